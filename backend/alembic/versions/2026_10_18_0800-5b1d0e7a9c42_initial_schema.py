@@ -0,0 +1,163 @@
+"""Initial schema
+
+Creates the tables that existed before migrations were introduced: users,
+analysis_results, data_sources, zoning_areas and schools.
+
+Databases already built with Base.metadata.create_all have these tables
+(and the later ones); mark them as current with `alembic stamp head`
+instead of upgrading.
+
+Revision ID: 5b1d0e7a9c42
+Revises:
+Create Date: 2026-10-18 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5b1d0e7a9c42"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("uid", sa.String(length=128), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=False),
+        sa.Column("full_name", sa.String(length=255), nullable=True),
+        sa.Column("hashed_password", sa.String(length=255), nullable=True),
+        sa.Column("role", sa.String(length=50), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_uid", "users", ["uid"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "analysis_results",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("analysis_id", sa.String(length=128), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("address", sa.Text(), nullable=False),
+        sa.Column("lat", sa.Float(), nullable=True),
+        sa.Column("lng", sa.Float(), nullable=True),
+        sa.Column("judgment", sa.String(length=20), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("profitability_score", sa.Float(), nullable=True),
+        sa.Column("licensing_score", sa.Float(), nullable=True),
+        sa.Column("regulation_risk_score", sa.Float(), nullable=True),
+        sa.Column("profitability_data", sa.JSON(), nullable=True),
+        sa.Column("licensing_data", sa.JSON(), nullable=True),
+        sa.Column("regulation_risk_data", sa.JSON(), nullable=True),
+        sa.Column("market_stats_data", sa.JSON(), nullable=True),
+        sa.Column("analyzed_at", sa.DateTime(), nullable=False),
+        sa.Column("data_freshness", sa.String(length=50), nullable=True),
+        sa.Column("model_version", sa.String(length=50), nullable=True),
+    )
+    op.create_index("ix_analysis_results_id", "analysis_results", ["id"])
+    op.create_index(
+        "ix_analysis_results_analysis_id",
+        "analysis_results",
+        ["analysis_id"],
+        unique=True,
+    )
+    op.create_index("ix_analysis_results_judgment", "analysis_results", ["judgment"])
+    op.create_index(
+        "ix_analysis_results_analyzed_at", "analysis_results", ["analyzed_at"]
+    )
+    op.create_index(
+        "idx_analysis_results_user_judgment",
+        "analysis_results",
+        ["user_id", "judgment"],
+    )
+    op.create_index(
+        "idx_analysis_results_analyzed_at", "analysis_results", ["analyzed_at"]
+    )
+
+    op.create_table(
+        "data_sources",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("source_id", sa.String(length=128), nullable=False),
+        sa.Column("source_type", sa.String(length=50), nullable=False),
+        sa.Column("source_url", sa.Text(), nullable=True),
+        sa.Column("publisher", sa.String(length=255), nullable=True),
+        sa.Column("prefecture", sa.String(length=100), nullable=True),
+        sa.Column("city", sa.String(length=100), nullable=True),
+        sa.Column("collected_at", sa.DateTime(), nullable=False),
+        sa.Column("ingested_at", sa.DateTime(), nullable=False),
+        sa.Column("license", sa.String(length=255), nullable=True),
+        sa.Column("meta_data", sa.JSON(), nullable=True),
+    )
+    op.create_index("ix_data_sources_id", "data_sources", ["id"])
+    op.create_index(
+        "ix_data_sources_source_id", "data_sources", ["source_id"], unique=True
+    )
+    op.create_index("ix_data_sources_source_type", "data_sources", ["source_type"])
+    op.create_index("ix_data_sources_prefecture", "data_sources", ["prefecture"])
+    op.create_index("ix_data_sources_city", "data_sources", ["city"])
+    op.create_index("ix_data_sources_collected_at", "data_sources", ["collected_at"])
+    op.create_index(
+        "idx_data_sources_type_city", "data_sources", ["source_type", "city"]
+    )
+
+    op.create_table(
+        "zoning_areas",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("area_code", sa.String(length=50), nullable=False),
+        sa.Column("prefecture", sa.String(length=100), nullable=False),
+        sa.Column("city", sa.String(length=100), nullable=False),
+        sa.Column("district", sa.String(length=255), nullable=True),
+        sa.Column("zoning_type", sa.String(length=100), nullable=False),
+        sa.Column("geometry", sa.JSON(), nullable=True),
+        sa.Column("building_coverage_ratio", sa.Float(), nullable=True),
+        sa.Column("floor_area_ratio", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_zoning_areas_id", "zoning_areas", ["id"])
+    op.create_index(
+        "ix_zoning_areas_area_code", "zoning_areas", ["area_code"], unique=True
+    )
+    op.create_index("ix_zoning_areas_prefecture", "zoning_areas", ["prefecture"])
+    op.create_index("ix_zoning_areas_city", "zoning_areas", ["city"])
+    op.create_index("ix_zoning_areas_zoning_type", "zoning_areas", ["zoning_type"])
+    op.create_index(
+        "idx_zoning_areas_city_type", "zoning_areas", ["city", "zoning_type"]
+    )
+
+    op.create_table(
+        "schools",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("school_code", sa.String(length=50), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("school_type", sa.String(length=50), nullable=False),
+        sa.Column("prefecture", sa.String(length=100), nullable=False),
+        sa.Column("city", sa.String(length=100), nullable=False),
+        sa.Column("address", sa.Text(), nullable=True),
+        sa.Column("lat", sa.Float(), nullable=False),
+        sa.Column("lng", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_schools_id", "schools", ["id"])
+    op.create_index("ix_schools_school_code", "schools", ["school_code"], unique=True)
+    op.create_index("ix_schools_school_type", "schools", ["school_type"])
+    op.create_index("ix_schools_prefecture", "schools", ["prefecture"])
+    op.create_index("ix_schools_city", "schools", ["city"])
+    op.create_index("ix_schools_lat", "schools", ["lat"])
+    op.create_index("ix_schools_lng", "schools", ["lng"])
+    op.create_index("idx_schools_location", "schools", ["lat", "lng"])
+    op.create_index("idx_schools_city_type", "schools", ["city", "school_type"])
+
+
+def downgrade() -> None:
+    op.drop_table("schools")
+    op.drop_table("zoning_areas")
+    op.drop_table("data_sources")
+    op.drop_table("analysis_results")
+    op.drop_table("users")
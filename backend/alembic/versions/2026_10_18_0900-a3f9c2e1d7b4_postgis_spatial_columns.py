@@ -0,0 +1,125 @@
+"""PostGIS spatial columns for zoning_areas and schools
+
+Adds zoning_areas.boundary (geometry, MultiPolygon) and schools.location
+(geography, Point), both with GiST indexes, so containment, KNN and
+distance-within queries can use an index instead of scanning the table.
+
+boundary is derived from the GeoJSON in zoning_areas.geometry by a
+trigger; rows whose GeoJSON PostGIS cannot parse get a NULL boundary
+rather than failing the write. location is a stored generated column over
+lat/lng. Existing zoning rows are backfilled in batches before the index
+is built.
+
+Revision ID: a3f9c2e1d7b4
+Revises: 5b1d0e7a9c42
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a3f9c2e1d7b4"
+down_revision = "5b1d0e7a9c42"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+
+    # zoning_areas.boundary, parsed from the GeoJSON column
+    op.execute(
+        "ALTER TABLE zoning_areas "
+        "ADD COLUMN IF NOT EXISTS boundary geometry(MultiPolygon,4326)"
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION zoning_boundary_from_geojson(geojson json)
+        RETURNS geometry(MultiPolygon,4326)
+        LANGUAGE plpgsql IMMUTABLE AS $$
+        BEGIN
+            IF geojson IS NULL THEN
+                RETURN NULL;
+            END IF;
+            RETURN ST_Multi(ST_CollectionExtract(ST_MakeValid(
+                ST_SetSRID(ST_GeomFromGeoJSON(geojson::text), 4326)
+            ), 3));
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION zoning_areas_sync_boundary()
+        RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.boundary := zoning_boundary_from_geojson(NEW.geometry);
+            RETURN NEW;
+        END
+        $$
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER zoning_areas_sync_boundary "
+        "BEFORE INSERT OR UPDATE OF geometry ON zoning_areas "
+        "FOR EACH ROW EXECUTE FUNCTION zoning_areas_sync_boundary()"
+    )
+
+    # Backfill in id ranges to keep each statement's lock and WAL short
+    backfill = (
+        "UPDATE zoning_areas SET boundary = zoning_boundary_from_geojson(geometry)"
+    )
+    if context.is_offline_mode():
+        op.execute(backfill)
+    else:
+        bind = op.get_bind()
+        low, high = bind.execute(
+            sa.text("SELECT min(id), max(id) FROM zoning_areas")
+        ).one()
+        if low is not None:
+            for start in range(low, high + 1, BACKFILL_BATCH_SIZE):
+                bind.execute(
+                    sa.text(f"{backfill} WHERE id >= :start AND id < :end"),
+                    {"start": start, "end": start + BACKFILL_BATCH_SIZE},
+                )
+
+    op.create_index(
+        "idx_zoning_areas_boundary",
+        "zoning_areas",
+        ["boundary"],
+        postgresql_using="gist",
+    )
+
+    # schools.location, generated from lat/lng (filled on ADD COLUMN)
+    op.execute(
+        "ALTER TABLE schools ADD COLUMN IF NOT EXISTS location "
+        "geography(Point,4326) GENERATED ALWAYS AS "
+        "(ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography) STORED"
+    )
+    op.create_index(
+        "idx_schools_geog",
+        "schools",
+        ["location"],
+        postgresql_using="gist",
+    )
+
+    op.execute("ANALYZE zoning_areas")
+    op.execute("ANALYZE schools")
+
+
+def downgrade() -> None:
+    op.drop_index("idx_schools_geog", table_name="schools")
+    op.drop_column("schools", "location")
+
+    op.drop_index("idx_zoning_areas_boundary", table_name="zoning_areas")
+    op.execute("DROP TRIGGER IF EXISTS zoning_areas_sync_boundary ON zoning_areas")
+    op.execute("DROP FUNCTION IF EXISTS zoning_areas_sync_boundary()")
+    op.execute("DROP FUNCTION IF EXISTS zoning_boundary_from_geojson(json)")
+    op.drop_column("zoning_areas", "boundary")
@@ -0,0 +1,65 @@
+"""Batch analysis job tables
+
+Revision ID: c7e2b5a91f3d
+Revises: a3f9c2e1d7b4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c7e2b5a91f3d"
+down_revision = "a3f9c2e1d7b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "batch_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("job_id", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.Column("idempotency_key", sa.String(length=255), nullable=True),
+        sa.Column("request_hash", sa.String(length=64), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("idempotency_key"),
+    )
+    op.create_index("ix_batch_jobs_id", "batch_jobs", ["id"])
+    op.create_index("ix_batch_jobs_job_id", "batch_jobs", ["job_id"], unique=True)
+    op.create_index("ix_batch_jobs_status", "batch_jobs", ["status"])
+
+    op.create_table(
+        "batch_job_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "job_id", sa.Integer(), sa.ForeignKey("batch_jobs.id"), nullable=False
+        ),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("location", sa.JSON(), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.UniqueConstraint("job_id", "position", name="uq_batch_job_items_position"),
+    )
+    op.create_index("ix_batch_job_items_id", "batch_job_items", ["id"])
+    op.create_index(
+        "idx_batch_job_items_job_status", "batch_job_items", ["job_id", "status"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_batch_job_items_job_status", table_name="batch_job_items")
+    op.drop_index("ix_batch_job_items_id", table_name="batch_job_items")
+    op.drop_table("batch_job_items")
+    op.drop_index("ix_batch_jobs_status", table_name="batch_jobs")
+    op.drop_index("ix_batch_jobs_job_id", table_name="batch_jobs")
+    op.drop_index("ix_batch_jobs_id", table_name="batch_jobs")
+    op.drop_table("batch_jobs")
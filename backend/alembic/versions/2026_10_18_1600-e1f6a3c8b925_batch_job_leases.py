@@ -0,0 +1,30 @@
+"""Batch job leases
+
+Adds batch_jobs.owner and batch_jobs.updated_at. The instance processing a
+job records itself as owner and heartbeats updated_at; other instances only
+take over a running job once its heartbeat is stale.
+
+Revision ID: e1f6a3c8b925
+Revises: c7e2b5a91f3d
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e1f6a3c8b925"
+down_revision = "c7e2b5a91f3d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("batch_jobs", sa.Column("owner", sa.String(length=64), nullable=True))
+    op.add_column("batch_jobs", sa.Column("updated_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("batch_jobs", "updated_at")
+    op.drop_column("batch_jobs", "owner")
@@ -0,0 +1,102 @@
+"""Analysis API endpoints"""
+
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, status
+import structlog
+
+from app.core.config import settings
+from app.models.batch import BatchAnalysisRequest, BatchJobStatus
+from app.services.batch_jobs import (
+    BatchJobConflictError,
+    BatchJobNotFoundError,
+    BatchJobRunner,
+    BatchJobsUnavailableError,
+    get_batch_runner,
+)
+
+router = APIRouter(prefix="/analyze", tags=["analysis"])
+logger = structlog.get_logger()
+
+
+def _runner() -> BatchJobRunner:
+    try:
+        return get_batch_runner()
+    except BatchJobsUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)
+        )
+
+
+@router.post(
+    "/batch", response_model=BatchJobStatus, status_code=status.HTTP_202_ACCEPTED
+)
+async def submit_batch_analysis(
+    request: BatchAnalysisRequest,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+) -> BatchJobStatus:
+    """
+    Submit locations for asynchronous analysis
+
+    Poll GET /analyze/batch/{job_id} for progress and results. Repeating a
+    request with the same Idempotency-Key returns the original job.
+
+    Args:
+        request: Locations to analyze
+        idempotency_key: Optional Idempotency-Key header
+
+    Returns:
+        BatchJobStatus of the queued job
+
+    Raises:
+        HTTPException: 400 if the batch is larger than the configured
+            maximum, 409 if the Idempotency-Key was used with a different
+            request, 503 if batch analysis is unavailable
+    """
+    if len(request.locations) > settings.BATCH_ANALYSIS_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Too many locations: {len(request.locations)} "
+                f"(maximum {settings.BATCH_ANALYSIS_MAX_SIZE})"
+            ),
+        )
+
+    runner = _runner()
+    locations = [
+        location.model_dump(exclude_none=True) for location in request.locations
+    ]
+    try:
+        return await runner.submit(locations, idempotency_key=idempotency_key)
+    except BatchJobConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+
+
+@router.get("/batch/{job_id}", response_model=BatchJobStatus)
+async def get_batch_analysis(job_id: str) -> BatchJobStatus:
+    """
+    Get a batch job's progress and per-location results
+
+    Raises:
+        HTTPException: 404 if the job does not exist
+    """
+    try:
+        return await _runner().get_status(job_id)
+    except BatchJobNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.post("/batch/{job_id}/cancel", response_model=BatchJobStatus)
+async def cancel_batch_analysis(job_id: str) -> BatchJobStatus:
+    """
+    Cancel a batch job
+
+    Locations already analyzed keep their results; the rest are marked
+    cancelled. Cancelling a finished job has no effect.
+
+    Raises:
+        HTTPException: 404 if the job does not exist
+    """
+    try:
+        return await _runner().cancel(job_id)
+    except BatchJobNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
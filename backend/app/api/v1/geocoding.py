@@ -1,20 +1,80 @@
 """Geocoding API endpoints"""
 
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+import json
+from typing import Tuple
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 import structlog
 
-from app.models.geocoding import GeocodingRequest, GeocodingResult
-from app.services.geocoding import geocode_address, GeocodingError
+from app.core.config import settings
+from app.core.retry import deadline
+from app.models.geocoding import (
+    BatchGeocodingItem,
+    BatchGeocodingRequest,
+    BatchGeocodingResponse,
+    BatchReverseGeocodingItem,
+    BatchReverseGeocodingRequest,
+    BatchReverseGeocodingResponse,
+    GeocodingRequest,
+    GeocodingResult,
+    ReverseGeocodingRequest,
+)
+from app.services.geocoding import (
+    geocode_address_with_metadata,
+    geocode_batch,
+    GeocodingError,
+)
+from app.services.geocoding_providers import (
+    GeocodingNotFoundError,
+    GeocodingUnavailableError,
+)
+from app.services.reverse_geocoding import reverse_geocode, reverse_geocode_batch
 
 router = APIRouter(prefix="/geocoding", tags=["geocoding"])
 logger = structlog.get_logger()
 
 
+def _error_response(address: str, error: Exception) -> Tuple[int, str]:
+    """Map a geocoding exception to an HTTP status code and detail"""
+    if isinstance(error, ValueError):
+        return status.HTTP_400_BAD_REQUEST, f"Invalid address: {str(error)}"
+
+    if isinstance(error, GeocodingUnavailableError):
+        return (
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            "Geocoding is temporarily unavailable. Please try again later.",
+        )
+
+    if isinstance(error, GeocodingError):
+        # Differentiate between rate limiting and other errors
+        if "rate limit" in str(error).lower():
+            return (
+                status.HTTP_429_TOO_MANY_REQUESTS,
+                "Geocoding rate limit exceeded. Please try again later.",
+            )
+        elif "No results" in str(error):
+            return status.HTTP_404_NOT_FOUND, f"Address not found: {address}"
+        else:
+            return (
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                f"Geocoding failed: {str(error)}",
+            )
+
+    return (
+        status.HTTP_500_INTERNAL_SERVER_ERROR,
+        "An unexpected error occurred during geocoding",
+    )
+
+
 @router.post("/", response_model=GeocodingResult)
-async def geocode(request: GeocodingRequest) -> GeocodingResult:
+async def geocode(request: GeocodingRequest, response: Response) -> GeocodingResult:
     """
     Geocode an address to coordinates
 
+    X-Cache-Status (fresh, stale or miss) and Age headers report whether the
+    result came from cache and how old it is.
+
     Args:
         request: Geocoding request with address
 
@@ -27,13 +87,16 @@ async def geocode(request: GeocodingRequest) -> GeocodingResult:
     try:
         logger.info("geocoding_api_request", address=request.address)
 
-        result = await geocode_address(request.address)
+        with deadline(settings.GEOCODING_DEADLINE):
+            result, metadata = await geocode_address_with_metadata(request.address)
+        response.headers.update(metadata.to_headers())
 
         logger.info(
             "geocoding_api_success",
             address=request.address,
             lat=result.lat,
             lng=result.lng,
+            cache_status=metadata.status,
         )
 
         return result
@@ -42,30 +105,13 @@ async def geocode(request: GeocodingRequest) -> GeocodingResult:
         logger.warning(
             "geocoding_api_invalid_input", address=request.address, error=str(e)
         )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid address: {str(e)}",
-        )
+        status_code, detail = _error_response(request.address, e)
+        raise HTTPException(status_code=status_code, detail=detail)
 
     except GeocodingError as e:
         logger.error("geocoding_api_error", address=request.address, error=str(e))
-
-        # Differentiate between rate limiting and other errors
-        if "rate limit" in str(e).lower():
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Geocoding rate limit exceeded. Please try again later.",
-            )
-        elif "No results" in str(e):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Address not found: {request.address}",
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Geocoding failed: {str(e)}",
-            )
+        status_code, detail = _error_response(request.address, e)
+        raise HTTPException(status_code=status_code, detail=detail)
 
     except Exception as e:
         logger.error(
@@ -73,7 +119,177 @@ async def geocode(request: GeocodingRequest) -> GeocodingResult:
             address=request.address,
             error=str(e),
         )
+        status_code, detail = _error_response(request.address, e)
+        raise HTTPException(status_code=status_code, detail=detail)
+
+
+@router.post("/batch", response_model=BatchGeocodingResponse)
+async def geocode_batch_endpoint(
+    request: BatchGeocodingRequest,
+    stream: bool = Query(
+        False, description="Stream per-item results as NDJSON in completion order"
+    ),
+):
+    """
+    Geocode many addresses in one request
+
+    Addresses are deduplicated after normalization and resolved concurrently.
+    Failures are reported per item instead of failing the whole batch.
+
+    Args:
+        request: Batch geocoding request with addresses
+        stream: If true, return application/x-ndjson with one item per line
+            as soon as each lookup finishes
+
+    Returns:
+        BatchGeocodingResponse with results in input order
+
+    Raises:
+        HTTPException: 400 if the batch is larger than the configured maximum
+    """
+    if len(request.addresses) > settings.GEOCODING_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Too many addresses: {len(request.addresses)} "
+                f"(maximum {settings.GEOCODING_BATCH_MAX_SIZE})"
+            ),
+        )
+
+    logger.info("geocoding_batch_api_request", total=len(request.addresses))
+
+    async def items():
+        async for indices, outcome in geocode_batch(request.addresses):
+            for index in indices:
+                address = request.addresses[index]
+                if isinstance(outcome, Exception):
+                    status_code, detail = _error_response(address, outcome)
+                    yield BatchGeocodingItem(
+                        index=index,
+                        address=address,
+                        status_code=status_code,
+                        error=detail,
+                    )
+                else:
+                    yield BatchGeocodingItem(
+                        index=index,
+                        address=address,
+                        status_code=status.HTTP_200_OK,
+                        result=outcome,
+                    )
+
+    if stream:
+
+        async def ndjson():
+            async for item in items():
+                yield json.dumps(item.model_dump(), ensure_ascii=False) + "\n"
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    results = sorted([item async for item in items()], key=lambda item: item.index)
+    succeeded = sum(1 for item in results if item.result is not None)
+
+    logger.info(
+        "geocoding_batch_api_success",
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+    )
+
+    return BatchGeocodingResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
+
+
+@router.post("/reverse", response_model=GeocodingResult)
+async def reverse_geocode_endpoint(request: ReverseGeocodingRequest) -> GeocodingResult:
+    """
+    Resolve coordinates to the containing 町丁目
+
+    Lookups run against the in-memory boundary index without external calls.
+
+    Args:
+        request: Reverse geocoding request with lat/lng
+
+    Returns:
+        GeocodingResult with the queried point and its 町丁目
+
+    Raises:
+        HTTPException: 404 if the point is outside every 町丁目, 503 if no
+            boundary data is loaded
+    """
+    try:
+        return reverse_geocode(request.lat, request.lng)
+    except GeocodingNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Location not found: {request.lat},{request.lng}",
+        )
+    except GeocodingUnavailableError as e:
+        logger.error("reverse_geocoding_unavailable", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Reverse geocoding is not available",
+        )
+
+
+@router.post("/reverse/batch", response_model=BatchReverseGeocodingResponse)
+async def reverse_geocode_batch_endpoint(
+    request: BatchReverseGeocodingRequest,
+) -> BatchReverseGeocodingResponse:
+    """
+    Resolve many coordinates in one vectorized pass
+
+    Args:
+        request: Batch reverse geocoding request with locations
+
+    Returns:
+        BatchReverseGeocodingResponse with results in input order
+
+    Raises:
+        HTTPException: 400 if the batch is larger than the configured
+            maximum, 503 if no boundary data is loaded
+    """
+    if len(request.locations) > settings.REVERSE_GEOCODING_BATCH_MAX_SIZE:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="An unexpected error occurred during geocoding",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Too many locations: {len(request.locations)} "
+                f"(maximum {settings.REVERSE_GEOCODING_BATCH_MAX_SIZE})"
+            ),
         )
+
+    lats = [location.lat for location in request.locations]
+    lngs = [location.lng for location in request.locations]
+    try:
+        # Large batches take a few milliseconds of CPU; keep the loop free
+        outcomes = await asyncio.to_thread(reverse_geocode_batch, lats, lngs)
+    except GeocodingUnavailableError as e:
+        logger.error("reverse_geocoding_unavailable", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Reverse geocoding is not available",
+        )
+
+    results = [
+        BatchReverseGeocodingItem(index=index, lat=lat, lng=lng, result=result)
+        for index, (lat, lng, result) in enumerate(zip(lats, lngs, outcomes))
+    ]
+    succeeded = sum(1 for item in results if item.result is not None)
+
+    logger.info(
+        "reverse_geocoding_batch_success",
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+    )
+
+    return BatchReverseGeocodingResponse(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
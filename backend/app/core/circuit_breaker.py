@@ -0,0 +1,207 @@
+"""Circuit breaker for upstream dependencies"""
+
+import time
+from collections import deque
+from typing import Dict, Optional
+import structlog
+
+logger = structlog.get_logger()
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+    pass
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker
+
+    Outcomes of recent calls are kept in a sliding window. Once at least
+    min_calls have been recorded, the circuit opens if the failure rate or
+    the slow-call rate reaches its threshold. While open, calls fail fast.
+    After open_duration the circuit lets a few trial calls through
+    (half-open): if they all succeed it closes, otherwise it opens again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        slow_call_threshold: float = 3.0,
+        slow_call_rate_threshold: float = 0.8,
+        window_size: int = 20,
+        min_calls: int = 10,
+        open_duration: float = 30.0,
+        half_open_max_calls: int = 3,
+    ):
+        """
+        Args:
+            name: Breaker name used in logs and /health
+            failure_rate_threshold: Failure ratio (0-1) that opens the circuit
+            slow_call_threshold: Seconds after which a call counts as slow
+            slow_call_rate_threshold: Slow-call ratio (0-1) that opens it
+            window_size: Number of recent calls considered
+            min_calls: Calls required before the rates are evaluated
+            open_duration: Seconds to stay open before trial calls
+            half_open_max_calls: Trial calls needed to close again
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+
+        self._state = self.CLOSED
+        self._window: deque = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timer expires"""
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.open_duration
+        ):
+            self._transition(self.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        previous = self._state
+        self._state = state
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+        if state in (self.HALF_OPEN, self.CLOSED):
+            self._half_open_in_flight = 0
+            self._half_open_successes = 0
+        if state == self.CLOSED:
+            self._window.clear()
+
+        log = logger.warning if state == self.OPEN else logger.info
+        log(
+            "circuit_breaker_state_changed",
+            breaker=self.name,
+            previous=previous,
+            state=state,
+        )
+
+    def allow(self) -> None:
+        """
+        Check whether a call may proceed
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all
+                trial slots taken
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if (
+            state == self.HALF_OPEN
+            and self._half_open_in_flight < self.half_open_max_calls
+        ):
+            self._half_open_in_flight += 1
+            return
+
+        self.rejected += 1
+        raise CircuitOpenError(f"Circuit breaker '{self.name}' is open")
+
+    def reset(self) -> None:
+        """Force the circuit closed and forget recorded outcomes"""
+        if self._state != self.CLOSED:
+            self._transition(self.CLOSED)
+        self._window.clear()
+
+    def release(self) -> None:
+        """Release a permit for a call that ended without an outcome (e.g. cancelled)"""
+        if self._state == self.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def record_success(self, latency: float = 0.0) -> None:
+        """Record a successful call and its latency in seconds"""
+        slow = latency >= self.slow_call_threshold
+        if self._state == self.HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            if slow:
+                self._transition(self.OPEN)
+                return
+            self._half_open_successes += 1
+            if self._half_open_successes >= self.half_open_max_calls:
+                self._transition(self.CLOSED)
+            return
+
+        self._window.append((True, slow))
+        self._evaluate()
+
+    def record_failure(self, latency: float = 0.0) -> None:
+        """Record a failed call and its latency in seconds"""
+        if self._state == self.HALF_OPEN:
+            self._transition(self.OPEN)
+            return
+
+        self._window.append((False, latency >= self.slow_call_threshold))
+        self._evaluate()
+
+    def _evaluate(self) -> None:
+        if self._state != self.CLOSED or len(self._window) < self.min_calls:
+            return
+        calls = len(self._window)
+        failure_rate = sum(1 for ok, _ in self._window if not ok) / calls
+        slow_rate = sum(1 for _, slow in self._window if slow) / calls
+        if (
+            failure_rate >= self.failure_rate_threshold
+            or slow_rate >= self.slow_call_rate_threshold
+        ):
+            logger.warning(
+                "circuit_breaker_tripped",
+                breaker=self.name,
+                failure_rate=round(failure_rate, 3),
+                slow_call_rate=round(slow_rate, 3),
+            )
+            self._transition(self.OPEN)
+
+    def get_stats(self) -> dict:
+        """Get state and window statistics"""
+        calls = len(self._window)
+        return {
+            "state": self.state,
+            "calls_in_window": calls,
+            "failure_rate": (
+                sum(1 for ok, _ in self._window if not ok) / calls if calls else 0.0
+            ),
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+        }
+
+
+# Registry of named breakers, reported by /health
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def register_circuit_breaker(breaker: CircuitBreaker) -> CircuitBreaker:
+    """Register a breaker so its state is reported"""
+    _breakers[breaker.name] = breaker
+    return breaker
+
+
+def get_circuit_breaker(name: str) -> Optional[CircuitBreaker]:
+    """Get a registered breaker by name"""
+    return _breakers.get(name)
+
+
+def get_circuit_breaker_states() -> Dict[str, str]:
+    """Get the state of every registered breaker"""
+    return {name: breaker.state for name, breaker in _breakers.items()}
@@ -0,0 +1,169 @@
+"""Binary codec for cached values
+
+Encoded values are msgpack, optionally compressed, behind a 3-byte header:
+
+    0xCA | format version | compression id
+
+The header lets readers tell encoded values from values written before the
+codec existed (Firestore maps, JSON strings), and lets a new format version
+roll out safely: deploy readers that understand it first, then switch the
+writer. Unknown versions or compressions raise CodecError, which the cache
+backends treat as a miss.
+"""
+
+import zlib
+from typing import Any, Optional
+import msgpack
+import structlog
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:  # pragma: no cover - optional dependency
+    lz4_frame = None
+
+logger = structlog.get_logger()
+
+MAGIC = 0xCA
+VERSION = 1
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_LZ4 = 3
+
+_COMPRESSION_IDS = {
+    "none": COMPRESSION_NONE,
+    "zlib": COMPRESSION_ZLIB,
+    "zstd": COMPRESSION_ZSTD,
+    "lz4": COMPRESSION_LZ4,
+}
+
+
+class CodecError(Exception):
+    """Raised when a value cannot be decoded"""
+
+    pass
+
+
+def _available(compression_id: int) -> bool:
+    if compression_id == COMPRESSION_ZSTD:
+        return zstandard is not None
+    if compression_id == COMPRESSION_LZ4:
+        return lz4_frame is not None
+    return True
+
+
+def _compress(compression_id: int, data: bytes) -> bytes:
+    if compression_id == COMPRESSION_ZLIB:
+        return zlib.compress(data, 1)
+    if compression_id == COMPRESSION_ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if compression_id == COMPRESSION_LZ4:
+        return lz4_frame.compress(data)
+    return data
+
+
+def _decompress(compression_id: int, data: bytes) -> bytes:
+    if compression_id == COMPRESSION_NONE:
+        return data
+    if compression_id == COMPRESSION_ZLIB:
+        return zlib.decompress(data)
+    if not _available(compression_id):
+        raise CodecError(f"Compression {compression_id} is not installed")
+    if compression_id == COMPRESSION_ZSTD:
+        return zstandard.ZstdDecompressor().decompress(data)
+    if compression_id == COMPRESSION_LZ4:
+        return lz4_frame.decompress(data)
+    raise CodecError(f"Unknown compression: {compression_id}")
+
+
+def is_encoded(data: Any) -> bool:
+    """Check whether a stored value was written by a Codec"""
+    return isinstance(data, (bytes, bytearray)) and len(data) >= 3 and data[0] == MAGIC
+
+
+class Codec:
+    """
+    msgpack serialization with compression above a size threshold
+
+    The requested compression falls back to zlib when its library is not
+    installed (zstandard and lz4 are optional dependencies).
+    """
+
+    def __init__(self, compression: str = "zstd", compress_min_bytes: int = 1024):
+        if compression not in _COMPRESSION_IDS:
+            raise ValueError(f"Unknown compression: {compression}")
+
+        compression_id = _COMPRESSION_IDS[compression]
+        if not _available(compression_id):
+            logger.warning("codec_compression_unavailable", compression=compression)
+            compression, compression_id = "zlib", COMPRESSION_ZLIB
+
+        self.compression = compression
+        self.compression_id = compression_id
+        self.compress_min_bytes = compress_min_bytes
+
+    def encode(self, value: Any) -> bytes:
+        """Encode a JSON-like value"""
+        payload = msgpack.packb(value, use_bin_type=True)
+        compression_id = COMPRESSION_NONE
+        if self.compression_id != COMPRESSION_NONE and (
+            len(payload) >= self.compress_min_bytes
+        ):
+            compressed = _compress(self.compression_id, payload)
+            # Keep the raw payload when compression does not pay off
+            if len(compressed) < len(payload):
+                payload, compression_id = compressed, self.compression_id
+        return bytes((MAGIC, VERSION, compression_id)) + payload
+
+    def decode(self, data: bytes) -> Any:
+        """Decode a value written by any Codec (see decode)"""
+        return decode(data)
+
+
+def decode(data: bytes) -> Any:
+    """
+    Decode a value written by any Codec, whatever its compression
+
+    Raises:
+        CodecError: If the header or payload is not understood
+    """
+    if not is_encoded(data):
+        raise CodecError("Missing codec header")
+    version, compression_id = data[1], data[2]
+    if version != VERSION:
+        raise CodecError(f"Unsupported codec version: {version}")
+
+    try:
+        payload = _decompress(compression_id, bytes(data[3:]))
+        return msgpack.unpackb(payload, raw=False)
+    except CodecError:
+        raise
+    except Exception as e:
+        raise CodecError(f"Corrupt cached value: {e}") from e
+
+
+def build_codec(
+    name: str, compression: str = "zstd", compress_min_bytes: int = 1024
+) -> Optional[Codec]:
+    """
+    Build the codec selected in settings
+
+    Args:
+        name: "msgpack", or "json" to keep writing values in the legacy format
+        compression: "zstd", "lz4", "zlib" or "none"
+        compress_min_bytes: Payloads smaller than this are not compressed
+
+    Returns:
+        Codec, or None for the legacy format
+    """
+    if name == "json":
+        return None
+    if name != "msgpack":
+        raise ValueError(f"Unknown cache codec: {name}")
+    return Codec(compression=compression, compress_min_bytes=compress_min_bytes)
@@ -0,0 +1,144 @@
+"""Planar geometry helpers for lat/lng polygons and points
+
+Polygons are lists of rings, each an (N, 2) float array of (lng, lat)
+vertices; the first ring is the exterior and the rest are holes. Rings may or
+may not repeat their first vertex. Tests use the even-odd rule, which is
+exact for the small 町丁目-sized polygons we deal with.
+"""
+
+from typing import List, Sequence, Tuple
+import numpy as np
+
+Ring = np.ndarray
+Polygon = List[Ring]
+BBox = Tuple[float, float, float, float]  # min_lng, min_lat, max_lng, max_lat
+
+
+def as_ring(coordinates: Sequence[Sequence[float]]) -> Ring:
+    """Convert GeoJSON ring coordinates to an (N, 2) float array"""
+    ring = np.asarray(coordinates, dtype=np.float64)[:, :2]
+    if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+        ring = ring[:-1]
+    return ring
+
+
+def polygons_from_geojson(geometry: dict) -> List[Polygon]:
+    """
+    Read the polygons of a GeoJSON Polygon or MultiPolygon geometry
+
+    Raises:
+        ValueError: If the geometry is of another type
+    """
+    geometry_type = geometry.get("type")
+    if geometry_type == "Polygon":
+        parts = [geometry["coordinates"]]
+    elif geometry_type == "MultiPolygon":
+        parts = geometry["coordinates"]
+    else:
+        raise ValueError(f"Unsupported geometry type: {geometry_type}")
+    return [[as_ring(ring) for ring in part] for part in parts]
+
+
+def polygon_bbox(polygon: Polygon) -> BBox:
+    """Bounding box of a polygon (its exterior ring)"""
+    exterior = polygon[0]
+    min_lng, min_lat = exterior.min(axis=0)
+    max_lng, max_lat = exterior.max(axis=0)
+    return float(min_lng), float(min_lat), float(max_lng), float(max_lat)
+
+
+def polygon_edges(polygon: Polygon) -> np.ndarray:
+    """
+    Edges of every ring of a polygon as an (N, 4) array of x1, y1, x2, y2
+
+    Counting ray crossings over the edges of all rings together gives the
+    even-odd test for a polygon with holes in a single pass.
+    """
+    edges = [np.hstack([ring, np.roll(ring, -1, axis=0)]) for ring in polygon]
+    return np.vstack(edges)
+
+
+def edge_crossings(edges: np.ndarray, lngs: np.ndarray, lats: np.ndarray) -> np.ndarray:
+    """
+    Whether a ray cast east from each point crosses each edge
+
+    edges (..., 4) broadcasts against lngs and lats, so the same function
+    serves one polygon against many points and aligned point/edge pairs.
+    """
+    x1 = edges[..., 0]
+    y1 = edges[..., 1]
+    x2 = edges[..., 2]
+    y2 = edges[..., 3]
+    spans = (y1 > lats) != (y2 > lats)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_at = x1 + (lats - y1) * (x2 - x1) / (y2 - y1)
+    return spans & (lngs < x_at)
+
+
+def points_in_polygon(
+    polygon: Polygon, lngs: np.ndarray, lats: np.ndarray
+) -> np.ndarray:
+    """
+    Test many points against a polygon with holes
+
+    Args:
+        polygon: Exterior ring followed by hole rings
+        lngs: Longitudes
+        lats: Latitudes
+
+    Returns:
+        Boolean array, True for points inside the polygon
+    """
+    lngs = np.asarray(lngs, dtype=np.float64)[:, None]
+    lats = np.asarray(lats, dtype=np.float64)[:, None]
+    hits = edge_crossings(polygon_edges(polygon)[None, :, :], lngs, lats)
+    return (np.count_nonzero(hits, axis=1) % 2).astype(bool)
+
+
+def point_in_polygon(polygon: Polygon, lng: float, lat: float) -> bool:
+    """Test a single point against a polygon with holes"""
+    return bool(points_in_polygon(polygon, np.array([lng]), np.array([lat]))[0])
+
+
+def expand_ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Concatenate the integer ranges [start, start + count) without a loop
+
+    expand_ranges([10, 20], [2, 3]) -> [10, 11, 20, 21, 22]
+    """
+    total = int(counts.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(total, dtype=np.int64)
+
+
+def pairs_in_polygons(
+    edges: np.ndarray,
+    edge_starts: np.ndarray,
+    polygons: np.ndarray,
+    lngs: np.ndarray,
+    lats: np.ndarray,
+) -> np.ndarray:
+    """
+    Test aligned (point, polygon) pairs in one pass over flattened edges
+
+    Every pair is expanded into one row per edge of its polygon and ray
+    crossings are counted for all rows at once.
+
+    Args:
+        edges: (E, 4) edges of all polygons (see polygon_edges)
+        edge_starts: Polygon i owns edges[edge_starts[i]:edge_starts[i + 1]]
+        polygons: Polygon index of each pair
+        lngs: Longitude of each pair's point
+        lats: Latitude of each pair's point
+
+    Returns:
+        Boolean array, True for pairs whose point is inside the polygon
+    """
+    counts = edge_starts[polygons + 1] - edge_starts[polygons]
+    rows = np.repeat(np.arange(len(polygons)), counts)
+    hits = edge_crossings(
+        edges[expand_ranges(edge_starts[polygons], counts)], lngs[rows], lats[rows]
+    )
+    return np.bincount(rows[hits], minlength=len(polygons)) % 2 == 1
@@ -0,0 +1,184 @@
+"""Cross-instance cache invalidation over pub/sub
+
+Every instance keeps an in-process L1 cache. When one instance writes or
+deletes a key it publishes the key, and every other instance drops it from
+its L1. Messages carry the publisher's instance id so an instance ignores its
+own invalidations (it has already applied them locally).
+
+Delivery is best effort: if the subscription drops, subscribers are told to
+flush everything once it is re-established, and L1 TTLs bound staleness in
+the meantime.
+"""
+
+import asyncio
+import json
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+import redis.asyncio as redis
+import structlog
+
+logger = structlog.get_logger()
+
+# Called with the invalidated keys, or None to flush everything
+InvalidationHandler = Callable[[Optional[List[str]]], None]
+
+
+class InvalidationBus(ABC):
+    """Base class for invalidation channels"""
+
+    def __init__(self, channel: str = "cache-invalidation"):
+        self.channel = channel
+        self.instance_id = uuid.uuid4().hex
+        self._handlers: List[InvalidationHandler] = []
+        self.published = 0
+        self.received = 0
+        self.publish_errors = 0
+
+    def subscribe(self, handler: InvalidationHandler) -> None:
+        """Register a handler for invalidations from other instances"""
+        self._handlers.append(handler)
+
+    def _dispatch(self, keys: Optional[List[str]]) -> None:
+        self.received += 1
+        for handler in self._handlers:
+            try:
+                handler(keys)
+            except Exception as e:
+                logger.error("cache_invalidation_handler_failed", error=str(e))
+
+    def _message(self, keys: Optional[List[str]]) -> str:
+        return json.dumps({"source": self.instance_id, "keys": keys})
+
+    async def start(self) -> None:
+        """Start receiving invalidations"""
+
+    async def close(self) -> None:
+        """Stop receiving invalidations"""
+
+    @abstractmethod
+    async def publish(self, keys: Optional[List[str]]) -> None:
+        """
+        Tell other instances to drop keys from their L1 (None for all)
+
+        Never raises; failures are logged and counted.
+        """
+
+    def get_stats(self) -> dict:
+        """Get message counts"""
+        return {
+            "backend": type(self).__name__,
+            "published": self.published,
+            "received": self.received,
+            "publish_errors": self.publish_errors,
+        }
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """
+    In-process stand-in for tests and single-instance deployments
+
+    Buses on the same channel in one process behave like separate instances
+    connected to the same pub/sub topic.
+    """
+
+    _channels: Dict[str, List["LocalInvalidationBus"]] = {}
+
+    async def start(self) -> None:
+        members = self._channels.setdefault(self.channel, [])
+        if self not in members:
+            members.append(self)
+
+    async def close(self) -> None:
+        members = self._channels.get(self.channel, [])
+        if self in members:
+            members.remove(self)
+
+    async def publish(self, keys: Optional[List[str]]) -> None:
+        self.published += 1
+        payload = json.loads(self._message(keys))
+        for bus in list(self._channels.get(self.channel, [])):
+            if bus.instance_id != payload["source"]:
+                bus._dispatch(payload["keys"])
+
+
+class RedisInvalidationBus(InvalidationBus):
+    """Invalidation channel over Redis pub/sub"""
+
+    def __init__(
+        self,
+        url: str,
+        channel: str = "cache-invalidation",
+        reconnect_delay: float = 1.0,
+    ):
+        super().__init__(channel)
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self._redis = None
+        self._task: Optional[asyncio.Task] = None
+        self.reconnects = 0
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._redis = redis.from_url(self.url)
+        self._task = asyncio.create_task(self._listen())
+        logger.info("cache_invalidation_started", channel=self.channel)
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _listen(self) -> None:
+        connected_before = False
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    if connected_before:
+                        # Invalidations may have been missed while disconnected
+                        self.reconnects += 1
+                        self._dispatch(None)
+                    connected_before = True
+
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        payload = json.loads(message["data"])
+                        if payload.get("source") == self.instance_id:
+                            continue
+                        self._dispatch(payload.get("keys"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(
+                    "cache_invalidation_disconnected",
+                    channel=self.channel,
+                    error=str(e),
+                )
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def publish(self, keys: Optional[List[str]]) -> None:
+        if self._redis is None:
+            return
+        try:
+            await self._redis.publish(self.channel, self._message(keys))
+            self.published += 1
+        except Exception as e:
+            self.publish_errors += 1
+            logger.warning(
+                "cache_invalidation_publish_failed",
+                channel=self.channel,
+                error=str(e),
+            )
+
+    def get_stats(self) -> dict:
+        return {**super().get_stats(), "reconnects": self.reconnects}
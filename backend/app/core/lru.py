@@ -0,0 +1,127 @@
+"""In-memory LRU cache with TTL expiry"""
+
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a JSON-like value in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimate_size(key) + estimate_size(item)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            size += estimate_size(item)
+    return size
+
+
+class LRUCache:
+    """
+    Bounded in-process LRU cache with per-entry TTL
+
+    Bounded by entry count and, optionally, by the estimated size of the
+    stored values. Not thread-safe; intended for use from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl: float = 3600.0,
+        max_bytes: Optional[int] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # key -> (expires_at, value, estimated size)
+        self._data: "OrderedDict[str, tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def _pop(self, key: str) -> bool:
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value, or None if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._pop(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Set value, evicting the least recently used entries when full"""
+        ttl = self.ttl if ttl is None else ttl
+        size = estimate_size(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            # Never worth evicting everything else for one oversized value
+            self._pop(key)
+            return
+
+        self._pop(key)
+        self._data[key] = (time.monotonic() + ttl, value, size)
+        self._bytes += size
+
+        while len(self._data) > self.max_entries or (
+            self.max_bytes and self._bytes > self.max_bytes
+        ):
+            _, (_, _, evicted_size) = self._data.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        """Delete value, returning whether it was present"""
+        return self._pop(key)
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """Unexpired (key, value) pairs, least recently used first"""
+        now = time.monotonic()
+        return [
+            (key, value)
+            for key, (expires_at, value, _) in self._data.items()
+            if expires_at > now
+        ]
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._data.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> dict:
+        """Get cache statistics"""
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,184 @@
+"""Async token-bucket rate limiter for upstream APIs"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+import structlog
+
+from app.core.retry import cap_timeout
+
+logger = structlog.get_logger()
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a permit cannot be granted within the allowed wait"""
+
+    pass
+
+
+class TokenBucketRateLimiter:
+    """
+    Token-bucket limiter with FIFO queueing and adaptive slowdown
+
+    Permits are reserved in call order (GCRA-style virtual scheduling), so
+    waiters are served fairly. A caller that would have to wait past its
+    deadline is rejected immediately without consuming a permit.
+
+    The effective rate is halved whenever the upstream reports throttling and
+    recovers additively on success (AIMD), never exceeding the configured rate.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: int = 1,
+        daily_budget: int = 0,
+        max_wait: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        recovery_step: float = 0.05,
+    ):
+        """
+        Args:
+            name: Limiter name used in logs
+            rate: Permits per second
+            burst: Permits that may be granted back to back
+            daily_budget: Maximum permits per UTC day (0 for unlimited)
+            max_wait: Default maximum queueing time in seconds
+            min_rate: Floor for the adaptive rate (default: 10% of rate)
+            recovery_step: Fraction of rate restored per successful call
+        """
+        self.name = name
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.daily_budget = daily_budget
+        self.max_wait = max_wait
+        self.min_rate = min_rate if min_rate is not None else rate * 0.1
+        self.recovery_step = recovery_step
+
+        # Theoretical arrival time of the next permit (monotonic clock)
+        self._tat = 0.0
+        self._day = self._today()
+        self._daily_used = 0
+
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.acquired = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait_observed = 0.0
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.utcnow().date().isoformat()
+
+    def _check_daily_budget(self) -> None:
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._daily_used = 0
+
+        if self.daily_budget and self._daily_used >= self.daily_budget:
+            self.rejected += 1
+            raise RateLimitExceeded(
+                f"{self.name} daily budget of {self.daily_budget} requests exhausted"
+            )
+
+    async def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Wait for a permit
+
+        Args:
+            timeout: Maximum seconds to queue (default: max_wait), further
+                capped by the time left before the current deadline
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If the daily budget is exhausted or the permit
+                would not be granted within the timeout
+        """
+        self._check_daily_budget()
+
+        timeout = cap_timeout(self.max_wait if timeout is None else timeout)
+        interval = 1.0 / self.rate
+        now = time.monotonic()
+        start = max(now, self._tat - (self.burst - 1) * interval)
+        wait = start - now
+
+        if timeout is not None and wait > timeout:
+            self.rejected += 1
+            logger.warning(
+                "rate_limit_rejected",
+                limiter=self.name,
+                wait=round(wait, 3),
+                timeout=timeout,
+                queue_depth=self.queue_depth,
+            )
+            raise RateLimitExceeded(
+                f"{self.name} rate limit exceeded (would wait {wait:.2f}s)"
+            )
+
+        # Reserve the slot before sleeping so later callers queue behind us
+        self._tat = reserved = max(self._tat, now) + interval
+        self._daily_used += 1
+
+        if wait > 0:
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Hand the unused permit back. If later callers already
+                # queued behind it their slots stay put; only the tail can
+                # be released without reordering the queue.
+                if self._tat == reserved:
+                    self._tat -= interval
+                self._daily_used = max(0, self._daily_used - 1)
+                raise
+            finally:
+                self.queue_depth -= 1
+
+        self.acquired += 1
+        self.total_wait += wait
+        self.max_wait_observed = max(self.max_wait_observed, wait)
+        return wait
+
+    def record_throttled(self) -> None:
+        """Slow down after the upstream reported rate limiting"""
+        self.throttled += 1
+        previous = self.rate
+        self.rate = max(self.min_rate, self.rate * 0.5)
+        logger.warning(
+            "rate_limit_throttled",
+            limiter=self.name,
+            previous_rate=previous,
+            rate=self.rate,
+        )
+
+    def record_success(self) -> None:
+        """Recover toward the configured rate after a successful call"""
+        if self.rate < self.max_rate:
+            self.rate = min(
+                self.max_rate, self.rate + self.max_rate * self.recovery_step
+            )
+
+    def get_stats(self) -> dict:
+        """Get queue and wait-time metrics"""
+        return {
+            "rate": self.rate,
+            "max_rate": self.max_rate,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "acquired": self.acquired,
+            "rejected": self.rejected,
+            "throttled": self.throttled,
+            "avg_wait": self.total_wait / self.acquired if self.acquired else 0.0,
+            "max_wait": self.max_wait_observed,
+            "daily_used": self._daily_used,
+            "daily_budget": self.daily_budget,
+        }
@@ -0,0 +1,246 @@
+"""Deadline-aware retries with a global retry budget
+
+A deadline is an absolute point on the monotonic clock carried in a context
+variable, so it follows the request into every coroutine and task it spawns.
+Nested deadlines can only shorten the one already in effect.
+
+RetryPolicy retries transient failures with full-jitter exponential backoff.
+It never sleeps past the deadline, and every retry spends a token from a
+RetryBudget that only refills as a fraction of first attempts, so retries
+cannot multiply load on an upstream that is already failing.
+"""
+
+import asyncio
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+import structlog
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when there is no time left before the current deadline"""
+
+    pass
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """
+    Run the enclosed block under a deadline
+
+    Args:
+        seconds: Time allowed from now; an earlier enclosing deadline wins
+
+    Yields:
+        The effective deadline on the monotonic clock
+    """
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        expires_at = min(expires_at, current)
+
+    token = _deadline.set(expires_at)
+    try:
+        yield expires_at
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one"""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return None
+    return max(0.0, expires_at - time.monotonic())
+
+
+def cap_timeout(timeout: Optional[float]) -> Optional[float]:
+    """Cap a timeout by the time left before the current deadline"""
+    remaining = remaining_time()
+    if remaining is None:
+        return timeout
+    if timeout is None:
+        return remaining
+    return min(timeout, remaining)
+
+
+class RetryBudget:
+    """
+    Token bucket limiting retries to a fraction of requests
+
+    Each first attempt deposits `ratio` tokens and each retry withdraws one,
+    so in steady state retries stay below ratio * requests. `max_tokens`
+    caps how many retries can be saved up for a burst.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+
+        self.requests = 0
+        self.retries = 0
+        self.exhausted = 0
+
+    def record_request(self) -> None:
+        """Record a first attempt"""
+        self.requests += 1
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """Spend a token for a retry, returning False if none is left"""
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            self.retries += 1
+            return True
+        self.exhausted += 1
+        return False
+
+    def get_stats(self) -> dict:
+        """Get token and usage counts"""
+        return {
+            "ratio": self.ratio,
+            "tokens": round(self._tokens, 3),
+            "requests": self.requests,
+            "retries": self.retries,
+            "exhausted": self.exhausted,
+        }
+
+
+class RetryPolicy:
+    """
+    Retry transient failures within the deadline and retry budget
+
+    Outcomes are counted per call:
+        success: succeeded on the first attempt
+        success_after_retry: succeeded on a later attempt
+        non_retryable: failed with an error that is not retried
+        attempts_exhausted: still failing after max_attempts
+        budget_exhausted: retry denied by the retry budget
+        deadline_exceeded: no time left for another attempt
+    """
+
+    OUTCOMES = (
+        "success",
+        "success_after_retry",
+        "non_retryable",
+        "attempts_exhausted",
+        "budget_exhausted",
+        "deadline_exceeded",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        retryable: Callable[[Exception], bool],
+        max_attempts: int = 3,
+        base_delay: float = 0.2,
+        max_delay: float = 2.0,
+        budget: Optional[RetryBudget] = None,
+    ):
+        """
+        Args:
+            name: Policy name used in logs
+            retryable: Returns True for errors worth retrying
+            max_attempts: Maximum attempts including the first one
+            base_delay: Backoff cap in seconds before the first retry
+            max_delay: Upper bound of the backoff cap
+            budget: Shared retry budget (default: a private 10% budget)
+        """
+        self.name = name
+        self.retryable = retryable
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+
+        self.attempts = 0
+        self.outcomes: Dict[str, int] = {outcome: 0 for outcome in self.OUTCOMES}
+
+    def backoff(self, retry: int) -> float:
+        """Full-jitter backoff before the given retry (1-based)"""
+        cap = min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        return random.uniform(0, cap)
+
+    def _give_up(self, outcome: str, error: Exception, attempt: int) -> None:
+        self.outcomes[outcome] += 1
+        if outcome != "non_retryable":
+            logger.warning(
+                "retry_gave_up",
+                policy=self.name,
+                outcome=outcome,
+                attempts=attempt,
+                error=str(error),
+            )
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Call fn, retrying transient failures
+
+        Args:
+            fn: Zero-argument coroutine function performing one attempt
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            DeadlineExceeded: If the deadline passed before the first attempt
+            Exception: The last error raised by fn when giving up
+        """
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            self.outcomes["deadline_exceeded"] += 1
+            raise DeadlineExceeded(f"{self.name} deadline exceeded")
+
+        self.budget.record_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            self.attempts += 1
+            try:
+                result = await fn()
+            except Exception as e:
+                if not self.retryable(e):
+                    self._give_up("non_retryable", e, attempt)
+                    raise
+                if attempt >= self.max_attempts:
+                    self._give_up("attempts_exhausted", e, attempt)
+                    raise
+
+                delay = self.backoff(attempt)
+                remaining = remaining_time()
+                if remaining is not None and delay >= remaining:
+                    self._give_up("deadline_exceeded", e, attempt)
+                    raise
+                if not self.budget.try_acquire():
+                    self._give_up("budget_exhausted", e, attempt)
+                    raise
+
+                logger.info(
+                    "retry_scheduled",
+                    policy=self.name,
+                    attempt=attempt,
+                    delay=round(delay, 3),
+                    error=str(e),
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            self.outcomes["success" if attempt == 1 else "success_after_retry"] += 1
+            return result
+
+    def get_stats(self) -> dict:
+        """Get attempt and outcome counts"""
+        return {
+            "attempts": self.attempts,
+            "outcomes": dict(self.outcomes),
+            "budget": self.budget.get_stats(),
+        }
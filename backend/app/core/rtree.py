@@ -0,0 +1,169 @@
+"""Static R-tree over bounding boxes, packed with Sort-Tile-Recursive (STR)
+
+The tree is built once from a fixed set of boxes and never updated, so it is
+stored as flat arrays: every level holds its node boxes plus, in CSR form,
+the indices of each node's children in the level below (or of the items at
+the leaf level). Point queries descend level by level, either for one point
+in plain Python or for many points at once as (point, node) pair arrays.
+"""
+
+import math
+from typing import List, Tuple
+import numpy as np
+
+from app.core.geometry import expand_ranges
+
+
+def _str_order(boxes: np.ndarray, capacity: int) -> np.ndarray:
+    """
+    Sort-Tile-Recursive order of boxes
+
+    Boxes are sorted by centre x into vertical slices of about
+    sqrt(n / capacity) nodes each, then by centre y within each slice, so
+    consecutive runs of capacity boxes make compact nodes.
+    """
+    count = len(boxes)
+    centres_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    centres_y = (boxes[:, 1] + boxes[:, 3]) / 2
+    slice_count = math.ceil(math.sqrt(math.ceil(count / capacity)))
+    slice_size = slice_count * capacity
+
+    by_x = np.argsort(centres_x, kind="stable")
+    slices = np.arange(count) // slice_size
+    # Sort by slice, then centre y within the slice
+    return by_x[np.lexsort((centres_y[by_x], slices))]
+
+
+def _pack(
+    boxes: np.ndarray, capacity: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Group boxes into parent nodes of up to capacity children
+
+    Returns:
+        (parent boxes, child starts, child indices) with the children of
+        parent j at child_indices[child_starts[j]:child_starts[j + 1]]
+    """
+    order = _str_order(boxes, capacity)
+    starts = np.append(np.arange(0, len(order), capacity), len(order))
+    ordered = boxes[order]
+    parents = np.column_stack(
+        [
+            np.minimum.reduceat(ordered[:, 0], starts[:-1]),
+            np.minimum.reduceat(ordered[:, 1], starts[:-1]),
+            np.maximum.reduceat(ordered[:, 2], starts[:-1]),
+            np.maximum.reduceat(ordered[:, 3], starts[:-1]),
+        ]
+    )
+    return parents, starts.astype(np.int64), order.astype(np.int64)
+
+
+def _contains(boxes: np.ndarray, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    return (
+        (xs >= boxes[:, 0])
+        & (xs <= boxes[:, 2])
+        & (ys >= boxes[:, 1])
+        & (ys <= boxes[:, 3])
+    )
+
+
+class PackedRTree:
+    """
+    STR-packed R-tree answering "which boxes contain this point"
+
+    Boxes are (min_x, min_y, max_x, max_y); for lat/lng data x is the
+    longitude. Results are item indices into the boxes passed in.
+    """
+
+    def __init__(self, boxes: np.ndarray, capacity: int = 16):
+        """
+        Args:
+            boxes: (N, 4) array of item bounding boxes
+            capacity: Maximum children per node
+        """
+        self.capacity = capacity
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+
+        # levels[0] groups items; the last level is the root's children
+        self.levels: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        boxes = self.boxes
+        while len(boxes):
+            parents, starts, children = _pack(boxes, capacity)
+            self.levels.append((parents, starts, children))
+            if len(parents) <= capacity:
+                break
+            boxes = parents
+
+        # Plain-Python copies for single-point queries
+        self._py_boxes = [level[0].tolist() for level in self.levels]
+        self._py_children = [
+            [
+                level[2][start:end].tolist()
+                for start, end in zip(level[1][:-1], level[1][1:])
+            ]
+            for level in self.levels
+        ]
+        self._py_items = self.boxes.tolist()
+
+    def __len__(self) -> int:
+        return len(self.boxes)
+
+    @property
+    def depth(self) -> int:
+        return len(self.levels)
+
+    def query_point(self, x: float, y: float) -> List[int]:
+        """Indices of the boxes containing one point"""
+        if not self.levels:
+            return []
+        nodes = range(len(self._py_boxes[-1]))
+        for level in range(len(self.levels) - 1, -1, -1):
+            boxes = self._py_boxes[level]
+            children = self._py_children[level]
+            found = []
+            for node in nodes:
+                min_x, min_y, max_x, max_y = boxes[node]
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    found.extend(children[node])
+            nodes = found
+
+        items = self._py_items
+        return [
+            item
+            for item in nodes
+            if items[item][0] <= x <= items[item][2]
+            and items[item][1] <= y <= items[item][3]
+        ]
+
+    def query_points(
+        self, xs: np.ndarray, ys: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Boxes containing each of many points, as (point, item) pairs
+
+        Every level is one vectorized pass over the surviving (point, node)
+        pairs, so the cost grows with the number of candidate pairs rather
+        than with the number of points times the tree size.
+
+        Returns:
+            (point indices, item indices), grouped by point in input order
+        """
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        empty = np.zeros(0, dtype=np.int64)
+        if not self.levels or not len(xs):
+            return empty, empty
+
+        root_count = len(self.levels[-1][0])
+        points = np.repeat(np.arange(len(xs)), root_count)
+        nodes = np.tile(np.arange(root_count), len(xs))
+        for boxes, starts, children in reversed(self.levels):
+            hit = _contains(boxes[nodes], xs[points], ys[points])
+            points, nodes = points[hit], nodes[hit]
+            counts = starts[nodes + 1] - starts[nodes]
+            points = np.repeat(points, counts)
+            nodes = children[expand_ranges(starts[nodes], counts)]
+
+        # Pairs stay grouped by point through every filter and expansion
+        hit = _contains(self.boxes[nodes], xs[points], ys[points])
+        return points[hit], nodes[hit]
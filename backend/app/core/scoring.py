@@ -0,0 +1,330 @@
+"""Go/Amber/Stop scoring (spec 4.3 and 5.1)
+
+The scalar functions are the reference implementation of the spec's
+formulas. score_locations computes the same scores for N locations from
+column arrays in one NumPy pass; every expression applies the same float64
+operations in the same order as its scalar counterpart, so both give
+bit-identical results (tests/test_scoring.py checks this).
+"""
+
+from typing import Dict, Optional, Sequence
+import numpy as np
+
+SCORING_VERSION = "1.0.0"
+
+# 総合スコア = w1 × 収益性 + w2 × 許認可実現性 + w3 × (100 - 規制リスク)
+PROFITABILITY_WEIGHT = 0.4
+LICENSING_WEIGHT = 0.3
+REGULATION_WEIGHT = 0.3
+
+MAX_REVPAR_RATIO = 1.5
+SCHOOL_DISTANCE_LIMIT = 100.0  # 学校・保育所から100m以内規制
+SCHOOL_PENALTY_PER_METER = 0.3
+MIN_COMPETITION_FACTOR = 0.5
+
+# 判定ロジック (spec 4.3)
+GO_SCORE = 70.0
+AMBER_SCORE = 50.0
+GO_MAX_RISK = 40.0
+STOP_RISK = 70.0
+GO_MIN_CONFIDENCE = 0.7
+
+# 用途地域 → 許認可の基礎点; 工業専用地域 allows neither 旅館業 nor 民泊
+ZONING_SCORES = {
+    "商業地域": 100.0,
+    "近隣商業地域": 90.0,
+    "準工業地域": 80.0,
+    "第一種住居地域": 70.0,
+    "第二種住居地域": 70.0,
+    "準住居地域": 70.0,
+    "工業地域": 40.0,
+    "第一種低層住居専用地域": 30.0,
+    "第二種低層住居専用地域": 30.0,
+    "田園住居地域": 30.0,
+    "工業専用地域": 0.0,
+}
+# Short names used in the spec
+ZONING_SCORES.update(
+    {
+        "近隣商業": 90.0,
+        "第一種住居": 70.0,
+        "第二種住居": 70.0,
+        "第一種低層住専": 30.0,
+        "第二種低層住専": 30.0,
+    }
+)
+DEFAULT_ZONING_SCORE = 50.0
+
+JUDGMENTS = np.array(["Stop", "Amber", "Go"], dtype=object)
+
+
+def _clip_score(value: float) -> float:
+    return min(max(value, 0.0), 100.0)
+
+
+def calculate_profitability_score(
+    revpar: float, occupancy: float, market_avg_revpar: float, confidence: float
+) -> float:
+    """
+    Profitability from RevPAR against the market average, occupancy and
+    the confidence of the RevPAR estimate
+
+    Args:
+        revpar: Estimated RevPAR (円)
+        occupancy: Occupancy rate (%)
+        market_avg_revpar: Market average RevPAR (円); 0 if unknown
+        confidence: Confidence of the estimate (0-1)
+
+    Returns:
+        Score from 0 to 100
+    """
+    if market_avg_revpar > 0:
+        revpar_ratio = min(revpar / market_avg_revpar, MAX_REVPAR_RATIO)
+    else:
+        revpar_ratio = 0.0
+    occupancy_score = occupancy / 100
+    base_score = revpar_ratio * 50 + occupancy_score * 50
+    return _clip_score(base_score * confidence)
+
+
+def calculate_licensing_score(
+    zoning: Optional[str],
+    school_distance: Optional[float],
+    existing_permits: float,
+) -> float:
+    """
+    Licensing feasibility from the 用途地域, the distance to the nearest
+    school and the number of existing permits nearby
+
+    Args:
+        zoning: 用途地域 name (unknown or None scores as the default)
+        school_distance: Meters to the nearest school, None if none nearby
+        existing_permits: Existing permits in the area
+
+    Returns:
+        Score from 0 to 100
+    """
+    zoning_score = ZONING_SCORES.get(zoning, DEFAULT_ZONING_SCORE)
+    if school_distance is not None and school_distance < SCHOOL_DISTANCE_LIMIT:
+        school_penalty = (
+            SCHOOL_DISTANCE_LIMIT - school_distance
+        ) * SCHOOL_PENALTY_PER_METER
+    else:
+        school_penalty = 0.0
+    competition_factor = max(MIN_COMPETITION_FACTOR, 1 - existing_permits / 100)
+    return _clip_score((zoning_score - school_penalty) * competition_factor)
+
+
+def calculate_regulation_risk_score(
+    signal_sentiment: float, recent_violations: float, media_sentiment: float
+) -> float:
+    """
+    Regulation risk from council signals, violations and press coverage
+
+    Args:
+        signal_sentiment: Recency-weighted mean sentiment of council
+            signals (-1 to 1)
+        recent_violations: Recent violations in the area
+        media_sentiment: Press sentiment (-1 to 1)
+
+    Returns:
+        Score from 0 (low risk) to 100
+    """
+    violation_score = min(recent_violations * 5, 30.0)
+    risk_score = (
+        abs(signal_sentiment) * 50 + violation_score + abs(media_sentiment) * 20
+    )
+    return _clip_score(risk_score)
+
+
+def calculate_total_score(
+    profitability_score: float, licensing_score: float, regulation_risk_score: float
+) -> float:
+    """Weighted total of the three sub-scores"""
+    return (
+        PROFITABILITY_WEIGHT * profitability_score
+        + LICENSING_WEIGHT * licensing_score
+        + REGULATION_WEIGHT * (100 - regulation_risk_score)
+    )
+
+
+def judge(
+    score: float,
+    regulation_risk_score: float,
+    licensing_score: float,
+    confidence: float = 1.0,
+) -> str:
+    """
+    Go/Amber/Stop judgment (spec 4.3)
+
+    Stop when the total is under 50, the risk is over 70 or licensing is
+    impossible (a licensing score of 0); Go when the total is at least 70,
+    the risk at most 40 and the RevPAR confidence at least 0.7; Amber
+    otherwise.
+    """
+    if score < AMBER_SCORE or regulation_risk_score > STOP_RISK or licensing_score <= 0:
+        return "Stop"
+    if (
+        score >= GO_SCORE
+        and regulation_risk_score <= GO_MAX_RISK
+        and confidence >= GO_MIN_CONFIDENCE
+    ):
+        return "Go"
+    return "Amber"
+
+
+def calculate_overall_judgment(
+    profitability_score: float,
+    licensing_score: float,
+    regulation_risk_score: float,
+    confidence: float = 1.0,
+) -> Dict:
+    """
+    Combine sub-scores into the total score and judgment
+
+    Returns:
+        Dict with judgment and score
+    """
+    score = calculate_total_score(
+        profitability_score, licensing_score, regulation_risk_score
+    )
+    return {
+        "judgment": judge(score, regulation_risk_score, licensing_score, confidence),
+        "score": score,
+    }
+
+
+def score_location(
+    revpar: float,
+    occupancy: float,
+    market_avg_revpar: float,
+    confidence: float,
+    zoning: Optional[str],
+    school_distance: Optional[float],
+    existing_permits: float,
+    signal_sentiment: float,
+    recent_violations: float,
+    media_sentiment: float,
+) -> Dict:
+    """
+    Score one location (scalar reference for score_locations)
+
+    Returns:
+        Dict with profitability_score, licensing_score,
+        regulation_risk_score, score and judgment
+    """
+    profitability = calculate_profitability_score(
+        revpar, occupancy, market_avg_revpar, confidence
+    )
+    licensing = calculate_licensing_score(zoning, school_distance, existing_permits)
+    risk = calculate_regulation_risk_score(
+        signal_sentiment, recent_violations, media_sentiment
+    )
+    return {
+        "profitability_score": profitability,
+        "licensing_score": licensing,
+        "regulation_risk_score": risk,
+        **calculate_overall_judgment(profitability, licensing, risk, confidence),
+    }
+
+
+def _column(values, length: Optional[int] = None) -> np.ndarray:
+    column = np.asarray(values, dtype=np.float64)
+    if length is not None and column.shape != (length,):
+        raise ValueError(f"Expected {length} values, got shape {column.shape}")
+    return column
+
+
+def zoning_scores(zonings: Sequence[Optional[str]]) -> np.ndarray:
+    """Licensing base score per 用途地域 name"""
+    return np.fromiter(
+        (ZONING_SCORES.get(zoning, DEFAULT_ZONING_SCORE) for zoning in zonings),
+        dtype=np.float64,
+        count=len(zonings),
+    )
+
+
+def score_locations(
+    revpar,
+    occupancy,
+    market_avg_revpar,
+    confidence,
+    zoning: Sequence[Optional[str]],
+    school_distance,
+    existing_permits,
+    signal_sentiment,
+    recent_violations,
+    media_sentiment,
+) -> Dict[str, np.ndarray]:
+    """
+    Score N locations from column arrays in one vectorized pass
+
+    Arguments are the columns of score_location, each of length N (scalars
+    are not broadcast). school_distance may hold NaN or inf where there is
+    no school nearby, the vectorized equivalent of None.
+
+    Returns:
+        Dict of arrays: profitability_score, licensing_score,
+        regulation_risk_score, score and judgment (object array of
+        "Go"/"Amber"/"Stop")
+
+    Raises:
+        ValueError: If the columns differ in length
+    """
+    count = len(zoning)
+    revpar = _column(revpar, count)
+    occupancy = _column(occupancy, count)
+    market_avg_revpar = _column(market_avg_revpar, count)
+    confidence = _column(confidence, count)
+    school_distance = _column(school_distance, count)
+    existing_permits = _column(existing_permits, count)
+    signal_sentiment = _column(signal_sentiment, count)
+    recent_violations = _column(recent_violations, count)
+    media_sentiment = _column(media_sentiment, count)
+
+    # Profitability
+    has_market = market_avg_revpar > 0
+    revpar_ratio = np.zeros(count)
+    np.divide(revpar, market_avg_revpar, out=revpar_ratio, where=has_market)
+    revpar_ratio = np.where(has_market, np.minimum(revpar_ratio, MAX_REVPAR_RATIO), 0.0)
+    base_score = revpar_ratio * 50 + (occupancy / 100) * 50
+    profitability = np.clip(base_score * confidence, 0.0, 100.0)
+
+    # Licensing (NaN compares false, so no penalty)
+    near_school = school_distance < SCHOOL_DISTANCE_LIMIT
+    school_penalty = np.where(
+        near_school,
+        (SCHOOL_DISTANCE_LIMIT - school_distance) * SCHOOL_PENALTY_PER_METER,
+        0.0,
+    )
+    competition_factor = np.maximum(MIN_COMPETITION_FACTOR, 1 - existing_permits / 100)
+    licensing = np.clip(
+        (zoning_scores(zoning) - school_penalty) * competition_factor, 0.0, 100.0
+    )
+
+    # Regulation risk
+    violation_score = np.minimum(recent_violations * 5, 30.0)
+    risk = np.clip(
+        np.abs(signal_sentiment) * 50 + violation_score + np.abs(media_sentiment) * 20,
+        0.0,
+        100.0,
+    )
+
+    score = (
+        PROFITABILITY_WEIGHT * profitability
+        + LICENSING_WEIGHT * licensing
+        + REGULATION_WEIGHT * (100 - risk)
+    )
+
+    # 0 = Stop, 1 = Amber, 2 = Go
+    go = (score >= GO_SCORE) & (risk <= GO_MAX_RISK) & (confidence >= GO_MIN_CONFIDENCE)
+    stop = (score < AMBER_SCORE) | (risk > STOP_RISK) | (licensing <= 0)
+    judgment = JUDGMENTS[np.where(stop, 0, np.where(go, 2, 1))]
+
+    return {
+        "profitability_score": profitability,
+        "licensing_score": licensing,
+        "regulation_risk_score": risk,
+        "score": score,
+        "judgment": judgment,
+    }
@@ -0,0 +1,89 @@
+"""Single-flight coalescing of concurrent identical calls"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Call:
+    """An in-flight call shared by one or more waiters"""
+
+    def __init__(self, task: "asyncio.Future"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one execution
+
+    The first caller for a key starts the work; callers arriving while it is
+    in flight await the same result (or exception). Cancelling one waiter does
+    not cancel the shared work unless it was the last waiter.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument coroutine function doing the work
+
+        Returns:
+            The result of fn
+
+        Raises:
+            Whatever fn raises, propagated to every waiter
+        """
+        call = self._calls.get(key)
+        if call is not None and call.task.cancelled():
+            # Abandoned by its last waiter; this caller was not cancelled
+            call = None
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._finish(key, call))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            # Only cancel the shared work when nobody is left to receive it
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+                # Later callers start a fresh call instead of joining this one
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _finish(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Mark the exception as retrieved when every waiter has gone away
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._calls
+
+    def in_flight(self) -> int:
+        """Number of keys currently being executed"""
+        return len(self._calls)
+
+    def get_stats(self) -> dict:
+        """Get execution and coalescing counts"""
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight(),
+        }
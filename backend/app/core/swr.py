@@ -0,0 +1,127 @@
+"""Stale-while-revalidate support for cached results
+
+Cached entries carry a soft TTL (fresh_until) inside the stored value and a
+hard TTL enforced by the cache backend. Between the two, callers serve the
+stale value immediately and trigger a background refresh; past the hard TTL
+the entry is gone and the caller recomputes on the critical path.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional, Set
+import structlog
+
+from app.core.singleflight import SingleFlight
+
+logger = structlog.get_logger()
+
+STATUS_FRESH = "fresh"
+STATUS_STALE = "stale"
+STATUS_MISS = "miss"
+
+
+def stamp(entry: dict, soft_ttl: float, now: Optional[float] = None) -> dict:
+    """Add cached_at / fresh_until (epoch seconds) to an entry dict"""
+    now = time.time() if now is None else now
+    return {**entry, "cached_at": now, "fresh_until": now + soft_ttl}
+
+
+def is_fresh(entry: dict, now: Optional[float] = None) -> bool:
+    """Check an entry's soft TTL; entries without one never go stale"""
+    fresh_until = entry.get("fresh_until")
+    if fresh_until is None:
+        return True
+    return (time.time() if now is None else now) < fresh_until
+
+
+class CacheMetadata:
+    """How a result was served: fresh or stale from cache, or computed"""
+
+    def __init__(self, status: str, cached_at: Optional[float] = None):
+        self.status = status
+        self.cached_at = cached_at
+
+    @classmethod
+    def from_entry(cls, entry: dict, now: Optional[float] = None) -> "CacheMetadata":
+        status = STATUS_FRESH if is_fresh(entry, now) else STATUS_STALE
+        return cls(status, entry.get("cached_at"))
+
+    @property
+    def stale(self) -> bool:
+        return self.status == STATUS_STALE
+
+    @property
+    def age(self) -> int:
+        """Seconds since the value was computed (0 for fresh computations)"""
+        if self.cached_at is None:
+            return 0
+        return max(0, int(time.time() - self.cached_at))
+
+    def to_dict(self) -> dict:
+        return {"status": self.status, "stale": self.stale, "age": self.age}
+
+    def to_headers(self) -> dict:
+        """HTTP response headers describing the cached result"""
+        return {"X-Cache-Status": self.status, "Age": str(self.age)}
+
+
+class Revalidator:
+    """
+    Refresh stale entries in the background, one refresh per key at a time
+
+    Refreshes run through a SingleFlight, so a key already being recomputed
+    (in the background or by a caller that missed) is not refreshed again.
+    """
+
+    def __init__(self, singleflight: Optional[SingleFlight] = None):
+        self._singleflight = singleflight or SingleFlight()
+        # Strong references so pending refreshes are not garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+        # Keys whose refresh task has been created but may not have started
+        self._pending: Set[str] = set()
+        self.triggered = 0
+        self.skipped = 0
+        self.failed = 0
+
+    def trigger(self, key: str, fn: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Start a background refresh of key unless one is already running
+
+        Returns:
+            True if a refresh was started
+        """
+        if key in self._pending or key in self._singleflight:
+            self.skipped += 1
+            return False
+
+        self.triggered += 1
+        self._pending.add(key)
+        task = asyncio.create_task(self._refresh(key, fn))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _refresh(self, key: str, fn: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await self._singleflight.do(key, fn)
+            logger.debug("cache_revalidated", key=key)
+        except Exception as e:
+            # The stale value stays until the hard TTL; the next hit retries
+            self.failed += 1
+            logger.warning("cache_revalidation_failed", key=key, error=str(e))
+        finally:
+            self._pending.discard(key)
+
+    async def drain(self) -> None:
+        """Wait for refreshes in progress (used on shutdown and in tests)"""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_stats(self) -> dict:
+        """Get refresh counts"""
+        return {
+            "triggered": self.triggered,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "in_flight": len(self._tasks),
+        }
@@ -1,21 +1,47 @@
 """SQLAlchemy base configuration"""
 
-from sqlalchemy import create_engine, text
+from typing import AsyncIterator
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import structlog
 
 from app.core.config import settings
+from app.db.instrumentation import (
+    DatabaseMetrics,
+    get_request_query_stats,
+    instrument_engine,
+    instrumented_pool,
+)
 
 logger = structlog.get_logger()
 
-# Create engine
+# Pool and statement metrics per engine (see get_database_stats)
+sync_metrics = DatabaseMetrics("sync", settings.DATABASE_SLOW_QUERY_MS / 1000)
+async_metrics = DatabaseMetrics("async", settings.DATABASE_SLOW_QUERY_MS / 1000)
+
+POOL_OPTIONS = {
+    "pool_pre_ping": True,
+    "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+    "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+}
+
+# Each process holds at most
+#   DATABASE_SYNC_POOL_SIZE + DATABASE_SYNC_MAX_OVERFLOW
+#   + DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW
+# connections; size max_connections for that times the instance count.
+
+# Create engine; only scripts and get_db use it, so its pool stays small
 engine = create_engine(
     settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+    poolclass=instrumented_pool(QueuePool, sync_metrics),
     echo=settings.DEBUG,
+    pool_size=settings.DATABASE_SYNC_POOL_SIZE,
+    max_overflow=settings.DATABASE_SYNC_MAX_OVERFLOW,
+    **POOL_OPTIONS,
 )
+instrument_engine(engine, sync_metrics)
 
 # Create session factory
 SessionLocal = sessionmaker(
@@ -25,6 +51,41 @@ SessionLocal = sessionmaker(
 )
 
 
+def async_database_url(url: str) -> str:
+    """Swap the sync driver in a database URL for its asyncio counterpart"""
+    url = make_url(url)
+    if url.get_backend_name() == "postgresql":
+        return url.set(drivername="postgresql+asyncpg").render_as_string(
+            hide_password=False
+        )
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite").render_as_string(
+            hide_password=False
+        )
+    return url.render_as_string(hide_password=False)
+
+
+# Async engine (asyncpg) for request handlers; the sync engine above stays
+# for Alembic, scripts and existing callers
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    poolclass=instrumented_pool(AsyncAdaptedQueuePool, async_metrics),
+    echo=settings.DEBUG,
+    connect_args={"timeout": settings.DATABASE_CONNECT_TIMEOUT},
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,
+    **POOL_OPTIONS,
+)
+instrument_engine(async_engine.sync_engine, async_metrics)
+
+# Async session factory; objects stay usable after commit without a reload
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
 # Create base class for models
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models"""
@@ -41,13 +102,32 @@ def get_db():
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Get async database session (FastAPI dependency)"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 async def check_database():
-    """Check database connection"""
+    """Check database connection without blocking the event loop"""
     try:
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         return "ok"
     except Exception as e:
         logger.error("database_check_failed", error=str(e))
         return "error"
+
+
+async def close_database() -> None:
+    """Close pooled async connections (called on application shutdown)"""
+    await async_engine.dispose()
+
+
+def get_database_stats() -> dict:
+    """Get pool, statement and per-request query metrics for both engines"""
+    return {
+        "sync": sync_metrics.get_stats(),
+        "async": async_metrics.get_stats(),
+        "requests": get_request_query_stats(),
+    }
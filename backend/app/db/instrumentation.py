@@ -0,0 +1,218 @@
+"""Database pool and statement instrumentation
+
+Engines built in app.db.base are wired to a DatabaseMetrics through
+SQLAlchemy events (statement latency, slow statement logging) and a pool
+subclass (checkout wait, pool timeouts). QueryAccountingMiddleware counts
+the statements each HTTP request issues and flags likely N+1 patterns: the
+same normalized statement repeated many times in one request.
+"""
+
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional, Type
+import structlog
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+from app.core.metrics import Histogram
+
+logger = structlog.get_logger()
+
+_PARAM = re.compile(r"%\(\w+\)s|\$\d+|(?<![:\w]):\w+|\?")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(statement: str) -> str:
+    """
+    Reduce a SQL statement to its shape for logging and grouping
+
+    Bound parameters and literals become ?, value lists collapse to (?...)
+    and whitespace is collapsed, so statements that differ only by values
+    compare equal.
+    """
+    normalized = _PARAM.sub("?", statement)
+    normalized = _STRING.sub("?", normalized)
+    normalized = _NUMBER.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("(?...)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class DatabaseMetrics:
+    """Pool checkout and statement metrics for one engine"""
+
+    def __init__(self, name: str, slow_threshold: float = 0.2):
+        self.name = name
+        self.slow_threshold = slow_threshold
+        self.checkout_wait = Histogram()
+        self.statement_latency = Histogram()
+        self.pool_timeouts = 0
+        self.statements = 0
+        self.statement_errors = 0
+        self.slow_statements = 0
+        self.engine: Optional[Engine] = None
+
+    def get_stats(self) -> dict:
+        """Get pool gauges, checkout waits and statement latencies"""
+        stats = {
+            "checkout_wait": self.checkout_wait.get_stats(),
+            "pool_timeouts": self.pool_timeouts,
+            "statements": self.statements,
+            "statement_errors": self.statement_errors,
+            "slow_statements": self.slow_statements,
+            "statement_latency": self.statement_latency.get_stats(),
+        }
+        pool = self.engine.pool if self.engine is not None else None
+        if isinstance(pool, QueuePool):
+            stats["pool"] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        return stats
+
+
+def instrumented_pool(pool_class: Type[Pool], metrics: DatabaseMetrics) -> Type[Pool]:
+    """
+    Subclass a pool class so connection checkouts are timed
+
+    Pass the result as create_engine(poolclass=...). The time recorded is
+    what a caller waits for a connection, including opening a new one.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return pool_class._do_get(self)
+        except exc.TimeoutError:
+            metrics.pool_timeouts += 1
+            logger.warning("database_pool_timeout", engine=metrics.name)
+            raise
+        finally:
+            metrics.checkout_wait.observe(time.perf_counter() - start)
+
+    return type(
+        f"Instrumented{pool_class.__name__}", (pool_class,), {"_do_get": _do_get}
+    )
+
+
+class RequestQueries:
+    """Statements issued while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+
+_request_queries: ContextVar[Optional[RequestQueries]] = ContextVar(
+    "request_queries", default=None
+)
+
+_queries_per_request = Histogram(QUERY_COUNT_BUCKETS)
+_n_plus_one_suspects = 0
+
+
+def instrument_engine(engine: Engine, metrics: DatabaseMetrics) -> None:
+    """Record statement latency and log slow statements for a (sync) engine"""
+    metrics.engine = engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        _record_statement(metrics, statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        starts = (
+            context.connection.info.get("query_start_time")
+            if context.connection
+            else None
+        )
+        if starts:
+            starts.pop()
+        metrics.statement_errors += 1
+
+
+def _record_statement(metrics: DatabaseMetrics, statement: str, elapsed: float) -> None:
+    metrics.statements += 1
+    metrics.statement_latency.observe(elapsed)
+
+    request = _request_queries.get()
+    if request is not None:
+        request.count += 1
+        request.duration += elapsed
+        request.statements[normalize_sql(statement)] += 1
+
+    if elapsed >= metrics.slow_threshold:
+        metrics.slow_statements += 1
+        logger.warning(
+            "slow_sql_statement",
+            engine=metrics.name,
+            duration_ms=round(elapsed * 1000, 1),
+            sql=normalize_sql(statement),
+        )
+
+
+class QueryAccountingMiddleware:
+    """
+    ASGI middleware counting the statements each HTTP request issues
+
+    Requests that run the same normalized statement at least
+    n_plus_one_threshold times are logged as likely N+1 patterns.
+    """
+
+    def __init__(self, app, n_plus_one_threshold: int = 10):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = _request_queries.set(queries)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_queries.reset(token)
+            if queries.count:
+                self._finish(scope, queries)
+
+    def _finish(self, scope, queries: RequestQueries) -> None:
+        global _n_plus_one_suspects
+        _queries_per_request.observe(queries.count)
+
+        sql, repeats = queries.statements.most_common(1)[0]
+        if repeats >= self.n_plus_one_threshold:
+            _n_plus_one_suspects += 1
+            logger.warning(
+                "sql_n_plus_one_suspected",
+                path=scope.get("path"),
+                repeats=repeats,
+                queries=queries.count,
+                sql=sql,
+            )
+
+
+def get_request_query_stats() -> dict:
+    """Get statements-per-request distribution and N+1 suspects"""
+    return {
+        "queries_per_request": _queries_per_request.get_stats(),
+        "n_plus_one_suspects": _n_plus_one_suspects,
+    }
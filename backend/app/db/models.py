@@ -2,6 +2,7 @@
 
 from datetime import datetime
 from sqlalchemy import (
+    DDL,
     Column,
     String,
     Integer,
@@ -12,10 +13,13 @@ from sqlalchemy import (
     JSON,
     ForeignKey,
     Index,
+    UniqueConstraint,
+    event,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 
 from app.db.base import Base
+from app.db.types import Geography, Geometry, PostGISComputed
 
 
 class User(Base):
@@ -126,6 +130,8 @@ class ZoningArea(Base):
 
     # Geometry (stored as GeoJSON)
     geometry = Column(JSON, nullable=True)
+    # PostGIS copy of geometry, kept in sync by a trigger on PostgreSQL
+    boundary = deferred(Column(Geometry("MULTIPOLYGON", 4326), nullable=True))
 
     # Building regulations
     building_coverage_ratio = Column(Float, nullable=True)  # 建ぺい率
@@ -134,7 +140,50 @@ class ZoningArea(Base):
     # Metadata
     updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
-    __table_args__ = (Index("idx_zoning_areas_city_type", "city", "zoning_type"),)
+    __table_args__ = (
+        Index("idx_zoning_areas_city_type", "city", "zoning_type"),
+        Index("idx_zoning_areas_boundary", "boundary", postgresql_using="gist"),
+    )
+
+
+# Same trigger as the a3f9c2e1d7b4 migration, so schemas built with
+# create_all also derive boundary from the GeoJSON column
+for _statement in (
+    """
+    CREATE OR REPLACE FUNCTION zoning_boundary_from_geojson(geojson json)
+    RETURNS geometry(MultiPolygon,4326)
+    LANGUAGE plpgsql IMMUTABLE AS $$
+    BEGIN
+        IF geojson IS NULL THEN
+            RETURN NULL;
+        END IF;
+        RETURN ST_Multi(ST_CollectionExtract(ST_MakeValid(
+            ST_SetSRID(ST_GeomFromGeoJSON(geojson::text), 4326)
+        ), 3));
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION zoning_areas_sync_boundary()
+    RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.boundary := zoning_boundary_from_geojson(NEW.geometry);
+        RETURN NEW;
+    END
+    $$
+    """,
+    "CREATE TRIGGER zoning_areas_sync_boundary "
+    "BEFORE INSERT OR UPDATE OF geometry ON zoning_areas "
+    "FOR EACH ROW EXECUTE FUNCTION zoning_areas_sync_boundary()",
+):
+    event.listen(
+        ZoningArea.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="postgresql"),
+    )
 
 
 class School(Base):
@@ -157,6 +206,16 @@ class School(Base):
     address = Column(Text, nullable=True)
     lat = Column(Float, nullable=False, index=True)
     lng = Column(Float, nullable=False, index=True)
+    # Generated from lat/lng on PostgreSQL
+    location = deferred(
+        Column(
+            Geography("POINT", 4326),
+            PostGISComputed(
+                "ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography", persisted=True
+            ),
+            nullable=True,
+        )
+    )
 
     # Metadata
     updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -164,4 +223,62 @@ class School(Base):
     __table_args__ = (
         Index("idx_schools_location", "lat", "lng"),
         Index("idx_schools_city_type", "city", "school_type"),
+        Index("idx_schools_geog", "location", postgresql_using="gist"),
+    )
+
+
+class BatchJob(Base):
+    """Batch analysis job (POST /analyze/batch)"""
+
+    __tablename__ = "batch_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String(64), unique=True, index=True, nullable=False)
+    status = Column(
+        String(20), nullable=False, index=True
+    )  # queued, running, completed, cancelled
+    total = Column(Integer, nullable=False)
+
+    # Idempotency-Key header and a hash of the request body it was used with
+    idempotency_key = Column(String(255), unique=True, nullable=True)
+    request_hash = Column(String(64), nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Lease: the instance processing the job and its last heartbeat
+    owner = Column(String(64), nullable=True)
+    updated_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    items = relationship(
+        "BatchJobItem", back_populates="job", order_by="BatchJobItem.position"
+    )
+
+
+class BatchJobItem(Base):
+    """One location of a batch analysis job"""
+
+    __tablename__ = "batch_job_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("batch_jobs.id"), nullable=False)
+    position = Column(Integer, nullable=False)
+    status = Column(
+        String(20), nullable=False
+    )  # pending, running, done, failed, cancelled
+
+    location = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    job = relationship("BatchJob", back_populates="items")
+
+    __table_args__ = (
+        UniqueConstraint("job_id", "position", name="uq_batch_job_items_position"),
+        Index("idx_batch_job_items_job_status", "job_id", "status"),
     )
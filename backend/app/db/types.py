@@ -0,0 +1,67 @@
+"""PostGIS column types
+
+Geometry and Geography render as PostGIS types on PostgreSQL and fall back
+to TEXT elsewhere, so the models still create on SQLite (tests, scripts).
+Spatial values are written and read by SQL functions (see
+app.services.spatial_queries), never bound from Python.
+"""
+
+from sqlalchemy import Computed
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.types import Text, TypeDecorator, UserDefinedType
+
+
+class _PostGISType(UserDefinedType):
+    cache_ok = True
+
+    def __init__(self, name: str, geometry_type: str, srid: int):
+        self.name = name
+        self.geometry_type = geometry_type
+        self.srid = srid
+
+    def get_col_spec(self, **kw) -> str:
+        return f"{self.name}({self.geometry_type},{self.srid})"
+
+
+class Geometry(TypeDecorator):
+    """PostGIS geometry column (planar coordinates)"""
+
+    impl = Text
+    cache_ok = True
+    postgis_name = "geometry"
+
+    def __init__(self, geometry_type: str = "GEOMETRY", srid: int = 4326):
+        super().__init__()
+        self.geometry_type = geometry_type
+        self.srid = srid
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(
+                _PostGISType(self.postgis_name, self.geometry_type, self.srid)
+            )
+        return dialect.type_descriptor(Text())
+
+
+class Geography(Geometry):
+    """PostGIS geography column (lat/lng on the spheroid, distances in meters)"""
+
+    postgis_name = "geography"
+
+
+class PostGISComputed(Computed):
+    """
+    Generated column expression that only applies on PostgreSQL
+
+    Elsewhere the column is created as a plain nullable column, since the
+    expression calls PostGIS functions.
+    """
+
+    inherit_cache = True
+
+
+@compiles(PostGISComputed)
+def _compile_postgis_computed(element, compiler, **kw):
+    if compiler.dialect.name != "postgresql":
+        return ""
+    return compiler.visit_computed_column(element, **kw)
@@ -6,8 +6,36 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import structlog
 
+from app.core.circuit_breaker import get_circuit_breaker_states
 from app.core.config import settings
-from app.api.v1 import auth, geocoding
+from app.api.v1 import analysis, auth, geocoding
+from app.db.base import close_database, get_database_stats
+from app.db.instrumentation import QueryAccountingMiddleware
+from app.services import geocoding as geocoding_service
+from app.services.batch_jobs import (
+    get_batch_job_stats,
+    start_batch_jobs,
+    stop_batch_jobs,
+)
+from app.services.cache import start_cache, close_cache, get_cache_stats, shared_cache
+from app.services.gazetteer import load_gazetteer
+from app.services.geocoding_cache import geocoding_cache
+from app.services.http_client import (
+    start_http_client,
+    close_http_client,
+    get_pool_stats,
+)
+from app.services.redis_cache import RedisCache, check_redis
+from app.services.reverse_geocoding import (
+    get_boundary_index_stats,
+    load_boundary_index,
+)
+from app.services.school_index import (
+    get_school_index_stats,
+    start_school_index,
+    stop_school_index,
+)
+from app.services.zoning import get_zoning_stats
 
 # Configure structured logging
 structlog.configure(
@@ -37,8 +65,19 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     # Startup
     logger.info("application_startup", version="0.1.0", environment=settings.ENV)
+    await start_http_client()
+    await start_cache()
+    load_gazetteer()
+    load_boundary_index()
+    start_school_index()
+    await start_batch_jobs()
     yield
     # Shutdown
+    await stop_batch_jobs()
+    await stop_school_index()
+    await close_cache()
+    await close_http_client()
+    await close_database()
     logger.info("application_shutdown")
 
 
@@ -61,9 +100,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request SQL statement counts and N+1 detection
+app.add_middleware(
+    QueryAccountingMiddleware,
+    n_plus_one_threshold=settings.DATABASE_N_PLUS_ONE_THRESHOLD,
+)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(geocoding.router, prefix="/api/v1")
+app.include_router(analysis.router, prefix="/api/v1")
 
 
 @app.get("/health")
@@ -77,21 +123,56 @@ async def health_check():
         "database": await check_database(),
         "firestore": await check_firestore(),
     }
+    if isinstance(shared_cache, RedisCache):
+        checks["redis"] = await check_redis(shared_cache)
 
     all_ok = all(v == "ok" for v in checks.values())
     status_code = 200 if all_ok else 503
 
+    # Open upstream breakers degrade the service but do not fail the probe
+    circuit_breakers = get_circuit_breaker_states()
+    breakers_closed = all(v == "closed" for v in circuit_breakers.values())
+
     return JSONResponse(
         content={
-            "status": "ok" if all_ok else "degraded",
+            "status": "ok" if all_ok and breakers_closed else "degraded",
             "version": "0.1.0",
             "environment": settings.ENV,
             "checks": checks,
+            "circuit_breakers": circuit_breakers,
         },
         status_code=status_code,
     )
 
 
+@app.get("/metrics")
+async def metrics():
+    """In-process pool, cache and upstream metrics (JSON)"""
+    return {
+        "database": get_database_stats(),
+        "http_client": get_pool_stats(),
+        "cache": {
+            "application": get_cache_stats(),
+            "shared": (
+                shared_cache.get_stats() if hasattr(shared_cache, "get_stats") else {}
+            ),
+            "geocoding": geocoding_cache.get_stats(),
+        },
+        "geocoding": {
+            "providers": geocoding_service.get_provider_stats(),
+            "rate_limiter": geocoding_service.get_rate_limiter_stats(),
+            "retry": geocoding_service.get_retry_stats(),
+            "singleflight": geocoding_service.get_singleflight_stats(),
+            "revalidation": geocoding_service.get_revalidation_stats(),
+        },
+        "circuit_breakers": get_circuit_breaker_states(),
+        "boundary_index": get_boundary_index_stats(),
+        "school_index": get_school_index_stats(),
+        "zoning": get_zoning_stats(),
+        "batch_jobs": get_batch_job_stats(),
+    }
+
+
 @app.get("/")
 async def root():
     """Root endpoint"""
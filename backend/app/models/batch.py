@@ -0,0 +1,87 @@
+"""Batch analysis models"""
+
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class BatchLocation(BaseModel):
+    """
+    One location to analyze, by address or coordinates
+
+    Market and regulation inputs are optional; without them the location
+    scores as having no market data and no known regulation signals.
+    """
+
+    address: Optional[str] = Field(None, min_length=1, description="Address")
+    lat: Optional[float] = Field(None, description="Latitude", ge=-90, le=90)
+    lng: Optional[float] = Field(None, description="Longitude", ge=-180, le=180)
+
+    # Scoring inputs
+    revpar: float = Field(0.0, description="Estimated RevPAR (円)", ge=0)
+    occupancy: float = Field(0.0, description="Occupancy rate (%)", ge=0, le=100)
+    market_avg_revpar: float = Field(0.0, description="Market average RevPAR (円)", ge=0)
+    confidence: float = Field(
+        0.0, description="Confidence of the RevPAR estimate", ge=0, le=1
+    )
+    existing_permits: int = Field(0, description="Existing permits nearby", ge=0)
+    signal_sentiment: float = Field(
+        0.0, description="Council signal sentiment", ge=-1, le=1
+    )
+    recent_violations: int = Field(0, description="Recent violations", ge=0)
+    media_sentiment: float = Field(0.0, description="Press sentiment", ge=-1, le=1)
+
+    @model_validator(mode="after")
+    def check_location(self) -> "BatchLocation":
+        if self.address is None and (self.lat is None or self.lng is None):
+            raise ValueError("Either address or lat and lng is required")
+        return self
+
+
+class BatchAnalysisRequest(BaseModel):
+    """Batch analysis request model"""
+
+    locations: List[BatchLocation] = Field(
+        ..., min_length=1, description="Locations to analyze"
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "locations": [
+                    {"address": "東京都渋谷区道玄坂1-2-3"},
+                    {"lat": 35.6812, "lng": 139.7671},
+                ]
+            }
+        }
+    )
+
+
+class BatchItemStatus(BaseModel):
+    """Status and result of one location in a batch job"""
+
+    position: int = Field(..., description="Index in the request")
+    status: str = Field(..., description="pending, running, done, failed or cancelled")
+    result: Optional[dict] = Field(None, description="Analysis result when done")
+    error: Optional[str] = Field(None, description="Error message when failed")
+
+
+class BatchJobStatus(BaseModel):
+    """Batch analysis job progress"""
+
+    job_id: str = Field(..., description="Job ID")
+    status: str = Field(..., description="queued, running, completed or cancelled")
+    total: int = Field(..., description="Number of locations")
+    done: int = Field(0, description="Locations analyzed")
+    failed: int = Field(0, description="Locations that failed")
+    cancelled: int = Field(0, description="Locations skipped by cancellation")
+    created_at: datetime = Field(..., description="When the job was submitted")
+    finished_at: Optional[datetime] = Field(
+        None, description="When the job completed or was cancelled"
+    )
+    estimated_completion: Optional[datetime] = Field(
+        None, description="Projected completion from the pace so far"
+    )
+    items: Optional[List[BatchItemStatus]] = Field(
+        None, description="Per-location status (GET only)"
+    )
@@ -1,6 +1,6 @@
 """Geocoding models"""
 
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
 
@@ -38,3 +38,86 @@ class GeocodingRequest(BaseModel):
     model_config = ConfigDict(
         json_schema_extra={"example": {"address": "京都府京都市東山区祇園町南側570-120"}}
     )
+
+
+class BatchGeocodingRequest(BaseModel):
+    """Batch geocoding request model"""
+
+    addresses: List[str] = Field(
+        ...,
+        min_length=1,
+        description="Addresses to geocode (results are returned in input order)",
+    )
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "addresses": [
+                    "京都府京都市東山区祇園町南側570-120",
+                    "東京都渋谷区道玄坂1-2-3",
+                ]
+            }
+        }
+    )
+
+
+class BatchGeocodingItem(BaseModel):
+    """Result for a single address in a batch"""
+
+    index: int = Field(..., description="Position of the address in the request")
+    address: str = Field(..., description="Address as given in the request")
+    status_code: int = Field(..., description="HTTP-style status for this item")
+    result: Optional[GeocodingResult] = Field(None, description="Geocoding result")
+    error: Optional[str] = Field(None, description="Error detail if the item failed")
+
+
+class BatchGeocodingResponse(BaseModel):
+    """Batch geocoding response model"""
+
+    total: int = Field(..., description="Number of addresses in the request")
+    succeeded: int = Field(..., description="Number of addresses geocoded")
+    failed: int = Field(..., description="Number of addresses that failed")
+    results: List[BatchGeocodingItem] = Field(..., description="Per-item results")
+
+
+class ReverseGeocodingRequest(BaseModel):
+    """Reverse geocoding request model"""
+
+    lat: float = Field(..., description="Latitude", ge=-90, le=90)
+    lng: float = Field(..., description="Longitude", ge=-180, le=180)
+
+    model_config = ConfigDict(
+        json_schema_extra={"example": {"lat": 35.0036, "lng": 135.7736}}
+    )
+
+
+class BatchReverseGeocodingRequest(BaseModel):
+    """Batch reverse geocoding request model"""
+
+    locations: List[ReverseGeocodingRequest] = Field(
+        ...,
+        min_length=1,
+        description="Locations to resolve (results are returned in input order)",
+    )
+
+
+class BatchReverseGeocodingItem(BaseModel):
+    """Result for a single location in a batch"""
+
+    index: int = Field(..., description="Position of the location in the request")
+    lat: float = Field(..., description="Latitude as given in the request")
+    lng: float = Field(..., description="Longitude as given in the request")
+    result: Optional[GeocodingResult] = Field(
+        None, description="町丁目 containing the location, if any"
+    )
+
+
+class BatchReverseGeocodingResponse(BaseModel):
+    """Batch reverse geocoding response model"""
+
+    total: int = Field(..., description="Number of locations in the request")
+    succeeded: int = Field(..., description="Number of locations resolved")
+    failed: int = Field(..., description="Number of locations outside every 町丁目")
+    results: List[BatchReverseGeocodingItem] = Field(
+        ..., description="Per-item results"
+    )
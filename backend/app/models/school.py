@@ -0,0 +1,14 @@
+"""School models"""
+
+from pydantic import BaseModel, Field
+
+
+class NearbySchool(BaseModel):
+    """School or nursery near a queried point"""
+
+    school_code: str = Field(..., description="School code")
+    name: str = Field(..., description="School name")
+    school_type: str = Field(..., description="School type (elementary, nursery, ...)")
+    lat: float = Field(..., description="Latitude", ge=-90, le=90)
+    lng: float = Field(..., description="Longitude", ge=-180, le=180)
+    distance: float = Field(..., description="Great-circle distance in meters", ge=0)
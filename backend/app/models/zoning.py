@@ -0,0 +1,17 @@
+"""Zoning models"""
+
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class ZoningResult(BaseModel):
+    """用途地域 covering a point"""
+
+    area_code: str = Field(..., description="Zoning area code")
+    zoning_type: str = Field(..., description="Zoning type (用途地域)")
+    building_coverage_ratio: Optional[float] = Field(
+        None, description="Building coverage ratio (建ぺい率)"
+    )
+    floor_area_ratio: Optional[float] = Field(
+        None, description="Floor area ratio (容積率)"
+    )
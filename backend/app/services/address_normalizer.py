@@ -0,0 +1,144 @@
+"""Japanese address normalization
+
+Normalized addresses are used as cache keys, coalescing keys and gazetteer
+keys, so spelling variants of the same address must produce the same string:
+
+    東京都渋谷区道玄坂三丁目５番７号  -> 東京都渋谷区道玄坂3-5-7
+    東京都渋谷区道玄坂3丁目5-7       -> 東京都渋谷区道玄坂3-5-7
+    東京都 渋谷区 道玄坂３－５－７   -> 東京都渋谷区道玄坂3-5-7
+
+All tables and patterns are compiled once at import time, and results are
+memoized so bulk jobs with repeated addresses skip the regex pipeline.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# Dash and long-vowel variants used as separators in 番地 (after NFKC)
+_DASHES = "‐‑‒–—―−─━"
+
+# 異体字 and small-kana variants that appear in registered addresses
+_VARIANTS = {
+    "﨑": "崎",
+    "髙": "高",
+    "邊": "辺",
+    "邉": "辺",
+    "濵": "浜",
+    "濱": "浜",
+    "德": "徳",
+    "ヶ": "ケ",
+    "ヵ": "ケ",
+}
+
+_TRANSLATION_TABLE = str.maketrans(
+    {
+        **{dash: "-" for dash in _DASHES},
+        **_VARIANTS,
+        "・": None,
+        "･": None,
+    }
+)
+
+_KANJI_DIGITS = {
+    "〇": 0,
+    "一": 1,
+    "二": 2,
+    "三": 3,
+    "四": 4,
+    "五": 5,
+    "六": 6,
+    "七": 7,
+    "八": 8,
+    "九": 9,
+}
+_KANJI_UNITS = {"十": 10, "百": 100, "千": 1000}
+
+# Kanji numerals are only converted in front of 丁目/番地/番/号, so place
+# names such as 四条, 九十九里 or 一番町 are left alone
+_KANJI_NUMBER_RE = re.compile(r"([〇一二三四五六七八九十百千]+)(?=丁目|番地|番(?![町丁])|号)")
+# Katakana long vowel used as a dash between digits (e.g. 1ー2)
+_DIGIT_DASH_RE = re.compile(r"(?<=\d)ー(?=\d)")
+# 5の3 -> 5-3
+_NO_SEPARATOR_RE = re.compile(r"(?<=\d)の(?=\d)")
+# 3丁目5番地7号 -> 3-5-7- (trailing dash removed below)
+_BLOCK_SUFFIX_RE = re.compile(r"(?<=\d)(?:丁目|番地|番(?![町丁])|号)")
+# Whitespace is dropped except between two ASCII alphanumerics (building names)
+_SPACE_RE = re.compile(r"(?<![A-Za-z0-9]) | (?![A-Za-z0-9])")
+_SPACE_AROUND_DASH_RE = re.compile(r" ?- ?")
+_MULTI_DASH_RE = re.compile(r"-{2,}")
+
+
+def kanji_to_int(numeral: str) -> int:
+    """
+    Convert a kanji numeral to an int
+
+    Supports positional (二十三) and digit-by-digit (二〇三) forms.
+    """
+    if not any(char in _KANJI_UNITS for char in numeral):
+        value = 0
+        for char in numeral:
+            value = value * 10 + _KANJI_DIGITS[char]
+        return value
+
+    total = 0
+    current = 0
+    for char in numeral:
+        if char in _KANJI_UNITS:
+            total += (current or 1) * _KANJI_UNITS[char]
+            current = 0
+        else:
+            current = current * 10 + _KANJI_DIGITS[char]
+    return total + current
+
+
+def _replace_kanji_number(match: "re.Match") -> str:
+    return str(kanji_to_int(match.group(1)))
+
+
+@lru_cache(maxsize=65536)
+def _normalize(address: str) -> str:
+    # Full-width alphanumerics and symbols to half-width
+    address = unicodedata.normalize("NFKC", address)
+
+    # Dashes, 異体字 and separators in one pass
+    address = address.translate(_TRANSLATION_TABLE)
+
+    # Whitespace
+    address = " ".join(address.split())
+    address = _SPACE_RE.sub("", address)
+
+    # Numbers and 丁目/番地/号 forms
+    address = _KANJI_NUMBER_RE.sub(_replace_kanji_number, address)
+    address = _DIGIT_DASH_RE.sub("-", address)
+    address = _NO_SEPARATOR_RE.sub("-", address)
+    address = _BLOCK_SUFFIX_RE.sub("-", address)
+    address = _SPACE_AROUND_DASH_RE.sub("-", address)
+    address = _MULTI_DASH_RE.sub("-", address)
+
+    return address.strip(" -")
+
+
+def normalize_address(address: str) -> str:
+    """
+    Normalize address string
+
+    Args:
+        address: Raw address string
+
+    Returns:
+        Normalized address string
+    """
+    if not address:
+        return ""
+    return _normalize(address)
+
+
+def clear_normalize_cache() -> None:
+    """Clear the memoized normalization results"""
+    _normalize.cache_clear()
+
+
+def normalize_cache_info():
+    """Get memoization statistics (functools cache_info)"""
+    return _normalize.cache_info()
@@ -0,0 +1,781 @@
+"""Batch analysis jobs
+
+Submitting a batch writes a batch_jobs row and one batch_job_items row per
+location, then puts the job id on a task queue. A worker takes the job and
+analyzes its pending items with bounded concurrency, recording each result
+as it finishes. Progress is read back from the item rows, and a job
+interrupted by a restart picks up where it stopped: resume() re-enqueues
+unfinished jobs, and items the dead worker left running go back to pending
+(up to BATCH_ANALYSIS_MAX_ATTEMPTS runs per item).
+
+A running job is leased to one instance: the worker claims it with a
+conditional UPDATE and heartbeats batch_jobs.updated_at while it works.
+Other instances only take a running job over once its heartbeat is older
+than BATCH_ANALYSIS_LEASE_SECONDS, so scale-outs and rolling deploys do not
+re-run items a live worker is processing.
+
+Upstream calls are bounded across all jobs by one semaphore per upstream
+(geocoding, database), so a large batch cannot starve interactive traffic.
+
+InProcessTaskQueue runs jobs on this instance's event loop. It stands in
+for Cloud Tasks, which would deliver the same job ids to a worker.
+"""
+
+import asyncio
+import hashlib
+import json
+import secrets
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+import structlog
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.scoring import SCORING_VERSION, score_location
+from app.db.base import AsyncSessionLocal, async_engine
+from app.db.models import BatchJob, BatchJobItem
+from app.models.batch import BatchItemStatus, BatchJobStatus
+from app.services.geocoding import geocode_address_with_metadata
+from app.services.geocoding_providers import (
+    GeocodingNotFoundError,
+    GeocodingUnavailableError,
+)
+from app.services.reverse_geocoding import reverse_geocode
+from app.services.school_index import (
+    SchoolIndexUnavailableError,
+    find_nearest_schools,
+)
+from app.services.spatial_queries import query_nearest_schools
+from app.services.zoning import lookup_zoning
+
+logger = structlog.get_logger()
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_CANCELLED = "cancelled"
+FINISHED_JOB_STATUSES = (JOB_COMPLETED, JOB_CANCELLED)
+
+ITEM_PENDING = "pending"
+ITEM_RUNNING = "running"
+ITEM_DONE = "done"
+ITEM_FAILED = "failed"
+ITEM_CANCELLED = "cancelled"
+
+Limits = Dict[str, asyncio.Semaphore]
+Analyzer = Callable[[dict, Limits], Awaitable[dict]]
+
+
+class BatchJobNotFoundError(Exception):
+    """Raised when a job id is unknown"""
+
+    pass
+
+
+class BatchJobConflictError(Exception):
+    """Raised when an Idempotency-Key is reused with a different request"""
+
+    pass
+
+
+class BatchJobsUnavailableError(Exception):
+    """Raised when batch jobs are disabled or not started"""
+
+    pass
+
+
+class InProcessTaskQueue:
+    """
+    Task queue on the local event loop
+
+    Stand-in for Cloud Tasks: job ids are delivered to the handler by a
+    fixed number of worker tasks, so at most that many jobs run at once.
+    Undelivered ids are lost on shutdown; resume() finds those jobs again
+    from the database.
+    """
+
+    def __init__(self, workers: int = 1):
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self.enqueued = 0
+        self.failures = 0
+
+    def start(self, handler: Callable[[str], Awaitable[None]]) -> None:
+        self._tasks = [
+            asyncio.create_task(self._worker(handler)) for _ in range(self.workers)
+        ]
+
+    async def enqueue(self, job_id: str) -> None:
+        self.enqueued += 1
+        await self._queue.put(job_id)
+
+    async def join(self) -> None:
+        """Wait until every enqueued job has been handled"""
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, handler: Callable[[str], Awaitable[None]]) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await handler(job_id)
+            except Exception as e:
+                self.failures += 1
+                logger.error("batch_job_failed", job_id=job_id, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    def get_stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "depth": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "failures": self.failures,
+        }
+
+
+def upstream_limits() -> Limits:
+    """Concurrency limit per upstream, shared by all batch jobs"""
+    return {
+        "geocoding": asyncio.Semaphore(settings.BATCH_ANALYSIS_GEOCODING_CONCURRENCY),
+        "database": asyncio.Semaphore(settings.BATCH_ANALYSIS_DATABASE_CONCURRENCY),
+    }
+
+
+async def _nearest_school_distance(
+    lat: float, lng: float, limits: Limits
+) -> Optional[float]:
+    try:
+        schools = find_nearest_schools(lat, lng, k=1)
+    except SchoolIndexUnavailableError:
+        # Without the in-memory index, ask PostGIS (if there is one)
+        if async_engine.dialect.name != "postgresql":
+            return None
+        async with limits["database"]:
+            async with AsyncSessionLocal() as db:
+                schools = await query_nearest_schools(db, lat, lng, k=1)
+    return schools[0].distance if schools else None
+
+
+async def analyze_location(location: dict, limits: Limits) -> dict:
+    """
+    Analyze one batch location
+
+    Resolves the address (or coordinates) to an area, looks up its 用途地域
+    and nearest school, and scores it with the location's market and
+    regulation inputs.
+
+    Args:
+        location: BatchLocation fields
+        limits: Upstream concurrency limits
+
+    Returns:
+        JSON-serializable result with area, zoning, school_distance and
+        the score columns of AnalysisResult
+
+    Raises:
+        GeocodingError: If the address cannot be geocoded
+    """
+    if location.get("address"):
+        async with limits["geocoding"]:
+            area, _ = await geocode_address_with_metadata(location["address"])
+    else:
+        try:
+            area = reverse_geocode(location["lat"], location["lng"])
+        except (GeocodingNotFoundError, GeocodingUnavailableError):
+            area = None
+    lat = area.lat if area else location["lat"]
+    lng = area.lng if area else location["lng"]
+
+    zoning = None
+    if area is not None:
+        zoning = await lookup_zoning(
+            lat, lng, area.prefecture, load_limit=limits["database"]
+        )
+    school_distance = await _nearest_school_distance(lat, lng, limits)
+
+    scores = score_location(
+        revpar=location.get("revpar", 0.0),
+        occupancy=location.get("occupancy", 0.0),
+        market_avg_revpar=location.get("market_avg_revpar", 0.0),
+        confidence=location.get("confidence", 0.0),
+        zoning=zoning.zoning_type if zoning else None,
+        school_distance=school_distance,
+        existing_permits=location.get("existing_permits", 0),
+        signal_sentiment=location.get("signal_sentiment", 0.0),
+        recent_violations=location.get("recent_violations", 0),
+        media_sentiment=location.get("media_sentiment", 0.0),
+    )
+    return {
+        "area": area.model_dump() if area else {"lat": lat, "lng": lng},
+        "zoning": zoning.model_dump() if zoning else None,
+        "school_distance": school_distance,
+        **scores,
+        "model_version": SCORING_VERSION,
+    }
+
+
+def _request_hash(locations: List[dict]) -> str:
+    body = json.dumps(locations, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def new_job_id() -> str:
+    """Job id like batch_20251026_3f9a1c2b7d4e"""
+    return f"batch_{datetime.utcnow():%Y%m%d}_{secrets.token_hex(6)}"
+
+
+class BatchJobRunner:
+    """Submits, runs, cancels and reports batch analysis jobs"""
+
+    def __init__(
+        self,
+        queue: InProcessTaskQueue,
+        session_factory=AsyncSessionLocal,
+        analyzer: Analyzer = analyze_location,
+        item_concurrency: int = 10,
+        limits: Optional[Limits] = None,
+        max_attempts: int = 3,
+        lease_seconds: float = 60.0,
+    ):
+        """
+        Args:
+            queue: Task queue delivering job ids to run()
+            session_factory: Async session factory for the job tables
+            analyzer: Coroutine analyzing one location
+            item_concurrency: Items in flight per job
+            limits: Upstream concurrency limits (default: from settings)
+            max_attempts: Runs per item before a resumed item is failed
+            lease_seconds: Heartbeat age after which another instance may
+                take over a running job
+        """
+        self.queue = queue
+        self._session_factory = session_factory
+        self.analyzer = analyzer
+        self.item_concurrency = item_concurrency
+        self.limits = limits if limits is not None else upstream_limits()
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.instance_id = uuid.uuid4().hex
+        self._running: Dict[str, asyncio.Task] = {}
+
+        self.items_done = 0
+        self.items_failed = 0
+        self.jobs_completed = 0
+        self.jobs_cancelled = 0
+        self.jobs_resumed = 0
+
+    async def _get_job(self, db, job_id: str) -> BatchJob:
+        job = (
+            await db.execute(select(BatchJob).where(BatchJob.job_id == job_id))
+        ).scalar_one_or_none()
+        if job is None:
+            raise BatchJobNotFoundError(f"Batch job not found: {job_id}")
+        return job
+
+    async def _find_idempotent(
+        self, db, idempotency_key: str, request_hash: str
+    ) -> Optional[BatchJob]:
+        job = (
+            await db.execute(
+                select(BatchJob).where(BatchJob.idempotency_key == idempotency_key)
+            )
+        ).scalar_one_or_none()
+        if job is not None and job.request_hash != request_hash:
+            raise BatchJobConflictError(
+                "Idempotency-Key was already used with a different request"
+            )
+        return job
+
+    async def submit(
+        self, locations: List[dict], idempotency_key: Optional[str] = None
+    ) -> BatchJobStatus:
+        """
+        Store a new job and enqueue it
+
+        A repeated Idempotency-Key with the same locations returns the
+        existing job instead of creating another.
+
+        Raises:
+            BatchJobConflictError: If the key was used with other locations
+        """
+        request_hash = _request_hash(locations)
+        async with self._session_factory() as db:
+            if idempotency_key is not None:
+                existing = await self._find_idempotent(
+                    db, idempotency_key, request_hash
+                )
+                if existing is not None:
+                    return await self.get_status(existing.job_id, include_items=False)
+
+            now = datetime.utcnow()
+            job = BatchJob(
+                job_id=new_job_id(),
+                status=JOB_QUEUED,
+                total=len(locations),
+                idempotency_key=idempotency_key,
+                request_hash=request_hash,
+                created_at=now,
+            )
+            db.add(job)
+            try:
+                await db.flush()
+                db.add_all(
+                    [
+                        BatchJobItem(
+                            job_id=job.id,
+                            position=position,
+                            status=ITEM_PENDING,
+                            location=location,
+                            attempts=0,
+                            updated_at=now,
+                        )
+                        for position, location in enumerate(locations)
+                    ]
+                )
+                await db.commit()
+            except IntegrityError:
+                # A concurrent submit with the same key won
+                await db.rollback()
+                if idempotency_key is None:
+                    raise
+                existing = await self._find_idempotent(
+                    db, idempotency_key, request_hash
+                )
+                if existing is None:
+                    raise
+                return await self.get_status(existing.job_id, include_items=False)
+            job_id = job.job_id
+
+        await self.queue.enqueue(job_id)
+        logger.info("batch_job_submitted", job_id=job_id, total=len(locations))
+        return await self.get_status(job_id, include_items=False)
+
+    def _lease_expired(self, now: datetime):
+        """Condition matching running jobs whose owner stopped heartbeating"""
+        stale_before = now - timedelta(seconds=self.lease_seconds)
+        return (BatchJob.status == JOB_RUNNING) & (
+            BatchJob.updated_at.is_(None) | (BatchJob.updated_at < stale_before)
+        )
+
+    async def run(self, job_id: str) -> None:
+        """Process a job's pending items (task queue handler)"""
+        if job_id in self._running:
+            return  # Delivered twice; already being processed here
+        task = asyncio.create_task(self._process(job_id))
+        self._running[job_id] = task
+        try:
+            await asyncio.wait({task})
+        finally:
+            # Stops processing on shutdown; no-op once the task is done
+            task.cancel()
+            self._running.pop(job_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            raise task.exception()
+
+    async def _process(self, job_id: str) -> None:
+        now = datetime.utcnow()
+        async with self._session_factory() as db:
+            job = await self._get_job(db, job_id)
+            if job.status in FINISHED_JOB_STATUSES:
+                return
+            resumed = job.status == JOB_RUNNING
+
+            # Claim the lease: a queued job, or a running one whose owner
+            # stopped heartbeating. Fails if the job was cancelled since it
+            # was read or another live instance holds it.
+            claimed = await db.execute(
+                update(BatchJob)
+                .where(
+                    BatchJob.id == job.id,
+                    (BatchJob.status == JOB_QUEUED) | self._lease_expired(now),
+                )
+                .values(
+                    status=JOB_RUNNING,
+                    owner=self.instance_id,
+                    updated_at=now,
+                    started_at=func.coalesce(BatchJob.started_at, now),
+                )
+            )
+            if not claimed.rowcount:
+                await db.rollback()
+                logger.info("batch_job_not_claimed", job_id=job_id)
+                return
+            if resumed:
+                # A previous worker stopped mid-job; retry what it was running
+                self.jobs_resumed += 1
+                logger.info("batch_job_resumed", job_id=job_id)
+
+            running = (BatchJobItem.job_id == job.id) & (
+                BatchJobItem.status == ITEM_RUNNING
+            )
+            await db.execute(
+                update(BatchJobItem)
+                .where(running & (BatchJobItem.attempts >= self.max_attempts))
+                .values(
+                    status=ITEM_FAILED,
+                    error=f"Gave up after {self.max_attempts} attempts",
+                    updated_at=now,
+                )
+            )
+            await db.execute(
+                update(BatchJobItem)
+                .where(running)
+                .values(status=ITEM_PENDING, updated_at=now)
+            )
+            await db.commit()
+
+            job_pk = job.id
+            pending = (
+                await db.execute(
+                    select(BatchJobItem.id, BatchJobItem.location)
+                    .where(
+                        BatchJobItem.job_id == job_pk,
+                        BatchJobItem.status == ITEM_PENDING,
+                    )
+                    .order_by(BatchJobItem.position)
+                )
+            ).all()
+
+        heartbeat = asyncio.create_task(
+            self._heartbeat(job_id, job_pk, asyncio.current_task())
+        )
+        semaphore = asyncio.Semaphore(self.item_concurrency)
+        try:
+            outcomes = await asyncio.gather(
+                *(
+                    self._process_item(job_id, item_id, location, semaphore)
+                    for item_id, location in pending
+                ),
+                return_exceptions=True,
+            )
+        finally:
+            heartbeat.cancel()
+
+        async with self._session_factory() as db:
+            # Claiming or recording these items failed (e.g. a database
+            # error); fail them rather than leave them running
+            for (item_id, _), outcome in zip(pending, outcomes):
+                if not isinstance(outcome, Exception):
+                    continue
+                self.items_failed += 1
+                logger.error(
+                    "batch_item_processing_failed",
+                    job_id=job_id,
+                    item_id=item_id,
+                    error=str(outcome),
+                )
+                await db.execute(
+                    update(BatchJobItem)
+                    .where(
+                        BatchJobItem.id == item_id,
+                        BatchJobItem.status.in_([ITEM_PENDING, ITEM_RUNNING]),
+                    )
+                    .values(
+                        status=ITEM_FAILED,
+                        error=str(outcome),
+                        updated_at=datetime.utcnow(),
+                    )
+                )
+
+            # Only a job still running under our lease completes; a
+            # cancelled one stays so
+            result = await db.execute(
+                update(BatchJob)
+                .where(
+                    BatchJob.id == job_pk,
+                    BatchJob.status == JOB_RUNNING,
+                    BatchJob.owner == self.instance_id,
+                )
+                .values(
+                    status=JOB_COMPLETED,
+                    finished_at=datetime.utcnow(),
+                    updated_at=datetime.utcnow(),
+                )
+            )
+            await db.commit()
+        if result.rowcount:
+            self.jobs_completed += 1
+            logger.info("batch_job_completed", job_id=job_id)
+
+    async def _heartbeat(self, job_id: str, job_pk: int, worker: asyncio.Task) -> None:
+        """Renew the job's lease until processing ends; stop it if lost"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self._session_factory() as db:
+                    renewed = await db.execute(
+                        update(BatchJob)
+                        .where(
+                            BatchJob.id == job_pk,
+                            BatchJob.status == JOB_RUNNING,
+                            BatchJob.owner == self.instance_id,
+                        )
+                        .values(updated_at=datetime.utcnow())
+                    )
+                    await db.commit()
+            except Exception as e:
+                # Retry on the next beat; the lease outlasts a few misses
+                logger.warning(
+                    "batch_job_heartbeat_failed", job_id=job_id, error=str(e)
+                )
+                continue
+            if not renewed.rowcount:
+                # Cancelled elsewhere, or taken over after a stalled heartbeat
+                logger.warning("batch_job_lease_lost", job_id=job_id)
+                worker.cancel()
+                return
+
+    async def _process_item(
+        self,
+        job_id: str,
+        item_id: int,
+        location: dict,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        async with semaphore:
+            async with self._session_factory() as db:
+                claimed = await db.execute(
+                    update(BatchJobItem)
+                    .where(
+                        BatchJobItem.id == item_id,
+                        BatchJobItem.status == ITEM_PENDING,
+                    )
+                    .values(
+                        status=ITEM_RUNNING,
+                        attempts=BatchJobItem.attempts + 1,
+                        updated_at=datetime.utcnow(),
+                    )
+                )
+                await db.commit()
+            if not claimed.rowcount:
+                return  # Cancelled since the job started
+
+            try:
+                result = await self.analyzer(location, self.limits)
+            except Exception as e:
+                self.items_failed += 1
+                logger.warning(
+                    "batch_item_failed", job_id=job_id, item_id=item_id, error=str(e)
+                )
+                values = {"status": ITEM_FAILED, "error": str(e)}
+            else:
+                self.items_done += 1
+                values = {"status": ITEM_DONE, "result": result}
+
+            async with self._session_factory() as db:
+                await db.execute(
+                    update(BatchJobItem)
+                    .where(
+                        BatchJobItem.id == item_id,
+                        BatchJobItem.status == ITEM_RUNNING,
+                    )
+                    .values(**values, updated_at=datetime.utcnow())
+                )
+                await db.commit()
+
+    async def cancel(self, job_id: str) -> BatchJobStatus:
+        """
+        Cancel a job; items not yet finished are marked cancelled
+
+        Cancelling a finished job leaves it unchanged.
+
+        Raises:
+            BatchJobNotFoundError: If the job does not exist
+        """
+        now = datetime.utcnow()
+        async with self._session_factory() as db:
+            job = await self._get_job(db, job_id)
+            result = await db.execute(
+                update(BatchJob)
+                .where(
+                    BatchJob.id == job.id,
+                    BatchJob.status.in_([JOB_QUEUED, JOB_RUNNING]),
+                )
+                .values(status=JOB_CANCELLED, finished_at=now, updated_at=now)
+            )
+            if result.rowcount:
+                await db.execute(
+                    update(BatchJobItem)
+                    .where(
+                        BatchJobItem.job_id == job.id,
+                        BatchJobItem.status.in_([ITEM_PENDING, ITEM_RUNNING]),
+                    )
+                    .values(status=ITEM_CANCELLED, updated_at=now)
+                )
+            await db.commit()
+
+        if result.rowcount:
+            self.jobs_cancelled += 1
+            logger.info("batch_job_cancelled", job_id=job_id)
+        # Stop in-flight items if the job runs on this instance
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        return await self.get_status(job_id, include_items=False)
+
+    async def resume(self) -> int:
+        """
+        Re-enqueue queued jobs and running jobs whose lease has expired
+
+        Jobs a live instance is heartbeating are left to it. Each job is
+        claimed when it runs, so a job enqueued on two instances is
+        processed by one.
+
+        Returns:
+            Number of jobs enqueued
+        """
+        now = datetime.utcnow()
+        async with self._session_factory() as db:
+            job_ids = (
+                (
+                    await db.execute(
+                        select(BatchJob.job_id)
+                        .where(
+                            (BatchJob.status == JOB_QUEUED) | self._lease_expired(now)
+                        )
+                        .order_by(BatchJob.id)
+                    )
+                )
+                .scalars()
+                .all()
+            )
+        for job_id in job_ids:
+            await self.queue.enqueue(job_id)
+        if job_ids:
+            logger.info("batch_jobs_resumed", count=len(job_ids))
+        return len(job_ids)
+
+    async def get_status(
+        self, job_id: str, include_items: bool = True
+    ) -> BatchJobStatus:
+        """
+        Get a job's progress and, optionally, its per-item results
+
+        Raises:
+            BatchJobNotFoundError: If the job does not exist
+        """
+        async with self._session_factory() as db:
+            job = await self._get_job(db, job_id)
+            counts = dict(
+                (
+                    await db.execute(
+                        select(BatchJobItem.status, func.count())
+                        .where(BatchJobItem.job_id == job.id)
+                        .group_by(BatchJobItem.status)
+                    )
+                ).all()
+            )
+            items = None
+            if include_items:
+                rows = await db.execute(
+                    select(
+                        BatchJobItem.position,
+                        BatchJobItem.status,
+                        BatchJobItem.result,
+                        BatchJobItem.error,
+                    )
+                    .where(BatchJobItem.job_id == job.id)
+                    .order_by(BatchJobItem.position)
+                )
+                items = [BatchItemStatus(**row._mapping) for row in rows.all()]
+
+        finished = counts.get(ITEM_DONE, 0) + counts.get(ITEM_FAILED, 0)
+        estimated_completion = None
+        if job.status == JOB_RUNNING and finished and job.started_at:
+            elapsed = datetime.utcnow() - job.started_at
+            estimated_completion = job.started_at + elapsed * (job.total / finished)
+
+        return BatchJobStatus(
+            job_id=job.job_id,
+            status=job.status,
+            total=job.total,
+            done=counts.get(ITEM_DONE, 0),
+            failed=counts.get(ITEM_FAILED, 0),
+            cancelled=counts.get(ITEM_CANCELLED, 0),
+            created_at=job.created_at,
+            finished_at=job.finished_at,
+            estimated_completion=estimated_completion,
+            items=items,
+        )
+
+    def get_stats(self) -> dict:
+        return {
+            "queue": self.queue.get_stats(),
+            "running_jobs": len(self._running),
+            "items_done": self.items_done,
+            "items_failed": self.items_failed,
+            "jobs_completed": self.jobs_completed,
+            "jobs_cancelled": self.jobs_cancelled,
+            "jobs_resumed": self.jobs_resumed,
+        }
+
+
+_runner: Optional[BatchJobRunner] = None
+
+
+async def start_batch_jobs(
+    queue: Optional[InProcessTaskQueue] = None,
+    session_factory=AsyncSessionLocal,
+    analyzer: Analyzer = analyze_location,
+) -> Optional[BatchJobRunner]:
+    """Start the job workers and re-enqueue unfinished jobs"""
+    global _runner
+    if not settings.BATCH_ANALYSIS_ENABLED:
+        logger.info("batch_jobs_disabled")
+        return None
+
+    if queue is None:
+        queue = InProcessTaskQueue(workers=settings.BATCH_ANALYSIS_WORKERS)
+    runner = BatchJobRunner(
+        queue,
+        session_factory=session_factory,
+        analyzer=analyzer,
+        item_concurrency=settings.BATCH_ANALYSIS_ITEM_CONCURRENCY,
+        max_attempts=settings.BATCH_ANALYSIS_MAX_ATTEMPTS,
+        lease_seconds=settings.BATCH_ANALYSIS_LEASE_SECONDS,
+    )
+    queue.start(runner.run)
+    _runner = runner
+
+    try:
+        await runner.resume()
+    except Exception as e:
+        # Jobs stay in the database and resume on the next start
+        logger.error("batch_jobs_resume_failed", error=str(e))
+    return runner
+
+
+async def stop_batch_jobs() -> None:
+    """Stop the job workers; running jobs resume on the next start"""
+    global _runner
+    runner, _runner = _runner, None
+    if runner is not None:
+        await runner.queue.stop()
+
+
+def get_batch_runner() -> BatchJobRunner:
+    """
+    Get the running batch job runner
+
+    Raises:
+        BatchJobsUnavailableError: If batch jobs are disabled or not started
+    """
+    if _runner is None:
+        raise BatchJobsUnavailableError("Batch analysis is not available")
+    return _runner
+
+
+def get_batch_job_stats() -> dict:
+    """Get queue depth and job/item counters"""
+    if _runner is None:
+        return {"enabled": False}
+    return {"enabled": True, **_runner.get_stats()}
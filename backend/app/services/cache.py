@@ -0,0 +1,246 @@
+"""Application cache: in-process L1 over the shared cache backend"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+import structlog
+
+from app.core.codec import build_codec
+from app.core.config import settings
+from app.core.invalidation import (
+    InvalidationBus,
+    LocalInvalidationBus,
+    RedisInvalidationBus,
+)
+from app.core.lru import LRUCache
+from app.services.firestore import (
+    BulkWriteResult,
+    FirestoreCache,
+    cache as firestore_cache,
+)
+from app.services.redis_cache import RedisCache
+
+logger = structlog.get_logger()
+
+
+class TieredCache:
+    """
+    Bounded in-process L1 in front of a shared cache
+
+    Exposes the FirestoreCache interface. Reads are served from the L1 when
+    possible and fill it on a shared-tier hit. Writes go to the shared tier,
+    update the local L1 and publish the keys on the invalidation bus so other
+    instances drop their copies.
+    """
+
+    def __init__(
+        self,
+        shared: Union[FirestoreCache, RedisCache],
+        local: LRUCache,
+        bus: Optional[InvalidationBus] = None,
+    ):
+        self.shared = shared
+        self.local = local
+        self.bus = bus
+        # Bumped on every remote invalidation; a shared-tier read that spans
+        # an invalidation does not fill the L1 with a possibly stale value
+        self._epoch = 0
+
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+        if bus is not None:
+            bus.subscribe(self._invalidate)
+
+    def _invalidate(self, keys: Optional[List[str]]) -> None:
+        self._epoch += 1
+        if keys is None:
+            self.local.clear()
+            return
+        for key in keys:
+            self.local.delete(key)
+
+    def _local_ttl(self, ttl: int) -> float:
+        return min(ttl, self.local.ttl)
+
+    async def _publish(self, keys: List[str]) -> None:
+        if self.bus is not None and keys:
+            await self.bus.publish(keys)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from the L1, falling back to the shared tier"""
+        value = self.local.get(key)
+        if value is not None:
+            self.local_hits += 1
+            return value
+
+        epoch = self._epoch
+        value = await self.shared.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.shared_hits += 1
+        if epoch == self._epoch:
+            self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
+        """Set value in both tiers and invalidate other instances"""
+        self.local.delete(key)
+        ok = await self.shared.set(key, value, ttl=ttl)
+        if ok:
+            self.local.set(key, value, ttl=self._local_ttl(ttl))
+        await self._publish([key])
+        return ok
+
+    async def delete(self, key: str) -> bool:
+        """Delete value from both tiers and invalidate other instances"""
+        self.local.delete(key)
+        ok = await self.shared.delete(key)
+        await self._publish([key])
+        return ok
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Get many values, reading only L1 misses from the shared tier"""
+        values: Dict[str, Any] = {}
+        missing: List[str] = []
+        for key in dict.fromkeys(keys):
+            value = self.local.get(key)
+            if value is not None:
+                values[key] = value
+            else:
+                missing.append(key)
+        self.local_hits += len(values)
+
+        if missing:
+            epoch = self._epoch
+            found = await self.shared.get_many(missing)
+            self.shared_hits += len(found)
+            self.misses += len(missing) - len(found)
+            if epoch == self._epoch:
+                for key, value in found.items():
+                    self.local.set(key, value)
+            values.update(found)
+        return values
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: int = 3600,
+        ttls: Optional[Dict[str, int]] = None,
+    ) -> BulkWriteResult:
+        """Set many values in both tiers and invalidate other instances"""
+        ttls = ttls or {}
+        for key in items:
+            self.local.delete(key)
+        result = await self.shared.set_many(items, ttl=ttl, ttls=ttls)
+        for key in result.succeeded:
+            self.local.set(key, items[key], ttl=self._local_ttl(ttls.get(key, ttl)))
+        await self._publish(list(items))
+        return result
+
+    async def delete_many(self, keys: Iterable[str]) -> BulkWriteResult:
+        """Delete many values from both tiers and invalidate other instances"""
+        keys = list(dict.fromkeys(keys))
+        for key in keys:
+            self.local.delete(key)
+        result = await self.shared.delete_many(keys)
+        await self._publish(keys)
+        return result
+
+    async def clear_expired(self) -> int:
+        """Clear expired entries in the shared tier (the L1 expires by TTL)"""
+        return await self.shared.clear_expired()
+
+    def get_stats(self) -> dict:
+        """Get hit ratios per tier"""
+        lookups = self.local_hits + self.shared_hits + self.misses
+        shared_lookups = self.shared_hits + self.misses
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "local_hit_ratio": self.local_hits / lookups if lookups else 0.0,
+            "shared_hit_ratio": (
+                self.shared_hits / shared_lookups if shared_lookups else 0.0
+            ),
+            "hit_ratio": (
+                (self.local_hits + self.shared_hits) / lookups if lookups else 0.0
+            ),
+            "local": self.local.get_stats(),
+            "invalidation": self.bus.get_stats() if self.bus else None,
+        }
+
+
+def _build_shared_cache() -> Union[FirestoreCache, RedisCache]:
+    """Build the shared cache backend selected in settings"""
+    backend = settings.CACHE_BACKEND
+    if backend == "redis":
+        return RedisCache(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            codec=build_codec(
+                settings.CACHE_CODEC,
+                compression=settings.CACHE_COMPRESSION,
+                compress_min_bytes=settings.CACHE_COMPRESS_MIN_BYTES,
+            ),
+        )
+    if backend != "firestore":
+        logger.warning("cache_backend_unknown", backend=backend)
+    return firestore_cache
+
+
+def _build_invalidation_bus() -> Optional[InvalidationBus]:
+    """Build the invalidation bus selected in settings"""
+    backend = settings.CACHE_INVALIDATION_BACKEND
+    if backend == "redis":
+        return RedisInvalidationBus(
+            settings.REDIS_URL, channel=settings.CACHE_INVALIDATION_CHANNEL
+        )
+    if backend == "local":
+        return LocalInvalidationBus(channel=settings.CACHE_INVALIDATION_CHANNEL)
+    if backend != "none":
+        logger.warning("cache_invalidation_backend_unknown", backend=backend)
+    return None
+
+
+def _build_cache():
+    """Build the application cache from settings"""
+    if not settings.CACHE_L1_ENABLED:
+        return shared_cache
+    return TieredCache(
+        shared=shared_cache,
+        local=LRUCache(
+            max_entries=settings.CACHE_L1_MAX_ENTRIES,
+            ttl=settings.CACHE_L1_TTL,
+            max_bytes=settings.CACHE_L1_MAX_BYTES,
+        ),
+        bus=_build_invalidation_bus(),
+    )
+
+
+# Global shared cache backend and application cache
+shared_cache = _build_shared_cache()
+cache = _build_cache()
+
+
+async def start_cache() -> None:
+    """Start receiving invalidations (called on application startup)"""
+    if isinstance(cache, TieredCache) and cache.bus is not None:
+        await cache.bus.start()
+
+
+async def close_cache() -> None:
+    """Stop receiving invalidations and release connections (on shutdown)"""
+    if isinstance(cache, TieredCache) and cache.bus is not None:
+        await cache.bus.close()
+    if isinstance(shared_cache, RedisCache):
+        await shared_cache.close()
+
+
+def get_cache_stats() -> dict:
+    """Get application cache statistics"""
+    if isinstance(cache, TieredCache):
+        return cache.get_stats()
+    return {"tiered": False}
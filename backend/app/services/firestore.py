@@ -1,38 +1,156 @@
 """Firestore service"""
 
-from typing import Optional, Any
-from datetime import datetime, timedelta
+import asyncio
+import time
+from typing import Any, Dict, Iterable, List, Optional
+from datetime import datetime, timedelta, timezone
 import structlog
-from firebase_admin import firestore
+from firebase_admin import firestore_async
+
+from app.core.codec import Codec, CodecError, build_codec, decode, is_encoded
+from app.core.config import settings
 
 logger = structlog.get_logger()
 
-# Get Firestore client
-try:
-    db = firestore.client()
-    logger.info("firestore_client_initialized")
-except Exception as e:
-    logger.error("firestore_client_initialization_failed", error=str(e))
-    db = None
+# Firestore accepts at most 500 writes per batch commit
+MAX_BATCH_WRITES = 500
+# Documents requested per get_all call; chunks are fetched concurrently
+MAX_BATCH_READS = 300
+
+# Seconds to fail fast after the client could not be created, so an outage
+# does not repeat credential lookups and error logs on every cache call
+CLIENT_RETRY_INTERVAL = 30.0
+
+# Async Firestore client. Created on first use rather than at import so its
+# gRPC channel is bound to the running event loop.
+db = None
+_client_failed_at: Optional[float] = None
+
+
+def _get_db():
+    """Get the async Firestore client, creating it on first use"""
+    global db, _client_failed_at
+    if db is None:
+        if (
+            _client_failed_at is not None
+            and time.monotonic() - _client_failed_at < CLIENT_RETRY_INTERVAL
+        ):
+            raise Exception("Firestore client not initialized")
+        try:
+            db = firestore_async.client()
+            _client_failed_at = None
+            logger.info("firestore_client_initialized")
+        except Exception as e:
+            _client_failed_at = time.monotonic()
+            logger.error(
+                "firestore_client_initialization_failed",
+                error=str(e),
+                retry_in=CLIENT_RETRY_INTERVAL,
+            )
+            raise Exception("Firestore client not initialized") from e
+    return db
+
+
+def _is_expired(expires_at: Optional[datetime]) -> bool:
+    """Check an expires_at value read back from Firestore"""
+    if not expires_at:
+        return False
+    # Firestore returns timezone-aware UTC timestamps
+    if expires_at.tzinfo is not None:
+        return expires_at < datetime.now(timezone.utc)
+    return expires_at < datetime.utcnow()
+
+
+def _chunks(items: List, size: int) -> Iterable[List]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class BulkWriteResult:
+    """Outcome of a bulk write: keys committed and keys whose batch failed"""
+
+    def __init__(self):
+        self.succeeded: List[str] = []
+        self.failed: Dict[str, str] = {}
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def __repr__(self) -> str:
+        return (
+            f"BulkWriteResult(succeeded={len(self.succeeded)}, "
+            f"failed={len(self.failed)})"
+        )
+
+
+class PurgeResult:
+    """Progress of an expired-entry purge"""
+
+    def __init__(self):
+        self.deleted = 0
+        self.failed = 0
+        self.pages = 0
+        self.elapsed = 0.0
+        # Resume point for the next run; None once the purge has caught up
+        self.cursor: Optional[Dict[str, str]] = None
+        self.complete = False
+
+    def to_dict(self) -> dict:
+        return {
+            "deleted": self.deleted,
+            "failed": self.failed,
+            "pages": self.pages,
+            "elapsed": round(self.elapsed, 3),
+            "cursor": self.cursor,
+            "complete": self.complete,
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"PurgeResult(deleted={self.deleted}, failed={self.failed}, "
+            f"complete={self.complete})"
+        )
 
 
 class FirestoreCache:
-    """Firestore-based cache service"""
+    """
+    Firestore-based cache service
+
+    With a codec, values are stored as one encoded bytes field instead of a
+    Firestore map. Both forms are read back, so the codec can be switched on
+    without flushing the cache.
+    """
 
-    def __init__(self, collection_name: str = "cache"):
+    def __init__(self, collection_name: str = "cache", codec: Optional[Codec] = None):
         self.collection_name = collection_name
+        self.codec = codec
+        self.purge_runs = 0
+        self.purge_deleted = 0
+        self.purge_failed = 0
+        self.last_purge: Optional[PurgeResult] = None
 
     def _get_collection(self):
         """Get Firestore collection"""
-        if db is None:
-            raise Exception("Firestore client not initialized")
-        return db.collection(self.collection_name)
+        return _get_db().collection(self.collection_name)
+
+    def _encode(self, value: Any) -> Any:
+        return self.codec.encode(value) if self.codec else value
+
+    def _decode(self, key: str, value: Any) -> Optional[Any]:
+        if not is_encoded(value):
+            return value
+        try:
+            return decode(value)
+        except CodecError as e:
+            logger.error("cache_decode_failed", key=key, error=str(e))
+            return None
 
     async def get(self, key: str) -> Optional[Any]:
         """Get value from cache"""
         try:
             doc_ref = self._get_collection().document(key)
-            doc = doc_ref.get()
+            doc = await doc_ref.get()
 
             if not doc.exists:
                 logger.debug("cache_miss", key=key)
@@ -41,15 +159,14 @@ class FirestoreCache:
             data = doc.to_dict()
 
             # Check expiration
-            expires_at = data.get("expires_at")
-            if expires_at and expires_at < datetime.utcnow():
+            if _is_expired(data.get("expires_at")):
                 logger.debug("cache_expired", key=key)
                 # Delete expired cache
-                doc_ref.delete()
+                await doc_ref.delete()
                 return None
 
             logger.debug("cache_hit", key=key)
-            return data.get("value")
+            return self._decode(key, data.get("value"))
 
         except Exception as e:
             logger.error("cache_get_failed", key=key, error=str(e))
@@ -61,10 +178,10 @@ class FirestoreCache:
             expires_at = datetime.utcnow() + timedelta(seconds=ttl)
 
             doc_ref = self._get_collection().document(key)
-            doc_ref.set(
+            await doc_ref.set(
                 {
                     "key": key,
-                    "value": value,
+                    "value": self._encode(value),
                     "created_at": datetime.utcnow(),
                     "expires_at": expires_at,
                 }
@@ -81,7 +198,7 @@ class FirestoreCache:
         """Delete value from cache"""
         try:
             doc_ref = self._get_collection().document(key)
-            doc_ref.delete()
+            await doc_ref.delete()
             logger.debug("cache_deleted", key=key)
             return True
 
@@ -89,23 +206,288 @@ class FirestoreCache:
             logger.error("cache_delete_failed", key=key, error=str(e))
             return False
 
-    async def clear_expired(self) -> int:
-        """Clear all expired cache entries"""
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get many values in as few round trips as possible
+
+        Documents are fetched with get_all in chunks that run concurrently.
+        Expired entries are treated as misses and deleted in one batch. A
+        chunk that fails to load is logged and its keys count as misses.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dict of key to value for the keys that were found and fresh
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+
         try:
-            now = datetime.utcnow()
-            expired_docs = self._get_collection().where("expires_at", "<", now).stream()
+            collection = self._get_collection()
+        except Exception as e:
+            logger.error("cache_get_many_failed", keys=len(keys), error=str(e))
+            return {}
+
+        async def fetch(chunk: List[str]) -> list:
+            refs = [collection.document(key) for key in chunk]
+            return [doc async for doc in _get_db().get_all(refs)]
+
+        chunks = list(_chunks(keys, MAX_BATCH_READS))
+        outcomes = await asyncio.gather(
+            *(fetch(chunk) for chunk in chunks), return_exceptions=True
+        )
+
+        values: Dict[str, Any] = {}
+        expired: List[str] = []
+        failed = 0
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, Exception):
+                failed += len(chunk)
+                logger.error(
+                    "cache_get_many_chunk_failed", keys=len(chunk), error=str(outcome)
+                )
+                continue
+            for doc in outcome:
+                if not doc.exists:
+                    continue
+                data = doc.to_dict()
+                if _is_expired(data.get("expires_at")):
+                    expired.append(doc.id)
+                    continue
+                value = self._decode(doc.id, data.get("value"))
+                if value is not None:
+                    values[doc.id] = value
+
+        if expired:
+            await self.delete_many(expired)
+
+        logger.debug(
+            "cache_get_many",
+            requested=len(keys),
+            hits=len(values),
+            expired=len(expired),
+            failed=failed,
+        )
+        return values
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: int = 3600,
+        ttls: Optional[Dict[str, int]] = None,
+    ) -> BulkWriteResult:
+        """
+        Set many values with batched writes
+
+        Writes are split into batches of at most 500 and committed
+        concurrently. Each batch is atomic, so a failure affects only the
+        keys of that batch.
+
+        Args:
+            items: Dict of key to value
+            ttl: Default time to live in seconds
+            ttls: Per-key time to live overriding ttl
+
+        Returns:
+            BulkWriteResult with succeeded and failed keys
+        """
+        ttls = ttls or {}
+        now = datetime.utcnow()
+        documents = {
+            key: {
+                "key": key,
+                "value": self._encode(value),
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=ttls.get(key, ttl)),
+            }
+            for key, value in items.items()
+        }
+
+        def write(batch, ref, key):
+            batch.set(ref, documents[key])
+
+        return await self._write_many(list(documents), write, "cache_set_many")
+
+    async def delete_many(self, keys: Iterable[str]) -> BulkWriteResult:
+        """
+        Delete many values with batched writes
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            BulkWriteResult with succeeded and failed keys
+        """
+
+        def write(batch, ref, key):
+            batch.delete(ref)
+
+        return await self._write_many(
+            list(dict.fromkeys(keys)), write, "cache_delete_many"
+        )
+
+    async def _write_many(self, keys: List[str], write, event: str) -> BulkWriteResult:
+        result = BulkWriteResult()
+        if not keys:
+            return result
 
-            count = 0
-            for doc in expired_docs:
-                doc.reference.delete()
-                count += 1
+        try:
+            collection = self._get_collection()
+        except Exception as e:
+            logger.error(f"{event}_failed", keys=len(keys), error=str(e))
+            result.failed = {key: str(e) for key in keys}
+            return result
+
+        async def commit(chunk: List[str]) -> None:
+            batch = _get_db().batch()
+            for key in chunk:
+                write(batch, collection.document(key), key)
+            await batch.commit()
+
+        chunks = list(_chunks(keys, MAX_BATCH_WRITES))
+        outcomes = await asyncio.gather(
+            *(commit(chunk) for chunk in chunks), return_exceptions=True
+        )
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(
+                    f"{event}_chunk_failed", keys=len(chunk), error=str(outcome)
+                )
+                result.failed.update({key: str(outcome) for key in chunk})
+            else:
+                result.succeeded.extend(chunk)
+
+        logger.debug(event, succeeded=len(result.succeeded), failed=len(result.failed))
+        return result
 
-            logger.info("expired_cache_cleared", count=count)
-            return count
+    async def clear_expired(self) -> int:
+        """
+        Clear expired cache entries
+
+        Skipped when the collection has a Firestore TTL policy on expires_at
+        (FIRESTORE_CACHE_NATIVE_TTL); otherwise runs purge_expired with the
+        CACHE_PURGE_* settings.
+        """
+        if settings.FIRESTORE_CACHE_NATIVE_TTL:
+            logger.debug("expired_cache_purge_skipped", reason="native_ttl")
+            return 0
+
+        result = await self.purge_expired(
+            page_size=settings.CACHE_PURGE_PAGE_SIZE,
+            parallelism=settings.CACHE_PURGE_PARALLELISM,
+            time_budget=settings.CACHE_PURGE_TIME_BUDGET,
+        )
+        return result.deleted
+
+    async def purge_expired(
+        self,
+        page_size: int = MAX_BATCH_WRITES,
+        parallelism: int = 4,
+        time_budget: Optional[float] = None,
+        cursor: Optional[Dict[str, str]] = None,
+    ) -> PurgeResult:
+        """
+        Delete expired entries page by page with batched deletes
+
+        Expired documents are listed in (expires_at, id) order, fetching only
+        document ids, and each page is deleted as one batch. Up to
+        `parallelism` page deletes run while the next page is read. When the
+        time budget runs out the purge stops after in-flight deletes finish
+        and returns a cursor to resume from.
+
+        Args:
+            page_size: Documents per page, at most 500 (one batch commit)
+            parallelism: Page deletes in flight at once
+            time_budget: Seconds to spend before stopping, None for no limit
+            cursor: Resume point returned by a previous run
+
+        Returns:
+            PurgeResult with counts, elapsed time and the resume cursor
+        """
+        result = PurgeResult()
+        start = time.monotonic()
+        page_size = min(page_size, MAX_BATCH_WRITES)
+        in_flight: set = set()
+
+        async def delete_page(ids: List[str]) -> None:
+            outcome = await self.delete_many(ids)
+            result.deleted += len(outcome.succeeded)
+            result.failed += len(outcome.failed)
+
+        try:
+            collection = self._get_collection()
+            query = (
+                collection.where("expires_at", "<", datetime.now(timezone.utc))
+                .order_by("expires_at")
+                .order_by("__name__")
+                .select(["expires_at"])
+                .limit(page_size)
+            )
+
+            while True:
+                if time_budget is not None and time.monotonic() - start >= time_budget:
+                    break
+
+                page = query
+                if cursor is not None:
+                    page = query.start_after(
+                        {
+                            "expires_at": datetime.fromisoformat(cursor["expires_at"]),
+                            "__name__": collection.document(cursor["id"]),
+                        }
+                    )
+                docs = [doc async for doc in page.stream()]
+                if docs:
+                    result.pages += 1
+                    last = docs[-1]
+                    cursor = {
+                        "expires_at": last.get("expires_at").isoformat(),
+                        "id": last.id,
+                    }
+                    in_flight.add(
+                        asyncio.create_task(delete_page([doc.id for doc in docs]))
+                    )
+                if len(docs) < page_size:
+                    result.complete = True
+                    cursor = None
+                    break
+
+                if len(in_flight) >= parallelism:
+                    _, in_flight = await asyncio.wait(
+                        in_flight, return_when=asyncio.FIRST_COMPLETED
+                    )
+                logger.debug(
+                    "expired_cache_purge_progress",
+                    pages=result.pages,
+                    deleted=result.deleted,
+                    elapsed=round(time.monotonic() - start, 3),
+                )
 
         except Exception as e:
             logger.error("clear_expired_failed", error=str(e))
-            return 0
+
+        if in_flight:
+            await asyncio.wait(in_flight)
+        result.cursor = cursor
+        result.elapsed = time.monotonic() - start
+
+        self.purge_runs += 1
+        self.purge_deleted += result.deleted
+        self.purge_failed += result.failed
+        self.last_purge = result
+        logger.info("expired_cache_cleared", **result.to_dict())
+        return result
+
+    def get_stats(self) -> dict:
+        """Get purge statistics"""
+        return {
+            "purge_runs": self.purge_runs,
+            "purge_deleted": self.purge_deleted,
+            "purge_failed": self.purge_failed,
+            "last_purge": self.last_purge.to_dict() if self.last_purge else None,
+        }
 
 
 class UserProfileService:
@@ -116,15 +498,13 @@ class UserProfileService:
 
     def _get_collection(self):
         """Get Firestore collection"""
-        if db is None:
-            raise Exception("Firestore client not initialized")
-        return db.collection(self.collection_name)
+        return _get_db().collection(self.collection_name)
 
     async def get_profile(self, uid: str) -> Optional[dict]:
         """Get user profile"""
         try:
             doc_ref = self._get_collection().document(uid)
-            doc = doc_ref.get()
+            doc = await doc_ref.get()
 
             if not doc.exists:
                 logger.debug("user_profile_not_found", uid=uid)
@@ -149,7 +529,7 @@ class UserProfileService:
                 }
             )
 
-            doc_ref.set(profile_data)
+            await doc_ref.set(profile_data)
             logger.info("user_profile_created", uid=uid)
             return True
 
@@ -168,7 +548,7 @@ class UserProfileService:
                 }
             )
 
-            doc_ref.update(update_data)
+            await doc_ref.update(update_data)
             logger.info("user_profile_updated", uid=uid)
             return True
 
@@ -180,7 +560,7 @@ class UserProfileService:
         """Delete user profile"""
         try:
             doc_ref = self._get_collection().document(uid)
-            doc_ref.delete()
+            await doc_ref.delete()
             logger.info("user_profile_deleted", uid=uid)
             return True
 
@@ -190,19 +570,22 @@ class UserProfileService:
 
 
 # Global cache instance
-cache = FirestoreCache()
+cache = FirestoreCache(
+    codec=build_codec(
+        settings.CACHE_CODEC,
+        compression=settings.CACHE_COMPRESSION,
+        compress_min_bytes=settings.CACHE_COMPRESS_MIN_BYTES,
+    )
+)
 user_profile_service = UserProfileService()
 
 
 async def check_firestore() -> str:
     """Check Firestore connection"""
     try:
-        if db is None:
-            return "error"
-
-        # Try to read a collection
-        collections = db.collections()
-        list(collections)  # Force evaluation
+        # Try to list collections
+        async for _ in _get_db().collections():
+            break
 
         return "ok"
     except Exception as e:
@@ -0,0 +1,323 @@
+"""Offline 町丁目 gazetteer geocoder
+
+Resolves addresses locally from an index built out of the MLIT 位置参照情報
+(大字・町丁目レベル) dataset, so common addresses never reach the paid
+Google API. Build the index file with scripts/build_gazetteer_index.py.
+"""
+
+import csv
+import gzip
+import json
+import os
+from bisect import bisect_right
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+import structlog
+
+from app.core.config import settings
+from app.models.geocoding import GeocodingResult
+from app.services.address_normalizer import normalize_address
+
+logger = structlog.get_logger()
+
+# Bump when the index file layout or key normalization changes
+INDEX_FORMAT_VERSION = 2
+
+_DIGITS = frozenset("0123456789")
+# Characters allowed right after a matched 町丁目 name (番地 or end of string)
+_BOUNDARY_CHARS = _DIGITS | frozenset("- ")
+
+# Column names in the MLIT 位置参照情報 CSV
+_MLIT_COLUMNS = {
+    "prefecture": "都道府県名",
+    "city": "市区町村名",
+    "district": "大字町丁目名",
+    "lat": "緯度",
+    "lng": "経度",
+}
+
+
+class GazetteerError(Exception):
+    """Raised when a gazetteer index cannot be built or loaded"""
+
+    pass
+
+
+def read_mlit_csv(path: str, encoding: str = "cp932") -> Iterator[dict]:
+    """
+    Read rows from an MLIT 位置参照情報 (大字・町丁目レベル) CSV file
+
+    Args:
+        path: CSV file path
+        encoding: File encoding (the published files are Shift_JIS)
+
+    Yields:
+        Dicts with prefecture, city, district, lat and lng
+    """
+    with open(path, encoding=encoding, newline="") as f:
+        reader = csv.DictReader(f)
+        missing = set(_MLIT_COLUMNS.values()) - set(reader.fieldnames or [])
+        if missing:
+            raise GazetteerError(f"Missing columns in {path}: {sorted(missing)}")
+
+        for row in reader:
+            yield {
+                "prefecture": row[_MLIT_COLUMNS["prefecture"]],
+                "city": row[_MLIT_COLUMNS["city"]],
+                "district": row[_MLIT_COLUMNS["district"]],
+                "lat": float(row[_MLIT_COLUMNS["lat"]]),
+                "lng": float(row[_MLIT_COLUMNS["lng"]]),
+            }
+
+
+class GazetteerIndex:
+    """
+    Prefix index over normalized 町丁目 addresses
+
+    Keys are normalized "都道府県+市区町村+町丁目" strings (plus the same
+    without the prefecture) held in a sorted array. A lookup finds the longest
+    key that is a prefix of the query with a few binary searches.
+    """
+
+    def __init__(
+        self,
+        records: List[list],
+        keys: List[str],
+        key_records: List[List[int]],
+        built_at: Optional[str] = None,
+    ):
+        self.records = records
+        self.keys = keys
+        self.key_records = key_records
+        self.built_at = built_at
+        self.hits = 0
+        self.misses = 0
+        self.ambiguous = 0
+        self.degraded_hits = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def build(cls, rows: Iterable[dict]) -> "GazetteerIndex":
+        """
+        Build an index from gazetteer rows
+
+        Args:
+            rows: Dicts with prefecture, city, district, lat and lng
+
+        Returns:
+            GazetteerIndex
+        """
+        records: List[list] = []
+        key_map: dict = {}
+        seen: set = set()
+
+        for row in rows:
+            if not row["district"]:
+                continue
+            name = (row["prefecture"], row["city"], row["district"])
+            if name in seen:
+                continue
+            seen.add(name)
+
+            record_id = len(records)
+            records.append(
+                [
+                    row["prefecture"],
+                    row["city"],
+                    row["district"],
+                    round(row["lat"], 6),
+                    round(row["lng"], 6),
+                ]
+            )
+            local = normalize_address(row["city"] + row["district"])
+            full = normalize_address(row["prefecture"]) + local
+            for key in (full, local):
+                key_map.setdefault(key, []).append(record_id)
+
+        keys = sorted(key_map)
+        return cls(
+            records=records,
+            keys=keys,
+            key_records=[key_map[key] for key in keys],
+            built_at=datetime.utcnow().isoformat(),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "GazetteerIndex":
+        """Load an index file written by save()"""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            raise GazetteerError(
+                f"Unsupported gazetteer index version {data.get('version')} "
+                f"(expected {INDEX_FORMAT_VERSION}); rebuild the index"
+            )
+
+        return cls(
+            records=data["records"],
+            keys=data["keys"],
+            key_records=data["key_records"],
+            built_at=data.get("built_at"),
+        )
+
+    def save(self, path: str) -> None:
+        """Write the index as gzipped JSON"""
+        data = {
+            "version": INDEX_FORMAT_VERSION,
+            "built_at": self.built_at,
+            "records": self.records,
+            "keys": self.keys,
+            "key_records": self.key_records,
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+    def _prefix_matches(self, address: str) -> Iterator[int]:
+        """Yield positions of keys that are prefixes of address, longest first"""
+        prefix = address
+        while prefix:
+            i = bisect_right(self.keys, prefix) - 1
+            if i < 0:
+                return
+            key = self.keys[i]
+            if prefix.startswith(key):
+                yield i
+                prefix = key[:-1]
+            else:
+                # Any shorter matching key is also a prefix of the common part
+                common = 0
+                for a, b in zip(key, prefix):
+                    if a != b:
+                        break
+                    common += 1
+                prefix = prefix[:common]
+
+    def match(
+        self, normalized_address: str, strict: bool = True
+    ) -> Tuple[Optional[list], bool]:
+        """
+        Find the 町丁目 record for a normalized address
+
+        Args:
+            normalized_address: Normalized address
+            strict: If False, accept the longest 町丁目 prefix even when the
+                rest of the address does not start at a 番地 boundary
+
+        Returns:
+            (record, ambiguous): record is None on a miss or when the
+            matched key maps to more than one 町丁目
+        """
+        for i in self._prefix_matches(normalized_address):
+            key = self.keys[i]
+            rest = normalized_address[len(key) :]
+            if strict and rest and rest[0] not in _BOUNDARY_CHARS:
+                continue
+            # Keys ending in a 丁目 number ("道玄坂1") must not match "道玄坂12"
+            if rest and key[-1] in _DIGITS and rest[0] in _DIGITS:
+                continue
+            record_ids = self.key_records[i]
+            if len(record_ids) > 1:
+                return None, True
+            return self.records[record_ids[0]], False
+        return None, False
+
+    def lookup(
+        self, normalized_address: str, strict: bool = True
+    ) -> Optional[GeocodingResult]:
+        """
+        Resolve a normalized address to a GeocodingResult
+
+        Args:
+            normalized_address: Normalized address
+            strict: See match(); non-strict lookups are used as a degraded
+                fallback when upstream geocoding is unavailable. They retry an
+                address whose strict lookup was already counted, so they only
+                count degraded_hits
+
+        Returns:
+            GeocodingResult, or None on a miss or ambiguity
+        """
+        record, ambiguous = self.match(normalized_address, strict=strict)
+        if not strict:
+            if record is not None:
+                self.degraded_hits += 1
+        elif record is None:
+            if ambiguous:
+                self.ambiguous += 1
+            else:
+                self.misses += 1
+        else:
+            self.hits += 1
+        if record is None:
+            return None
+
+        prefecture, city, district, lat, lng = record
+        return GeocodingResult(
+            lat=round(lat, 4),
+            lng=round(lng, 4),
+            formatted_address=f"{prefecture}{city}{district}",
+            prefecture=prefecture,
+            city=city,
+            district=district,
+        )
+
+    def get_stats(self) -> dict:
+        """Get index size and lookup counts"""
+        return {
+            "records": len(self.records),
+            "keys": len(self.keys),
+            "built_at": self.built_at,
+            "hits": self.hits,
+            "misses": self.misses,
+            "ambiguous": self.ambiguous,
+            "degraded_hits": self.degraded_hits,
+        }
+
+
+# Global gazetteer, loaded from GAZETTEER_INDEX_PATH
+_gazetteer: Optional[GazetteerIndex] = None
+_gazetteer_loaded = False
+
+
+def load_gazetteer(path: Optional[str] = None) -> Optional[GazetteerIndex]:
+    """
+    Load the gazetteer index (called on application startup)
+
+    Returns:
+        GazetteerIndex, or None if disabled or the file is unavailable
+    """
+    global _gazetteer, _gazetteer_loaded
+    path = path or settings.GAZETTEER_INDEX_PATH
+    _gazetteer_loaded = True
+
+    if not settings.GAZETTEER_ENABLED or not path:
+        _gazetteer = None
+        return None
+
+    if not os.path.exists(path):
+        logger.warning("gazetteer_index_missing", path=path)
+        _gazetteer = None
+        return None
+
+    try:
+        _gazetteer = GazetteerIndex.load(path)
+        logger.info(
+            "gazetteer_loaded",
+            path=path,
+            records=len(_gazetteer),
+            built_at=_gazetteer.built_at,
+        )
+    except Exception as e:
+        logger.error("gazetteer_load_failed", path=path, error=str(e))
+        _gazetteer = None
+    return _gazetteer
+
+
+def get_gazetteer() -> Optional[GazetteerIndex]:
+    """Get the global gazetteer, loading it on first use"""
+    if not _gazetteer_loaded:
+        load_gazetteer()
+    return _gazetteer
@@ -1,52 +1,60 @@
 """Geocoding service using Google Maps Geocoding API"""
 
-import re
-import unicodedata
-from typing import Optional
+import asyncio
+from typing import AsyncIterator, List, Optional, Tuple, Union
 import httpx
 import structlog
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type,
-)
 
+from app.core.circuit_breaker import CircuitBreaker, register_circuit_breaker
 from app.core.config import settings
+from app.core.rate_limiter import RateLimitExceeded, TokenBucketRateLimiter
+from app.core.retry import DeadlineExceeded, RetryBudget, RetryPolicy, deadline
+from app.core.singleflight import SingleFlight
+from app.core.swr import STATUS_MISS, CacheMetadata, Revalidator
 from app.models.geocoding import GeocodingResult
+from app.services.address_normalizer import normalize_address
+from app.services.gazetteer import get_gazetteer
+from app.services.geocoding_cache import geocoding_cache, STATUS_OK
+from app.services.geocoding_providers import (
+    CircuitBreakerProvider,
+    GeocodingError,
+    GeocodingNotFoundError,
+    GeocodingProvider,
+    GeocodingTransientError,
+    GSIGeocodingProvider,
+    HedgedGeocoder,
+)
+from app.services.http_client import deadline_timeout, get_http_client
 
 logger = structlog.get_logger()
 
+# Coalesces concurrent upstream lookups of the same normalized address
+_singleflight = SingleFlight()
 
-class GeocodingError(Exception):
-    """Custom exception for geocoding errors"""
-
-    pass
-
-
-def normalize_address(address: str) -> str:
-    """
-    Normalize address string
-
-    Args:
-        address: Raw address string
+# Background refreshes of stale cache entries, coalesced with foreground misses
+_revalidator = Revalidator(_singleflight)
 
-    Returns:
-        Normalized address string
-    """
-    if not address:
-        return ""
-
-    # Convert full-width characters to half-width
-    address = unicodedata.normalize("NFKC", address)
-
-    # Remove extra whitespace
-    address = " ".join(address.split())
-
-    # Remove special characters that might interfere
-    address = re.sub(r"[・･]", "", address)
+# Client-side quota for the Google Geocoding API
+_rate_limiter = TokenBucketRateLimiter(
+    name="google_geocoding",
+    rate=settings.GEOCODING_QPS,
+    burst=settings.GEOCODING_BURST,
+    daily_budget=settings.GEOCODING_DAILY_BUDGET,
+    max_wait=settings.GEOCODING_RATE_LIMIT_MAX_WAIT,
+)
 
-    return address.strip()
+# Retries of transient Google errors, limited to a fraction of traffic
+_retry_policy = RetryPolicy(
+    name="google_geocoding",
+    retryable=lambda e: isinstance(e, GeocodingTransientError),
+    max_attempts=settings.GEOCODING_RETRY_MAX_ATTEMPTS,
+    base_delay=settings.GEOCODING_RETRY_BASE_DELAY,
+    max_delay=settings.GEOCODING_RETRY_MAX_DELAY,
+    budget=RetryBudget(
+        ratio=settings.GEOCODING_RETRY_BUDGET_RATIO,
+        max_tokens=settings.GEOCODING_RETRY_BUDGET_MAX_TOKENS,
+    ),
+)
 
 
 def _extract_prefecture(address_components: list) -> Optional[str]:
@@ -90,14 +98,9 @@ def _extract_postal_code(address_components: list) -> Optional[str]:
     return None
 
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=2, max=10),
-    retry=retry_if_exception_type(httpx.HTTPStatusError),
-)
-async def _call_geocoding_api(address: str) -> dict:
+async def _request_geocoding_api(address: str) -> dict:
     """
-    Call Google Maps Geocoding API with retry logic
+    Make a single Google Maps Geocoding API request
 
     Args:
         address: Normalized address string
@@ -106,6 +109,8 @@ async def _call_geocoding_api(address: str) -> dict:
         API response as dict
 
     Raises:
+        GeocodingNotFoundError: If the address has no results
+        GeocodingTransientError: If the failure is worth retrying
         GeocodingError: If API call fails
     """
     api_key = settings.GOOGLE_MAPS_API_KEY
@@ -121,42 +126,190 @@ async def _call_geocoding_api(address: str) -> dict:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            status = data.get("status")
-
-            if status == "OK":
-                return data
-            elif status == "ZERO_RESULTS":
-                raise GeocodingError(f"No results found for address: {address}")
-            elif status == "OVER_QUERY_LIMIT":
-                raise GeocodingError("Google Maps API rate limit exceeded")
-            elif status == "REQUEST_DENIED":
-                raise GeocodingError("Google Maps API request denied (check API key)")
-            elif status == "INVALID_REQUEST":
-                raise GeocodingError(
-                    f"Invalid geocoding request for address: {address}"
-                )
-            else:
-                raise GeocodingError(f"Geocoding failed with status: {status}")
+        await _rate_limiter.acquire()
+    except RateLimitExceeded as e:
+        raise GeocodingError(f"Google Maps API rate limit exceeded: {str(e)}") from e
+
+    try:
+        client = get_http_client()
+        response = await client.get(
+            url, params=params, timeout=deadline_timeout(client)
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        status = data.get("status")
+
+        if status == "OK":
+            _rate_limiter.record_success()
+            return data
+        elif status == "ZERO_RESULTS":
+            _rate_limiter.record_success()
+            raise GeocodingNotFoundError(f"No results found for address: {address}")
+        elif status == "OVER_QUERY_LIMIT":
+            _rate_limiter.record_throttled()
+            raise GeocodingTransientError("Google Maps API rate limit exceeded")
+        elif status == "REQUEST_DENIED":
+            raise GeocodingError("Google Maps API request denied (check API key)")
+        elif status == "INVALID_REQUEST":
+            raise GeocodingError(f"Invalid geocoding request for address: {address}")
+        elif status == "UNKNOWN_ERROR":
+            raise GeocodingTransientError("Geocoding failed with status: UNKNOWN_ERROR")
+        else:
+            raise GeocodingError(f"Geocoding failed with status: {status}")
 
     except httpx.HTTPStatusError as e:
         if e.response.status_code == 429:
-            raise GeocodingError("Rate limit exceeded") from e
+            _rate_limiter.record_throttled()
+            raise GeocodingTransientError("Rate limit exceeded") from e
+        if e.response.status_code >= 500:
+            raise GeocodingTransientError(
+                f"HTTP error: {e.response.status_code}"
+            ) from e
         raise GeocodingError(f"HTTP error: {e.response.status_code}") from e
     except httpx.RequestError as e:
-        raise GeocodingError(f"Network error: {str(e)}") from e
+        raise GeocodingTransientError(f"Network error: {str(e)}") from e
+    except GeocodingError:
+        raise
     except Exception as e:
         raise GeocodingError(f"Unexpected error: {str(e)}") from e
 
 
+async def _call_geocoding_api(address: str) -> dict:
+    """
+    Call Google Maps Geocoding API, retrying transient failures
+
+    Retries use jittered backoff within the current deadline and the shared
+    retry budget.
+
+    Args:
+        address: Normalized address string
+
+    Returns:
+        API response as dict
+
+    Raises:
+        GeocodingError: If API call fails
+    """
+    try:
+        return await _retry_policy.call(lambda: _request_geocoding_api(address))
+    except DeadlineExceeded as e:
+        raise GeocodingError(f"Geocoding deadline exceeded: {str(e)}") from e
+
+
+def _parse_geocoding_response(data: dict) -> GeocodingResult:
+    """
+    Parse the first result of a Geocoding API response
+
+    Args:
+        data: API response as dict
+
+    Returns:
+        GeocodingResult with coordinates and parsed address
+    """
+    result = data["results"][0]
+    geometry = result["geometry"]
+    location = geometry["location"]
+
+    # Round coordinates to town level (approximately 100m precision)
+    # ~0.001 degree ≈ 100m
+    lat = round(location["lat"], 4)
+    lng = round(location["lng"], 4)
+
+    # Extract address components
+    address_components = result.get("address_components", [])
+    prefecture = _extract_prefecture(address_components)
+    city = _extract_city(address_components)
+    district = _extract_district(address_components)
+    postal_code = _extract_postal_code(address_components)
+
+    formatted_address = result.get("formatted_address", "")
+
+    return GeocodingResult(
+        lat=lat,
+        lng=lng,
+        formatted_address=formatted_address,
+        prefecture=prefecture or "",
+        city=city or "",
+        district=district,
+        postal_code=postal_code,
+    )
+
+
+class GoogleGeocodingProvider(GeocodingProvider):
+    """Google Maps Geocoding API provider"""
+
+    name = "google"
+
+    async def geocode(self, normalized_address: str) -> GeocodingResult:
+        data = await _call_geocoding_api(normalized_address)
+        return _parse_geocoding_response(data)
+
+
+def _with_circuit_breaker(provider: GeocodingProvider) -> GeocodingProvider:
+    """Wrap a provider in a registered circuit breaker built from settings"""
+    breaker = register_circuit_breaker(
+        CircuitBreaker(
+            name=f"{provider.name}_geocoding",
+            failure_rate_threshold=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+            slow_call_threshold=settings.CIRCUIT_BREAKER_SLOW_CALL_THRESHOLD,
+            slow_call_rate_threshold=settings.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+            window_size=settings.CIRCUIT_BREAKER_WINDOW,
+            min_calls=settings.CIRCUIT_BREAKER_MIN_CALLS,
+            open_duration=settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+            half_open_max_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+        )
+    )
+    return CircuitBreakerProvider(provider, breaker)
+
+
+def _build_secondary_providers() -> List[GeocodingProvider]:
+    """Build the secondary providers listed in settings"""
+    providers: List[GeocodingProvider] = []
+    for name in settings.GEOCODING_SECONDARY_PROVIDERS:
+        if name == "gsi":
+            providers.append(
+                _with_circuit_breaker(
+                    GSIGeocodingProvider(url=settings.GSI_ADDRESS_SEARCH_URL)
+                )
+            )
+        else:
+            logger.warning("geocoding_provider_unknown", provider=name)
+    return providers
+
+
+# Google as primary, hedged with the configured secondaries; every provider
+# sits behind its own circuit breaker
+_geocoder = HedgedGeocoder(
+    primary=_with_circuit_breaker(GoogleGeocodingProvider()),
+    secondaries=_build_secondary_providers(),
+    hedge_enabled=settings.GEOCODING_HEDGE_ENABLED,
+    hedge_percentile=settings.GEOCODING_HEDGE_PERCENTILE,
+    min_delay=settings.GEOCODING_HEDGE_MIN_DELAY,
+    max_delay=settings.GEOCODING_HEDGE_MAX_DELAY,
+)
+
+
+async def _resolve_address(normalized_address: str) -> GeocodingResult:
+    """Resolve a normalized address upstream and populate the cache"""
+    try:
+        geocoding_result = await _geocoder.geocode(normalized_address)
+    except GeocodingNotFoundError:
+        if settings.GEOCODING_CACHE_ENABLED:
+            await geocoding_cache.set_not_found(normalized_address)
+        raise
+
+    if settings.GEOCODING_CACHE_ENABLED:
+        await geocoding_cache.set_result(normalized_address, geocoding_result)
+    return geocoding_result
+
+
 async def geocode_address(address: str) -> GeocodingResult:
     """
     Geocode an address to coordinates
 
+    See geocode_address_with_metadata.
+
     Args:
         address: Address string to geocode
 
@@ -165,6 +318,37 @@ async def geocode_address(address: str) -> GeocodingResult:
 
     Raises:
         ValueError: If address is empty
+        GeocodingNotFoundError: If the address has no results
+        GeocodingError: If geocoding fails
+    """
+    result, _ = await geocode_address_with_metadata(address)
+    return result
+
+
+async def geocode_address_with_metadata(
+    address: str,
+) -> Tuple[GeocodingResult, CacheMetadata]:
+    """
+    Geocode an address to coordinates, reporting how the result was served
+
+    Addresses found in the offline gazetteer are resolved locally. Otherwise
+    results (including ZERO_RESULTS answers) are cached by normalized address,
+    and concurrent lookups of the same normalized address share one upstream
+    call. A cached result past its TTL but within the stale window is returned
+    immediately while one background refresh updates the cache. If every
+    upstream provider fails (e.g. their circuit breakers are open), the
+    gazetteer is retried without the 番地 boundary check so the caller gets
+    町丁目-level coordinates instead of an error.
+
+    Args:
+        address: Address string to geocode
+
+    Returns:
+        Tuple of GeocodingResult and CacheMetadata (fresh, stale or miss)
+
+    Raises:
+        ValueError: If address is empty
+        GeocodingNotFoundError: If the address has no results
         GeocodingError: If geocoding fails
     """
     if not address or not address.strip():
@@ -179,53 +363,149 @@ async def geocode_address(address: str) -> GeocodingResult:
         normalized_address=normalized_address,
     )
 
-    try:
-        # Call Geocoding API
-        data = await _call_geocoding_api(normalized_address)
+    gazetteer = get_gazetteer()
+    if gazetteer is not None:
+        local_result = gazetteer.lookup(normalized_address)
+        if local_result is not None:
+            logger.info(
+                "geocoding_gazetteer_hit",
+                address=address,
+                prefecture=local_result.prefecture,
+                city=local_result.city,
+                district=local_result.district,
+            )
+            return local_result, CacheMetadata(STATUS_MISS)
+
+    if settings.GEOCODING_CACHE_ENABLED:
+        cached = await geocoding_cache.get(normalized_address)
+        if cached is not None:
+            metadata = CacheMetadata.from_entry(cached)
+            if metadata.stale:
+                refreshing = _revalidator.trigger(
+                    normalized_address, lambda: _resolve_address(normalized_address)
+                )
+                logger.info(
+                    "geocoding_cache_stale",
+                    address=address,
+                    age=metadata.age,
+                    refreshing=refreshing,
+                )
+            if cached["status"] != STATUS_OK:
+                raise GeocodingNotFoundError(
+                    f"No results found for address: {normalized_address}"
+                )
+            return GeocodingResult(**cached["result"]), metadata
 
-        # Parse first result
-        result = data["results"][0]
-        geometry = result["geometry"]
-        location = geometry["location"]
-
-        # Round coordinates to town level (approximately 100m precision)
-        # ~0.001 degree ≈ 100m
-        lat = round(location["lat"], 4)
-        lng = round(location["lng"], 4)
-
-        # Extract address components
-        address_components = result.get("address_components", [])
-        prefecture = _extract_prefecture(address_components)
-        city = _extract_city(address_components)
-        district = _extract_district(address_components)
-        postal_code = _extract_postal_code(address_components)
-
-        formatted_address = result.get("formatted_address", "")
-
-        geocoding_result = GeocodingResult(
-            lat=lat,
-            lng=lng,
-            formatted_address=formatted_address,
-            prefecture=prefecture or "",
-            city=city or "",
-            district=district,
-            postal_code=postal_code,
+    try:
+        geocoding_result = await _singleflight.do(
+            normalized_address, lambda: _resolve_address(normalized_address)
         )
 
         logger.info(
             "geocoding_success",
             address=address,
-            lat=lat,
-            lng=lng,
-            prefecture=prefecture,
-            city=city,
+            lat=geocoding_result.lat,
+            lng=geocoding_result.lng,
+            prefecture=geocoding_result.prefecture,
+            city=geocoding_result.city,
         )
 
-        return geocoding_result
+        return geocoding_result, CacheMetadata(STATUS_MISS)
 
-    except GeocodingError:
-        logger.error("geocoding_failed", address=address)
+    except GeocodingNotFoundError:
+        logger.info("geocoding_not_found", address=address)
+        raise
+    except GeocodingError as e:
+        degraded_result = (
+            gazetteer.lookup(normalized_address, strict=False) if gazetteer else None
+        )
+        if degraded_result is not None:
+            logger.warning(
+                "geocoding_degraded_offline",
+                address=address,
+                error=str(e),
+                district=degraded_result.district,
+            )
+            return degraded_result, CacheMetadata(STATUS_MISS)
+        logger.error("geocoding_failed", address=address, error=str(e))
         raise
     except Exception as e:
         logger.error("geocoding_unexpected_error", address=address, error=str(e))
         raise GeocodingError(f"Unexpected geocoding error: {str(e)}") from e
+
+
+async def geocode_batch(
+    addresses: List[str], concurrency: Optional[int] = None
+) -> AsyncIterator[Tuple[List[int], Union[GeocodingResult, Exception]]]:
+    """
+    Geocode many addresses concurrently
+
+    Addresses are deduplicated after normalization and resolved under a
+    semaphore. Outcomes are yielded as they complete, so callers can stream
+    them before the slowest lookup finishes.
+
+    Args:
+        addresses: Address strings to geocode
+        concurrency: Maximum concurrent lookups (defaults to settings)
+
+    Yields:
+        Tuples of (input indices sharing the normalized address, result or
+        the exception raised for it)
+    """
+    groups: dict = {}
+    for index, address in enumerate(addresses):
+        groups.setdefault(normalize_address(address), []).append(index)
+
+    semaphore = asyncio.Semaphore(concurrency or settings.GEOCODING_BATCH_CONCURRENCY)
+
+    # Warm the local cache tier with one bulk read of the shared tier
+    if settings.GEOCODING_CACHE_ENABLED:
+        await geocoding_cache.prefetch(list(groups))
+
+    logger.info(
+        "geocoding_batch_started",
+        total=len(addresses),
+        unique=len(groups),
+    )
+
+    async def resolve(indices: List[int]):
+        async with semaphore:
+            try:
+                with deadline(settings.GEOCODING_DEADLINE):
+                    return indices, await geocode_address(addresses[indices[0]])
+            except Exception as e:
+                return indices, e
+
+    tasks = [asyncio.create_task(resolve(indices)) for indices in groups.values()]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Cancel outstanding lookups if the consumer stops early
+        for task in tasks:
+            task.cancel()
+
+
+def get_provider_stats() -> dict:
+    """Get hedging and per-provider win/failure counts"""
+    return _geocoder.get_stats()
+
+
+def get_rate_limiter_stats() -> dict:
+    """Get queue depth, wait time and throttling metrics for the Google API"""
+    return _rate_limiter.get_stats()
+
+
+def get_retry_stats() -> dict:
+    """Get Google Geocoding API retry outcomes and budget"""
+    return _retry_policy.get_stats()
+
+
+def get_singleflight_stats() -> dict:
+    """Get coalescing stats; "coalesced" is the number of upstream calls saved"""
+    return _singleflight.get_stats()
+
+
+def get_revalidation_stats() -> dict:
+    """Get background refresh counts for stale cache entries"""
+    return _revalidator.get_stats()
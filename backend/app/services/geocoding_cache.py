@@ -0,0 +1,177 @@
+"""Read-through cache for geocoding results"""
+
+import hashlib
+from typing import List, Optional, Union
+import structlog
+
+from app.core.config import settings
+from app.core.lru import LRUCache
+from app.core.swr import stamp
+from app.models.geocoding import GeocodingResult
+from app.services.cache import shared_cache
+from app.services.firestore import FirestoreCache
+from app.services.redis_cache import RedisCache
+
+logger = structlog.get_logger()
+
+STATUS_OK = "OK"
+STATUS_ZERO_RESULTS = "ZERO_RESULTS"
+
+# Bump when the cached entry format changes
+CACHE_KEY_VERSION = "v1"
+
+
+def cache_key(normalized_address: str) -> str:
+    """Build a cache key for a normalized address"""
+    digest = hashlib.sha256(normalized_address.encode("utf-8")).hexdigest()
+    return f"geocode:{CACHE_KEY_VERSION}:{digest}"
+
+
+class GeocodingCache:
+    """
+    Two-tier geocoding cache
+
+    An in-process LRU sits in front of a shared tier (Firestore or Redis) so repeat
+    lookups of the same normalized address skip the Google API. ZERO_RESULTS
+    answers are cached too, with a shorter TTL.
+
+    Results go stale after ttl but are kept for a further stale_ttl, during
+    which callers serve them while refreshing in the background (see
+    app.core.swr). Entries carry cached_at / fresh_until for that check.
+    """
+
+    def __init__(
+        self,
+        local: LRUCache,
+        shared: Optional[Union[FirestoreCache, RedisCache]] = None,
+        ttl: int = 2592000,
+        negative_ttl: int = 3600,
+        stale_ttl: int = 0,
+    ):
+        self.local = local
+        self.shared = shared
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    async def get(self, normalized_address: str) -> Optional[dict]:
+        """
+        Look up a cached entry
+
+        Returns:
+            Entry dict with "status" ("OK" with "result", or "ZERO_RESULTS"),
+            or None on a miss
+        """
+        key = cache_key(normalized_address)
+
+        entry = self.local.get(key)
+        if entry is not None:
+            self.local_hits += 1
+            self._record_hit(entry, "local", normalized_address)
+            return entry
+
+        if self.shared is not None:
+            entry = await self.shared.get(key)
+            if entry is not None:
+                self.shared_hits += 1
+                ttl = self.negative_ttl if entry["status"] != STATUS_OK else None
+                self.local.set(key, entry, ttl=ttl)
+                self._record_hit(entry, "shared", normalized_address)
+                return entry
+
+        self.misses += 1
+        logger.debug("geocoding_cache_miss", normalized_address=normalized_address)
+        return None
+
+    async def prefetch(self, normalized_addresses: List[str]) -> int:
+        """
+        Load shared-tier entries for many addresses into the local tier
+
+        Used before bulk lookups so N shared-tier reads become one get_many.
+
+        Returns:
+            Number of entries loaded
+        """
+        if self.shared is None:
+            return 0
+
+        keys = {}
+        for normalized_address in normalized_addresses:
+            key = cache_key(normalized_address)
+            if key not in self.local:
+                keys[key] = normalized_address
+        if not keys:
+            return 0
+
+        entries = await self.shared.get_many(keys)
+        for key, entry in entries.items():
+            ttl = self.negative_ttl if entry["status"] != STATUS_OK else None
+            self.local.set(key, entry, ttl=ttl)
+
+        logger.debug(
+            "geocoding_cache_prefetched", requested=len(keys), loaded=len(entries)
+        )
+        return len(entries)
+
+    async def set_result(
+        self, normalized_address: str, result: GeocodingResult
+    ) -> None:
+        """Cache a successful geocoding result"""
+        entry = stamp({"status": STATUS_OK, "result": result.model_dump()}, self.ttl)
+        await self._set(normalized_address, entry, self.ttl + self.stale_ttl)
+
+    async def set_not_found(self, normalized_address: str) -> None:
+        """Cache a ZERO_RESULTS answer (never served stale)"""
+        entry = stamp({"status": STATUS_ZERO_RESULTS}, self.negative_ttl)
+        await self._set(normalized_address, entry, self.negative_ttl)
+
+    async def _set(self, normalized_address: str, entry: dict, ttl: int) -> None:
+        """Store entry in both tiers; ttl is the hard TTL"""
+        key = cache_key(normalized_address)
+        self.local.set(key, entry, ttl=min(ttl, self.local.ttl))
+        if self.shared is not None:
+            await self.shared.set(key, entry, ttl=ttl)
+
+    def _record_hit(self, entry: dict, tier: str, normalized_address: str) -> None:
+        if entry["status"] != STATUS_OK:
+            self.negative_hits += 1
+        logger.debug(
+            "geocoding_cache_hit",
+            tier=tier,
+            status=entry["status"],
+            normalized_address=normalized_address,
+        )
+
+    def clear_local(self) -> None:
+        """Clear the in-process tier"""
+        self.local.clear()
+
+    def get_stats(self) -> dict:
+        """Get hit/miss counts per tier"""
+        lookups = self.local_hits + self.shared_hits + self.misses
+        hits = self.local_hits + self.shared_hits
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "local": self.local.get_stats(),
+        }
+
+
+# Global geocoding cache instance
+geocoding_cache = GeocodingCache(
+    local=LRUCache(
+        max_entries=settings.GEOCODING_CACHE_MAX_ENTRIES,
+        ttl=settings.GEOCODING_CACHE_LOCAL_TTL,
+    ),
+    shared=shared_cache if settings.GEOCODING_CACHE_SHARED_ENABLED else None,
+    ttl=settings.GEOCODING_CACHE_TTL,
+    negative_ttl=settings.GEOCODING_CACHE_NEGATIVE_TTL,
+    stale_ttl=settings.GEOCODING_CACHE_STALE_TTL,
+)
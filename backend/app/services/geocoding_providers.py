@@ -0,0 +1,367 @@
+"""Pluggable geocoding providers with hedged requests
+
+Providers resolve a normalized address to a GeocodingResult. HedgedGeocoder
+sends the request to the primary provider and, if it has not answered within
+a latency percentile of its recent calls, fires the same request at the next
+provider. The first good answer wins and the rest are cancelled.
+"""
+
+import asyncio
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Dict, List, Optional
+import httpx
+import structlog
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.rate_limiter import RateLimitExceeded
+from app.models.geocoding import GeocodingResult
+from app.services.http_client import deadline_timeout, get_http_client
+
+logger = structlog.get_logger()
+
+
+class GeocodingError(Exception):
+    """Custom exception for geocoding errors"""
+
+    pass
+
+
+class GeocodingNotFoundError(GeocodingError):
+    """Raised when the geocoder returns no results (ZERO_RESULTS)"""
+
+    pass
+
+
+class GeocodingTransientError(GeocodingError):
+    """Raised for failures worth retrying (network errors, 5xx, throttling)"""
+
+    pass
+
+
+class GeocodingUnavailableError(GeocodingError):
+    """Raised when a provider is skipped because its circuit breaker is open"""
+
+    pass
+
+
+class GeocodingProvider(ABC):
+    """Base class for geocoding providers"""
+
+    name = "provider"
+
+    @abstractmethod
+    async def geocode(self, normalized_address: str) -> GeocodingResult:
+        """
+        Geocode a normalized address
+
+        Raises:
+            GeocodingNotFoundError: If the provider has no result
+            GeocodingError: If the lookup fails
+        """
+
+
+# 都道府県 / 市区町村 (incl. 郡 and 政令市の区) / rest
+_TITLE_RE = re.compile(
+    r"^(?P<prefecture>東京都|北海道|(?:京都|大阪)府|.{2,3}県)"
+    r"(?P<city>(?:.+?郡)?(?:.+?市.+?区|.+?[市区町村]))?"
+    r"(?P<district>.*)$"
+)
+
+
+class GSIGeocodingProvider(GeocodingProvider):
+    """国土地理院 address search (https://msearch.gsi.go.jp)"""
+
+    name = "gsi"
+
+    def __init__(
+        self,
+        url: str = "https://msearch.gsi.go.jp/address-search/AddressSearch",
+        client_factory: Optional[Callable[[], httpx.AsyncClient]] = None,
+    ):
+        self.url = url
+        self.client_factory = client_factory
+
+    def _client(self) -> httpx.AsyncClient:
+        if self.client_factory is not None:
+            return self.client_factory()
+        return get_http_client()
+
+    async def geocode(self, normalized_address: str) -> GeocodingResult:
+        try:
+            client = self._client()
+            response = await client.get(
+                self.url,
+                params={"q": normalized_address},
+                timeout=deadline_timeout(client),
+            )
+            response.raise_for_status()
+            features = response.json()
+        except httpx.HTTPStatusError as e:
+            raise GeocodingError(
+                f"GSI address search HTTP error: {e.response.status_code}"
+            ) from e
+        except httpx.RequestError as e:
+            raise GeocodingError(f"GSI address search network error: {str(e)}") from e
+        except ValueError as e:
+            raise GeocodingError("GSI address search returned invalid JSON") from e
+
+        if not features:
+            raise GeocodingNotFoundError(
+                f"No results found for address: {normalized_address}"
+            )
+
+        feature = features[0]
+        lng, lat = feature["geometry"]["coordinates"]
+        title = feature.get("properties", {}).get("title", "")
+        match = _TITLE_RE.match(title)
+
+        return GeocodingResult(
+            lat=round(lat, 4),
+            lng=round(lng, 4),
+            formatted_address=title,
+            prefecture=match.group("prefecture") if match else "",
+            city=(match.group("city") or "") if match else "",
+            district=(match.group("district") or None) if match else None,
+        )
+
+
+class StubGeocodingProvider(GeocodingProvider):
+    """
+    Canned provider for tests and local development
+
+    Returns results from a dict keyed by normalized address, after an
+    optional delay. Unknown addresses raise GeocodingNotFoundError, or the
+    configured error if one is given.
+    """
+
+    def __init__(
+        self,
+        name: str = "stub",
+        results: Optional[Dict[str, GeocodingResult]] = None,
+        delay: float = 0.0,
+        error: Optional[Exception] = None,
+    ):
+        self.name = name
+        self.results = results or {}
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def geocode(self, normalized_address: str) -> GeocodingResult:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        if normalized_address not in self.results:
+            raise GeocodingNotFoundError(
+                f"No results found for address: {normalized_address}"
+            )
+        return self.results[normalized_address]
+
+
+class CircuitBreakerProvider(GeocodingProvider):
+    """
+    Guard a provider with a circuit breaker
+
+    While the breaker is open the provider fails fast with
+    GeocodingUnavailableError, so callers move on to the next provider
+    instead of waiting through timeouts and retries. ZERO_RESULTS answers
+    count as healthy calls; client-side rate limit rejections and
+    cancellations (hedge losers) are not counted at all.
+    """
+
+    def __init__(self, provider: GeocodingProvider, breaker: CircuitBreaker):
+        self.provider = provider
+        self.breaker = breaker
+        self.name = provider.name
+
+    async def geocode(self, normalized_address: str) -> GeocodingResult:
+        try:
+            self.breaker.allow()
+        except CircuitOpenError as e:
+            raise GeocodingUnavailableError(str(e)) from e
+
+        start = time.monotonic()
+        try:
+            result = await self.provider.geocode(normalized_address)
+        except GeocodingNotFoundError:
+            self.breaker.record_success(time.monotonic() - start)
+            raise
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception as e:
+            if isinstance(e.__cause__, RateLimitExceeded):
+                self.breaker.release()
+            else:
+                self.breaker.record_failure(time.monotonic() - start)
+            raise
+
+        self.breaker.record_success(time.monotonic() - start)
+        return result
+
+
+class HedgedGeocoder:
+    """
+    Geocode through a primary provider with hedged secondaries
+
+    A secondary request is fired when the primary is slower than the given
+    percentile of its recent latencies, or immediately when the primary
+    fails. The first successful answer is returned and the other requests are
+    cancelled. A no-result answer from the primary is final: it is raised
+    without falling back, since secondaries such as GSI fuzzy-match almost
+    any string.
+    """
+
+    def __init__(
+        self,
+        primary: GeocodingProvider,
+        secondaries: Optional[List[GeocodingProvider]] = None,
+        hedge_enabled: bool = True,
+        hedge_percentile: float = 95.0,
+        min_delay: float = 0.2,
+        max_delay: float = 2.0,
+        min_samples: int = 20,
+        window: int = 500,
+    ):
+        self.primary = primary
+        self.secondaries = secondaries or []
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self._latencies: deque = deque(maxlen=window)
+
+        self.requests = 0
+        self.hedged = 0
+        self.fallbacks = 0
+        self.not_found = 0
+        self.wins: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+
+    def hedge_delay(self) -> float:
+        """Current hedge delay from the primary's latency percentile"""
+        if len(self._latencies) < self.min_samples:
+            return self.max_delay
+        ordered = sorted(self._latencies)
+        rank = math.ceil(self.hedge_percentile / 100 * len(ordered)) - 1
+        value = ordered[max(0, min(rank, len(ordered) - 1))]
+        return min(self.max_delay, max(self.min_delay, value))
+
+    async def _timed(self, provider: GeocodingProvider, address: str):
+        start = time.monotonic()
+        try:
+            result = await provider.geocode(address)
+        except asyncio.CancelledError:
+            # A primary that lost the race took at least this long; leaving
+            # it out would bias the percentile towards the fast requests
+            if provider is self.primary:
+                self._latencies.append(time.monotonic() - start)
+            raise
+        if provider is self.primary:
+            self._latencies.append(time.monotonic() - start)
+        return result
+
+    async def geocode(self, normalized_address: str) -> GeocodingResult:
+        """
+        Geocode through the providers
+
+        Raises:
+            GeocodingNotFoundError: If the primary reported no results, or no
+                provider found the address and at least one reported none
+            GeocodingError: If every provider failed
+        """
+        self.requests += 1
+        providers = [self.primary] + self.secondaries
+        delay = self.hedge_delay()
+        tasks: Dict[asyncio.Task, GeocodingProvider] = {}
+        errors: List[Exception] = []
+        next_index = 0
+
+        def launch() -> None:
+            nonlocal next_index
+            provider = providers[next_index]
+            next_index += 1
+            task = asyncio.create_task(self._timed(provider, normalized_address))
+            tasks[task] = provider
+
+        launch()
+        pending = set(tasks)
+        try:
+            while pending:
+                can_hedge = self.hedge_enabled and next_index < len(providers)
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if not done:
+                    self.hedged += 1
+                    logger.info(
+                        "geocoding_hedge_fired",
+                        provider=providers[next_index].name,
+                        delay=round(delay, 3),
+                    )
+                    launch()
+                    pending = {task for task in tasks if not task.done()}
+                    continue
+
+                for task in done:
+                    provider = tasks[task]
+                    error = task.exception()
+                    if error is None:
+                        self.wins[provider.name] = self.wins.get(provider.name, 0) + 1
+                        return task.result()
+                    if provider is self.primary and isinstance(
+                        error, GeocodingNotFoundError
+                    ):
+                        # The primary's no-result is an answer, not a failure:
+                        # a secondary's fuzzy match would only be a wrong hit
+                        self.not_found += 1
+                        raise error
+                    self.failures[provider.name] = (
+                        self.failures.get(provider.name, 0) + 1
+                    )
+                    errors.append(error)
+                    logger.warning(
+                        "geocoding_provider_failed",
+                        provider=provider.name,
+                        error=str(error),
+                    )
+
+                # Fall back immediately when everything in flight has failed
+                if not pending and next_index < len(providers):
+                    self.fallbacks += 1
+                    launch()
+                    pending = {task for task in tasks if not task.done()}
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            # Wait for the losers to unwind and retrieve their errors, so no
+            # request outlives the call or logs "exception never retrieved"
+            await asyncio.shield(asyncio.gather(*tasks, return_exceptions=True))
+
+        for error in errors:
+            if isinstance(error, GeocodingNotFoundError):
+                raise error
+        raise errors[0]
+
+    def get_stats(self) -> dict:
+        """Get hedging and per-provider counts"""
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "fallbacks": self.fallbacks,
+            "not_found": self.not_found,
+            "hedge_delay": self.hedge_delay(),
+            "wins": dict(self.wins),
+            "failures": dict(self.failures),
+        }
@@ -0,0 +1,116 @@
+"""Shared HTTP client for outbound API calls"""
+
+from typing import Any, Optional
+import httpx
+import structlog
+
+from app.core.config import settings
+from app.core.retry import cap_timeout, remaining_time
+
+logger = structlog.get_logger()
+
+# Process-wide client, created in the application lifespan
+_client: Optional[httpx.AsyncClient] = None
+_requests_sent = 0
+
+
+async def _count_request(request: httpx.Request) -> None:
+    """Event hook counting requests sent through the shared client"""
+    global _requests_sent
+    _requests_sent += 1
+
+
+def _build_client() -> httpx.AsyncClient:
+    """Build an AsyncClient configured from settings"""
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        settings.HTTP_READ_TIMEOUT,
+        connect=settings.HTTP_CONNECT_TIMEOUT,
+        pool=settings.HTTP_POOL_TIMEOUT,
+    )
+    return httpx.AsyncClient(
+        http2=settings.HTTP2_ENABLED,
+        limits=limits,
+        timeout=timeout,
+        event_hooks={"request": [_count_request]},
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Create the shared client (called on application startup)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+        logger.info(
+            "http_client_started",
+            http2=settings.HTTP2_ENABLED,
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (called on application shutdown)"""
+    global _client
+    if _client is None:
+        return
+
+    logger.info("http_client_pool_stats", **get_pool_stats())
+    await _client.aclose()
+    _client = None
+    logger.info("http_client_closed")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client
+
+    The client is normally created by the application lifespan. Scripts and
+    tests that run outside the app get a lazily created client instead.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+        logger.debug("http_client_created_lazily")
+    return _client
+
+
+def get_pool_stats() -> dict:
+    """
+    Get request counts and pool limits for the shared client
+
+    Live connection counts would need httpx's private transport internals,
+    which change between releases, so only public state is reported.
+    """
+    return {
+        "requests_sent": _requests_sent,
+        "started": _client is not None and not _client.is_closed,
+        "http2": settings.HTTP2_ENABLED,
+        "max_connections": settings.HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    }
+
+
+def deadline_timeout(client: httpx.AsyncClient) -> Any:
+    """
+    Per-request timeout capped by the current deadline
+
+    Returns:
+        httpx.Timeout with every phase capped by the remaining time, or
+        httpx.USE_CLIENT_DEFAULT when no deadline is set (its type is not
+        public, hence the Any annotation)
+    """
+    if remaining_time() is None:
+        return httpx.USE_CLIENT_DEFAULT
+    timeout = client.timeout
+    return httpx.Timeout(
+        connect=cap_timeout(timeout.connect),
+        read=cap_timeout(timeout.read),
+        write=cap_timeout(timeout.write),
+        pool=cap_timeout(timeout.pool),
+    )
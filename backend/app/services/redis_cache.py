@@ -0,0 +1,225 @@
+"""Redis cache service"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Union
+import redis.asyncio as redis
+import structlog
+
+from app.core.codec import Codec, CodecError, decode, is_encoded
+from app.services.firestore import BulkWriteResult, _chunks
+
+logger = structlog.get_logger()
+
+# Commands sent per pipeline / keys per MGET or DEL
+MAX_PIPELINE_COMMANDS = 1000
+
+
+class RedisCache:
+    """
+    Redis-based cache service
+
+    Same interface as FirestoreCache. Values are stored as JSON strings, or
+    encoded bytes with a codec, with a native TTL, so Redis expires entries
+    itself and clear_expired is a no-op. Bulk calls are pipelined.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "cache:",
+        max_connections: int = 50,
+        socket_timeout: float = 1.0,
+        codec: Optional[Codec] = None,
+    ):
+        self.url = url
+        self.codec = codec
+        self.prefix = prefix
+        self.max_connections = max_connections
+        self.socket_timeout = socket_timeout
+        # Created on first use so the connection pool is bound to the
+        # running event loop
+        self._client: Optional[redis.Redis] = None
+
+    def _get_client(self) -> redis.Redis:
+        """Get the Redis client, creating its connection pool on first use"""
+        if self._client is None:
+            self._client = redis.from_url(
+                self.url,
+                max_connections=self.max_connections,
+                socket_timeout=self.socket_timeout,
+                socket_connect_timeout=self.socket_timeout,
+            )
+            logger.info("redis_client_initialized")
+        return self._client
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _dumps(self, value: Any) -> Union[bytes, str]:
+        if self.codec:
+            return self.codec.encode(value)
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def _loads(raw: bytes) -> Any:
+        # Values written before the codec was enabled are JSON
+        if is_encoded(raw):
+            return decode(raw)
+        return json.loads(raw)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Get value from cache"""
+        try:
+            raw = await self._get_client().get(self._key(key))
+            if raw is None:
+                logger.debug("cache_miss", key=key)
+                return None
+
+            logger.debug("cache_hit", key=key)
+            return self._loads(raw)
+
+        except Exception as e:
+            logger.error("cache_get_failed", key=key, error=str(e))
+            return None
+
+    async def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
+        """Set value in cache"""
+        try:
+            await self._get_client().set(self._key(key), self._dumps(value), ex=ttl)
+            logger.debug("cache_set", key=key, ttl=ttl)
+            return True
+
+        except Exception as e:
+            logger.error("cache_set_failed", key=key, error=str(e))
+            return False
+
+    async def delete(self, key: str) -> bool:
+        """Delete value from cache"""
+        try:
+            await self._get_client().delete(self._key(key))
+            logger.debug("cache_deleted", key=key)
+            return True
+
+        except Exception as e:
+            logger.error("cache_delete_failed", key=key, error=str(e))
+            return False
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Get many values with MGET
+
+        A chunk that fails to load is logged and its keys count as misses.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dict of key to value for the keys that were found
+        """
+        keys = list(dict.fromkeys(keys))
+        values: Dict[str, Any] = {}
+        failed = 0
+        for chunk in _chunks(keys, MAX_PIPELINE_COMMANDS):
+            try:
+                raws = await self._get_client().mget([self._key(key) for key in chunk])
+            except Exception as e:
+                failed += len(chunk)
+                logger.error(
+                    "cache_get_many_chunk_failed", keys=len(chunk), error=str(e)
+                )
+                continue
+            for key, raw in zip(chunk, raws):
+                if raw is None:
+                    continue
+                try:
+                    values[key] = self._loads(raw)
+                except (CodecError, ValueError) as e:
+                    logger.error("cache_decode_failed", key=key, error=str(e))
+
+        logger.debug(
+            "cache_get_many", requested=len(keys), hits=len(values), failed=failed
+        )
+        return values
+
+    async def set_many(
+        self,
+        items: Dict[str, Any],
+        ttl: int = 3600,
+        ttls: Optional[Dict[str, int]] = None,
+    ) -> BulkWriteResult:
+        """
+        Set many values with pipelined SET ... EX
+
+        Args:
+            items: Dict of key to value
+            ttl: Default time to live in seconds
+            ttls: Per-key time to live overriding ttl
+
+        Returns:
+            BulkWriteResult with succeeded and failed keys
+        """
+        ttls = ttls or {}
+
+        def write(pipe, key):
+            pipe.set(self._key(key), self._dumps(items[key]), ex=ttls.get(key, ttl))
+
+        return await self._write_many(list(items), write, "cache_set_many")
+
+    async def delete_many(self, keys: Iterable[str]) -> BulkWriteResult:
+        """
+        Delete many values with pipelined DEL
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            BulkWriteResult with succeeded and failed keys
+        """
+
+        def write(pipe, key):
+            pipe.delete(self._key(key))
+
+        return await self._write_many(
+            list(dict.fromkeys(keys)), write, "cache_delete_many"
+        )
+
+    async def _write_many(self, keys: List[str], write, event: str) -> BulkWriteResult:
+        result = BulkWriteResult()
+        for chunk in _chunks(keys, MAX_PIPELINE_COMMANDS):
+            try:
+                async with self._get_client().pipeline(transaction=False) as pipe:
+                    for key in chunk:
+                        write(pipe, key)
+                    replies = await pipe.execute(raise_on_error=False)
+            except Exception as e:
+                logger.error(f"{event}_chunk_failed", keys=len(chunk), error=str(e))
+                result.failed.update({key: str(e) for key in chunk})
+                continue
+            for key, reply in zip(chunk, replies):
+                if isinstance(reply, Exception):
+                    result.failed[key] = str(reply)
+                else:
+                    result.succeeded.append(key)
+
+        logger.debug(event, succeeded=len(result.succeeded), failed=len(result.failed))
+        return result
+
+    async def clear_expired(self) -> int:
+        """Nothing to clear: Redis expires keys by their TTL"""
+        return 0
+
+    async def close(self) -> None:
+        """Close the connection pool"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+async def check_redis(cache: RedisCache) -> str:
+    """Check Redis connection"""
+    try:
+        await cache._get_client().ping()
+        return "ok"
+    except Exception as e:
+        logger.error("redis_check_failed", error=str(e))
+        return "error"
@@ -0,0 +1,398 @@
+"""Offline reverse geocoding from lat/lng to 町丁目
+
+Coordinates are resolved against 町丁目 boundary polygons (e.g. the e-Stat
+小地域 boundary data exported as GeoJSON) held in memory under a uniform grid
+index, so a lookup only tests the few polygons whose bounding boxes overlap
+the point's grid cell and never calls an external service.
+"""
+
+import gzip
+import json
+import math
+import os
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+import structlog
+
+from app.core.config import settings
+from app.core.geometry import (
+    Polygon,
+    edge_crossings,
+    expand_ranges,
+    pairs_in_polygons,
+    polygon_bbox,
+    polygon_edges,
+    polygons_from_geojson,
+)
+from app.models.geocoding import GeocodingResult
+from app.services.geocoding_providers import (
+    GeocodingNotFoundError,
+    GeocodingUnavailableError,
+)
+
+logger = structlog.get_logger()
+
+# GeoJSON property names accepted for each field (ours, then e-Stat 小地域)
+_PROPERTY_KEYS = {
+    "prefecture": ("prefecture", "PREF_NAME"),
+    "city": ("city", "CITY_NAME"),
+    "district": ("district", "S_NAME"),
+}
+
+# Offset that keeps grid rows non-negative when packed into one int64 key
+_ROW_OFFSET = 1 << 31
+
+
+class BoundaryIndexError(Exception):
+    """Raised when a boundary index cannot be built or loaded"""
+
+    pass
+
+
+def _property(properties: dict, field: str) -> str:
+    for key in _PROPERTY_KEYS[field]:
+        value = properties.get(key)
+        if value:
+            return str(value)
+    return ""
+
+
+class BoundaryIndex:
+    """
+    Grid index over 町丁目 boundary polygons
+
+    Every polygon is registered in each grid cell its bounding box overlaps.
+    A lookup computes the point's cell, filters candidates by bounding box
+    and runs a point-in-polygon test. Batch lookups expand every point into
+    (point, candidate, edge) rows over the flattened edge array and count
+    ray crossings for all of them in a few array operations.
+    """
+
+    def __init__(self, features: Iterable[dict], cell_size: float = 0.01):
+        """
+        Args:
+            features: GeoJSON features with 町丁目 names in their properties
+            cell_size: Grid cell size in degrees (0.01 is roughly 1 km)
+        """
+        self.cell_size = cell_size
+        self.records: List[Tuple[str, str, str]] = []
+        self.polygons: List[Polygon] = []
+        self.polygon_records: List[int] = []
+        bboxes: List[Tuple[float, float, float, float]] = []
+
+        for feature in features:
+            geometry = feature.get("geometry")
+            if not geometry:
+                continue
+            properties = feature.get("properties") or {}
+            record = (
+                _property(properties, "prefecture"),
+                _property(properties, "city"),
+                _property(properties, "district"),
+            )
+            if not record[0] or not record[1]:
+                continue
+
+            try:
+                parts = polygons_from_geojson(geometry)
+            except ValueError:
+                continue
+
+            record_id = len(self.records)
+            self.records.append(record)
+            for polygon in parts:
+                if len(polygon[0]) < 3:
+                    continue
+                self.polygons.append(polygon)
+                self.polygon_records.append(record_id)
+                bboxes.append(polygon_bbox(polygon))
+
+        self.bboxes = np.array(bboxes, dtype=np.float64).reshape(-1, 4)
+        self.polygon_records_array = np.asarray(self.polygon_records, dtype=np.int64)
+
+        # Edges of all polygons in one array; polygon i owns
+        # edges[edge_starts[i]:edge_starts[i + 1]]
+        edges = [polygon_edges(polygon) for polygon in self.polygons]
+        self.edges = np.vstack(edges) if edges else np.zeros((0, 4))
+        self.edge_starts = np.concatenate(
+            [[0], np.cumsum([len(e) for e in edges], dtype=np.int64)]
+        ).astype(np.int64)
+
+        # Grid in CSR form: cell cell_keys[j] holds
+        # cell_polygons[cell_starts[j]:cell_starts[j + 1]]
+        grid: dict = {}
+        for polygon_id, (min_lng, min_lat, max_lng, max_lat) in enumerate(bboxes):
+            col_start, row_start = self._cell(min_lng, min_lat)
+            col_end, row_end = self._cell(max_lng, max_lat)
+            for col in range(col_start, col_end + 1):
+                for row in range(row_start, row_end + 1):
+                    grid.setdefault(self._key(col, row), []).append(polygon_id)
+        keys = sorted(grid)
+        self.cell_keys = np.array(keys, dtype=np.int64)
+        self.cell_starts = np.concatenate(
+            [[0], np.cumsum([len(grid[key]) for key in keys], dtype=np.int64)]
+        ).astype(np.int64)
+        self.cell_polygons = np.array(
+            [polygon_id for key in keys for polygon_id in grid[key]], dtype=np.int64
+        )
+        self._cells = {
+            key: [(polygon_id, bboxes[polygon_id]) for polygon_id in grid[key]]
+            for key in keys
+        }
+
+        self.lookups = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _cell(self, lng: float, lat: float) -> Tuple[int, int]:
+        return math.floor(lng / self.cell_size), math.floor(lat / self.cell_size)
+
+    @staticmethod
+    def _key(col: int, row: int) -> int:
+        return (col << 32) + row + _ROW_OFFSET
+
+    def _keys(self, lngs: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        cols = np.floor(lngs / self.cell_size).astype(np.int64)
+        rows = np.floor(lats / self.cell_size).astype(np.int64)
+        return (cols << 32) + rows + _ROW_OFFSET
+
+    @classmethod
+    def load(cls, path: str, cell_size: float = 0.01) -> "BoundaryIndex":
+        """Build an index from a GeoJSON FeatureCollection (.geojson or .gz)"""
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if data.get("type") != "FeatureCollection":
+            raise BoundaryIndexError(f"{path} is not a GeoJSON FeatureCollection")
+        return cls(data.get("features", []), cell_size=cell_size)
+
+    def locate(self, lat: float, lng: float) -> Optional[int]:
+        """
+        Find the 町丁目 containing a point
+
+        Returns:
+            Record id, or None if the point is outside every polygon
+        """
+        self.lookups += 1
+        for polygon_id, bbox in self._cells.get(self._key(*self._cell(lng, lat)), ()):
+            min_lng, min_lat, max_lng, max_lat = bbox
+            if not (min_lng <= lng <= max_lng and min_lat <= lat <= max_lat):
+                continue
+            edges = self.edges[
+                self.edge_starts[polygon_id] : self.edge_starts[polygon_id + 1]
+            ]
+            if np.count_nonzero(edge_crossings(edges, lng, lat)) % 2:
+                self.hits += 1
+                return self.polygon_records[polygon_id]
+        return None
+
+    def locate_many(
+        self, lats: np.ndarray, lngs: np.ndarray, chunk_size: int = 2048
+    ) -> np.ndarray:
+        """
+        Find the 町丁目 containing each point
+
+        All (point, candidate polygon, edge) combinations of a chunk are
+        tested in one vectorized pass, so the cost does not depend on how
+        the points are spread over grid cells.
+
+        Args:
+            lats: Latitudes
+            lngs: Longitudes
+            chunk_size: Points per pass, bounding temporary memory
+
+        Returns:
+            Array of record ids, -1 for points outside every polygon
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        record_ids = np.full(len(lats), -1, dtype=np.int64)
+        self.lookups += len(lats)
+
+        for start in range(0, len(lats), chunk_size):
+            chunk = slice(start, start + chunk_size)
+            record_ids[chunk] = self._locate_chunk(lats[chunk], lngs[chunk])
+
+        self.hits += int(np.count_nonzero(record_ids >= 0))
+        return record_ids
+
+    def _locate_chunk(self, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+        record_ids = np.full(len(lats), -1, dtype=np.int64)
+        if not len(self.cell_keys) or not len(lats):
+            return record_ids
+
+        # Grid cell of each point
+        keys = self._keys(lngs, lats)
+        cells = np.searchsorted(self.cell_keys, keys)
+        cells = np.minimum(cells, len(self.cell_keys) - 1)
+        found = self.cell_keys[cells] == keys
+        points = np.nonzero(found)[0]
+        cells = cells[found]
+
+        # (point, candidate polygon) pairs, filtered by bounding box
+        counts = self.cell_starts[cells + 1] - self.cell_starts[cells]
+        pair_points = np.repeat(points, counts)
+        pair_polygons = self.cell_polygons[
+            expand_ranges(self.cell_starts[cells], counts)
+        ]
+        bboxes = self.bboxes[pair_polygons]
+        pair_lngs = lngs[pair_points]
+        pair_lats = lats[pair_points]
+        in_bbox = (
+            (pair_lngs >= bboxes[:, 0])
+            & (pair_lngs <= bboxes[:, 2])
+            & (pair_lats >= bboxes[:, 1])
+            & (pair_lats <= bboxes[:, 3])
+        )
+        pair_points = pair_points[in_bbox]
+        pair_polygons = pair_polygons[in_bbox]
+        if not len(pair_points):
+            return record_ids
+
+        # Ray crossings of every pair against every edge of its polygon
+        inside = pairs_in_polygons(
+            self.edges,
+            self.edge_starts,
+            pair_polygons,
+            lngs[pair_points],
+            lats[pair_points],
+        )
+
+        # First containing polygon per point, in grid candidate order
+        inside_points, first = np.unique(pair_points[inside], return_index=True)
+        record_ids[inside_points] = self.polygon_records_array[
+            pair_polygons[inside][first]
+        ]
+        return record_ids
+
+    def to_result(self, record_id: int, lat: float, lng: float) -> GeocodingResult:
+        """Build a GeocodingResult for a record and the queried point"""
+        prefecture, city, district = self.records[record_id]
+        return GeocodingResult(
+            lat=round(lat, 4),
+            lng=round(lng, 4),
+            formatted_address=f"{prefecture}{city}{district}",
+            prefecture=prefecture,
+            city=city,
+            district=district or None,
+        )
+
+    def get_stats(self) -> dict:
+        """Get index size and lookup counts"""
+        return {
+            "records": len(self.records),
+            "polygons": len(self.polygons),
+            "cells": len(self.cell_keys),
+            "lookups": self.lookups,
+            "hits": self.hits,
+        }
+
+
+# Global boundary index, loaded from REVERSE_GEOCODING_BOUNDARY_PATH
+_boundary_index: Optional[BoundaryIndex] = None
+_boundary_index_loaded = False
+
+
+def load_boundary_index(path: Optional[str] = None) -> Optional[BoundaryIndex]:
+    """
+    Load the 町丁目 boundary index (called on application startup)
+
+    Returns:
+        BoundaryIndex, or None if disabled or the file is unavailable
+    """
+    global _boundary_index, _boundary_index_loaded
+    path = path or settings.REVERSE_GEOCODING_BOUNDARY_PATH
+    _boundary_index_loaded = True
+
+    if not settings.REVERSE_GEOCODING_ENABLED or not path:
+        _boundary_index = None
+        return None
+
+    if not os.path.exists(path):
+        logger.warning("boundary_index_missing", path=path)
+        _boundary_index = None
+        return None
+
+    try:
+        _boundary_index = BoundaryIndex.load(
+            path, cell_size=settings.REVERSE_GEOCODING_CELL_SIZE
+        )
+        logger.info(
+            "boundary_index_loaded",
+            path=path,
+            **_boundary_index.get_stats(),
+        )
+    except Exception as e:
+        logger.error("boundary_index_load_failed", path=path, error=str(e))
+        _boundary_index = None
+    return _boundary_index
+
+
+def get_boundary_index() -> Optional[BoundaryIndex]:
+    """Get the global boundary index, loading it on first use"""
+    if not _boundary_index_loaded:
+        load_boundary_index()
+    return _boundary_index
+
+
+def _require_index() -> BoundaryIndex:
+    index = get_boundary_index()
+    if index is None:
+        raise GeocodingUnavailableError("Reverse geocoding boundaries are not loaded")
+    return index
+
+
+def reverse_geocode(lat: float, lng: float) -> GeocodingResult:
+    """
+    Resolve coordinates to the containing 町丁目
+
+    Args:
+        lat: Latitude
+        lng: Longitude
+
+    Returns:
+        GeocodingResult with the queried point and its 町丁目
+
+    Raises:
+        GeocodingNotFoundError: If the point is outside every 町丁目
+        GeocodingUnavailableError: If no boundary index is loaded
+    """
+    index = _require_index()
+    record_id = index.locate(lat, lng)
+    if record_id is None:
+        raise GeocodingNotFoundError(f"No results found for location: {lat},{lng}")
+    return index.to_result(record_id, lat, lng)
+
+
+def reverse_geocode_batch(
+    lats: List[float], lngs: List[float]
+) -> List[Optional[GeocodingResult]]:
+    """
+    Resolve many coordinates in one vectorized pass
+
+    Args:
+        lats: Latitudes
+        lngs: Longitudes (same length as lats)
+
+    Returns:
+        GeocodingResult per point in input order, None for points outside
+        every 町丁目
+
+    Raises:
+        GeocodingUnavailableError: If no boundary index is loaded
+    """
+    index = _require_index()
+    record_ids = index.locate_many(np.asarray(lats), np.asarray(lngs))
+    return [
+        index.to_result(record_id, lat, lng) if record_id >= 0 else None
+        for record_id, lat, lng in zip(record_ids.tolist(), lats, lngs)
+    ]
+
+
+def get_boundary_index_stats() -> dict:
+    """Get boundary index size and lookup counts"""
+    index = get_boundary_index()
+    return index.get_stats() if index is not None else {"loaded": False}
@@ -0,0 +1,550 @@
+"""In-memory spatial index over schools and nurseries
+
+The schools table is loaded once into numpy arrays and bucketed into a
+uniform 3D grid over earth-centred (ECEF) coordinates in meters. Unlike a
+lat/lng grid, cells are the same size everywhere in Japan and the chord
+between two points maps exactly to their great-circle distance, so radius
+and k-nearest queries only measure the schools in a few neighbouring cells.
+A background task rebuilds the index when the table changes and swaps it in
+whole, so queries never see a partly built index.
+"""
+
+import asyncio
+import math
+import time
+from typing import Iterable, List, Optional, Tuple
+import numpy as np
+import structlog
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.core.geometry import expand_ranges
+from app.db.base import AsyncSessionLocal
+from app.db.models import School
+from app.models.school import NearbySchool
+
+logger = structlog.get_logger()
+
+EARTH_RADIUS = 6_371_008.8  # meters, mean radius
+
+# Neighbourhood radii (in cells) searched before falling back to measuring
+# every school
+NEAREST_RINGS = (1, 2, 4)
+
+# Offset keeping cell coordinates non-negative when packed into one int64 key
+_CELL_OFFSET = 1 << 20
+_CELL_BITS = 21
+
+
+# (point, school) pairs measured per pass when scanning every school
+_SCAN_PAIRS = 1 << 21
+
+SchoolRow = Tuple[str, str, str, float, float]  # code, name, type, lat, lng
+
+
+def _neighbour_deltas(rings: int) -> np.ndarray:
+    """
+    Key offsets of the cells within rings cells of a cell
+
+    Cell keys are linear in the cell coordinates, so a neighbour's key is
+    the cell's key plus one of these deltas.
+    """
+    steps = np.arange(-rings, rings + 1, dtype=np.int64)
+    offsets = np.stack(np.meshgrid(steps, steps, steps), axis=-1).reshape(-1, 3)
+    return (
+        (offsets[:, 0] << (2 * _CELL_BITS))
+        + (offsets[:, 1] << _CELL_BITS)
+        + offsets[:, 2]
+    )
+
+
+_NEIGHBOUR_DELTAS = {rings: _neighbour_deltas(rings) for rings in NEAREST_RINGS}
+
+
+class SchoolIndexUnavailableError(Exception):
+    """Raised when the school index has not been loaded"""
+
+    pass
+
+
+def to_ecef(lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Project lat/lng in degrees onto an (N, 3) array of sphere coordinates"""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lng = np.radians(np.asarray(lngs, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return EARTH_RADIUS * np.column_stack(
+        [cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)]
+    )
+
+
+def arc_to_chord(distance: float) -> float:
+    """Straight-line length of a great-circle arc of the given length"""
+    return 2 * EARTH_RADIUS * math.sin(min(distance / (2 * EARTH_RADIUS), math.pi / 2))
+
+
+def chord_to_arc(chords: np.ndarray) -> np.ndarray:
+    """Great-circle length of arcs with the given straight-line lengths"""
+    return 2 * EARTH_RADIUS * np.arcsin(np.minimum(chords / (2 * EARTH_RADIUS), 1.0))
+
+
+class SchoolIndex:
+    """
+    Grid index over school locations
+
+    Schools are sorted by grid cell so each occupied cell owns a contiguous
+    slice of the coordinate arrays (CSR form, like BoundaryIndex). A query
+    looks up the keys of the cells around each point, expands them into
+    (point, school) pairs and measures all pairs in one array operation.
+    """
+
+    def __init__(self, schools: Iterable[SchoolRow], cell_size: float = 500.0):
+        """
+        Args:
+            schools: (school_code, name, school_type, lat, lng) rows
+            cell_size: Grid cell edge in meters
+        """
+        self.cell_size = cell_size
+        rows = list(schools)
+        self.records: List[Tuple[str, str, str]] = [row[:3] for row in rows]
+        self.lats = np.array([row[3] for row in rows], dtype=np.float64)
+        self.lngs = np.array([row[4] for row in rows], dtype=np.float64)
+
+        # Coordinates sorted by cell; cell cell_keys[j] holds sorted
+        # positions cell_starts[j]:cell_starts[j + 1]
+        xyz = to_ecef(self.lats, self.lngs)
+        keys = self._keys(self._cells(xyz))
+        order = np.argsort(keys, kind="stable")
+        self.xyz = xyz[order]
+        self.ids = order.astype(np.int64)
+        self.cell_keys, counts = np.unique(keys[order], return_counts=True)
+        self.cell_starts = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        # Same cells as a dict, for single-point queries
+        self._spans = {
+            key: (start, end)
+            for key, start, end in zip(
+                self.cell_keys.tolist(),
+                self.cell_starts[:-1].tolist(),
+                self.cell_starts[1:].tolist(),
+            )
+        }
+
+        self.queries = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _cells(self, xyz: np.ndarray) -> np.ndarray:
+        return np.floor(xyz / self.cell_size).astype(np.int64) + _CELL_OFFSET
+
+    @staticmethod
+    def _keys(cells: np.ndarray) -> np.ndarray:
+        return (
+            (cells[..., 0] << (2 * _CELL_BITS))
+            + (cells[..., 1] << _CELL_BITS)
+            + cells[..., 2]
+        )
+
+    def _candidates(
+        self, xyz: np.ndarray, rings: Optional[int], reach: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (point, sorted position) pairs for the schools in the cells within
+        rings cells of each point, or for every school in reach if rings is
+        None
+        """
+        if rings is None:
+            # chord^2 = 2R^2 - 2 a.b on the sphere, so one matrix product
+            # finds the pairs in reach (with slack for rounding)
+            scores = xyz @ self.xyz.T
+            return np.nonzero(scores >= EARTH_RADIUS**2 - reach**2 / 2 - 1.0)
+
+        deltas = _NEIGHBOUR_DELTAS[rings]
+        keys = (self._keys(self._cells(xyz))[:, None] + deltas[None, :]).ravel()
+        points = np.repeat(np.arange(len(xyz)), len(deltas))
+
+        cells = np.minimum(
+            np.searchsorted(self.cell_keys, keys), len(self.cell_keys) - 1
+        )
+        found = self.cell_keys[cells] == keys
+        points = points[found]
+        cells = cells[found]
+
+        counts = self.cell_starts[cells + 1] - self.cell_starts[cells]
+        return np.repeat(points, counts), expand_ranges(self.cell_starts[cells], counts)
+
+    def _measure(
+        self, xyz: np.ndarray, rings: Optional[int], reach: float
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Pairs within reach (chord meters), sorted by point then distance"""
+        points, positions = self._candidates(xyz, rings, reach)
+        chords = np.linalg.norm(self.xyz[positions] - xyz[points], axis=1)
+        within = chords <= reach
+        points, positions, chords = points[within], positions[within], chords[within]
+        order = np.lexsort((chords, points))
+        return points[order], positions[order], chords[order]
+
+    def _measure_point(
+        self, xyz: np.ndarray, rings: int, reach: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sorted positions and chords within reach of one point
+
+        Same result as _measure for a single point, with the neighbour
+        cells looked up in a dict instead of array passes, which dominate
+        the cost of a one-point query.
+        """
+        key = int(self._keys(self._cells(xyz[None, :]))[0])
+        spans = [
+            self._spans[key + delta]
+            for delta in _NEIGHBOUR_DELTAS[rings].tolist()
+            if key + delta in self._spans
+        ]
+        if not spans:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        positions = np.concatenate([np.arange(start, end) for start, end in spans])
+        chords = np.linalg.norm(self.xyz[positions] - xyz, axis=1)
+        within = chords <= reach
+        order = np.argsort(chords[within], kind="stable")
+        return positions[within][order], chords[within][order]
+
+    def _scan_nearest(self, xyz: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """k nearest sorted positions and chords per point, over every school"""
+        k = min(k, len(self.xyz))
+        # The largest dot products are the shortest chords; measure only those
+        scores = xyz @ self.xyz.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        chords = np.linalg.norm(self.xyz[top] - xyz[:, None, :], axis=2)
+        order = np.argsort(chords, axis=1)
+        return np.take_along_axis(top, order, 1), np.take_along_axis(chords, order, 1)
+
+    def _chunks(self, count: int, rings: Optional[int], chunk_size: int) -> List[slice]:
+        """Point slices per pass; full scans take fewer points at a time"""
+        if rings is None:
+            chunk_size = max(1, _SCAN_PAIRS // len(self.xyz))
+        return [
+            slice(start, start + chunk_size) for start in range(0, count, chunk_size)
+        ]
+
+    def within_many(
+        self, lats: np.ndarray, lngs: np.ndarray, radius: float, chunk_size: int = 1024
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find every school within a radius of each point
+
+        Args:
+            lats: Latitudes
+            lngs: Longitudes
+            radius: Great-circle radius in meters
+            chunk_size: Points per pass, bounding temporary memory
+
+        Returns:
+            (point indices, school ids, distances in meters), sorted by
+            point and then distance
+        """
+        xyz = to_ecef(lats, lngs)
+        self.queries += len(xyz)
+        empty = np.zeros(0, dtype=np.int64)
+        if not len(self.xyz) or not len(xyz):
+            return empty, empty, np.zeros(0)
+
+        reach = arc_to_chord(radius)
+        rings = max(math.ceil(reach / self.cell_size), 1)
+        if rings > NEAREST_RINGS[-1]:
+            rings = None
+
+        results = []
+        for chunk in self._chunks(len(xyz), rings, chunk_size):
+            points, positions, chords = self._measure(xyz[chunk], rings, reach)
+            results.append((points + chunk.start, self.ids[positions], chords))
+        points, ids, chords = (np.concatenate(parts) for parts in zip(*results))
+        return points, ids, chord_to_arc(chords)
+
+    def nearest_many(
+        self,
+        lats: np.ndarray,
+        lngs: np.ndarray,
+        k: int = 1,
+        max_distance: Optional[float] = None,
+        chunk_size: int = 1024,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest schools to each point
+
+        Points are first searched one cell around and the unresolved ones
+        again over wider neighbourhoods; only points with fewer than k
+        schools within NEAREST_RINGS cells measure every school.
+
+        Args:
+            lats: Latitudes
+            lngs: Longitudes
+            k: Schools per point
+            max_distance: Ignore schools farther than this (meters)
+            chunk_size: Points per pass, bounding temporary memory
+
+        Returns:
+            (distances, school ids), each (N, k) and ordered nearest first;
+            missing neighbours have distance inf and id -1
+        """
+        xyz = to_ecef(lats, lngs)
+        self.queries += len(xyz)
+        distances = np.full((len(xyz), k), np.inf)
+        ids = np.full((len(xyz), k), -1, dtype=np.int64)
+        if not len(self.xyz) or not len(xyz):
+            return distances, ids
+
+        limit = arc_to_chord(max_distance) if max_distance is not None else np.inf
+        pending = np.arange(len(xyz))
+        for rings in NEAREST_RINGS:
+            reach = min(rings * self.cell_size, limit)
+            unresolved = []
+            for chunk in self._chunks(len(pending), rings, chunk_size):
+                batch = pending[chunk]
+                points, positions, chords = self._measure(xyz[batch], rings, reach)
+                counts = np.bincount(points, minlength=len(batch))
+                firsts = np.cumsum(counts) - counts
+                ranks = np.arange(len(points)) - np.repeat(firsts, counts)
+
+                # Exact once k schools lie within the searched reach
+                done = (counts >= k) | (reach >= limit)
+                keep = (ranks < k) & done[points]
+                rows = batch[points[keep]]
+                distances[rows, ranks[keep]] = chord_to_arc(chords[keep])
+                ids[rows, ranks[keep]] = self.ids[positions[keep]]
+                unresolved.append(batch[~done])
+            pending = np.concatenate(unresolved)
+            if not len(pending):
+                return distances, ids
+
+        # Fewer than k schools within NEAREST_RINGS cells: measure them all
+        for chunk in self._chunks(len(pending), None, chunk_size):
+            batch = pending[chunk]
+            positions, chords = self._scan_nearest(xyz[batch], k)
+            found = chords <= limit
+            columns = positions.shape[1]
+            distances[batch, :columns] = np.where(found, chord_to_arc(chords), np.inf)
+            ids[batch, :columns] = np.where(found, self.ids[positions], -1)
+        return distances, ids
+
+    def nearest(self, lat: float, lng: float, k: int = 1) -> List[Tuple[int, float]]:
+        """Nearest schools to one point as (school id, meters), nearest first"""
+        if len(self.xyz):
+            xyz = to_ecef([lat], [lng])[0]
+            for rings in NEAREST_RINGS:
+                positions, chords = self._measure_point(
+                    xyz, rings, rings * self.cell_size
+                )
+                if len(positions) >= k:
+                    self.queries += 1
+                    return self._pairs(positions[:k], chords[:k])
+
+        distances, ids = self.nearest_many(np.array([lat]), np.array([lng]), k=k)
+        return [
+            (int(school_id), float(distance))
+            for school_id, distance in zip(ids[0], distances[0])
+            if school_id >= 0
+        ]
+
+    def within(self, lat: float, lng: float, radius: float) -> List[Tuple[int, float]]:
+        """Schools within radius meters of one point as (school id, meters)"""
+        reach = arc_to_chord(radius)
+        rings = max(math.ceil(reach / self.cell_size), 1)
+        if len(self.xyz) and rings <= NEAREST_RINGS[-1]:
+            self.queries += 1
+            return self._pairs(
+                *self._measure_point(to_ecef([lat], [lng])[0], rings, reach)
+            )
+
+        _, ids, distances = self.within_many(np.array([lat]), np.array([lng]), radius)
+        return [(int(i), float(d)) for i, d in zip(ids, distances)]
+
+    def _pairs(
+        self, positions: np.ndarray, chords: np.ndarray
+    ) -> List[Tuple[int, float]]:
+        return list(zip(self.ids[positions].tolist(), chord_to_arc(chords).tolist()))
+
+    def to_result(self, school_id: int, distance: float) -> NearbySchool:
+        """Build a NearbySchool for a school and its distance from the query"""
+        school_code, name, school_type = self.records[school_id]
+        return NearbySchool(
+            school_code=school_code,
+            name=name,
+            school_type=school_type,
+            lat=float(self.lats[school_id]),
+            lng=float(self.lngs[school_id]),
+            distance=round(distance, 1),
+        )
+
+    def get_stats(self) -> dict:
+        """Get index size and query counts"""
+        return {
+            "schools": len(self.records),
+            "cells": len(self.cell_keys),
+            "queries": self.queries,
+        }
+
+
+# Global school index, rebuilt by the refresh task when the table changes
+_school_index: Optional[SchoolIndex] = None
+_fingerprint: Optional[tuple] = None
+_refresh_lock = asyncio.Lock()
+_refresh_task: Optional[asyncio.Task] = None
+_refreshes = 0
+_refreshed_at: Optional[float] = None
+
+
+async def _table_fingerprint(db) -> tuple:
+    """Row count, max id and last update of the schools table"""
+    result = await db.execute(
+        select(func.count(School.id), func.max(School.id), func.max(School.updated_at))
+    )
+    return tuple(result.one())
+
+
+async def _fetch_schools(db) -> List[SchoolRow]:
+    result = await db.execute(
+        select(
+            School.school_code,
+            School.name,
+            School.school_type,
+            School.lat,
+            School.lng,
+        ).order_by(School.id)
+    )
+    return [tuple(row) for row in result.all()]
+
+
+async def refresh_school_index(force: bool = False) -> Optional[SchoolIndex]:
+    """
+    Rebuild the school index if the schools table changed
+
+    The table fingerprint (row count, max id, max updated_at) is checked
+    first, so an unchanged table costs one aggregate query. The new index
+    is built off the event loop and replaces the old one in a single
+    assignment.
+
+    Args:
+        force: Rebuild even if the fingerprint is unchanged
+
+    Returns:
+        The current SchoolIndex
+    """
+    global _school_index, _fingerprint, _refreshes, _refreshed_at
+
+    async with _refresh_lock:
+        async with AsyncSessionLocal() as db:
+            fingerprint = await _table_fingerprint(db)
+            if not force and _school_index is not None and fingerprint == _fingerprint:
+                return _school_index
+            schools = await _fetch_schools(db)
+
+        start = time.perf_counter()
+        index = await asyncio.to_thread(
+            SchoolIndex, schools, settings.SCHOOL_INDEX_CELL_SIZE
+        )
+        _school_index = index
+        _fingerprint = fingerprint
+        _refreshes += 1
+        _refreshed_at = time.time()
+        logger.info(
+            "school_index_loaded",
+            build_time=round(time.perf_counter() - start, 3),
+            **index.get_stats(),
+        )
+        return index
+
+
+async def _refresh_loop() -> None:
+    while True:
+        try:
+            await refresh_school_index()
+        except Exception as e:
+            logger.error("school_index_refresh_failed", error=str(e))
+        if settings.SCHOOL_INDEX_REFRESH_INTERVAL <= 0:
+            return
+        await asyncio.sleep(settings.SCHOOL_INDEX_REFRESH_INTERVAL)
+
+
+def start_school_index() -> None:
+    """Load the index and keep it fresh in the background (application startup)"""
+    global _refresh_task
+    if not settings.SCHOOL_INDEX_ENABLED:
+        return
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_loop())
+
+
+async def stop_school_index() -> None:
+    """Stop the background refresh (called on application shutdown)"""
+    global _refresh_task
+    if _refresh_task is None:
+        return
+    _refresh_task.cancel()
+    try:
+        await _refresh_task
+    except asyncio.CancelledError:
+        pass
+    _refresh_task = None
+
+
+def set_school_index(index: Optional[SchoolIndex]) -> None:
+    """Replace the global index (scripts and tests)"""
+    global _school_index
+    _school_index = index
+
+
+def get_school_index() -> Optional[SchoolIndex]:
+    """Get the global school index, None until the first load completes"""
+    return _school_index
+
+
+def _require_index() -> SchoolIndex:
+    index = _school_index
+    if index is None:
+        raise SchoolIndexUnavailableError("School index is not loaded")
+    return index
+
+
+def find_nearest_schools(lat: float, lng: float, k: int = 1) -> List[NearbySchool]:
+    """
+    Find the schools nearest to a point, nearest first
+
+    Raises:
+        SchoolIndexUnavailableError: If the index is not loaded
+    """
+    index = _require_index()
+    return [index.to_result(i, d) for i, d in index.nearest(lat, lng, k=k)]
+
+
+def find_schools_within(lat: float, lng: float, radius: float) -> List[NearbySchool]:
+    """
+    Find the schools within radius meters of a point, nearest first
+
+    Raises:
+        SchoolIndexUnavailableError: If the index is not loaded
+    """
+    index = _require_index()
+    return [index.to_result(i, d) for i, d in index.within(lat, lng, radius)]
+
+
+def nearest_school_distances(lats: List[float], lngs: List[float]) -> np.ndarray:
+    """
+    Distance in meters from each point to its nearest school (inf if none)
+
+    Raises:
+        SchoolIndexUnavailableError: If the index is not loaded
+    """
+    distances, _ = _require_index().nearest_many(np.asarray(lats), np.asarray(lngs))
+    return distances[:, 0]
+
+
+def get_school_index_stats() -> dict:
+    """Get school index size, query counts and refresh history"""
+    index = _school_index
+    if index is None:
+        return {"loaded": False, "refreshes": _refreshes}
+    return {
+        "loaded": True,
+        **index.get_stats(),
+        "refreshes": _refreshes,
+        "age": round(time.time() - _refreshed_at, 1) if _refreshed_at else None,
+    }
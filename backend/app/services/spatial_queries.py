@@ -0,0 +1,180 @@
+"""Spatial queries run in PostGIS
+
+Counterparts of the in-memory ZoningIndex and SchoolIndex for callers that
+do not hold an index: containment on zoning_areas.boundary, KNN (<->) and
+distance-within on schools.location. Each query is written so the GiST
+indexes from the PostGIS migration can serve it; the *_statement builders
+are separate from the async runners so the plans can be checked with
+EXPLAIN.
+"""
+
+from typing import List, Optional
+from sqlalchemy import Float, Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import School, ZoningArea
+from app.models.school import NearbySchool
+from app.models.zoning import ZoningResult
+
+
+def point_geometry(lat: float, lng: float):
+    """WGS84 point as a PostGIS geometry expression"""
+    return func.ST_SetSRID(func.ST_MakePoint(lng, lat), 4326)
+
+
+def point_geography(lat: float, lng: float):
+    """WGS84 point as a PostGIS geography expression"""
+    return func.geography(point_geometry(lat, lng))
+
+
+def zoning_at_statement(
+    lat: float, lng: float, prefecture: Optional[str] = None
+) -> Select:
+    """Zoning area covering a point; the lowest id wins where areas overlap"""
+    statement = (
+        select(
+            ZoningArea.area_code,
+            ZoningArea.zoning_type,
+            ZoningArea.building_coverage_ratio,
+            ZoningArea.floor_area_ratio,
+        )
+        .where(func.ST_Covers(ZoningArea.boundary, point_geometry(lat, lng)))
+        .order_by(ZoningArea.id)
+        .limit(1)
+    )
+    if prefecture is not None:
+        statement = statement.where(ZoningArea.prefecture == prefecture)
+    return statement
+
+
+def _school_columns(lat: float, lng: float) -> list:
+    # Sphere distance, as SchoolIndex reports it
+    distance = func.ST_Distance(
+        School.location, point_geography(lat, lng), False, type_=Float
+    )
+    return [
+        School.school_code,
+        School.name,
+        School.school_type,
+        School.lat,
+        School.lng,
+        distance.label("distance"),
+    ]
+
+
+def nearest_schools_statement(
+    lat: float,
+    lng: float,
+    k: int = 1,
+    school_type: Optional[str] = None,
+    max_distance: Optional[float] = None,
+) -> Select:
+    """k schools nearest to a point, by an index-assisted KNN scan"""
+    point = point_geography(lat, lng)
+    statement = (
+        select(*_school_columns(lat, lng))
+        .order_by(School.location.op("<->")(point))
+        .limit(k)
+    )
+    if school_type is not None:
+        statement = statement.where(School.school_type == school_type)
+    if max_distance is not None:
+        statement = statement.where(
+            func.ST_DWithin(School.location, point, max_distance, False)
+        )
+    return statement
+
+
+def schools_within_statement(
+    lat: float, lng: float, radius: float, school_type: Optional[str] = None
+) -> Select:
+    """Schools within radius meters of a point, nearest first"""
+    columns = _school_columns(lat, lng)
+    statement = (
+        select(*columns)
+        .where(
+            func.ST_DWithin(School.location, point_geography(lat, lng), radius, False)
+        )
+        .order_by(columns[-1])
+    )
+    if school_type is not None:
+        statement = statement.where(School.school_type == school_type)
+    return statement
+
+
+async def query_zoning_at(
+    db: AsyncSession, lat: float, lng: float, prefecture: Optional[str] = None
+) -> Optional[ZoningResult]:
+    """
+    Find the 用途地域 covering a point in the database
+
+    Args:
+        db: Async database session
+        lat: Latitude
+        lng: Longitude
+        prefecture: Optional prefecture to narrow the search
+
+    Returns:
+        ZoningResult, or None if the point is outside every zoning area
+    """
+    row = (await db.execute(zoning_at_statement(lat, lng, prefecture))).first()
+    if row is None:
+        return None
+    return ZoningResult(
+        area_code=row.area_code,
+        zoning_type=row.zoning_type,
+        building_coverage_ratio=row.building_coverage_ratio,
+        floor_area_ratio=row.floor_area_ratio,
+    )
+
+
+async def query_nearest_schools(
+    db: AsyncSession,
+    lat: float,
+    lng: float,
+    k: int = 1,
+    school_type: Optional[str] = None,
+    max_distance: Optional[float] = None,
+) -> List[NearbySchool]:
+    """
+    Find the schools nearest to a point in the database, nearest first
+
+    Args:
+        db: Async database session
+        lat: Latitude
+        lng: Longitude
+        k: Number of schools
+        school_type: Optional school type filter
+        max_distance: Optional cutoff in meters
+
+    Returns:
+        Up to k schools
+    """
+    result = await db.execute(
+        nearest_schools_statement(lat, lng, k, school_type, max_distance)
+    )
+    return [NearbySchool(**row._mapping) for row in result.all()]
+
+
+async def query_schools_within(
+    db: AsyncSession,
+    lat: float,
+    lng: float,
+    radius: float,
+    school_type: Optional[str] = None,
+) -> List[NearbySchool]:
+    """
+    Find the schools within radius meters of a point in the database
+
+    Args:
+        db: Async database session
+        lat: Latitude
+        lng: Longitude
+        radius: Radius in meters
+        school_type: Optional school type filter
+
+    Returns:
+        Schools nearest first
+    """
+    result = await db.execute(schools_within_statement(lat, lng, radius, school_type))
+    return [NearbySchool(**row._mapping) for row in result.all()]
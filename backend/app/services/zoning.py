@@ -0,0 +1,317 @@
+"""用途地域 lookup for coordinates
+
+ZoningArea rows keep their polygons as GeoJSON in a JSON column, which
+cannot be searched spatially in the database. A prefecture's rows are
+instead loaded on first use, parsed once into flattened edge arrays and
+indexed with an STR-packed R-tree over the polygon bounding boxes. A lookup
+descends the tree to the few polygons whose boxes contain the point and
+runs the even-odd test only on those. At most ZONING_MAX_PREFECTURES
+indexes are kept, least recently used first out.
+"""
+
+import asyncio
+import time
+from contextlib import nullcontext
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import structlog
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.geometry import (
+    Polygon,
+    edge_crossings,
+    pairs_in_polygons,
+    polygon_bbox,
+    polygon_edges,
+    polygons_from_geojson,
+)
+from app.core.lru import LRUCache
+from app.core.rtree import PackedRTree
+from app.core.singleflight import SingleFlight
+from app.db.base import AsyncSessionLocal
+from app.db.models import ZoningArea
+from app.models.zoning import ZoningResult
+
+logger = structlog.get_logger()
+
+# area_code, zoning_type, building_coverage_ratio, floor_area_ratio, geometry
+ZoningRow = Tuple[str, str, Optional[float], Optional[float], Any]
+
+
+class ZoningIndex:
+    """
+    R-tree index over the 用途地域 polygons of one prefecture
+
+    Each part of a (Multi)Polygon is indexed separately under its own
+    bounding box and maps back to its ZoningArea record. Where polygons
+    overlap, the one loaded first (lowest id) wins.
+    """
+
+    def __init__(self, rows: Iterable[ZoningRow], node_capacity: int = 16):
+        """
+        Args:
+            rows: (area_code, zoning_type, building_coverage_ratio,
+                floor_area_ratio, GeoJSON geometry) per ZoningArea
+            node_capacity: R-tree node fan-out
+        """
+        self.records: List[Tuple[str, str, Optional[float], Optional[float]]] = []
+        self.polygons: List[Polygon] = []
+        polygon_records: List[int] = []
+        bboxes = []
+        self.skipped = 0
+
+        for area_code, zoning_type, coverage, floor_area, geometry in rows:
+            try:
+                parts = polygons_from_geojson(geometry or {})
+            except (ValueError, KeyError, TypeError, IndexError):
+                self.skipped += 1
+                continue
+
+            record_id = len(self.records)
+            self.records.append((area_code, zoning_type, coverage, floor_area))
+            for polygon in parts:
+                if len(polygon[0]) < 3:
+                    continue
+                self.polygons.append(polygon)
+                polygon_records.append(record_id)
+                bboxes.append(polygon_bbox(polygon))
+
+        self.polygon_records = np.asarray(polygon_records, dtype=np.int64)
+
+        # Edges of all polygons in one array; polygon i owns
+        # edges[edge_starts[i]:edge_starts[i + 1]]
+        edges = [polygon_edges(polygon) for polygon in self.polygons]
+        self.edges = np.vstack(edges) if edges else np.zeros((0, 4))
+        self.edge_starts = np.concatenate(
+            [[0], np.cumsum([len(e) for e in edges], dtype=np.int64)]
+        ).astype(np.int64)
+
+        self.tree = PackedRTree(
+            np.array(bboxes, dtype=np.float64).reshape(-1, 4), capacity=node_capacity
+        )
+        self.lookups = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def locate(self, lat: float, lng: float) -> Optional[int]:
+        """
+        Find the zoning record covering a point
+
+        Returns:
+            Record id, or None if no polygon contains the point
+        """
+        self.lookups += 1
+        for polygon_id in sorted(self.tree.query_point(lng, lat)):
+            edges = self.edges[
+                self.edge_starts[polygon_id] : self.edge_starts[polygon_id + 1]
+            ]
+            if np.count_nonzero(edge_crossings(edges, lng, lat)) % 2:
+                self.hits += 1
+                return int(self.polygon_records[polygon_id])
+        return None
+
+    def locate_many(
+        self, lats: np.ndarray, lngs: np.ndarray, chunk_size: int = 4096
+    ) -> np.ndarray:
+        """
+        Find the zoning record covering each point
+
+        Args:
+            lats: Latitudes
+            lngs: Longitudes
+            chunk_size: Points per pass, bounding temporary memory
+
+        Returns:
+            Array of record ids, -1 for points outside every polygon
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        record_ids = np.full(len(lats), -1, dtype=np.int64)
+        self.lookups += len(lats)
+
+        for start in range(0, len(lats), chunk_size):
+            chunk_lats = lats[start : start + chunk_size]
+            chunk_lngs = lngs[start : start + chunk_size]
+            points, polygons = self.tree.query_points(chunk_lngs, chunk_lats)
+            inside = pairs_in_polygons(
+                self.edges,
+                self.edge_starts,
+                polygons,
+                chunk_lngs[points],
+                chunk_lats[points],
+            )
+            points, polygons = points[inside], polygons[inside]
+
+            # Lowest containing polygon per point, as in locate
+            order = np.lexsort((polygons, points))
+            inside_points, first = np.unique(points[order], return_index=True)
+            record_ids[start + inside_points] = self.polygon_records[
+                polygons[order][first]
+            ]
+
+        self.hits += int(np.count_nonzero(record_ids >= 0))
+        return record_ids
+
+    def to_result(self, record_id: int) -> ZoningResult:
+        """Build a ZoningResult for a record"""
+        area_code, zoning_type, coverage, floor_area = self.records[record_id]
+        return ZoningResult(
+            area_code=area_code,
+            zoning_type=zoning_type,
+            building_coverage_ratio=coverage,
+            floor_area_ratio=floor_area,
+        )
+
+    def get_stats(self) -> dict:
+        """Get index size and lookup counts"""
+        return {
+            "areas": len(self.records),
+            "polygons": len(self.polygons),
+            "skipped": self.skipped,
+            "tree_depth": self.tree.depth,
+            "lookups": self.lookups,
+            "hits": self.hits,
+        }
+
+
+# Per-prefecture indexes, loaded on first use
+_indexes = LRUCache(
+    max_entries=settings.ZONING_MAX_PREFECTURES, ttl=settings.ZONING_INDEX_TTL
+)
+_singleflight = SingleFlight()
+
+
+async def _fetch_rows(prefecture: str) -> List[ZoningRow]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(
+                ZoningArea.area_code,
+                ZoningArea.zoning_type,
+                ZoningArea.building_coverage_ratio,
+                ZoningArea.floor_area_ratio,
+                ZoningArea.geometry,
+            )
+            .where(ZoningArea.prefecture == prefecture)
+            .order_by(ZoningArea.id)
+        )
+        return [tuple(row) for row in result.all()]
+
+
+async def _load_index(
+    prefecture: str, load_limit: Optional[asyncio.Semaphore] = None
+) -> ZoningIndex:
+    start = time.perf_counter()
+    async with load_limit or nullcontext():
+        rows = await _fetch_rows(prefecture)
+    index = await asyncio.to_thread(
+        ZoningIndex, rows, settings.ZONING_RTREE_NODE_CAPACITY
+    )
+    _indexes.set(prefecture, index)
+    logger.info(
+        "zoning_index_loaded",
+        prefecture=prefecture,
+        load_time=round(time.perf_counter() - start, 3),
+        **index.get_stats(),
+    )
+    return index
+
+
+async def get_zoning_index(
+    prefecture: str, load_limit: Optional[asyncio.Semaphore] = None
+) -> ZoningIndex:
+    """
+    Get the zoning index for a prefecture, loading it on first use
+
+    Concurrent first lookups for the same prefecture share one load.
+
+    Args:
+        prefecture: Prefecture name
+        load_limit: Semaphore held while reading the prefecture's rows from
+            the database; cached indexes are returned without it
+    """
+    index = _indexes.get(prefecture)
+    if index is None:
+        index = await _singleflight.do(
+            f"zoning:{prefecture}", lambda: _load_index(prefecture, load_limit)
+        )
+    return index
+
+
+def invalidate_zoning_index(prefecture: Optional[str] = None) -> None:
+    """Drop a prefecture's index (or all) so the next lookup reloads it"""
+    if prefecture is None:
+        _indexes.clear()
+    else:
+        _indexes.delete(prefecture)
+
+
+async def lookup_zoning(
+    lat: float,
+    lng: float,
+    prefecture: str,
+    load_limit: Optional[asyncio.Semaphore] = None,
+) -> Optional[ZoningResult]:
+    """
+    Find the 用途地域 covering a point
+
+    Args:
+        lat: Latitude
+        lng: Longitude
+        prefecture: Prefecture of the point (e.g. from geocoding)
+        load_limit: Semaphore held only if the prefecture must be loaded
+            from the database
+
+    Returns:
+        ZoningResult, or None if the point is outside every zoning area
+    """
+    index = await get_zoning_index(prefecture, load_limit)
+    record_id = index.locate(lat, lng)
+    return index.to_result(record_id) if record_id is not None else None
+
+
+async def lookup_zoning_batch(
+    lats: Sequence[float],
+    lngs: Sequence[float],
+    prefectures: Union[str, Sequence[str]],
+) -> List[Optional[ZoningResult]]:
+    """
+    Find the 用途地域 covering many points
+
+    Points are grouped by prefecture and each group is located in one
+    vectorized pass.
+
+    Args:
+        lats: Latitudes
+        lngs: Longitudes (same length as lats)
+        prefectures: One prefecture for all points, or one per point
+
+    Returns:
+        ZoningResult per point in input order, None for points outside
+        every zoning area
+    """
+    if isinstance(prefectures, str):
+        prefectures = [prefectures] * len(lats)
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    groups = np.asarray(prefectures, dtype=object)
+
+    results: List[Optional[ZoningResult]] = [None] * len(lats)
+    for prefecture in dict.fromkeys(prefectures):
+        members = np.nonzero(groups == prefecture)[0]
+        index = await get_zoning_index(prefecture)
+        record_ids = index.locate_many(lats[members], lngs[members])
+        for position, record_id in zip(members.tolist(), record_ids.tolist()):
+            if record_id >= 0:
+                results[position] = index.to_result(record_id)
+    return results
+
+
+def get_zoning_stats() -> dict:
+    """Get loaded prefectures, their index sizes and cache counters"""
+    prefectures = {
+        prefecture: index.get_stats() for prefecture, index in _indexes.items()
+    }
+    return {"prefectures": prefectures, "cache": _indexes.get_stats()}
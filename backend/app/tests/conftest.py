@@ -2,10 +2,14 @@
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import text
 from sqlalchemy.exc import OperationalError
 
+from app.core import circuit_breaker
 from app.main import app
 from app.db.base import Base, engine
+from app.services import geocoding
+from app.services.geocoding_cache import geocoding_cache
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -14,6 +18,10 @@ def setup_database():
     # Try to create tables, but don't fail if database is not available
     # Some tests (like geocoding) don't require database
     try:
+        if engine.dialect.name == "postgresql":
+            # Spatial columns need PostGIS
+            with engine.begin() as conn:
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
         Base.metadata.create_all(bind=engine)
         yield
         # Drop all tables after tests
@@ -27,6 +35,27 @@ def setup_database():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_geocoding_cache():
+    """Keep cached geocoding results from leaking between tests"""
+    geocoding_cache.clear_local()
+    yield
+    geocoding_cache.clear_local()
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Keep failures recorded by one test from opening breakers in the next"""
+    for breaker in circuit_breaker._breakers.values():
+        breaker.reset()
+
+
+@pytest.fixture(autouse=True)
+def no_secondary_geocoders(monkeypatch):
+    """Keep tests from reaching real secondary geocoding providers"""
+    monkeypatch.setattr(geocoding._geocoder, "secondaries", [])
+
+
 @pytest.fixture
 def client():
     """Create test client"""
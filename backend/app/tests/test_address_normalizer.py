@@ -0,0 +1,77 @@
+"""Test Japanese address normalization"""
+
+from pathlib import Path
+import pytest
+
+from app.services.address_normalizer import (
+    clear_normalize_cache,
+    kanji_to_int,
+    normalize_address,
+    normalize_cache_info,
+)
+
+GOLDEN_CORPUS = Path(__file__).parent / "data" / "address_golden.tsv"
+
+
+def _load_golden_corpus():
+    cases = []
+    for line in GOLDEN_CORPUS.read_text(encoding="utf-8").splitlines():
+        if not line or line.startswith("#"):
+            continue
+        raw, expected = line.split("\t")
+        cases.append((raw, expected))
+    return cases
+
+
+@pytest.mark.parametrize("raw,expected", _load_golden_corpus())
+def test_golden_corpus(raw, expected):
+    """Test normalization against the golden corpus"""
+    assert normalize_address(raw) == expected
+
+
+@pytest.mark.parametrize(
+    "numeral,expected",
+    [
+        ("一", 1),
+        ("十", 10),
+        ("十二", 12),
+        ("二十", 20),
+        ("二十三", 23),
+        ("百五", 105),
+        ("千二百三十四", 1234),
+        ("二〇三", 203),
+    ],
+)
+def test_kanji_to_int(numeral, expected):
+    """Test kanji numeral conversion"""
+    assert kanji_to_int(numeral) == expected
+
+
+def test_chome_variants_share_one_key():
+    """Test 三丁目 / 3丁目 / 3- variants produce one cache key"""
+    variants = [
+        "東京都渋谷区道玄坂三丁目5番7号",
+        "東京都渋谷区道玄坂3丁目5番7号",
+        "東京都渋谷区道玄坂3丁目5-7",
+        "東京都渋谷区道玄坂３－５－７",
+        "東京都 渋谷区 道玄坂 3-5-7",
+    ]
+    assert len({normalize_address(v) for v in variants}) == 1
+
+
+def test_normalization_is_idempotent():
+    """Test normalizing a normalized address is a no-op"""
+    for raw, _ in _load_golden_corpus():
+        once = normalize_address(raw)
+        assert normalize_address(once) == once
+
+
+def test_memoized_fast_path():
+    """Test repeated addresses are served from the memo"""
+    clear_normalize_cache()
+    normalize_address("東京都渋谷区道玄坂三丁目5番7号")
+    normalize_address("東京都渋谷区道玄坂三丁目5番7号")
+
+    info = normalize_cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
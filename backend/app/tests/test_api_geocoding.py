@@ -1,8 +1,10 @@
 """Test geocoding API endpoints"""
 
+import json
 from unittest.mock import patch, AsyncMock
 from fastapi.testclient import TestClient
 
+from app.core.swr import CacheMetadata
 from app.models.geocoding import GeocodingResult
 from app.services.geocoding import GeocodingError
 
@@ -20,7 +22,8 @@ def test_geocode_endpoint_success(client: TestClient):
     )
 
     with patch(
-        "app.api.v1.geocoding.geocode_address", new=AsyncMock(return_value=mock_result)
+        "app.api.v1.geocoding.geocode_address_with_metadata",
+        new=AsyncMock(return_value=(mock_result, CacheMetadata("miss"))),
     ):
         response = client.post(
             "/api/v1/geocoding/",
@@ -33,6 +36,7 @@ def test_geocode_endpoint_success(client: TestClient):
     assert data["lng"] == 135.7736
     assert data["prefecture"] == "京都府"
     assert data["city"] == "京都市東山区"
+    assert response.headers["X-Cache-Status"] == "miss"
 
 
 def test_geocode_endpoint_empty_address(client: TestClient):
@@ -48,7 +52,7 @@ def test_geocode_endpoint_empty_address(client: TestClient):
 def test_geocode_endpoint_invalid_address(client: TestClient):
     """Test geocoding with invalid address"""
     with patch(
-        "app.api.v1.geocoding.geocode_address",
+        "app.api.v1.geocoding.geocode_address_with_metadata",
         new=AsyncMock(side_effect=ValueError("Address cannot be empty")),
     ):
         response = client.post(
@@ -63,7 +67,7 @@ def test_geocode_endpoint_invalid_address(client: TestClient):
 def test_geocode_endpoint_not_found(client: TestClient):
     """Test geocoding when address not found"""
     with patch(
-        "app.api.v1.geocoding.geocode_address",
+        "app.api.v1.geocoding.geocode_address_with_metadata",
         new=AsyncMock(side_effect=GeocodingError("No results found")),
     ):
         response = client.post(
@@ -78,7 +82,7 @@ def test_geocode_endpoint_not_found(client: TestClient):
 def test_geocode_endpoint_rate_limit(client: TestClient):
     """Test geocoding rate limit error"""
     with patch(
-        "app.api.v1.geocoding.geocode_address",
+        "app.api.v1.geocoding.geocode_address_with_metadata",
         new=AsyncMock(side_effect=GeocodingError("Rate limit exceeded")),
     ):
         response = client.post(
@@ -93,7 +97,7 @@ def test_geocode_endpoint_rate_limit(client: TestClient):
 def test_geocode_endpoint_server_error(client: TestClient):
     """Test geocoding server error"""
     with patch(
-        "app.api.v1.geocoding.geocode_address",
+        "app.api.v1.geocoding.geocode_address_with_metadata",
         new=AsyncMock(side_effect=GeocodingError("API key invalid")),
     ):
         response = client.post(
@@ -108,7 +112,7 @@ def test_geocode_endpoint_server_error(client: TestClient):
 def test_geocode_endpoint_unexpected_error(client: TestClient):
     """Test geocoding unexpected error"""
     with patch(
-        "app.api.v1.geocoding.geocode_address",
+        "app.api.v1.geocoding.geocode_address_with_metadata",
         new=AsyncMock(side_effect=Exception("Unexpected error")),
     ):
         response = client.post(
@@ -118,3 +122,94 @@ def test_geocode_endpoint_unexpected_error(client: TestClient):
 
     assert response.status_code == 500
     assert "unexpected" in response.json()["detail"].lower()
+
+
+def _result_for(address: str) -> GeocodingResult:
+    """Build a distinct result per address for batch tests"""
+    return GeocodingResult(
+        lat=35.0 + len(address) / 1000,
+        lng=135.0,
+        formatted_address=address,
+        prefecture="京都府",
+        city="京都市東山区",
+    )
+
+
+async def _fake_geocode(address: str) -> GeocodingResult:
+    if "無効" in address:
+        raise GeocodingError(f"No results found for address: {address}")
+    if not address.strip():
+        raise ValueError("Address cannot be empty")
+    return _result_for(address)
+
+
+def test_geocode_batch_endpoint(client: TestClient):
+    """Test batch geocoding returns per-item results in input order"""
+    addresses = ["京都府京都市東山区", "無効な住所", "東京都渋谷区", " "]
+    mock_geocode = AsyncMock(side_effect=_fake_geocode)
+
+    with patch("app.services.geocoding.geocode_address", new=mock_geocode):
+        response = client.post("/api/v1/geocoding/batch", json={"addresses": addresses})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 4
+    assert data["succeeded"] == 2
+    assert data["failed"] == 2
+    assert [item["index"] for item in data["results"]] == [0, 1, 2, 3]
+    assert [item["status_code"] for item in data["results"]] == [200, 404, 200, 400]
+    assert data["results"][0]["result"]["formatted_address"] == "京都府京都市東山区"
+    assert "not found" in data["results"][1]["error"].lower()
+
+
+def test_geocode_batch_endpoint_deduplicates(client: TestClient):
+    """Test addresses that normalize to the same string are geocoded once"""
+    addresses = ["京都府京都市東山区", "京都府・京都市東山区", "京都府京都市東山区 "]
+    mock_geocode = AsyncMock(side_effect=_fake_geocode)
+
+    with patch("app.services.geocoding.geocode_address", new=mock_geocode):
+        response = client.post("/api/v1/geocoding/batch", json={"addresses": addresses})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["succeeded"] == 3
+    assert [item["address"] for item in data["results"]] == addresses
+    mock_geocode.assert_awaited_once()
+
+
+def test_geocode_batch_endpoint_stream(client: TestClient):
+    """Test NDJSON streaming mode"""
+    addresses = ["京都府京都市東山区", "無効な住所"]
+    mock_geocode = AsyncMock(side_effect=_fake_geocode)
+
+    with patch("app.services.geocoding.geocode_address", new=mock_geocode):
+        response = client.post(
+            "/api/v1/geocoding/batch?stream=true", json={"addresses": addresses}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(item["index"] for item in lines) == [0, 1]
+    by_index = {item["index"]: item for item in lines}
+    assert by_index[0]["status_code"] == 200
+    assert by_index[1]["status_code"] == 404
+
+
+def test_geocode_batch_endpoint_too_many(client: TestClient):
+    """Test batches over the configured maximum are rejected"""
+    with patch("app.api.v1.geocoding.settings") as mock_settings:
+        mock_settings.GEOCODING_BATCH_MAX_SIZE = 2
+        response = client.post(
+            "/api/v1/geocoding/batch", json={"addresses": ["a", "b", "c"]}
+        )
+
+    assert response.status_code == 400
+    assert "too many" in response.json()["detail"].lower()
+
+
+def test_geocode_batch_endpoint_empty(client: TestClient):
+    """Test an empty batch is a validation error"""
+    response = client.post("/api/v1/geocoding/batch", json={"addresses": []})
+
+    assert response.status_code == 422
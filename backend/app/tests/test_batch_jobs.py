@@ -0,0 +1,479 @@
+"""Test batch analysis jobs"""
+
+import asyncio
+from datetime import datetime
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.db.base import Base
+from app.db.models import BatchJob, BatchJobItem
+from app.main import app
+from app.models.geocoding import GeocodingResult
+from app.models.school import NearbySchool
+from app.models.zoning import ZoningResult
+from app.services import batch_jobs
+from app.services.batch_jobs import (
+    BatchJobConflictError,
+    InProcessTaskQueue,
+    analyze_location,
+    start_batch_jobs,
+    stop_batch_jobs,
+)
+
+LOCATIONS = [{"lat": 35.0 + i * 0.001, "lng": 135.77} for i in range(5)]
+
+
+async def echo_analyzer(location, limits):
+    await asyncio.sleep(0)
+    return {"lat": location["lat"]}
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    """Async sessions on a file-backed SQLite database with the job tables"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[BatchJob.__table__, BatchJobItem.__table__],
+        )
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def start_runner(session_factory):
+    """Start batch jobs on the test database with a given analyzer"""
+
+    async def start(analyzer=echo_analyzer, **settings_overrides):
+        for name, value in settings_overrides.items():
+            setattr(settings, name, value)
+        return await start_batch_jobs(
+            queue=InProcessTaskQueue(workers=2),
+            session_factory=session_factory,
+            analyzer=analyzer,
+        )
+
+    saved = {
+        name: getattr(settings, name)
+        for name in (
+            "BATCH_ANALYSIS_ITEM_CONCURRENCY",
+            "BATCH_ANALYSIS_MAX_ATTEMPTS",
+            "BATCH_ANALYSIS_LEASE_SECONDS",
+        )
+    }
+    yield start
+    await stop_batch_jobs()
+    for name, value in saved.items():
+        setattr(settings, name, value)
+
+
+async def finish(runner):
+    await asyncio.wait_for(runner.queue.join(), timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_job_runs_to_completion(start_runner):
+    """Test every item is analyzed and results come back in input order"""
+    runner = await start_runner()
+
+    submitted = await runner.submit(LOCATIONS)
+    assert submitted.status == "queued"
+    assert submitted.total == 5
+    await finish(runner)
+
+    job = await runner.get_status(submitted.job_id)
+    assert job.status == "completed"
+    assert job.done == 5
+    assert job.finished_at is not None
+    assert [item.result["lat"] for item in job.items] == [
+        location["lat"] for location in LOCATIONS
+    ]
+
+
+@pytest.mark.asyncio
+async def test_item_failures_do_not_fail_the_job(start_runner):
+    """Test a failing location is recorded and the rest still complete"""
+
+    async def analyzer(location, limits):
+        if location["lat"] == LOCATIONS[2]["lat"]:
+            raise ValueError("No results found")
+        return {}
+
+    runner = await start_runner(analyzer)
+    submitted = await runner.submit(LOCATIONS)
+    await finish(runner)
+
+    job = await runner.get_status(submitted.job_id)
+    assert job.status == "completed"
+    assert (job.done, job.failed) == (4, 1)
+    assert job.items[2].error == "No results found"
+
+
+@pytest.mark.asyncio
+async def test_item_bookkeeping_errors_fail_the_item(start_runner, monkeypatch):
+    """Test a database error on one item fails it and the job still completes"""
+    runner = await start_runner()
+    process_item = runner._process_item
+
+    async def flaky_process_item(job_id, item_id, location, semaphore):
+        if location["lat"] == LOCATIONS[1]["lat"]:
+            raise RuntimeError("database is locked")
+        await process_item(job_id, item_id, location, semaphore)
+
+    monkeypatch.setattr(runner, "_process_item", flaky_process_item)
+    submitted = await runner.submit(LOCATIONS)
+    await finish(runner)
+
+    job = await runner.get_status(submitted.job_id)
+    assert job.status == "completed"
+    assert (job.done, job.failed) == (4, 1)
+    assert job.items[1].error == "database is locked"
+
+
+@pytest.mark.asyncio
+async def test_items_run_with_bounded_concurrency(start_runner):
+    """Test no more than BATCH_ANALYSIS_ITEM_CONCURRENCY items run at once"""
+    in_flight = 0
+    peak = 0
+
+    async def analyzer(location, limits):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {}
+
+    runner = await start_runner(analyzer, BATCH_ANALYSIS_ITEM_CONCURRENCY=2)
+    await runner.submit(LOCATIONS * 4)
+    await finish(runner)
+
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_remaining_items(start_runner):
+    """Test cancelling marks unfinished items and stops the in-flight one"""
+    started = asyncio.Event()
+    stopped = asyncio.Event()
+
+    async def analyzer(location, limits):
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        finally:
+            stopped.set()
+
+    runner = await start_runner(analyzer, BATCH_ANALYSIS_ITEM_CONCURRENCY=1)
+    submitted = await runner.submit(LOCATIONS)
+    await asyncio.wait_for(started.wait(), timeout=5)
+
+    job = await runner.cancel(submitted.job_id)
+    await asyncio.wait_for(stopped.wait(), timeout=5)
+    await finish(runner)
+
+    assert job.status == "cancelled"
+    assert job.cancelled == 5
+    job = await runner.get_status(submitted.job_id)
+    assert job.status == "cancelled"
+    assert {item.status for item in job.items} == {"cancelled"}
+
+    # Cancelling again changes nothing
+    assert (await runner.cancel(submitted.job_id)).cancelled == 5
+
+
+@pytest.mark.asyncio
+async def test_unfinished_jobs_resume_on_start(start_runner, session_factory):
+    """Test a job interrupted mid-run resumes without redoing finished items"""
+    analyzed = []
+
+    async def analyzer(location, limits):
+        analyzed.append(location["lat"])
+        return {"lat": location["lat"]}
+
+    # State left by a worker that died: item 0 done, 1 running, 2 running
+    # on its last attempt, 3 and 4 pending
+    runner = batch_jobs.BatchJobRunner(
+        InProcessTaskQueue(), session_factory=session_factory
+    )
+    submitted = await runner.submit(LOCATIONS)
+    async with session_factory() as db:
+        job = (
+            await db.execute(
+                select(BatchJob).where(BatchJob.job_id == submitted.job_id)
+            )
+        ).scalar_one()
+        job.status = "running"
+        for position, status, attempts in (
+            (0, "done", 1),
+            (1, "running", 1),
+            (2, "running", 3),
+        ):
+            await db.execute(
+                update(BatchJobItem)
+                .where(BatchJobItem.job_id == job.id, BatchJobItem.position == position)
+                .values(status=status, attempts=attempts)
+            )
+        await db.commit()
+
+    runner = await start_runner(analyzer, BATCH_ANALYSIS_MAX_ATTEMPTS=3)
+    await finish(runner)
+
+    job = await runner.get_status(submitted.job_id)
+    assert job.status == "completed"
+    assert [item.status for item in job.items] == [
+        "done",
+        "done",
+        "failed",
+        "done",
+        "done",
+    ]
+    assert sorted(analyzed) == [LOCATIONS[i]["lat"] for i in (1, 3, 4)]
+    assert runner.get_stats()["jobs_resumed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_jobs_leased_to_a_live_instance_are_not_resumed(
+    start_runner, session_factory
+):
+    """Test a running job with a fresh heartbeat is left to its owner"""
+    analyzed = []
+
+    async def analyzer(location, limits):
+        analyzed.append(location["lat"])
+        return {}
+
+    runner = batch_jobs.BatchJobRunner(
+        InProcessTaskQueue(), session_factory=session_factory
+    )
+    submitted = await runner.submit(LOCATIONS)
+    async with session_factory() as db:
+        job = (
+            await db.execute(
+                select(BatchJob).where(BatchJob.job_id == submitted.job_id)
+            )
+        ).scalar_one()
+        job.status = "running"
+        job.owner = "other-instance"
+        job.updated_at = datetime.utcnow()
+        await db.execute(
+            update(BatchJobItem)
+            .where(BatchJobItem.job_id == job.id, BatchJobItem.position == 0)
+            .values(status="running", attempts=1)
+        )
+        await db.commit()
+
+    runner = await start_runner(analyzer)
+    # Even a direct delivery does not take the job from its owner
+    await runner.queue.enqueue(submitted.job_id)
+    await finish(runner)
+
+    job = await runner.get_status(submitted.job_id)
+    assert job.status == "running"
+    assert job.items[0].status == "running"
+    assert analyzed == []
+    assert runner.get_stats()["jobs_resumed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_between_read_and_claim_wins(
+    start_runner, session_factory, monkeypatch
+):
+    """Test a job cancelled after the worker read it is not restarted"""
+    analyzed = []
+
+    async def analyzer(location, limits):
+        analyzed.append(location["lat"])
+        return {}
+
+    runner = await start_runner(analyzer)
+    get_job = runner._get_job
+
+    async def get_job_then_cancel(db, job_id):
+        job = await get_job(db, job_id)
+        async with session_factory() as other:
+            await other.execute(
+                update(BatchJob)
+                .where(BatchJob.job_id == job_id)
+                .values(status="cancelled")
+            )
+            await other.commit()
+        return job
+
+    monkeypatch.setattr(runner, "_get_job", get_job_then_cancel)
+    submitted = await runner.submit(LOCATIONS)
+    await finish(runner)
+    monkeypatch.undo()
+
+    job = await runner.get_status(submitted.job_id)
+    assert job.status == "cancelled"
+    assert analyzed == []
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_stops_processing(start_runner, session_factory):
+    """Test the heartbeat stops local work once the job is taken over"""
+    started = asyncio.Event()
+    stopped = asyncio.Event()
+
+    async def analyzer(location, limits):
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        finally:
+            stopped.set()
+
+    runner = await start_runner(
+        analyzer, BATCH_ANALYSIS_ITEM_CONCURRENCY=1, BATCH_ANALYSIS_LEASE_SECONDS=0.05
+    )
+    submitted = await runner.submit(LOCATIONS)
+    await asyncio.wait_for(started.wait(), timeout=5)
+
+    async with session_factory() as db:
+        await db.execute(
+            update(BatchJob)
+            .where(BatchJob.job_id == submitted.job_id)
+            .values(owner="other-instance")
+        )
+        await db.commit()
+    await asyncio.wait_for(stopped.wait(), timeout=5)
+    await finish(runner)
+
+    job = await runner.get_status(submitted.job_id)
+    assert job.status == "running"
+    assert job.finished_at is None
+
+
+@pytest.mark.asyncio
+async def test_idempotency_key(start_runner, session_factory):
+    """Test a repeated key returns the same job and a different body conflicts"""
+    runner = await start_runner()
+
+    first = await runner.submit(LOCATIONS, idempotency_key="key-1")
+    again = await runner.submit(LOCATIONS, idempotency_key="key-1")
+    assert again.job_id == first.job_id
+    with pytest.raises(BatchJobConflictError):
+        await runner.submit(LOCATIONS[:1], idempotency_key="key-1")
+    await finish(runner)
+
+    async with session_factory() as db:
+        jobs = (await db.execute(select(BatchJob))).scalars().all()
+    assert len(jobs) == 1
+
+
+@pytest.mark.asyncio
+async def test_analyze_location_respects_upstream_limits(monkeypatch):
+    """Test geocoding calls are bounded by the shared geocoding limit"""
+    in_flight = 0
+    peak = 0
+
+    async def geocode(address):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        result = GeocodingResult(
+            lat=35.0036,
+            lng=135.7736,
+            formatted_address=address,
+            prefecture="京都府",
+            city="京都市東山区",
+        )
+        return result, None
+
+    async def lookup_zoning(lat, lng, prefecture, load_limit=None):
+        return ZoningResult(
+            area_code="26105-001",
+            zoning_type="商業地域",
+            building_coverage_ratio=80.0,
+            floor_area_ratio=400.0,
+        )
+
+    school = NearbySchool(
+        school_code="S1",
+        name="学校",
+        school_type="elementary",
+        lat=35.0,
+        lng=135.77,
+        distance=250.0,
+    )
+    monkeypatch.setattr(batch_jobs, "geocode_address_with_metadata", geocode)
+    monkeypatch.setattr(batch_jobs, "lookup_zoning", lookup_zoning)
+    monkeypatch.setattr(batch_jobs, "find_nearest_schools", lambda *a, **k: [school])
+
+    limits = {"geocoding": asyncio.Semaphore(2), "database": asyncio.Semaphore(1)}
+    location = {
+        "address": "京都府京都市東山区祇園町南側570-120",
+        "revpar": 6000.0,
+        "occupancy": 70.0,
+        "market_avg_revpar": 5000.0,
+        "confidence": 0.8,
+    }
+    results = await asyncio.gather(
+        *(analyze_location(location, limits) for _ in range(6))
+    )
+
+    assert peak == 2
+    result = results[0]
+    assert result["area"]["prefecture"] == "京都府"
+    assert result["zoning"]["zoning_type"] == "商業地域"
+    assert result["school_distance"] == 250.0
+    assert result["judgment"] == "Go"
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoints(start_runner, monkeypatch):
+    """Test submit, poll, cancel and error responses over HTTP"""
+    runner = await start_runner()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/v1/analyze/batch",
+            json={"locations": LOCATIONS},
+            headers={"Idempotency-Key": "abc"},
+        )
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert job_id.startswith("batch_")
+
+        await finish(runner)
+        response = await client.get(f"/api/v1/analyze/batch/{job_id}")
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+        assert len(response.json()["items"]) == 5
+
+        response = await client.post(f"/api/v1/analyze/batch/{job_id}/cancel")
+        assert response.json()["status"] == "completed"
+
+        response = await client.post(
+            "/api/v1/analyze/batch",
+            json={"locations": LOCATIONS[:1]},
+            headers={"Idempotency-Key": "abc"},
+        )
+        assert response.status_code == 409
+
+        response = await client.get("/api/v1/analyze/batch/batch_unknown")
+        assert response.status_code == 404
+
+        response = await client.post(
+            "/api/v1/analyze/batch", json={"locations": [{"lat": 35.0}]}
+        )
+        assert response.status_code == 422
+
+        monkeypatch.setattr(settings, "BATCH_ANALYSIS_MAX_SIZE", 2)
+        response = await client.post(
+            "/api/v1/analyze/batch", json={"locations": LOCATIONS}
+        )
+        assert response.status_code == 400
+
+
+def test_batch_endpoints_unavailable_without_workers(client):
+    """Test 503 when batch jobs have not been started"""
+    response = client.get("/api/v1/analyze/batch/batch_unknown")
+    assert response.status_code == 503
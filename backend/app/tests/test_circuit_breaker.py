@@ -0,0 +1,165 @@
+"""Test circuit breaker"""
+
+import asyncio
+import pytest
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.core.rate_limiter import RateLimitExceeded
+from app.models.geocoding import GeocodingResult
+from app.services.geocoding_providers import (
+    CircuitBreakerProvider,
+    GeocodingError,
+    GeocodingNotFoundError,
+    GeocodingUnavailableError,
+    StubGeocodingProvider,
+)
+
+ADDRESS = "東京都渋谷区道玄坂2-24-1"
+
+
+def _breaker(**kwargs) -> CircuitBreaker:
+    options = {"window_size": 4, "min_calls": 4, "half_open_max_calls": 2}
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+def test_opens_on_failure_rate():
+    """Test the circuit opens once the failure rate reaches the threshold"""
+    breaker = _breaker()
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    assert breaker.get_stats()["rejected"] == 1
+
+
+def test_opens_on_slow_calls():
+    """Test slow successful calls also open the circuit"""
+    breaker = _breaker(slow_call_threshold=1.0, slow_call_rate_threshold=0.75)
+    breaker.record_success(latency=0.1)
+    for _ in range(3):
+        breaker.record_success(latency=2.0)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_not_evaluated_before_min_calls():
+    """Test a few early failures do not open the circuit"""
+    breaker = _breaker()
+    for _ in range(3):
+        breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_closes_after_successful_trials():
+    """Test trial calls close the circuit after the open duration"""
+    breaker = _breaker(open_duration=0.0)
+    for _ in range(4):
+        breaker.record_failure()
+    assert breaker.get_stats()["times_opened"] == 1
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.allow()
+    breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    breaker.record_success()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_failure_reopens():
+    """Test a failed trial call opens the circuit again"""
+    breaker = _breaker(open_duration=0.05)
+    for _ in range(4):
+        breaker.record_failure()
+
+    breaker._opened_at -= 1.0
+    breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.get_stats()["times_opened"] == 2
+
+
+def _result() -> GeocodingResult:
+    return GeocodingResult(
+        lat=35.6586,
+        lng=139.6964,
+        formatted_address=ADDRESS,
+        prefecture="東京都",
+        city="渋谷区",
+    )
+
+
+@pytest.mark.asyncio
+async def test_provider_fails_fast_when_open():
+    """Test an open breaker skips the wrapped provider"""
+    stub = StubGeocodingProvider("stub", error=GeocodingError("upstream down"))
+    provider = CircuitBreakerProvider(stub, _breaker())
+
+    for _ in range(4):
+        with pytest.raises(GeocodingError):
+            await provider.geocode(ADDRESS)
+
+    with pytest.raises(GeocodingUnavailableError):
+        await provider.geocode(ADDRESS)
+    assert stub.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_provider_not_found_counts_as_success():
+    """Test ZERO_RESULTS answers keep the circuit closed"""
+    breaker = _breaker()
+    provider = CircuitBreakerProvider(StubGeocodingProvider("stub"), breaker)
+
+    for _ in range(5):
+        with pytest.raises(GeocodingNotFoundError):
+            await provider.geocode(ADDRESS)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.get_stats()["failure_rate"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_provider_ignores_client_side_rate_limit():
+    """Test local rate limiter rejections are not upstream failures"""
+    error = GeocodingError("Google Maps API rate limit exceeded")
+    error.__cause__ = RateLimitExceeded("over quota")
+    breaker = _breaker()
+    provider = CircuitBreakerProvider(
+        StubGeocodingProvider("stub", error=error), breaker
+    )
+
+    for _ in range(5):
+        with pytest.raises(GeocodingError):
+            await provider.geocode(ADDRESS)
+
+    assert breaker.get_stats()["calls_in_window"] == 0
+
+
+@pytest.mark.asyncio
+async def test_provider_cancellation_releases_trial_slot():
+    """Test a cancelled half-open call frees its trial slot"""
+    breaker = _breaker(open_duration=0.0, half_open_max_calls=1)
+    for _ in range(4):
+        breaker.record_failure()
+    provider = CircuitBreakerProvider(
+        StubGeocodingProvider("stub", {ADDRESS: _result()}, delay=1.0), breaker
+    )
+
+    task = asyncio.create_task(provider.geocode(ADDRESS))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    breaker.allow()
@@ -0,0 +1,83 @@
+"""Test cache value codec"""
+
+import json
+import pytest
+from unittest.mock import patch
+
+from app.core import codec as codec_module
+from app.core.codec import (
+    COMPRESSION_NONE,
+    COMPRESSION_ZLIB,
+    Codec,
+    CodecError,
+    build_codec,
+    decode,
+    is_encoded,
+)
+
+
+@pytest.fixture
+def payload():
+    """Analysis-sized payload with repetitive text"""
+    return {
+        "area": "京都府京都市東山区祇園町南側",
+        "profitability": {"adr": 18500.0, "occupancy": 0.72, "roi": 0.081},
+        "review_themes": [
+            {"theme": "立地", "sentiment": 0.9, "quote": "駅から近く便利でした" * 5}
+            for _ in range(30)
+        ],
+        "licensed": True,
+        "notes": None,
+    }
+
+
+def test_roundtrip_with_compression(payload):
+    """Test large values are compressed and decode back unchanged"""
+    codec = Codec(compression="zlib", compress_min_bytes=256)
+
+    data = codec.encode(payload)
+
+    assert is_encoded(data)
+    assert data[2] == COMPRESSION_ZLIB
+    assert len(data) < len(json.dumps(payload, ensure_ascii=False).encode())
+    assert decode(data) == payload
+
+
+def test_small_values_are_not_compressed():
+    """Test values under the threshold skip compression"""
+    codec = Codec(compression="zlib", compress_min_bytes=1024)
+
+    data = codec.encode({"lat": 35.0})
+
+    assert data[2] == COMPRESSION_NONE
+    assert codec.decode(data) == {"lat": 35.0}
+
+
+def test_missing_compression_library_falls_back_to_zlib(payload):
+    """Test an uninstalled compressor falls back to zlib"""
+    with patch.object(codec_module, "zstandard", None):
+        codec = Codec(compression="zstd", compress_min_bytes=0)
+
+    assert codec.compression == "zlib"
+    assert decode(codec.encode(payload)) == payload
+
+
+def test_unknown_version_and_corrupt_values_raise():
+    """Test values from a newer format version are rejected, not misread"""
+    data = Codec(compression="none").encode({"a": 1})
+
+    with pytest.raises(CodecError):
+        decode(bytes((data[0], 99)) + data[2:])
+    with pytest.raises(CodecError):
+        decode(data[:3] + b"\xc1")
+    with pytest.raises(CodecError):
+        decode(b'{"a": 1}')
+
+
+def test_legacy_values_are_not_encoded():
+    """Test JSON strings and Firestore maps are told apart from encoded values"""
+    assert not is_encoded(b'{"a": 1}')
+    assert not is_encoded({"a": 1})
+    assert build_codec("json") is None
+    with pytest.raises(ValueError):
+        build_codec("pickle")
@@ -1,7 +1,9 @@
 """Test database operations"""
 
 import pytest
-from app.db.base import SessionLocal, check_database
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.base import SessionLocal, async_database_url, check_database, get_async_db
 from app.db.models import User
 
 
@@ -27,6 +29,28 @@ async def test_database_connection():
     assert status in ["ok", "error"]
 
 
+def test_async_database_url():
+    """Test sync URLs are mapped to asyncio drivers"""
+    assert (
+        async_database_url("postgresql://user:pw@localhost:5432/areayield")
+        == "postgresql+asyncpg://user:pw@localhost:5432/areayield"
+    )
+    assert async_database_url("postgresql+psycopg2://u:p@db/x").startswith(
+        "postgresql+asyncpg://"
+    )
+    assert async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+
+@pytest.mark.asyncio
+async def test_get_async_db_yields_session():
+    """Test the async session dependency opens and closes a session"""
+    dependency = get_async_db()
+    session = await dependency.__anext__()
+    assert isinstance(session, AsyncSession)
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+
+
 def test_user_crud(db_session):
     """Test user CRUD operations"""
     # Create
@@ -0,0 +1,164 @@
+"""Test database pool and statement instrumentation"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from app.core.metrics import Histogram
+from app.db import instrumentation
+from app.db.instrumentation import (
+    DatabaseMetrics,
+    QueryAccountingMiddleware,
+    get_request_query_stats,
+    instrument_engine,
+    instrumented_pool,
+    normalize_sql,
+)
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """File-backed SQLite engine on an instrumented QueuePool of one connection"""
+    metrics = DatabaseMetrics("test", slow_threshold=60.0)
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        poolclass=instrumented_pool(QueuePool, metrics),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    instrument_engine(engine, metrics)
+    yield engine, metrics
+    engine.dispose()
+
+
+def test_normalize_sql():
+    """Test literals, bound parameters and value lists are reduced to shape"""
+    assert (
+        normalize_sql("SELECT * FROM users\n  WHERE id = 42 AND name = 'O''Brien'")
+        == "SELECT * FROM users WHERE id = ? AND name = ?"
+    )
+    assert normalize_sql(
+        "SELECT users.id FROM users WHERE users.id IN (%(id_1_1)s, %(id_1_2)s)"
+    ) == normalize_sql("SELECT users.id FROM users WHERE users.id IN ($1, $2, $3)")
+    assert (
+        normalize_sql("SELECT * FROM t WHERE a = :a") == "SELECT * FROM t WHERE a = ?"
+    )
+    assert normalize_sql("SELECT '12:30'::time") == "SELECT ?::time"
+
+
+def test_histogram_cumulative_buckets():
+    """Test bucket counts are cumulative and values past the last bound land in +Inf"""
+    histogram = Histogram([0.1, 1.0])
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    stats = histogram.get_stats()
+    assert stats["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+    assert stats["count"] == 4
+    assert stats["max"] == 3.0
+    assert stats["avg"] == pytest.approx(0.9125)
+
+
+def test_statements_and_checkouts_are_recorded(sqlite_engine):
+    """Test statement latency and checkout wait are observed per engine"""
+    engine, metrics = sqlite_engine
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+
+    stats = metrics.get_stats()
+    assert stats["statements"] == 2
+    assert stats["statement_latency"]["count"] == 2
+    assert stats["checkout_wait"]["count"] == 1
+    assert stats["pool"] == {
+        "size": 1,
+        "checked_out": 0,
+        "checked_in": 1,
+        "overflow": 0,
+    }
+
+
+def test_slow_statements_are_logged(sqlite_engine, monkeypatch):
+    """Test statements over the threshold are counted and logged normalized"""
+    engine, metrics = sqlite_engine
+    metrics.slow_threshold = 0.0
+    events = []
+    monkeypatch.setattr(
+        instrumentation.logger,
+        "warning",
+        lambda event, **kw: events.append((event, kw)),
+    )
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT :value"), {"value": 7})
+
+    assert metrics.get_stats()["slow_statements"] == 1
+    assert events[0][0] == "slow_sql_statement"
+    assert events[0][1]["sql"] == "SELECT ?"
+
+
+def test_failed_statements_are_counted(sqlite_engine):
+    """Test errors are counted and do not leave timing state behind"""
+    engine, metrics = sqlite_engine
+    with engine.connect() as conn:
+        with pytest.raises(exc.OperationalError):
+            conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+
+    stats = metrics.get_stats()
+    assert stats["statement_errors"] == 1
+    assert stats["statements"] == 1
+
+
+def test_pool_timeouts_are_counted(sqlite_engine):
+    """Test a checkout that times out is counted"""
+    engine, metrics = sqlite_engine
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    assert metrics.get_stats()["pool_timeouts"] == 1
+
+
+def test_queries_are_counted_per_request(sqlite_engine, monkeypatch):
+    """Test the middleware attributes statements to requests and flags N+1"""
+    engine, _ = sqlite_engine
+    events = []
+    monkeypatch.setattr(
+        instrumentation.logger,
+        "warning",
+        lambda event, **kw: events.append((event, kw)),
+    )
+    before = get_request_query_stats()
+
+    app = FastAPI()
+    app.add_middleware(QueryAccountingMiddleware, n_plus_one_threshold=3)
+
+    @app.get("/loop/{count}")
+    def loop(count: int):
+        with engine.connect() as conn:
+            for i in range(count):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return {"ok": True}
+
+    client = TestClient(app)
+    client.get("/loop/2")
+    client.get("/loop/4")
+    client.get("/loop/0")
+
+    after = get_request_query_stats()
+    observed = after["queries_per_request"]
+    previous = before["queries_per_request"]
+    # Requests without statements are not observed
+    assert observed["count"] - previous["count"] == 2
+    assert observed["sum"] - previous["sum"] == pytest.approx(6)
+    assert after["n_plus_one_suspects"] - before["n_plus_one_suspects"] == 1
+    assert events == [
+        (
+            "sql_n_plus_one_suspected",
+            {"path": "/loop/4", "repeats": 4, "queries": 4, "sql": "SELECT ?"},
+        )
+    ]
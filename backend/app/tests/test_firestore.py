@@ -1,11 +1,32 @@
 """Test Firestore operations"""
 
 import pytest
-from unittest.mock import Mock, patch
-from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
+from datetime import datetime, timedelta, timezone
+from app.services import firestore
 from app.services.firestore import FirestoreCache, UserProfileService
 
 
+def test_client_creation_failure_backs_off(monkeypatch):
+    """Test a failed client creation is not retried on every call"""
+    now = 1000.0
+    client = Mock(side_effect=ValueError("no credentials"))
+    monkeypatch.setattr(firestore, "db", None)
+    monkeypatch.setattr(firestore, "_client_failed_at", None)
+    monkeypatch.setattr(firestore.firestore_async, "client", client)
+    monkeypatch.setattr(firestore.time, "monotonic", lambda: now)
+
+    for _ in range(3):
+        with pytest.raises(Exception, match="not initialized"):
+            firestore._get_db()
+    assert client.call_count == 1
+
+    now += firestore.CLIENT_RETRY_INTERVAL
+    client.side_effect = None
+    assert firestore._get_db() is client.return_value
+    assert client.call_count == 2
+
+
 @pytest.fixture
 def mock_firestore_client():
     """Mock Firestore client"""
@@ -19,7 +40,7 @@ async def test_cache_set_and_get(mock_firestore_client):
     cache = FirestoreCache()
 
     # Mock document reference
-    mock_doc_ref = Mock()
+    mock_doc_ref = AsyncMock()
     mock_doc = Mock()
     mock_doc.exists = True
     mock_doc.to_dict.return_value = {
@@ -47,7 +68,7 @@ async def test_cache_expiration(mock_firestore_client):
     cache = FirestoreCache()
 
     # Mock expired document
-    mock_doc_ref = Mock()
+    mock_doc_ref = AsyncMock()
     mock_doc = Mock()
     mock_doc.exists = True
     mock_doc.to_dict.return_value = {
@@ -65,7 +86,7 @@ async def test_cache_expiration(mock_firestore_client):
     assert value is None
 
     # Document should be deleted
-    mock_doc_ref.delete.assert_called_once()
+    mock_doc_ref.delete.assert_awaited_once()
 
 
 @pytest.mark.asyncio
@@ -73,7 +94,7 @@ async def test_user_profile_crud(mock_firestore_client):
     """Test user profile CRUD operations"""
     service = UserProfileService()
 
-    mock_doc_ref = Mock()
+    mock_doc_ref = AsyncMock()
     mock_firestore_client.collection.return_value.document.return_value = mock_doc_ref
 
     # Create profile
@@ -81,7 +102,7 @@ async def test_user_profile_crud(mock_firestore_client):
         "test123", {"email": "test@example.com", "full_name": "Test User"}
     )
     assert result is True
-    mock_doc_ref.set.assert_called_once()
+    mock_doc_ref.set.assert_awaited_once()
 
     # Get profile
     mock_doc = Mock()
@@ -99,9 +120,271 @@ async def test_user_profile_crud(mock_firestore_client):
     # Update profile
     result = await service.update_profile("test123", {"full_name": "Updated Name"})
     assert result is True
-    mock_doc_ref.update.assert_called_once()
+    mock_doc_ref.update.assert_awaited_once()
 
     # Delete profile
     result = await service.delete_profile("test123")
     assert result is True
-    mock_doc_ref.delete.assert_called()
+    mock_doc_ref.delete.assert_awaited()
+
+
+@pytest.mark.asyncio
+async def test_cache_get_does_not_block_event_loop(mock_firestore_client):
+    """Test concurrent cache reads overlap instead of running back to back"""
+    import asyncio
+    import time
+
+    cache = FirestoreCache()
+
+    async def slow_get():
+        await asyncio.sleep(0.05)
+        mock_doc = Mock()
+        mock_doc.exists = False
+        return mock_doc
+
+    mock_doc_ref = AsyncMock()
+    mock_doc_ref.get.side_effect = slow_get
+    mock_firestore_client.collection.return_value.document.return_value = mock_doc_ref
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(cache.get(f"key:{i}") for i in range(10)))
+
+    assert results == [None] * 10
+    assert time.monotonic() - start < 0.25
+
+
+def _expired_query(mock_firestore_client, ids, page_size, clock=None):
+    """Mock the paginated expired-entry query over the given document ids"""
+    collection = mock_firestore_client.collection.return_value
+    ordered = collection.where.return_value.order_by.return_value.order_by
+    query = ordered.return_value.select.return_value.limit.return_value
+    query.start_after.return_value = query
+    pages = iter([ids[i : i + page_size] for i in range(0, len(ids), page_size)])
+    expires_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def stream():
+        if clock is not None:
+            clock[0] += 10
+        page = next(pages, [])
+
+        async def docs():
+            for doc_id in page:
+                doc = Mock()
+                doc.id = doc_id
+                doc.get.return_value = expires_at
+                yield doc
+
+        return docs()
+
+    query.stream.side_effect = stream
+
+    batches = []
+
+    def make_batch():
+        batch = Mock()
+        batch.commit = AsyncMock()
+        batches.append(batch)
+        return batch
+
+    mock_firestore_client.batch.side_effect = make_batch
+    return query, batches
+
+
+@pytest.mark.asyncio
+async def test_clear_expired(mock_firestore_client):
+    """Test expired entries are deleted in pages of batched deletes"""
+    cache = FirestoreCache()
+    ids = [f"key:{i}" for i in range(1200)]
+    query, batches = _expired_query(mock_firestore_client, ids, 500)
+
+    assert await cache.clear_expired() == 1200
+
+    assert [batch.delete.call_count for batch in batches] == [500, 500, 200]
+    assert query.stream.call_count == 3
+    stats = cache.get_stats()
+    assert stats["purge_deleted"] == 1200
+    assert stats["last_purge"]["pages"] == 3
+    assert stats["last_purge"]["complete"] is True
+    assert stats["last_purge"]["cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_purge_expired_resumes_from_cursor(mock_firestore_client):
+    """Test a purge stopped by its time budget can be resumed"""
+    cache = FirestoreCache()
+    ids = [f"key:{i}" for i in range(50)]
+    clock = [0.0]
+    query, batches = _expired_query(mock_firestore_client, ids, 10, clock)
+
+    with patch("app.services.firestore.time.monotonic", lambda: clock[0]):
+        result = await cache.purge_expired(page_size=10, time_budget=15)
+
+    # Two pages fit in the budget; deletes already started are finished
+    assert result.pages == 2
+    assert result.deleted == 20
+    assert not result.complete
+    assert result.cursor["id"] == "key:19"
+
+    result = await cache.purge_expired(page_size=10, cursor=result.cursor)
+
+    cursor_fields = query.start_after.call_args_list[0][0][0]
+    assert cursor_fields["expires_at"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert result.deleted == 30
+    assert result.complete
+    assert cache.get_stats()["purge_deleted"] == 50
+
+
+@pytest.mark.asyncio
+async def test_clear_expired_skipped_with_native_ttl(mock_firestore_client):
+    """Test the app-side purge is skipped when a TTL policy is configured"""
+    cache = FirestoreCache()
+
+    with patch("app.services.firestore.settings.FIRESTORE_CACHE_NATIVE_TTL", True):
+        assert await cache.clear_expired() == 0
+
+    mock_firestore_client.collection.assert_not_called()
+
+
+def _snapshot(key, value, expires_in):
+    doc = Mock()
+    doc.id = key
+    doc.exists = value is not None
+    doc.to_dict.return_value = {
+        "key": key,
+        "value": value,
+        "expires_at": datetime.now(timezone.utc) + timedelta(seconds=expires_in),
+    }
+    return doc
+
+
+@pytest.mark.asyncio
+async def test_cache_get_many(mock_firestore_client):
+    """Test bulk reads skip missing and expired entries"""
+    cache = FirestoreCache()
+    snapshots = {
+        "a": _snapshot("a", 1, 3600),
+        "b": _snapshot("b", 2, -60),
+        "c": _snapshot("c", None, 3600),
+    }
+    requested = []
+
+    async def get_all(refs):
+        requested.append(len(refs))
+        for ref in refs:
+            yield snapshots[ref.id]
+
+    mock_firestore_client.collection.return_value.document.side_effect = (
+        lambda key: Mock(id=key)
+    )
+    mock_firestore_client.get_all = get_all
+    batch = Mock()
+    batch.commit = AsyncMock()
+    mock_firestore_client.batch.return_value = batch
+
+    values = await cache.get_many(["a", "b", "c", "a"])
+
+    assert values == {"a": 1}
+    assert requested == [3]
+    # Expired entry deleted in one batch
+    assert batch.delete.call_count == 1
+    batch.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cache_get_many_partial_failure(mock_firestore_client):
+    """Test a failed chunk counts as misses without losing other chunks"""
+    cache = FirestoreCache()
+    calls = 0
+
+    async def get_all(refs):
+        nonlocal calls
+        calls += 1
+        if calls == 2:
+            raise RuntimeError("deadline exceeded")
+        for ref in refs:
+            yield _snapshot(ref.id, ref.id, 3600)
+
+    mock_firestore_client.collection.return_value.document.side_effect = (
+        lambda key: Mock(id=key)
+    )
+    mock_firestore_client.get_all = get_all
+
+    with patch("app.services.firestore.MAX_BATCH_READS", 2):
+        values = await cache.get_many(["a", "b", "c", "d", "e"])
+
+    assert calls == 3
+    assert len(values) == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_set_many_chunks_writes(mock_firestore_client):
+    """Test bulk writes are split into batches of at most 500"""
+    cache = FirestoreCache()
+    batches = []
+
+    def make_batch():
+        batch = Mock()
+        batch.commit = AsyncMock()
+        batches.append(batch)
+        return batch
+
+    mock_firestore_client.batch.side_effect = make_batch
+    items = {f"key:{i}": i for i in range(1200)}
+
+    result = await cache.set_many(items, ttl=60, ttls={"key:0": 3600})
+
+    assert result.ok
+    assert len(result.succeeded) == 1200
+    assert [batch.set.call_count for batch in batches] == [500, 500, 200]
+    first = batches[0].set.call_args_list[0][0][1]
+    second = batches[0].set.call_args_list[1][0][1]
+    assert first["expires_at"] - first["created_at"] == timedelta(seconds=3600)
+    assert second["expires_at"] - second["created_at"] == timedelta(seconds=60)
+
+
+@pytest.mark.asyncio
+async def test_cache_delete_many_reports_failed_batch(mock_firestore_client):
+    """Test a failed commit is reported per key"""
+    cache = FirestoreCache()
+    batches = []
+
+    def make_batch():
+        batch = Mock()
+        batch.commit = AsyncMock(
+            side_effect=RuntimeError("unavailable") if len(batches) == 1 else None
+        )
+        batches.append(batch)
+        return batch
+
+    mock_firestore_client.batch.side_effect = make_batch
+
+    with patch("app.services.firestore.MAX_BATCH_WRITES", 2):
+        result = await cache.delete_many(["a", "b", "c", "d", "e"])
+
+    assert not result.ok
+    assert sorted(result.failed) == ["c", "d"]
+    assert sorted(result.succeeded) == ["a", "b", "e"]
+
+
+@pytest.mark.asyncio
+async def test_cache_codec_stores_bytes(mock_firestore_client):
+    """Test values are stored encoded and decoded on read"""
+    from app.core.codec import Codec, is_encoded
+
+    cache = FirestoreCache(codec=Codec(compression="zlib", compress_min_bytes=0))
+    mock_doc_ref = AsyncMock()
+    mock_firestore_client.collection.return_value.document.return_value = mock_doc_ref
+
+    await cache.set("k", {"themes": ["立地"] * 100})
+    stored = mock_doc_ref.set.await_args[0][0]
+    assert is_encoded(stored["value"])
+
+    mock_doc = Mock()
+    mock_doc.exists = True
+    mock_doc.to_dict.return_value = stored
+    mock_doc_ref.get.return_value = mock_doc
+    assert await cache.get("k") == {"themes": ["立地"] * 100}
+
+    # Corrupt values are misses
+    mock_doc.to_dict.return_value = {**stored, "value": stored["value"][:3] + b"x"}
+    assert await cache.get("k") is None
@@ -0,0 +1,162 @@
+"""Test offline gazetteer geocoder"""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services import gazetteer as gazetteer_module
+from app.services.address_normalizer import normalize_address
+from app.services.gazetteer import GazetteerError, GazetteerIndex, read_mlit_csv
+from app.services.geocoding import geocode_address
+
+MLIT_CSV = """\
+"都道府県コード","都道府県名","市区町村コード","市区町村名","大字町丁目コード","大字町丁目名","緯度","経度","原典資料コード","大字・字・丁目区分コード"
+"26","京都府","26105","京都市東山区","261050001","祇園町南側","35.003611","135.775278","4","1"
+"26","京都府","26105","京都市東山区","261050002","祇園町北側","35.004722","135.775556","4","1"
+"13","東京都","13206","府中市","132060001","宮西町","35.671111","139.477222","4","1"
+"34","広島県","34208","府中市","342080001","宮西町","34.568333","133.236944","4","1"
+"47","沖縄県","47201","那覇市","472010001","おもろまち","26.221389","127.693056","4","1"
+"13","東京都","13113","渋谷区","131130001","道玄坂一丁目","35.657778","139.697222","4","2"
+"13","東京都","13113","渋谷区","131130002","道玄坂二丁目","35.658611","139.696389","4","2"
+"""
+
+
+@pytest.fixture
+def mlit_csv(tmp_path):
+    """MLIT 位置参照情報 CSV fixture"""
+    path = tmp_path / "mlit.csv"
+    path.write_text(MLIT_CSV, encoding="cp932")
+    return str(path)
+
+
+@pytest.fixture
+def index(mlit_csv):
+    """Gazetteer index built from the CSV fixture"""
+    return GazetteerIndex.build(read_mlit_csv(mlit_csv))
+
+
+def test_read_mlit_csv(mlit_csv):
+    """Test reading the MLIT CSV format"""
+    rows = list(read_mlit_csv(mlit_csv))
+
+    assert len(rows) == 7
+    assert rows[0]["prefecture"] == "京都府"
+    assert rows[0]["district"] == "祇園町南側"
+    assert rows[0]["lat"] == 35.003611
+
+
+def test_read_mlit_csv_missing_columns(tmp_path):
+    """Test CSVs without the expected columns are rejected"""
+    path = tmp_path / "bad.csv"
+    path.write_text("a,b\n1,2\n", encoding="cp932")
+
+    with pytest.raises(GazetteerError):
+        list(read_mlit_csv(str(path)))
+
+
+def test_lookup_with_banchi(index):
+    """Test addresses with 番地 resolve to their 町丁目"""
+    result = index.lookup(normalize_address("京都府京都市東山区祇園町南側570-120"))
+
+    assert result is not None
+    assert result.prefecture == "京都府"
+    assert result.city == "京都市東山区"
+    assert result.district == "祇園町南側"
+    assert result.lat == 35.0036
+    assert result.lng == 135.7753
+
+
+@pytest.mark.parametrize(
+    "address",
+    [
+        "東京都渋谷区道玄坂二丁目24番1号",
+        "東京都渋谷区道玄坂2丁目24-1",
+        "渋谷区道玄坂２－２４－１",
+        "東京都渋谷区道玄坂二丁目",
+    ],
+)
+def test_lookup_chome_variants(index, address):
+    """Test 丁目 spelling variants resolve to the same 町丁目"""
+    result = index.lookup(normalize_address(address))
+
+    assert result is not None
+    assert result.district == "道玄坂二丁目"
+
+
+def test_lookup_chome_number_boundary(index):
+    """Test 道玄坂1 does not match 道玄坂12"""
+    assert index.lookup(normalize_address("東京都渋谷区道玄坂12-3")) is None
+
+
+def test_lookup_without_prefecture(index):
+    """Test addresses without the prefecture still resolve"""
+    result = index.lookup(normalize_address("那覇市おもろまち1-1-1"))
+
+    assert result is not None
+    assert result.prefecture == "沖縄県"
+
+
+def test_lookup_ambiguous(index):
+    """Test the same 市区町村+町丁目 in two prefectures is ambiguous"""
+    assert index.lookup(normalize_address("府中市宮西町1-1")) is None
+    assert index.get_stats()["ambiguous"] == 1
+
+    # With the prefecture it is unambiguous
+    result = index.lookup(normalize_address("東京都府中市宮西町1-1"))
+    assert result.prefecture == "東京都"
+
+
+def test_lookup_requires_district_boundary(index):
+    """Test partial 町丁目 matches fall back instead of guessing"""
+    assert index.lookup(normalize_address("京都府京都市東山区祇園町南側大和町")) is None
+    assert index.lookup(normalize_address("京都府京都市東山区")) is None
+    assert index.lookup(normalize_address("大阪府大阪市中央区難波5-1-60")) is None
+    assert index.get_stats()["misses"] == 3
+
+
+def test_degraded_retry_counts_one_miss(index):
+    """Test a strict miss retried without the boundary check is one miss"""
+    address = normalize_address("京都府京都市東山区祇園町南側大和町")
+    assert index.lookup(address) is None
+    assert index.lookup(address, strict=False).district == "祇園町南側"
+
+    missing = normalize_address("大阪府大阪市中央区難波5-1-60")
+    assert index.lookup(missing) is None
+    assert index.lookup(missing, strict=False) is None
+
+    stats = index.get_stats()
+    assert (stats["hits"], stats["misses"], stats["degraded_hits"]) == (0, 2, 1)
+
+
+def test_save_and_load(index, tmp_path):
+    """Test the index file round trip"""
+    path = str(tmp_path / "gazetteer.json.gz")
+    index.save(path)
+    loaded = GazetteerIndex.load(path)
+
+    assert len(loaded) == len(index)
+    assert loaded.keys == index.keys
+    assert loaded.lookup("京都府京都市東山区祇園町北側") is not None
+
+
+def test_load_rejects_other_versions(index, tmp_path):
+    """Test stale index files are rejected"""
+    path = str(tmp_path / "gazetteer.json.gz")
+    with patch("app.services.gazetteer.INDEX_FORMAT_VERSION", 0):
+        index.save(path)
+
+    with pytest.raises(GazetteerError):
+        GazetteerIndex.load(path)
+
+
+@pytest.mark.asyncio
+async def test_geocode_address_uses_gazetteer_first(index):
+    """Test gazetteer hits never reach the Google API"""
+    mock_api = AsyncMock()
+
+    with patch.object(gazetteer_module, "_gazetteer", index), patch.object(
+        gazetteer_module, "_gazetteer_loaded", True
+    ), patch("app.services.geocoding._call_geocoding_api", new=mock_api):
+        result = await geocode_address("京都府京都市東山区祇園町南側570-120")
+
+    assert result.district == "祇園町南側"
+    mock_api.assert_not_awaited()
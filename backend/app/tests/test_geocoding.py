@@ -1,10 +1,12 @@
 """Test geocoding service"""
 
+import asyncio
 import os
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 from app.services.geocoding import (
     geocode_address,
+    geocode_batch,
     normalize_address,
     GeocodingError,
     GeocodingResult,
@@ -125,9 +127,9 @@ def test_normalize_address_empty():
 
 
 @pytest.mark.asyncio
-@patch("app.services.geocoding.httpx.AsyncClient")
+@patch("app.services.geocoding.get_http_client")
 @patch("app.services.geocoding.settings")
-async def test_geocode_with_rate_limiting(mock_settings, mock_client):
+async def test_geocode_with_rate_limiting(mock_settings, mock_get_client):
     """Test rate limiting behavior"""
     mock_settings.GOOGLE_MAPS_API_KEY = "test-api-key"
     mock_response = Mock()
@@ -139,7 +141,7 @@ async def test_geocode_with_rate_limiting(mock_settings, mock_client):
 
     mock_instance = AsyncMock()
     mock_instance.get.return_value = mock_response
-    mock_client.return_value.__aenter__.return_value = mock_instance
+    mock_get_client.return_value = mock_instance
 
     with pytest.raises(GeocodingError) as exc_info:
         await geocode_address("京都府京都市")
@@ -150,14 +152,14 @@ async def test_geocode_with_rate_limiting(mock_settings, mock_client):
 
 
 @pytest.mark.asyncio
-@patch("app.services.geocoding.httpx.AsyncClient")
+@patch("app.services.geocoding.get_http_client")
 @patch("app.services.geocoding.settings")
-async def test_geocode_network_error(mock_settings, mock_client):
+async def test_geocode_network_error(mock_settings, mock_get_client):
     """Test handling network errors"""
     mock_settings.GOOGLE_MAPS_API_KEY = "test-api-key"
     mock_instance = AsyncMock()
     mock_instance.get.side_effect = Exception("Network error")
-    mock_client.return_value.__aenter__.return_value = mock_instance
+    mock_get_client.return_value = mock_instance
 
     with pytest.raises(GeocodingError) as exc_info:
         await geocode_address("京都府京都市")
@@ -200,3 +202,68 @@ def test_geocoding_result_model():
     assert result.lng == 135.7736
     assert result.prefecture == "京都府"
     assert result.city == "京都市東山区"
+
+
+@pytest.mark.asyncio
+async def test_geocode_batch_bounded_concurrency():
+    """Test batch lookups respect the concurrency limit"""
+    in_flight = 0
+    max_in_flight = 0
+
+    async def slow_geocode(address):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return address
+
+    addresses = [f"京都府京都市{i}" for i in range(10)]
+    with patch("app.services.geocoding.geocode_address", new=slow_geocode):
+        outcomes = [item async for item in geocode_batch(addresses, concurrency=3)]
+
+    assert max_in_flight == 3
+    assert sorted(i for indices, _ in outcomes for i in indices) == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_geocode_degraded_offline_when_circuit_open():
+    """Test an open circuit falls back to a loose gazetteer match"""
+    from app.services import geocoding
+    from app.services.gazetteer import GazetteerIndex
+
+    gazetteer = GazetteerIndex.build(
+        [
+            {
+                "prefecture": "東京都",
+                "city": "渋谷区",
+                "district": "宇田川町",
+                "lat": 35.6617,
+                "lng": 139.6980,
+            }
+        ]
+    )
+    breaker = geocoding._geocoder.primary.breaker
+    for _ in range(breaker.min_calls):
+        breaker.record_failure()
+
+    with patch("app.services.geocoding.get_gazetteer", return_value=gazetteer):
+        result = await geocode_address("東京都渋谷区宇田川町センター街")
+
+    assert result.district == "宇田川町"
+    assert breaker.get_stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_geocode_circuit_open_without_gazetteer():
+    """Test an open circuit fails fast when no offline result exists"""
+    from app.services import geocoding
+    from app.services.geocoding_providers import GeocodingUnavailableError
+
+    breaker = geocoding._geocoder.primary.breaker
+    for _ in range(breaker.min_calls):
+        breaker.record_failure()
+
+    with patch("app.services.geocoding.get_gazetteer", return_value=None):
+        with pytest.raises(GeocodingUnavailableError):
+            await geocode_address("京都府京都市")
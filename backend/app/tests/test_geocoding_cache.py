@@ -0,0 +1,225 @@
+"""Test geocoding result cache"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.core.lru import LRUCache
+from app.models.geocoding import GeocodingResult
+from app.services import geocoding
+from app.services.geocoding import (
+    geocode_address,
+    geocode_address_with_metadata,
+    GeocodingNotFoundError,
+)
+from app.services.geocoding_cache import GeocodingCache, cache_key, geocoding_cache
+
+
+@pytest.fixture
+def sample_result():
+    """Sample geocoding result"""
+    return GeocodingResult(
+        lat=35.0036,
+        lng=135.7736,
+        formatted_address="京都府京都市東山区祇園町南側",
+        prefecture="京都府",
+        city="京都市東山区",
+        district="祇園町南側",
+    )
+
+
+@pytest.fixture
+def api_response():
+    """Sample Geocoding API response"""
+    return {
+        "status": "OK",
+        "results": [
+            {
+                "formatted_address": "日本、〒605-0074 京都府京都市東山区祇園町南側",
+                "geometry": {"location": {"lat": 35.003612, "lng": 135.773611}},
+                "address_components": [
+                    {"long_name": "京都府", "types": ["administrative_area_level_1"]},
+                    {"long_name": "京都市東山区", "types": ["locality"]},
+                    {"long_name": "祇園町南側", "types": ["sublocality_level_2"]},
+                ],
+            }
+        ],
+    }
+
+
+def test_cache_key_is_stable():
+    """Test cache keys are deterministic and Firestore-safe"""
+    key = cache_key("京都府京都市東山区")
+    assert key == cache_key("京都府京都市東山区")
+    assert key != cache_key("京都府京都市中京区")
+    assert "/" not in key
+
+
+@pytest.mark.asyncio
+async def test_local_tier_hit(sample_result):
+    """Test results are served from the in-process tier"""
+    cache = GeocodingCache(local=LRUCache(max_entries=10, ttl=60))
+
+    assert await cache.get("京都府京都市東山区") is None
+    await cache.set_result("京都府京都市東山区", sample_result)
+    entry = await cache.get("京都府京都市東山区")
+
+    assert entry["status"] == "OK"
+    assert entry["result"]["lat"] == 35.0036
+    stats = cache.get_stats()
+    assert stats["local_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_ratio"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_shared_tier_hit_populates_local(sample_result):
+    """Test a shared-tier hit is copied into the local tier"""
+    shared = AsyncMock()
+    shared.get.return_value = {"status": "OK", "result": sample_result.model_dump()}
+    cache = GeocodingCache(local=LRUCache(max_entries=10, ttl=60), shared=shared)
+
+    first = await cache.get("京都府京都市東山区")
+    second = await cache.get("京都府京都市東山区")
+
+    assert first == second
+    shared.get.assert_awaited_once()
+    assert cache.get_stats()["shared_hits"] == 1
+    assert cache.get_stats()["local_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_writes_go_to_both_tiers(sample_result):
+    """Test writes use the long TTL for results and short TTL for misses"""
+    shared = AsyncMock()
+    cache = GeocodingCache(
+        local=LRUCache(max_entries=10, ttl=60),
+        shared=shared,
+        ttl=86400,
+        negative_ttl=300,
+    )
+
+    await cache.set_result("a", sample_result)
+    await cache.set_not_found("b")
+
+    assert shared.set.await_args_list[0].kwargs["ttl"] == 86400
+    assert shared.set.await_args_list[1].kwargs["ttl"] == 300
+    assert (await cache.get("b"))["status"] == "ZERO_RESULTS"
+    assert cache.get_stats()["negative_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_geocode_address_uses_cache(api_response):
+    """Test repeat lookups of the same normalized address skip the API"""
+    mock_api = AsyncMock(return_value=api_response)
+
+    with patch("app.services.geocoding._call_geocoding_api", new=mock_api):
+        first = await geocode_address("京都府京都市東山区祇園町南側")
+        # Same address after normalization (full-width space)
+        second = await geocode_address("京都府京都市東山区祇園町南側　")
+
+    assert first == second
+    assert first.lat == 35.0036
+    mock_api.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_geocode_address_caches_zero_results():
+    """Test ZERO_RESULTS answers are cached"""
+    mock_api = AsyncMock(side_effect=GeocodingNotFoundError("No results found"))
+
+    with patch("app.services.geocoding._call_geocoding_api", new=mock_api):
+        for _ in range(2):
+            with pytest.raises(GeocodingNotFoundError):
+                await geocode_address("無効な住所12345")
+
+    mock_api.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_zero_results_are_not_replaced_by_secondary(monkeypatch, sample_result):
+    """Test a primary ZERO_RESULTS is cached even with a secondary configured"""
+    secondary = Mock()
+    secondary.name = "gsi"
+    secondary.geocode = AsyncMock(return_value=sample_result)
+    monkeypatch.setattr(geocoding._geocoder, "secondaries", [secondary])
+    mock_api = AsyncMock(side_effect=GeocodingNotFoundError("No results found"))
+
+    with patch("app.services.geocoding._call_geocoding_api", new=mock_api):
+        for _ in range(2):
+            with pytest.raises(GeocodingNotFoundError):
+                await geocode_address("無効な住所12345")
+
+    mock_api.assert_awaited_once()
+    secondary.geocode.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_prefetch_loads_shared_entries_in_one_call(sample_result):
+    """Test prefetch reads only local misses with a single get_many"""
+    shared = AsyncMock()
+    cache = GeocodingCache(
+        local=LRUCache(max_entries=100, ttl=60), shared=shared, ttl=3600
+    )
+    await cache.set_result("京都府京都市東山区", sample_result)
+    shared.get_many.return_value = {cache_key("京都府京都市中京区"): {"status": "ZERO_RESULTS"}}
+
+    loaded = await cache.prefetch(["京都府京都市東山区", "京都府京都市中京区", "京都府京都市北区"])
+
+    assert loaded == 1
+    shared.get_many.assert_awaited_once()
+    assert set(shared.get_many.call_args[0][0]) == {
+        cache_key("京都府京都市中京区"),
+        cache_key("京都府京都市北区"),
+    }
+    entry = await cache.get("京都府京都市中京区")
+    assert entry["status"] == "ZERO_RESULTS"
+    shared.get.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stale_result_served_while_refreshing(api_response):
+    """Test a stale entry is returned at once and refreshed in the background"""
+    address = "京都府京都市東山区祇園町南側"
+    mock_api = AsyncMock(return_value=api_response)
+
+    with patch("app.services.geocoding._call_geocoding_api", new=mock_api):
+        _, metadata = await geocode_address_with_metadata(address)
+        assert metadata.status == "miss"
+
+        # Push the entry past its soft TTL
+        entry = geocoding_cache.local.get(cache_key(address))
+        entry["fresh_until"] = entry["cached_at"] = 0
+
+        results = [await geocode_address_with_metadata(address) for _ in range(3)]
+        await geocoding._revalidator.drain()
+
+        assert all(metadata.stale for _, metadata in results)
+        assert results[0][0].lat == 35.0036
+        # One background refresh for all stale hits
+        assert mock_api.await_count == 2
+
+        _, metadata = await geocode_address_with_metadata(address)
+
+    assert metadata.status == "fresh"
+    assert mock_api.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_ttl_extends_shared_ttl(sample_result):
+    """Test results are kept for ttl + stale_ttl but go stale after ttl"""
+    shared = AsyncMock()
+    cache = GeocodingCache(
+        local=LRUCache(max_entries=10, ttl=60),
+        shared=shared,
+        ttl=3600,
+        negative_ttl=300,
+        stale_ttl=600,
+    )
+
+    await cache.set_result("a", sample_result)
+    await cache.set_not_found("b")
+
+    assert shared.set.await_args_list[0].kwargs["ttl"] == 4200
+    assert shared.set.await_args_list[1].kwargs["ttl"] == 300
+    entry = shared.set.await_args_list[0][0][1]
+    assert entry["fresh_until"] - entry["cached_at"] == 3600
@@ -0,0 +1,244 @@
+"""Test geocoding providers and hedged requests"""
+
+import asyncio
+import httpx
+import pytest
+
+from app.models.geocoding import GeocodingResult
+from app.services.geocoding_providers import (
+    GeocodingError,
+    GeocodingNotFoundError,
+    GeocodingProvider,
+    GSIGeocodingProvider,
+    HedgedGeocoder,
+    StubGeocodingProvider,
+)
+
+ADDRESS = "東京都渋谷区道玄坂2-24-1"
+
+
+def _result(source: str) -> GeocodingResult:
+    return GeocodingResult(
+        lat=35.6586,
+        lng=139.6964,
+        formatted_address=source,
+        prefecture="東京都",
+        city="渋谷区",
+    )
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    """Test no secondary request when the primary answers in time"""
+    primary = StubGeocodingProvider("primary", {ADDRESS: _result("primary")})
+    secondary = StubGeocodingProvider("secondary", {ADDRESS: _result("secondary")})
+    geocoder = HedgedGeocoder(primary, [secondary], max_delay=0.05)
+
+    result = await geocoder.geocode(ADDRESS)
+
+    assert result.formatted_address == "primary"
+    assert secondary.calls == 0
+    assert geocoder.get_stats()["hedged"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled():
+    """Test a slow primary triggers the secondary and loses the race"""
+    cancelled = asyncio.Event()
+
+    class SlowPrimary(StubGeocodingProvider):
+        async def geocode(self, normalized_address):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+    secondary = StubGeocodingProvider("secondary", {ADDRESS: _result("secondary")})
+    geocoder = HedgedGeocoder(SlowPrimary("primary"), [secondary], max_delay=0.02)
+
+    result = await geocoder.geocode(ADDRESS)
+
+    # The losing request has finished unwinding by the time geocode returns
+    assert cancelled.is_set()
+    assert result.formatted_address == "secondary"
+    stats = geocoder.get_stats()
+    assert stats["hedged"] == 1
+    assert stats["wins"] == {"secondary": 1}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_primary_is_a_latency_sample():
+    """Test a primary that lost the race still records its elapsed time"""
+    primary = StubGeocodingProvider("primary", {ADDRESS: _result("primary")}, delay=5)
+    secondary = StubGeocodingProvider("secondary", {ADDRESS: _result("secondary")})
+    geocoder = HedgedGeocoder(primary, [secondary], max_delay=0.02)
+
+    await geocoder.geocode(ADDRESS)
+
+    assert len(geocoder._latencies) == 1
+    assert geocoder._latencies[0] >= 0.02
+
+
+@pytest.mark.asyncio
+async def test_primary_can_still_win_after_hedge():
+    """Test the first good answer wins even after the hedge fired"""
+    primary = StubGeocodingProvider(
+        "primary", {ADDRESS: _result("primary")}, delay=0.03
+    )
+    secondary = StubGeocodingProvider(
+        "secondary", {ADDRESS: _result("secondary")}, delay=1
+    )
+    geocoder = HedgedGeocoder(primary, [secondary], max_delay=0.01)
+
+    result = await geocoder.geocode(ADDRESS)
+
+    assert result.formatted_address == "primary"
+    assert secondary.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_primary_falls_back_immediately():
+    """Test a primary failure moves to the secondary without waiting"""
+    primary = StubGeocodingProvider("primary", error=GeocodingError("HTTP error: 503"))
+    secondary = StubGeocodingProvider("secondary", {ADDRESS: _result("secondary")})
+    geocoder = HedgedGeocoder(primary, [secondary], hedge_enabled=False)
+
+    result = await geocoder.geocode(ADDRESS)
+
+    assert result.formatted_address == "secondary"
+    assert geocoder.get_stats()["fallbacks"] == 1
+    assert geocoder.get_stats()["failures"] == {"primary": 1}
+
+
+@pytest.mark.asyncio
+async def test_primary_not_found_is_final():
+    """Test a no-result primary is not replaced by a secondary's answer"""
+    primary = StubGeocodingProvider("primary")
+    secondary = StubGeocodingProvider("secondary", {ADDRESS: _result("secondary")})
+    geocoder = HedgedGeocoder(primary, [secondary])
+
+    with pytest.raises(GeocodingNotFoundError):
+        await geocoder.geocode(ADDRESS)
+
+    assert secondary.calls == 0
+    stats = geocoder.get_stats()
+    assert (stats["not_found"], stats["fallbacks"]) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_not_found_when_no_provider_has_result():
+    """Test not-found wins over other errors when nothing succeeded"""
+    primary = StubGeocodingProvider("primary", error=GeocodingError("down"))
+    secondary = StubGeocodingProvider("secondary")
+    geocoder = HedgedGeocoder(primary, [secondary])
+
+    with pytest.raises(GeocodingNotFoundError):
+        await geocoder.geocode(ADDRESS)
+
+
+@pytest.mark.asyncio
+async def test_all_providers_fail():
+    """Test the primary's error is raised when every provider fails"""
+    primary = StubGeocodingProvider("primary", error=GeocodingError("rate limit"))
+    secondary = StubGeocodingProvider("secondary", error=GeocodingError("down"))
+    geocoder = HedgedGeocoder(primary, [secondary])
+
+    with pytest.raises(GeocodingError, match="rate limit"):
+        await geocoder.geocode(ADDRESS)
+
+
+def test_provider_must_implement_geocode():
+    """Test an incomplete provider fails at construction"""
+
+    class Incomplete(GeocodingProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_hedge_delay_tracks_percentile():
+    """Test the hedge delay follows the primary's latency percentile"""
+    geocoder = HedgedGeocoder(
+        StubGeocodingProvider(),
+        hedge_percentile=90,
+        min_delay=0.05,
+        max_delay=2.0,
+        min_samples=10,
+    )
+    assert geocoder.hedge_delay() == 2.0  # not warmed up
+
+    geocoder._latencies.extend([0.1] * 9 + [1.0])
+    assert geocoder.hedge_delay() == 0.1
+
+    geocoder._latencies.extend([0.01] * 100)
+    assert geocoder.hedge_delay() == 0.05  # clamped to min_delay
+
+
+def _gsi_provider(handler) -> GSIGeocodingProvider:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return GSIGeocodingProvider(client_factory=lambda: client)
+
+
+@pytest.mark.asyncio
+async def test_gsi_provider_parses_response():
+    """Test the 国土地理院 address search response is parsed"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["q"] == ADDRESS
+        return httpx.Response(
+            200,
+            json=[
+                {
+                    "geometry": {
+                        "coordinates": [139.696389, 35.658611],
+                        "type": "Point",
+                    },
+                    "type": "Feature",
+                    "properties": {"addressCode": "", "title": "東京都渋谷区道玄坂二丁目"},
+                }
+            ],
+        )
+
+    result = await _gsi_provider(handler).geocode(ADDRESS)
+
+    assert result.lat == 35.6586
+    assert result.lng == 139.6964
+    assert result.prefecture == "東京都"
+    assert result.city == "渋谷区"
+    assert result.district == "道玄坂二丁目"
+
+
+@pytest.mark.asyncio
+async def test_gsi_provider_designated_city_ward():
+    """Test 政令市の区 are kept in the city field"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            json=[
+                {
+                    "geometry": {"coordinates": [135.775278, 35.003611]},
+                    "properties": {"title": "京都府京都市東山区祇園町南側"},
+                }
+            ],
+        )
+
+    result = await _gsi_provider(handler).geocode("京都府京都市東山区祇園町南側")
+
+    assert result.prefecture == "京都府"
+    assert result.city == "京都市東山区"
+    assert result.district == "祇園町南側"
+
+
+@pytest.mark.asyncio
+async def test_gsi_provider_errors():
+    """Test empty responses and HTTP errors"""
+    empty = _gsi_provider(lambda request: httpx.Response(200, json=[]))
+    with pytest.raises(GeocodingNotFoundError):
+        await empty.geocode(ADDRESS)
+
+    failing = _gsi_provider(lambda request: httpx.Response(503))
+    with pytest.raises(GeocodingError, match="503"):
+        await failing.geocode(ADDRESS)
@@ -23,3 +23,33 @@ def test_root_endpoint(client: TestClient):
     assert "message" in data
     assert "version" in data
     assert data["message"] == "AreaYield OS API"
+
+
+def test_health_reports_circuit_breakers(client: TestClient):
+    """Test health check lists breaker states and degrades when one is open"""
+    from app.core.circuit_breaker import get_circuit_breaker
+
+    response = client.get("/health")
+    assert response.json()["circuit_breakers"]["google_geocoding"] == "closed"
+
+    breaker = get_circuit_breaker("google_geocoding")
+    for _ in range(breaker.min_calls):
+        breaker.record_failure()
+
+    data = client.get("/health").json()
+    assert data["circuit_breakers"]["google_geocoding"] == "open"
+    assert data["status"] == "degraded"
+
+
+def test_metrics_endpoint(client: TestClient):
+    """Test metrics endpoint aggregates database, cache and upstream stats"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    data = response.json()
+    for engine in ("sync", "async"):
+        assert "checkout_wait" in data["database"][engine]
+        assert "statement_latency" in data["database"][engine]
+    assert "queries_per_request" in data["database"]["requests"]
+    assert "revalidation" in data["geocoding"]
+    assert "singleflight" in data["geocoding"]
+    assert "google_geocoding" in data["circuit_breakers"]
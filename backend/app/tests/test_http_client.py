@@ -0,0 +1,94 @@
+"""Test shared HTTP client"""
+
+import pytest
+import httpx
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import http_client
+
+
+@pytest.fixture(autouse=True)
+def reset_client():
+    """Make sure each test starts without a shared client"""
+    http_client._client = None
+    yield
+    http_client._client = None
+
+
+@pytest.mark.asyncio
+async def test_start_and_close_http_client():
+    """Test client lifecycle"""
+    client = await http_client.start_http_client()
+    assert isinstance(client, httpx.AsyncClient)
+    assert not client.is_closed
+
+    # Starting again reuses the same client
+    assert await http_client.start_http_client() is client
+
+    await http_client.close_http_client()
+    assert client.is_closed
+    assert http_client._client is None
+
+
+@pytest.mark.asyncio
+async def test_get_http_client_is_shared():
+    """Test the client is reused across calls"""
+    started = await http_client.start_http_client()
+    assert http_client.get_http_client() is started
+    assert http_client.get_http_client() is started
+
+
+@pytest.mark.asyncio
+async def test_get_http_client_lazy_creation():
+    """Test a client is created lazily outside the app lifespan"""
+    client = http_client.get_http_client()
+    assert isinstance(client, httpx.AsyncClient)
+    assert http_client.get_http_client() is client
+
+
+@pytest.mark.asyncio
+async def test_pool_stats():
+    """Test pool statistics are reported"""
+    stats = http_client.get_pool_stats()
+    assert stats["started"] is False
+
+    await http_client.start_http_client()
+    stats = http_client.get_pool_stats()
+    assert stats["started"] is True
+    for key in (
+        "requests_sent",
+        "http2",
+        "max_connections",
+        "max_keepalive_connections",
+    ):
+        assert key in stats
+
+
+def test_deadline_timeout_uses_client_default_without_deadline():
+    """Test the public client-default sentinel is returned without a deadline"""
+    client = http_client.get_http_client()
+    assert http_client.deadline_timeout(client) is httpx.USE_CLIENT_DEFAULT
+
+
+@pytest.mark.asyncio
+async def test_requests_are_counted():
+    """Test the request event hook counts outbound requests"""
+    client = http_client.get_http_client()
+    client._transport = httpx.MockTransport(lambda request: httpx.Response(200))
+    before = http_client.get_pool_stats()["requests_sent"]
+
+    await client.get("https://maps.googleapis.com/maps/api/geocode/json")
+
+    assert http_client.get_pool_stats()["requests_sent"] == before + 1
+
+
+def test_lifespan_manages_client():
+    """Test the app lifespan opens and closes the shared client"""
+    with TestClient(app):
+        client = http_client._client
+        assert client is not None
+        assert not client.is_closed
+
+    assert client.is_closed
+    assert http_client._client is None
@@ -0,0 +1,102 @@
+"""Test in-memory LRU cache"""
+
+from unittest.mock import patch
+
+from app.core.lru import LRUCache, estimate_size
+
+
+def test_lru_get_and_set():
+    """Test basic get/set"""
+    cache = LRUCache(max_entries=10, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert "a" in cache
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_lru_eviction_order():
+    """Test least recently used entries are evicted first"""
+    cache = LRUCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_lru_ttl_expiry():
+    """Test entries expire after their TTL"""
+    cache = LRUCache(max_entries=10, ttl=60)
+
+    with patch("app.core.lru.time.monotonic", return_value=1000.0):
+        cache.set("default", 1)
+        cache.set("short", 2, ttl=5)
+
+    with patch("app.core.lru.time.monotonic", return_value=1010.0):
+        assert cache.get("short") is None
+        assert cache.get("default") == 1
+
+    with patch("app.core.lru.time.monotonic", return_value=1061.0):
+        assert cache.get("default") is None
+
+    assert cache.get_stats()["expirations"] == 2
+    assert len(cache) == 0
+
+
+def test_lru_delete_and_clear():
+    """Test delete and clear"""
+    cache = LRUCache(max_entries=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.delete("a") is True
+    assert cache.delete("a") is False
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_lru_memory_cap():
+    """Test entries are evicted once the estimated size exceeds max_bytes"""
+    value = {"payload": "x" * 1000}
+    size = estimate_size(value)
+    cache = LRUCache(max_entries=100, ttl=60, max_bytes=size * 3)
+
+    for key in "abcd":
+        cache.set(key, value)
+
+    assert "a" not in cache
+    assert all(key in cache for key in "bcd")
+    stats = cache.get_stats()
+    assert stats["bytes"] == size * 3
+    assert stats["evictions"] == 1
+
+    cache.delete("b")
+    assert cache.get_stats()["bytes"] == size * 2
+
+
+def test_lru_skips_oversized_values():
+    """Test a value larger than max_bytes is not cached"""
+    cache = LRUCache(max_entries=100, ttl=60, max_bytes=500)
+    cache.set("small", 1)
+    cache.set("huge", "x" * 1000)
+
+    assert "huge" not in cache
+    assert cache.get("small") == 1
+
+
+def test_lru_items_skip_expired():
+    """Test items lists live entries, least recently used first"""
+    cache = LRUCache(max_entries=10, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("gone", 3, ttl=-1)
+    cache.get("a")
+
+    assert cache.items() == [("b", 2), ("a", 1)]
@@ -0,0 +1,21 @@
+"""Test the Alembic migration chain"""
+
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+BACKEND = Path(__file__).resolve().parents[2]
+
+
+def test_migrations_form_a_single_chain_from_the_initial_schema():
+    """Test upgrade head starts at the table-creating root and never branches"""
+    config = Config(str(BACKEND / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND / "alembic"))
+    script = ScriptDirectory.from_config(config)
+
+    assert len(script.get_bases()) == 1
+    assert len(script.get_heads()) == 1
+    chain = [rev.revision for rev in script.walk_revisions("base", "heads")]
+    assert chain[-1] == "5b1d0e7a9c42"  # initial schema
+    assert len(chain) == len(list(script.walk_revisions()))
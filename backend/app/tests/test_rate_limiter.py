@@ -0,0 +1,144 @@
+"""Test token-bucket rate limiter"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.core.rate_limiter import RateLimitExceeded, TokenBucketRateLimiter
+from app.core.retry import RetryPolicy
+from app.services.geocoding import _call_geocoding_api, GeocodingError
+
+
+@pytest.mark.asyncio
+async def test_burst_is_granted_immediately():
+    """Test permits within the burst do not wait"""
+    limiter = TokenBucketRateLimiter("test", rate=1, burst=3)
+
+    waits = [await limiter.acquire() for _ in range(3)]
+
+    assert waits == [0.0, 0.0, 0.0]
+    assert limiter.get_stats()["acquired"] == 3
+
+
+@pytest.mark.asyncio
+async def test_callers_queue_in_order():
+    """Test callers beyond the burst are spaced by the rate in FIFO order"""
+    limiter = TokenBucketRateLimiter("test", rate=100, burst=1)
+    order = []
+
+    async def worker(i):
+        await limiter.acquire()
+        order.append(i)
+
+    await asyncio.gather(*(worker(i) for i in range(5)))
+
+    assert order == [0, 1, 2, 3, 4]
+    stats = limiter.get_stats()
+    assert stats["max_queue_depth"] == 4
+    assert stats["queue_depth"] == 0
+    assert 0.03 <= stats["max_wait"] <= 0.05
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_wait_exceeds_timeout():
+    """Test callers that would wait past their deadline fail fast"""
+    limiter = TokenBucketRateLimiter("test", rate=10, burst=1, max_wait=0.05)
+    await limiter.acquire()
+
+    with pytest.raises(RateLimitExceeded):
+        await limiter.acquire()
+
+    assert limiter.get_stats()["rejected"] == 1
+    # A rejected caller does not consume a permit
+    assert await limiter.acquire(timeout=0.15) <= 0.1
+
+
+@pytest.mark.asyncio
+async def test_daily_budget():
+    """Test the daily budget caps total permits"""
+    limiter = TokenBucketRateLimiter("test", rate=1000, burst=10, daily_budget=2)
+    await limiter.acquire()
+    await limiter.acquire()
+
+    with pytest.raises(RateLimitExceeded, match="daily budget"):
+        await limiter.acquire()
+
+    # Budget resets on the next day
+    with patch.object(limiter, "_today", return_value="2099-01-01"):
+        await limiter.acquire()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_returns_its_permit():
+    """Test cancelling a queued acquire frees its slot and daily quota"""
+    limiter = TokenBucketRateLimiter("test", rate=10, burst=1, daily_budget=2)
+    await limiter.acquire()
+
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.get_stats()["queue_depth"] == 1
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    stats = limiter.get_stats()
+    assert stats["queue_depth"] == 0
+    assert stats["daily_used"] == 1
+    # The next caller gets the cancelled caller's slot, not the one after it
+    assert await limiter.acquire() <= 0.1
+    assert limiter.get_stats()["daily_used"] == 2
+
+
+def test_adaptive_rate():
+    """Test throttling halves the rate and success recovers it"""
+    limiter = TokenBucketRateLimiter("test", rate=10, min_rate=2, recovery_step=0.1)
+
+    limiter.record_throttled()
+    assert limiter.rate == 5
+    limiter.record_throttled()
+    limiter.record_throttled()
+    assert limiter.rate == 2  # floor
+
+    for _ in range(20):
+        limiter.record_success()
+    assert limiter.rate == 10  # capped at the configured rate
+    assert limiter.get_stats()["throttled"] == 3
+
+
+@pytest.mark.asyncio
+@patch("app.services.geocoding.get_http_client")
+@patch("app.services.geocoding.settings")
+async def test_geocoding_api_slows_down_on_over_query_limit(
+    mock_settings, mock_get_client
+):
+    """Test OVER_QUERY_LIMIT responses feed back into the limiter"""
+    mock_settings.GOOGLE_MAPS_API_KEY = "test-api-key"
+    mock_response = Mock()
+    mock_response.json.return_value = {"status": "OVER_QUERY_LIMIT"}
+    mock_client = AsyncMock()
+    mock_client.get.return_value = mock_response
+    mock_get_client.return_value = mock_client
+
+    limiter = TokenBucketRateLimiter("test", rate=50, burst=10)
+    no_retry = RetryPolicy("test", retryable=lambda e: False)
+    with patch("app.services.geocoding._rate_limiter", limiter), patch(
+        "app.services.geocoding._retry_policy", no_retry
+    ):
+        with pytest.raises(GeocodingError, match="rate limit"):
+            await _call_geocoding_api("京都府")
+
+    assert limiter.rate == 25
+    assert limiter.get_stats()["throttled"] == 1
+
+
+@pytest.mark.asyncio
+@patch("app.services.geocoding.settings")
+async def test_geocoding_api_client_side_limit(mock_settings):
+    """Test client-side rejections surface as rate limit errors"""
+    mock_settings.GOOGLE_MAPS_API_KEY = "test-api-key"
+    limiter = TokenBucketRateLimiter("test", rate=1, burst=1, daily_budget=1)
+    await limiter.acquire()
+
+    with patch("app.services.geocoding._rate_limiter", limiter):
+        with pytest.raises(GeocodingError, match="rate limit"):
+            await _call_geocoding_api("京都府")
@@ -0,0 +1,165 @@
+"""Test Redis cache backend"""
+
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core.codec import Codec
+from app.services.redis_cache import RedisCache
+
+
+def _to_bytes(value):
+    return value if isinstance(value, bytes) else value.encode()
+
+
+class FakePipeline:
+    """Queues commands and runs them against FakeRedis on execute"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key, value, ex))
+
+    def delete(self, key):
+        self.commands.append(("delete", key))
+
+    async def execute(self, raise_on_error=True):
+        self.client.round_trips += 1
+        replies = []
+        for command in self.commands:
+            if command[1] in self.client.failing_keys:
+                replies.append(Exception("OOM command not allowed"))
+            elif command[0] == "set":
+                _, key, value, ex = command
+                self.client.data[key] = _to_bytes(value)
+                self.client.ttls[key] = ex
+                replies.append(True)
+            else:
+                replies.append(int(self.client.data.pop(command[1], None) is not None))
+        return replies
+
+
+class FakeRedis:
+    """In-memory stand-in for redis.asyncio.Redis"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.failing_keys = set()
+        self.round_trips = 0
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.round_trips += 1
+        self.data[key] = _to_bytes(value)
+        self.ttls[key] = ex
+        return True
+
+    async def delete(self, key):
+        self.round_trips += 1
+        return int(self.data.pop(key, None) is not None)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def cache(fake_redis):
+    cache = RedisCache("redis://localhost:6379")
+    cache._client = fake_redis
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_set_and_get_with_native_ttl(cache, fake_redis):
+    """Test values round-trip as JSON with a Redis TTL"""
+    value = {"lat": 35.0, "name": "祇園町南側"}
+    assert await cache.set("geo:1", value, ttl=120) is True
+
+    assert await cache.get("geo:1") == value
+    assert fake_redis.ttls["cache:geo:1"] == 120
+    assert await cache.get("geo:missing") is None
+
+    assert await cache.delete("geo:1") is True
+    assert await cache.get("geo:1") is None
+
+
+@pytest.mark.asyncio
+async def test_clear_expired_is_noop(cache):
+    """Test no sweep is needed with native TTLs"""
+    assert await cache.clear_expired() == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_operations_are_pipelined(cache, fake_redis):
+    """Test bulk calls take one round trip per chunk"""
+    items = {f"k{i}": {"n": i} for i in range(10)}
+    result = await cache.set_many(items, ttl=60, ttls={"k0": 5})
+    assert result.ok
+    assert len(result.succeeded) == 10
+    assert fake_redis.ttls["cache:k0"] == 5
+    assert fake_redis.ttls["cache:k1"] == 60
+    assert fake_redis.round_trips == 1
+
+    values = await cache.get_many(["k0", "k1", "k1", "missing"])
+    assert values == {"k0": {"n": 0}, "k1": {"n": 1}}
+    assert fake_redis.round_trips == 2
+
+    result = await cache.delete_many(list(items))
+    assert result.ok
+    assert fake_redis.data == {}
+
+
+@pytest.mark.asyncio
+async def test_bulk_write_reports_per_key_failures(cache, fake_redis):
+    """Test a failed command fails only its own key"""
+    fake_redis.failing_keys.add("cache:bad")
+
+    result = await cache.set_many({"good": 1, "bad": 2})
+
+    assert result.succeeded == ["good"]
+    assert "bad" in result.failed
+    assert not result.ok
+
+
+@pytest.mark.asyncio
+async def test_errors_are_treated_as_misses(cache, fake_redis):
+    """Test connection errors do not propagate"""
+    fake_redis.get = AsyncMock(side_effect=ConnectionError("refused"))
+    fake_redis.mget = AsyncMock(side_effect=ConnectionError("refused"))
+
+    assert await cache.get("k") is None
+    assert await cache.get_many(["a", "b"]) == {}
+
+
+@pytest.mark.asyncio
+async def test_codec_reads_legacy_json(cache, fake_redis):
+    """Test enabling the codec keeps entries written as JSON readable"""
+    await cache.set("old", {"v": "旧"})
+    cache.codec = Codec(compression="zlib", compress_min_bytes=0)
+    await cache.set("new", {"v": "新" * 500})
+
+    assert fake_redis.data["cache:new"][0] == 0xCA
+    assert await cache.get_many(["old", "new"]) == {
+        "old": {"v": "旧"},
+        "new": {"v": "新" * 500},
+    }
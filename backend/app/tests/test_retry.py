@@ -0,0 +1,211 @@
+"""Test deadline-aware retries and retry budget"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock, patch
+import httpx
+import pytest
+
+from app.core.retry import (
+    DeadlineExceeded,
+    RetryBudget,
+    RetryPolicy,
+    cap_timeout,
+    deadline,
+    remaining_time,
+)
+from app.services.geocoding import (
+    GeocodingError,
+    GeocodingTransientError,
+    _call_geocoding_api,
+)
+
+
+class TransientError(Exception):
+    pass
+
+
+def _policy(**kwargs) -> RetryPolicy:
+    options = {
+        "retryable": lambda e: isinstance(e, TransientError),
+        "base_delay": 0.001,
+        "max_delay": 0.002,
+    }
+    options.update(kwargs)
+    return RetryPolicy("test", **options)
+
+
+def _flaky(failures: int, error: Exception = None):
+    calls = {"count": 0}
+
+    async def fn():
+        calls["count"] += 1
+        if calls["count"] <= failures:
+            raise error or TransientError("boom")
+        return "ok"
+
+    return fn, calls
+
+
+def test_deadline_nesting_keeps_earliest():
+    """Test an inner deadline cannot extend an outer one"""
+    assert remaining_time() is None
+    with deadline(0.5):
+        with deadline(10.0):
+            assert remaining_time() <= 0.5
+        with deadline(0.1):
+            assert remaining_time() <= 0.1
+    assert remaining_time() is None
+
+
+def test_cap_timeout():
+    """Test timeouts are capped by the remaining time"""
+    assert cap_timeout(5.0) == 5.0
+    assert cap_timeout(None) is None
+    with deadline(1.0):
+        assert cap_timeout(5.0) <= 1.0
+        assert cap_timeout(0.5) == 0.5
+        assert cap_timeout(None) <= 1.0
+
+
+@pytest.mark.asyncio
+async def test_deadline_propagates_to_tasks():
+    """Test tasks created under a deadline inherit it"""
+    with deadline(1.0):
+        remaining = await asyncio.create_task(asyncio.sleep(0, remaining_time()))
+    assert 0 < remaining <= 1.0
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors():
+    """Test transient errors are retried until success"""
+    policy = _policy()
+    fn, calls = _flaky(2)
+
+    assert await policy.call(fn) == "ok"
+    assert calls["count"] == 3
+    assert policy.get_stats()["outcomes"]["success_after_retry"] == 1
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_error_is_not_retried():
+    """Test other errors fail on the first attempt"""
+    policy = _policy()
+    fn, calls = _flaky(1, error=ValueError("bad"))
+
+    with pytest.raises(ValueError):
+        await policy.call(fn)
+    assert calls["count"] == 1
+    assert policy.get_stats()["outcomes"]["non_retryable"] == 1
+
+
+@pytest.mark.asyncio
+async def test_attempts_exhausted():
+    """Test the last error is raised after max_attempts"""
+    policy = _policy(max_attempts=3)
+    fn, calls = _flaky(5)
+
+    with pytest.raises(TransientError):
+        await policy.call(fn)
+    assert calls["count"] == 3
+    assert policy.get_stats()["outcomes"]["attempts_exhausted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_backoff_does_not_sleep_past_deadline():
+    """Test no retry is scheduled when the backoff exceeds the deadline"""
+    policy = _policy(base_delay=1.0, max_delay=1.0)
+    policy.backoff = lambda retry: 1.0
+    fn, calls = _flaky(5)
+
+    start = time.monotonic()
+    with deadline(0.2):
+        with pytest.raises(TransientError):
+            await policy.call(fn)
+
+    assert time.monotonic() - start < 0.1
+    assert calls["count"] == 1
+    assert policy.get_stats()["outcomes"]["deadline_exceeded"] == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_skips_the_call():
+    """Test no attempt is made once the deadline has passed"""
+    policy = _policy()
+    fn, calls = _flaky(0)
+
+    with deadline(0.0):
+        with pytest.raises(DeadlineExceeded):
+            await policy.call(fn)
+    assert calls["count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_limits_amplification():
+    """Test retries stop once the budget is spent"""
+    budget = RetryBudget(ratio=0.1, max_tokens=2.0)
+    policy = _policy(max_attempts=2, budget=budget)
+
+    for _ in range(10):
+        fn, _ = _flaky(5)
+        with pytest.raises(TransientError):
+            await policy.call(fn)
+
+    stats = policy.get_stats()
+    # 2 saved tokens plus 0.1 per request
+    assert stats["budget"]["retries"] == 2
+    assert stats["outcomes"]["budget_exhausted"] == 8
+    assert stats["attempts"] == 12
+
+
+def test_retry_budget_refills_with_traffic():
+    """Test successful traffic earns new retry tokens"""
+    budget = RetryBudget(ratio=0.5, max_tokens=1.0)
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+
+    budget.record_request()
+    budget.record_request()
+    assert budget.try_acquire()
+
+
+@pytest.mark.asyncio
+@patch("app.services.geocoding.get_http_client")
+@patch("app.services.geocoding.settings")
+async def test_geocoding_api_retries_server_errors(mock_settings, mock_get_client):
+    """Test 5xx responses are retried and then succeed"""
+    mock_settings.GOOGLE_MAPS_API_KEY = "test-api-key"
+    request = httpx.Request("GET", "https://maps.googleapis.com")
+    error_response = httpx.Response(503, request=request)
+    ok_response = Mock()
+    ok_response.json.return_value = {"status": "OK", "results": []}
+
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = [error_response, ok_response]
+    mock_get_client.return_value = mock_client
+
+    policy = _policy(retryable=lambda e: isinstance(e, GeocodingTransientError))
+    with patch("app.services.geocoding._retry_policy", policy):
+        data = await _call_geocoding_api("京都府")
+
+    assert data["status"] == "OK"
+    assert mock_client.get.call_count == 2
+
+
+@pytest.mark.asyncio
+@patch("app.services.geocoding.get_http_client")
+@patch("app.services.geocoding.settings")
+async def test_geocoding_api_does_not_retry_request_denied(
+    mock_settings, mock_get_client
+):
+    """Test permanent errors are not retried"""
+    mock_settings.GOOGLE_MAPS_API_KEY = "test-api-key"
+    response = Mock()
+    response.json.return_value = {"status": "REQUEST_DENIED"}
+    mock_client = AsyncMock()
+    mock_client.get.return_value = response
+    mock_get_client.return_value = mock_client
+
+    with pytest.raises(GeocodingError, match="denied"):
+        await _call_geocoding_api("京都府")
+    assert mock_client.get.call_count == 1
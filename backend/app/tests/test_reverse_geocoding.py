@@ -0,0 +1,224 @@
+"""Test offline reverse geocoding"""
+
+import gzip
+import json
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.geometry import point_in_polygon, polygons_from_geojson
+from app.services import reverse_geocoding
+from app.services.geocoding_providers import (
+    GeocodingNotFoundError,
+    GeocodingUnavailableError,
+)
+from app.services.reverse_geocoding import (
+    BoundaryIndex,
+    BoundaryIndexError,
+    reverse_geocode,
+    reverse_geocode_batch,
+)
+
+
+def _square(min_lng, min_lat, size):
+    return [
+        [min_lng, min_lat],
+        [min_lng + size, min_lat],
+        [min_lng + size, min_lat + size],
+        [min_lng, min_lat + size],
+        [min_lng, min_lat],
+    ]
+
+
+def _feature(properties, geometry):
+    return {"type": "Feature", "properties": properties, "geometry": geometry}
+
+
+FEATURES = [
+    # e-Stat 小地域 property names
+    _feature(
+        {"PREF_NAME": "東京都", "CITY_NAME": "渋谷区", "S_NAME": "道玄坂一丁目"},
+        {"type": "Polygon", "coordinates": [_square(139.690, 35.650, 0.005)]},
+    ),
+    _feature(
+        {"PREF_NAME": "東京都", "CITY_NAME": "渋谷区", "S_NAME": "道玄坂二丁目"},
+        {"type": "Polygon", "coordinates": [_square(139.695, 35.650, 0.005)]},
+    ),
+    # Polygon with a hole filled by another 町丁目
+    _feature(
+        {"prefecture": "京都府", "city": "京都市東山区", "district": "祇園町南側"},
+        {
+            "type": "Polygon",
+            "coordinates": [
+                _square(135.770, 35.000, 0.010),
+                _square(135.774, 35.004, 0.002),
+            ],
+        },
+    ),
+    _feature(
+        {"prefecture": "京都府", "city": "京都市東山区", "district": "祇園町北側"},
+        {"type": "Polygon", "coordinates": [_square(135.774, 35.004, 0.002)]},
+    ),
+    # MultiPolygon spanning several grid cells
+    _feature(
+        {"prefecture": "沖縄県", "city": "那覇市", "district": "おもろまち"},
+        {
+            "type": "MultiPolygon",
+            "coordinates": [
+                [_square(127.690, 26.215, 0.025)],
+                [_square(127.750, 26.215, 0.003)],
+            ],
+        },
+    ),
+]
+
+
+@pytest.fixture
+def index():
+    """Boundary index built from the fixture features"""
+    return BoundaryIndex(FEATURES, cell_size=0.01)
+
+
+@pytest.fixture
+def loaded_index(monkeypatch, index):
+    """Install the fixture index as the global boundary index"""
+    monkeypatch.setattr(reverse_geocoding, "_boundary_index", index)
+    monkeypatch.setattr(reverse_geocoding, "_boundary_index_loaded", True)
+    return index
+
+
+def test_point_in_polygon_with_hole():
+    """Test holes are excluded from the polygon"""
+    (polygon,) = polygons_from_geojson(FEATURES[2]["geometry"])
+    assert point_in_polygon(polygon, 135.771, 35.001)
+    assert not point_in_polygon(polygon, 135.775, 35.005)
+    assert not point_in_polygon(polygon, 135.790, 35.001)
+
+
+def test_reverse_geocode(loaded_index):
+    """Test resolving a point to its 町丁目"""
+    result = reverse_geocode(35.6525, 139.6975)
+
+    assert result.prefecture == "東京都"
+    assert result.city == "渋谷区"
+    assert result.district == "道玄坂二丁目"
+    assert result.formatted_address == "東京都渋谷区道玄坂二丁目"
+    assert result.lat == 35.6525
+    assert result.lng == 139.6975
+
+
+def test_reverse_geocode_hole_and_multipolygon(loaded_index):
+    """Test points in holes and in secondary polygon parts"""
+    assert reverse_geocode(35.005, 135.775).district == "祇園町北側"
+    assert reverse_geocode(35.001, 135.771).district == "祇園町南側"
+    assert reverse_geocode(26.236, 127.712).district == "おもろまち"
+    assert reverse_geocode(26.2165, 127.7515).district == "おもろまち"
+
+
+def test_reverse_geocode_outside(loaded_index):
+    """Test points outside every polygon"""
+    with pytest.raises(GeocodingNotFoundError):
+        reverse_geocode(43.0621, 141.3544)
+
+
+def test_reverse_geocode_without_index(monkeypatch):
+    """Test lookups fail as unavailable without boundary data"""
+    monkeypatch.setattr(reverse_geocoding, "_boundary_index", None)
+    monkeypatch.setattr(reverse_geocoding, "_boundary_index_loaded", True)
+    with pytest.raises(GeocodingUnavailableError):
+        reverse_geocode(35.0, 135.0)
+
+
+def test_batch_matches_single_lookups(index):
+    """Test vectorized batch lookups agree with single lookups"""
+    rng = np.random.default_rng(42)
+    lats = np.concatenate(
+        [rng.uniform(35.648, 35.657, 300), rng.uniform(34.999, 35.011, 300)]
+    )
+    lngs = np.concatenate(
+        [rng.uniform(139.688, 139.702, 300), rng.uniform(135.769, 135.781, 300)]
+    )
+
+    record_ids = index.locate_many(lats, lngs)
+    expected = [index.locate(lat, lng) for lat, lng in zip(lats, lngs)]
+
+    assert [r if r >= 0 else None for r in record_ids.tolist()] == expected
+    assert (record_ids >= 0).any() and (record_ids < 0).any()
+
+
+def test_reverse_geocode_batch(loaded_index):
+    """Test batch results keep input order"""
+    results = reverse_geocode_batch(
+        [35.6525, 43.0621, 35.6525], [139.6925, 141.3544, 139.6975]
+    )
+
+    assert results[0].district == "道玄坂一丁目"
+    assert results[1] is None
+    assert results[2].district == "道玄坂二丁目"
+
+
+def test_load_geojson_gz(tmp_path):
+    """Test loading a gzipped FeatureCollection"""
+    path = tmp_path / "boundaries.geojson.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"type": "FeatureCollection", "features": FEATURES}, f)
+
+    index = BoundaryIndex.load(str(path))
+
+    assert len(index) == 5
+    assert index.get_stats()["polygons"] == 6
+
+
+def test_load_rejects_non_feature_collection(tmp_path):
+    """Test loading a file that is not a FeatureCollection"""
+    path = tmp_path / "boundaries.geojson"
+    path.write_text(json.dumps(FEATURES[0]), encoding="utf-8")
+
+    with pytest.raises(BoundaryIndexError):
+        BoundaryIndex.load(str(path))
+
+
+def test_reverse_endpoint(client: TestClient, loaded_index):
+    """Test the reverse geocoding endpoint"""
+    response = client.post(
+        "/api/v1/geocoding/reverse", json={"lat": 35.6525, "lng": 139.6925}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["district"] == "道玄坂一丁目"
+
+    response = client.post(
+        "/api/v1/geocoding/reverse", json={"lat": 43.0621, "lng": 141.3544}
+    )
+    assert response.status_code == 404
+
+
+def test_reverse_batch_endpoint(client: TestClient, loaded_index):
+    """Test the batch reverse geocoding endpoint"""
+    response = client.post(
+        "/api/v1/geocoding/reverse/batch",
+        json={
+            "locations": [
+                {"lat": 35.005, "lng": 135.775},
+                {"lat": 43.0621, "lng": 141.3544},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert data["succeeded"] == 1
+    assert data["results"][0]["result"]["district"] == "祇園町北側"
+    assert data["results"][1]["result"] is None
+
+
+def test_reverse_endpoint_unavailable(client: TestClient, monkeypatch):
+    """Test 503 when no boundary data is loaded"""
+    monkeypatch.setattr(reverse_geocoding, "_boundary_index", None)
+    monkeypatch.setattr(reverse_geocoding, "_boundary_index_loaded", True)
+
+    response = client.post(
+        "/api/v1/geocoding/reverse", json={"lat": 35.0, "lng": 135.0}
+    )
+    assert response.status_code == 503
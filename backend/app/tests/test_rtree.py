@@ -0,0 +1,60 @@
+"""Test STR-packed R-tree"""
+
+import numpy as np
+import pytest
+
+from app.core.rtree import PackedRTree
+
+
+def brute_force(boxes, x, y):
+    return set(
+        np.nonzero(
+            (x >= boxes[:, 0])
+            & (x <= boxes[:, 2])
+            & (y >= boxes[:, 1])
+            & (y <= boxes[:, 3])
+        )[0].tolist()
+    )
+
+
+@pytest.fixture
+def boxes():
+    rng = np.random.default_rng(3)
+    corners = rng.uniform(0, 1, (3000, 2))
+    return np.hstack([corners, corners + rng.uniform(0, 0.05, (3000, 2))])
+
+
+def test_tree_is_packed(boxes):
+    """Test every level respects the node capacity and the tree is shallow"""
+    tree = PackedRTree(boxes, capacity=8)
+
+    assert len(tree) == 3000
+    assert tree.depth == 3  # 375 leaves, 47 nodes, 6 under the root
+    for _, starts, _ in tree.levels:
+        assert np.diff(starts).max() <= 8
+    assert len(tree.levels[-1][0]) <= 8
+
+
+def test_point_queries_match_brute_force(boxes):
+    """Test single and batch queries find exactly the containing boxes"""
+    tree = PackedRTree(boxes, capacity=8)
+    rng = np.random.default_rng(5)
+    xs = rng.uniform(0, 1, 300)
+    ys = rng.uniform(0, 1, 300)
+
+    points, items = tree.query_points(xs, ys)
+
+    assert np.all(np.diff(points) >= 0)
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        expected = brute_force(boxes, x, y)
+        assert set(items[points == i].tolist()) == expected
+        assert set(tree.query_point(x, y)) == expected
+
+
+def test_empty_tree():
+    """Test queries on an empty tree return nothing"""
+    tree = PackedRTree(np.zeros((0, 4)))
+
+    assert tree.query_point(0.5, 0.5) == []
+    points, items = tree.query_points(np.array([0.5]), np.array([0.5]))
+    assert len(points) == 0 and len(items) == 0
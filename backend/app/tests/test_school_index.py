@@ -0,0 +1,172 @@
+"""Test school spatial index"""
+
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services import school_index
+from app.services.school_index import (
+    SchoolIndex,
+    SchoolIndexUnavailableError,
+    find_nearest_schools,
+    find_schools_within,
+    nearest_school_distances,
+    refresh_school_index,
+)
+
+SCHOOLS = [
+    ("26101", "祇園小学校", "elementary", 35.0036, 135.7746),  # ~91 m east
+    ("26102", "東山保育園", "nursery", 35.0050, 135.7736),  # ~156 m north
+    ("13101", "渋谷小学校", "elementary", 35.6580, 139.7016),
+]
+
+
+def haversine(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * school_index.EARTH_RADIUS * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture
+def index():
+    return SchoolIndex(SCHOOLS, cell_size=500.0)
+
+
+@pytest.fixture
+def loaded_index(index):
+    school_index.set_school_index(index)
+    yield index
+    school_index.set_school_index(None)
+
+
+@pytest.fixture
+def random_index():
+    """Dense cluster in Kyoto plus schools scattered over Japan"""
+    rng = np.random.default_rng(7)
+    lats = np.concatenate([rng.normal(35.0, 0.03, 3000), rng.uniform(31, 43, 1000)])
+    lngs = np.concatenate([rng.normal(135.77, 0.03, 3000), rng.uniform(130, 145, 1000)])
+    rows = [
+        (str(i), f"school{i}", "elementary", a, b)
+        for i, (a, b) in enumerate(zip(lats, lngs))
+    ]
+    return SchoolIndex(rows, cell_size=250.0), lats, lngs
+
+
+def test_nearest_and_within(index):
+    """Test single-point queries return ids and great-circle distances"""
+    nearest = index.nearest(35.0036, 135.7736, k=2)
+    assert [school_id for school_id, _ in nearest] == [0, 1]
+    assert nearest[0][1] == pytest.approx(91.2, abs=0.5)
+
+    assert [school_id for school_id, _ in index.within(35.0036, 135.7736, 100)] == [0]
+    assert index.within(35.0036, 135.7736, 50) == []
+
+
+def test_nearest_many_matches_brute_force(random_index):
+    """Test k-nearest results equal a full haversine scan, dense and sparse"""
+    index, lats, lngs = random_index
+    rng = np.random.default_rng(1)
+    query_lats = np.concatenate([rng.normal(35.0, 0.03, 50), rng.uniform(31, 43, 50)])
+    query_lngs = np.concatenate(
+        [rng.normal(135.77, 0.03, 50), rng.uniform(130, 145, 50)]
+    )
+
+    distances, ids = index.nearest_many(query_lats, query_lngs, k=3)
+
+    for i, (lat, lng) in enumerate(zip(query_lats, query_lngs)):
+        expected = np.sort(haversine(lat, lng, lats, lngs))[:3]
+        np.testing.assert_allclose(distances[i], expected, rtol=1e-6)
+        np.testing.assert_allclose(
+            haversine(lat, lng, lats[ids[i]], lngs[ids[i]]), expected, rtol=1e-6
+        )
+
+
+def test_within_many_matches_brute_force(random_index):
+    """Test radius results are complete and sorted by distance per point"""
+    index, lats, lngs = random_index
+    query_lats = np.array([35.0, 35.02, 40.0])
+    query_lngs = np.array([135.77, 135.75, 140.0])
+
+    for radius in (200.0, 5000.0):
+        points, ids, distances = index.within_many(query_lats, query_lngs, radius)
+        for i, (lat, lng) in enumerate(zip(query_lats, query_lngs)):
+            expected = np.sort(haversine(lat, lng, lats, lngs))
+            expected = expected[expected <= radius]
+            np.testing.assert_allclose(distances[points == i], expected, rtol=1e-6)
+
+
+def test_max_distance_and_missing_neighbours(index):
+    """Test neighbours beyond max_distance or beyond the index are reported empty"""
+    distances, ids = index.nearest_many(
+        np.array([35.0036, 43.0]), np.array([135.7736, 141.35]), k=4, max_distance=1000
+    )
+    assert ids[0].tolist() == [0, 1, -1, -1]
+    assert np.isinf(distances[0, 2:]).all()
+    assert ids[1].tolist() == [-1, -1, -1, -1]
+
+    empty = SchoolIndex([])
+    distances, ids = empty.nearest_many(np.array([35.0]), np.array([135.0]))
+    assert ids.tolist() == [[-1]]
+
+
+def test_module_queries_require_loaded_index():
+    """Test lookups fail clearly before the first load"""
+    school_index.set_school_index(None)
+    with pytest.raises(SchoolIndexUnavailableError):
+        find_nearest_schools(35.0, 135.0)
+
+
+def test_module_queries(loaded_index):
+    """Test module helpers return NearbySchool models and batch distances"""
+    nearest = find_nearest_schools(35.0036, 135.7736)
+    assert nearest[0].name == "祇園小学校"
+    assert nearest[0].distance == pytest.approx(91.2, abs=0.5)
+
+    within = find_schools_within(35.0036, 135.7736, 200)
+    assert [school.school_type for school in within] == ["elementary", "nursery"]
+
+    distances = nearest_school_distances([35.0036, 35.6580], [135.7736, 139.7016])
+    assert distances[1] == pytest.approx(0.0, abs=0.01)
+
+
+def _session(fingerprint, rows):
+    db = MagicMock()
+    fingerprint_result = MagicMock()
+    fingerprint_result.one.return_value = fingerprint
+    rows_result = MagicMock()
+    rows_result.all.return_value = rows
+    db.execute = AsyncMock(side_effect=[fingerprint_result, rows_result])
+    session = MagicMock()
+    session.__aenter__ = AsyncMock(return_value=db)
+    session.__aexit__ = AsyncMock(return_value=False)
+    return session, db
+
+
+@pytest.mark.asyncio
+async def test_refresh_rebuilds_only_when_table_changes(monkeypatch):
+    """Test the index is swapped for a new one only on a fingerprint change"""
+    school_index.set_school_index(None)
+    first, _ = _session((2, 2, None), SCHOOLS[:2])
+    unchanged, unchanged_db = _session((2, 2, None), [])
+    changed, _ = _session((3, 3, None), SCHOOLS)
+    monkeypatch.setattr(
+        school_index,
+        "AsyncSessionLocal",
+        MagicMock(side_effect=[first, unchanged, changed]),
+    )
+
+    try:
+        index = await refresh_school_index()
+        assert len(index) == 2
+
+        assert await refresh_school_index() is index
+        assert unchanged_db.execute.await_count == 1
+
+        refreshed = await refresh_school_index()
+        assert refreshed is not index
+        assert len(school_index.get_school_index()) == 3
+    finally:
+        school_index.set_school_index(None)
@@ -0,0 +1,118 @@
+"""Test Go/Amber/Stop scoring"""
+
+import math
+import numpy as np
+import pytest
+
+from app.core.scoring import (
+    ZONING_SCORES,
+    calculate_licensing_score,
+    calculate_overall_judgment,
+    calculate_profitability_score,
+    calculate_regulation_risk_score,
+    score_location,
+    score_locations,
+)
+
+SCORE_COLUMNS = (
+    "profitability_score",
+    "licensing_score",
+    "regulation_risk_score",
+    "score",
+)
+
+
+def random_columns(count: int, seed: int = 0) -> dict:
+    """Random inputs covering the edge cases of every formula"""
+    rng = np.random.default_rng(seed)
+    zonings = list(ZONING_SCORES) + ["不明", None]
+    school_distance = rng.uniform(0, 300, count)
+    school_distance[rng.random(count) < 0.2] = np.nan
+    market = rng.uniform(2000, 9000, count)
+    market[rng.random(count) < 0.05] = 0.0
+    return {
+        "revpar": rng.uniform(0, 15000, count),
+        "occupancy": rng.uniform(0, 100, count),
+        "market_avg_revpar": market,
+        "confidence": rng.uniform(0.3, 1.0, count),
+        "zoning": [zonings[i] for i in rng.integers(0, len(zonings), count)],
+        "school_distance": school_distance,
+        "existing_permits": rng.integers(0, 120, count).astype(float),
+        "signal_sentiment": rng.uniform(-1, 1, count),
+        "recent_violations": rng.integers(0, 10, count).astype(float),
+        "media_sentiment": rng.uniform(-1, 1, count),
+    }
+
+
+def test_profitability_score():
+    """Test the spec example and zero market/occupancy edge cases"""
+    assert 70 <= calculate_profitability_score(6000, 70, 5000, 0.8) <= 90
+    assert calculate_profitability_score(6000, 0, 0, 0.8) == 0
+    assert calculate_profitability_score(50000, 100, 5000, 1.0) == 100
+
+
+def test_licensing_score():
+    """Test zoning, school penalty and competition factor"""
+    assert 80 <= calculate_licensing_score("商業地域", 150, 20) <= 100
+    assert calculate_licensing_score("第一種低層住専", 50, 5) < 40
+    full_name = calculate_licensing_score("第一種低層住居専用地域", 50, 5)
+    assert full_name == calculate_licensing_score("第一種低層住専", 50, 5)
+    assert calculate_licensing_score("商業地域", None, 200) == 50
+    assert calculate_licensing_score("工業専用地域", 30, 0) == 0
+
+
+def test_regulation_risk_score():
+    """Test violations are capped and the total is bounded"""
+    assert calculate_regulation_risk_score(0, 0, 0) == 0
+    assert calculate_regulation_risk_score(0, 100, 0) == 30
+    assert calculate_regulation_risk_score(-1, 10, 1) == 100
+
+
+@pytest.mark.parametrize(
+    "scores, expected",
+    [
+        ((85, 80, 30), "Go"),
+        ((40, 30, 80), "Stop"),
+        ((70, 60, 50), "Amber"),
+        ((100, 100, 75), "Stop"),
+        ((100, 0, 0), "Stop"),
+    ],
+)
+def test_overall_judgment(scores, expected):
+    """Test each branch of the judgment table"""
+    assert calculate_overall_judgment(*scores)["judgment"] == expected
+
+
+def test_low_confidence_is_not_go():
+    """Test Go needs a RevPAR confidence of at least 0.7"""
+    judgment = calculate_overall_judgment(85, 80, 30, confidence=0.6)
+    assert judgment["judgment"] == "Amber"
+
+
+def test_vectorized_parity_with_scalar():
+    """Test score_locations matches score_location exactly, row by row"""
+    columns = random_columns(5000)
+
+    scores = score_locations(**columns)
+
+    for i in range(5000):
+        # Plain Python floats, as a single-location caller would pass
+        row = {name: values[i] for name, values in columns.items()}
+        row.update(
+            {name: float(row[name]) for name in row if name != "zoning"},
+        )
+        if math.isnan(row["school_distance"]):
+            row["school_distance"] = None
+        expected = score_location(**row)
+        for name in SCORE_COLUMNS:
+            assert scores[name][i] == expected[name], (name, row)
+        assert scores["judgment"][i] == expected["judgment"]
+    assert set(scores["judgment"]) == {"Go", "Amber", "Stop"}
+
+
+def test_score_locations_rejects_ragged_columns():
+    """Test columns of different lengths are an error"""
+    columns = random_columns(10)
+    columns["occupancy"] = columns["occupancy"][:5]
+    with pytest.raises(ValueError):
+        score_locations(**columns)
@@ -0,0 +1,164 @@
+"""Test single-flight coalescing"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.core.singleflight import SingleFlight
+from app.models.geocoding import GeocodingResult
+from app.services.geocoding import geocode_address, get_singleflight_stats
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    """Test concurrent callers with the same key await one execution"""
+    flight = SingleFlight()
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(flight.do("key", work) for _ in range(10)))
+
+    assert results == ["result"] * 10
+    assert calls == 1
+    assert flight.get_stats() == {"executions": 1, "coalesced": 9, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_different_keys_run_separately():
+    """Test different keys are not coalesced"""
+    flight = SingleFlight()
+    work = AsyncMock(return_value="result")
+
+    await asyncio.gather(flight.do("a", work), flight.do("b", work))
+
+    assert work.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_all_waiters():
+    """Test an exception reaches every waiter and the key is released"""
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream failed")
+
+    results = await asyncio.gather(
+        *(flight.do("key", fail) for _ in range(3)), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.in_flight() == 0
+
+    # Next call starts a fresh execution
+    assert await flight.do("key", AsyncMock(return_value="ok")) == "ok"
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_keeps_shared_work():
+    """Test cancelling the first caller does not cancel other waiters"""
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "result"
+
+    first = asyncio.create_task(flight.do("key", work))
+    second = asyncio.create_task(flight.do("key", work))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "result"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_cancelling_all_waiters_cancels_work():
+    """Test the shared work is cancelled when its last waiter goes away"""
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = False
+
+    async def work():
+        nonlocal cancelled
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    waiter = asyncio.create_task(flight.do("key", work))
+    await started.wait()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    await asyncio.sleep(0)
+
+    assert cancelled
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_caller_after_abandoned_work_starts_fresh():
+    """Test a new caller does not inherit the cancellation of abandoned work"""
+    flight = SingleFlight()
+    started = asyncio.Event()
+
+    async def abandoned():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fresh():
+        return "fresh"
+
+    waiter = asyncio.create_task(flight.do("key", abandoned))
+    await started.wait()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert await flight.do("key", fresh) == "fresh"
+    assert flight.get_stats()["executions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_geocode_address_coalesces_upstream_calls():
+    """Test concurrent geocoding of the same address makes one API call"""
+    result = GeocodingResult(
+        lat=35.0036,
+        lng=135.7736,
+        formatted_address="京都府京都市東山区祇園町南側",
+        prefecture="京都府",
+        city="京都市東山区",
+    )
+
+    async def slow_api(address):
+        await asyncio.sleep(0.01)
+        return {}
+
+    before = get_singleflight_stats()["coalesced"]
+    with patch(
+        "app.services.geocoding._call_geocoding_api", new=AsyncMock(wraps=slow_api)
+    ) as mock_api, patch(
+        "app.services.geocoding._parse_geocoding_response", return_value=result
+    ), patch(
+        "app.services.geocoding.settings.GEOCODING_CACHE_ENABLED", False
+    ):
+        results = await asyncio.gather(
+            *(geocode_address("京都府京都市東山区祇園町南側") for _ in range(5))
+        )
+
+    assert all(r == result for r in results)
+    mock_api.assert_awaited_once()
+    assert get_singleflight_stats()["coalesced"] - before == 4
@@ -0,0 +1,169 @@
+"""Test PostGIS columns and spatial queries"""
+
+import pytest
+from sqlalchemy import create_mock_engine, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.db.base import engine
+from app.db.models import School, ZoningArea
+from app.services.spatial_queries import (
+    nearest_schools_statement,
+    schools_within_statement,
+    zoning_at_statement,
+)
+
+KYOTO = (35.0036, 135.7736)
+
+
+def _compile(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_spatial_columns_per_dialect():
+    """Test PostGIS types on PostgreSQL and plain TEXT elsewhere"""
+    pg_schools = str(
+        CreateTable(School.__table__).compile(dialect=postgresql.dialect())
+    )
+    assert "location geography(POINT,4326)" in pg_schools
+    pg_zoning = str(
+        CreateTable(ZoningArea.__table__).compile(dialect=postgresql.dialect())
+    )
+    assert "boundary geometry(MULTIPOLYGON,4326)" in pg_zoning
+
+    assert "location TEXT" in str(
+        CreateTable(School.__table__).compile(dialect=sqlite.dialect())
+    )
+
+    index = next(i for i in School.__table__.indexes if i.name == "idx_schools_geog")
+    assert "USING gist" in str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+
+def test_spatial_columns_are_derived_on_postgresql():
+    """Test create_all derives location and boundary like the migration"""
+    pg_schools = str(
+        CreateTable(School.__table__).compile(dialect=postgresql.dialect())
+    )
+    assert (
+        "GENERATED ALWAYS AS "
+        "(ST_SetSRID(ST_MakePoint(lng, lat), 4326)::geography) STORED"
+    ) in pg_schools
+    assert "GENERATED" not in str(
+        CreateTable(School.__table__).compile(dialect=sqlite.dialect())
+    )
+
+    statements = []
+
+    def capture(sql, *multiparams, **params):
+        statements.append(str(sql.compile(dialect=mock.dialect)))
+
+    mock = create_mock_engine("postgresql://", capture)
+    ZoningArea.__table__.create(mock)
+    assert any("CREATE TRIGGER zoning_areas_sync_boundary" in s for s in statements)
+
+    statements.clear()
+    mock = create_mock_engine("sqlite://", capture)
+    ZoningArea.__table__.create(mock)
+    assert not any("TRIGGER" in s for s in statements)
+
+
+def test_statements_use_index_operators():
+    """Test each query is phrased with an index-assisted operator"""
+    assert "ST_Covers(zoning_areas.boundary" in _compile(zoning_at_statement(*KYOTO))
+
+    nearest = _compile(nearest_schools_statement(*KYOTO, k=3, max_distance=500))
+    assert "ORDER BY schools.location <-> geography(" in nearest
+    assert "ST_DWithin(schools.location" in nearest
+    assert "LIMIT" in nearest
+
+    assert "ST_DWithin(schools.location" in _compile(
+        schools_within_statement(*KYOTO, radius=300)
+    )
+
+
+@pytest.fixture
+def postgis_connection():
+    """
+    Connection to a PostGIS database with a few zoning areas and schools
+
+    Only the GeoJSON and lat/lng columns are written; boundary and location
+    come from the trigger and generated column, as on a migrated database.
+    """
+    if engine.dialect.name != "postgresql":
+        pytest.skip("PostGIS database not configured")
+    try:
+        conn = engine.connect()
+    except OperationalError:
+        pytest.skip("Database not available")
+
+    transaction = conn.begin()
+    try:
+        conn.execute(
+            text(
+                "INSERT INTO zoning_areas "
+                "(area_code, prefecture, city, zoning_type, geometry, updated_at) "
+                "VALUES ('T-001', '京都府', '京都市', '商業地域', "
+                "CAST(:geometry AS json), now())"
+            ),
+            {
+                "geometry": '{"type": "Polygon", "coordinates": [[[135.77, 35.0], '
+                "[135.78, 35.0], [135.78, 35.01], [135.77, 35.01], [135.77, 35.0]]]}"
+            },
+        )
+        conn.execute(
+            text(
+                "INSERT INTO schools "
+                "(school_code, name, school_type, prefecture, city, lat, lng, "
+                "updated_at) "
+                "SELECT 'T' || i, '学校' || i, 'elementary', '京都府', '京都市', "
+                "35.0 + (i % 100) * 0.001, 135.7 + (i / 100) * 0.001, now() "
+                "FROM generate_series(1, 2000) AS i"
+            )
+        )
+        conn.execute(text("ANALYZE zoning_areas"))
+        conn.execute(text("ANALYZE schools"))
+        # Small tables: make the planner show whether the index is usable
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        yield conn
+    finally:
+        transaction.rollback()
+        conn.close()
+
+
+def _explain(conn, statement) -> str:
+    compiled = statement.compile(dialect=conn.dialect)
+    rows = conn.exec_driver_sql(f"EXPLAIN {compiled}", compiled.params).all()
+    return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.parametrize(
+    "statement, index_name",
+    [
+        (zoning_at_statement(*KYOTO), "idx_zoning_areas_boundary"),
+        (nearest_schools_statement(*KYOTO, k=5), "idx_schools_geog"),
+        (schools_within_statement(*KYOTO, radius=300), "idx_schools_geog"),
+    ],
+)
+def test_spatial_queries_use_gist_indexes(postgis_connection, statement, index_name):
+    """Test EXPLAIN shows the GiST index serving each spatial query"""
+    plan = _explain(postgis_connection, statement)
+    assert index_name in plan, plan
+
+
+def test_spatial_query_results(postgis_connection):
+    """Test containment, KNN and distance-within answers"""
+    zoning = postgis_connection.execute(zoning_at_statement(*KYOTO)).one()
+    assert zoning.zoning_type == "商業地域"
+
+    nearest = postgis_connection.execute(
+        nearest_schools_statement(35.0, 135.7, k=3)
+    ).all()
+    assert [row.school_code for row in nearest][0] == "T100"
+    assert [row.distance for row in nearest] == sorted(row.distance for row in nearest)
+
+    within = postgis_connection.execute(
+        schools_within_statement(35.0, 135.7, radius=150)
+    ).all()
+    assert all(row.distance <= 150 for row in within)
+    assert {row.school_code for row in within} == {row.school_code for row in nearest}
@@ -0,0 +1,74 @@
+"""Test stale-while-revalidate helpers"""
+
+import asyncio
+import time
+import pytest
+
+from app.core.swr import CacheMetadata, Revalidator, is_fresh, stamp
+
+
+def test_stamp_and_freshness():
+    """Test entries are fresh until their soft TTL passes"""
+    entry = stamp({"value": 1}, soft_ttl=60, now=1000.0)
+
+    assert entry == {"value": 1, "cached_at": 1000.0, "fresh_until": 1060.0}
+    assert is_fresh(entry, now=1059.0)
+    assert not is_fresh(entry, now=1060.0)
+    # Entries written before soft TTLs existed never go stale
+    assert is_fresh({"value": 1})
+
+
+def test_metadata_reports_staleness():
+    """Test metadata exposes status and age"""
+    entry = stamp({"value": 1}, soft_ttl=60, now=time.time() - 120)
+    metadata = CacheMetadata.from_entry(entry)
+
+    assert metadata.stale
+    assert 119 <= metadata.age <= 121
+    assert metadata.to_headers()["X-Cache-Status"] == "stale"
+    assert CacheMetadata("miss").to_dict() == {
+        "status": "miss",
+        "stale": False,
+        "age": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_revalidator_refreshes_each_key_once():
+    """Test concurrent triggers for one key start one refresh"""
+    revalidator = Revalidator()
+    calls = []
+
+    async def refresh(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+
+    started = [revalidator.trigger("a", lambda: refresh("a")) for _ in range(5)]
+    started.append(revalidator.trigger("b", lambda: refresh("b")))
+    await asyncio.sleep(0)
+    started.append(revalidator.trigger("a", lambda: refresh("a")))
+    await revalidator.drain()
+
+    assert started == [True, False, False, False, False, True, False]
+    assert sorted(calls) == ["a", "b"]
+    stats = revalidator.get_stats()
+    assert stats["triggered"] == 2
+    assert stats["skipped"] == 5
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_revalidator_failure_is_contained():
+    """Test a failed refresh is counted, not raised"""
+    revalidator = Revalidator()
+
+    async def refresh():
+        raise RuntimeError("upstream down")
+
+    assert revalidator.trigger("a", refresh)
+    await revalidator.drain()
+
+    assert revalidator.get_stats()["failed"] == 1
+    # The next stale hit may try again
+    assert revalidator.trigger("a", refresh)
+    await revalidator.drain()
@@ -0,0 +1,178 @@
+"""Test in-process L1 tier and cross-instance invalidation"""
+
+import pytest
+
+from app.core.invalidation import InvalidationBus, LocalInvalidationBus
+from app.core.lru import LRUCache
+from app.services.cache import TieredCache
+from app.services.firestore import BulkWriteResult
+
+
+class FakeSharedCache:
+    """Dict-backed stand-in for FirestoreCache"""
+
+    def __init__(self):
+        self.data = {}
+        self.reads = 0
+        self.on_get = None
+
+    async def get(self, key):
+        self.reads += 1
+        value = self.data.get(key)
+        if self.on_get:
+            await self.on_get(key)
+        return value
+
+    async def set(self, key, value, ttl=3600):
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+        return True
+
+    async def get_many(self, keys):
+        self.reads += 1
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    async def set_many(self, items, ttl=3600, ttls=None):
+        self.data.update(items)
+        result = BulkWriteResult()
+        result.succeeded.extend(items)
+        return result
+
+    async def delete_many(self, keys):
+        result = BulkWriteResult()
+        for key in keys:
+            self.data.pop(key, None)
+            result.succeeded.append(key)
+        return result
+
+
+async def make_instances(shared, count=2):
+    """Build caches that share a backend and an invalidation channel"""
+    instances = []
+    for _ in range(count):
+        bus = LocalInvalidationBus(channel="test-invalidation")
+        await bus.start()
+        instances.append(
+            TieredCache(shared, LRUCache(max_entries=100, ttl=60), bus=bus)
+        )
+    return instances
+
+
+@pytest.fixture(autouse=True)
+def reset_local_channels():
+    """Isolate local invalidation channels between tests"""
+    LocalInvalidationBus._channels.clear()
+    yield
+    LocalInvalidationBus._channels.clear()
+
+
+@pytest.mark.asyncio
+async def test_l1_serves_repeat_reads():
+    """Test repeat reads skip the shared tier"""
+    shared = FakeSharedCache()
+    shared.data["k"] = {"v": 1}
+    cache = TieredCache(shared, LRUCache(max_entries=10, ttl=60))
+
+    assert await cache.get("k") == {"v": 1}
+    assert await cache.get("k") == {"v": 1}
+    assert await cache.get("missing") is None
+
+    assert shared.reads == 2
+    stats = cache.get_stats()
+    assert stats["local_hits"] == 1
+    assert stats["shared_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["local_hit_ratio"] == pytest.approx(1 / 3)
+    assert stats["shared_hit_ratio"] == pytest.approx(1 / 2)
+
+
+@pytest.mark.asyncio
+async def test_write_invalidates_other_instances():
+    """Test a write on one instance drops the key from other L1s"""
+    shared = FakeSharedCache()
+    a, b = await make_instances(shared)
+
+    await a.set("k", "old")
+    assert await b.get("k") == "old"
+
+    await a.set("k", "new")
+    assert "k" not in b.local
+    assert await b.get("k") == "new"
+    assert await a.get("k") == "new"
+
+    await b.delete("k")
+    assert "k" not in a.local
+    assert await a.get("k") is None
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_invalidate_other_instances():
+    """Test set_many and delete_many publish their keys"""
+    shared = FakeSharedCache()
+    a, b = await make_instances(shared)
+
+    await a.set_many({"x": 1, "y": 2})
+    assert await b.get_many(["x", "y", "z"]) == {"x": 1, "y": 2}
+    assert b.get_stats()["misses"] == 1
+
+    await a.set_many({"x": 10})
+    assert "x" not in b.local
+    assert "y" in b.local
+
+    await a.delete_many(["y"])
+    assert await b.get_many(["x", "y"]) == {"x": 10}
+
+
+@pytest.mark.asyncio
+async def test_own_invalidations_are_ignored():
+    """Test an instance keeps the value it just wrote"""
+    shared = FakeSharedCache()
+    a, _ = await make_instances(shared)
+
+    await a.set("k", "v")
+    assert await a.get("k") == "v"
+    assert shared.reads == 0
+    assert a.bus.get_stats()["received"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_shared_read_skips_fill():
+    """Test a read racing an invalidation does not cache the stale value"""
+    shared = FakeSharedCache()
+    a, b = await make_instances(shared)
+    shared.data["k"] = "old"
+
+    async def concurrent_write(key):
+        shared.on_get = None
+        await a.set(key, "new")
+
+    shared.on_get = concurrent_write
+    assert await b.get("k") == "old"
+    assert "k" not in b.local
+    assert await b.get("k") == "new"
+
+
+@pytest.mark.asyncio
+async def test_flush_on_reconnect_clears_l1():
+    """Test a None invalidation flushes the whole L1"""
+    shared = FakeSharedCache()
+    shared.data.update({"x": 1, "y": 2})
+    (a,) = await make_instances(shared, count=1)
+    await a.get_many(["x", "y"])
+    assert len(a.local) == 2
+
+    a.bus._dispatch(None)
+    assert len(a.local) == 0
+
+
+def test_bus_must_implement_publish():
+    """Test an incomplete invalidation bus fails at construction"""
+
+    class Incomplete(InvalidationBus):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
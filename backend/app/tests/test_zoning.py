@@ -0,0 +1,181 @@
+"""Test 用途地域 lookup"""
+
+import asyncio
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core.geometry import point_in_polygon, polygons_from_geojson
+from app.core.lru import LRUCache
+from app.services import zoning
+from app.services.zoning import (
+    ZoningIndex,
+    get_zoning_stats,
+    invalidate_zoning_index,
+    lookup_zoning,
+    lookup_zoning_batch,
+)
+
+
+def _square(min_lng, min_lat, size):
+    return [
+        [min_lng, min_lat],
+        [min_lng + size, min_lat],
+        [min_lng + size, min_lat + size],
+        [min_lng, min_lat + size],
+        [min_lng, min_lat],
+    ]
+
+
+KYOTO_ROWS = [
+    # Residential block with a commercial block cut out of it
+    (
+        "26105-001",
+        "第一種住居地域",
+        60.0,
+        200.0,
+        {
+            "type": "Polygon",
+            "coordinates": [
+                _square(135.770, 35.000, 0.010),
+                _square(135.774, 35.004, 0.002),
+            ],
+        },
+    ),
+    (
+        "26105-002",
+        "商業地域",
+        80.0,
+        400.0,
+        {"type": "Polygon", "coordinates": [_square(135.774, 35.004, 0.002)]},
+    ),
+    (
+        "26105-003",
+        "第一種低層住居専用地域",
+        None,
+        None,
+        {
+            "type": "MultiPolygon",
+            "coordinates": [
+                [_square(135.790, 35.000, 0.005)],
+                [_square(135.800, 35.000, 0.005)],
+            ],
+        },
+    ),
+    ("26105-004", "準工業地域", 60.0, 200.0, None),
+]
+
+
+@pytest.fixture
+def index():
+    return ZoningIndex(KYOTO_ROWS, node_capacity=2)
+
+
+@pytest.fixture
+def fetch_rows(monkeypatch):
+    """Serve rows per prefecture instead of querying the database"""
+    rows = {"京都府": KYOTO_ROWS, "東京都": []}
+    fetch = AsyncMock(side_effect=lambda prefecture: rows[prefecture])
+    monkeypatch.setattr(zoning, "_fetch_rows", fetch)
+    monkeypatch.setattr(zoning, "_indexes", LRUCache(max_entries=1, ttl=60))
+    return fetch
+
+
+def test_locate_respects_holes_and_multipolygons(index):
+    """Test the hole belongs to the inner polygon and every part is indexed"""
+    outer = index.to_result(index.locate(35.001, 135.771))
+    assert outer.zoning_type == "第一種住居地域"
+    inner = index.to_result(index.locate(35.005, 135.775))
+    assert inner.zoning_type == "商業地域"
+    assert inner.floor_area_ratio == 400.0
+    assert index.locate(35.002, 135.802) == 2
+    assert index.locate(35.020, 135.771) is None
+    assert index.get_stats()["skipped"] == 1
+
+
+def test_locate_many_matches_single_lookups(index):
+    """Test the vectorized path agrees with locate and a brute-force scan"""
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(34.998, 35.012, 500)
+    lngs = rng.uniform(135.768, 135.808, 500)
+    polygons = [
+        polygons_from_geojson(row[4]) for row in KYOTO_ROWS if row[4] is not None
+    ]
+
+    record_ids = index.locate_many(lats, lngs, chunk_size=64)
+
+    for lat, lng, record_id in zip(lats, lngs, record_ids):
+        single = index.locate(lat, lng)
+        assert record_id == (-1 if single is None else single)
+        expected = next(
+            (
+                i
+                for i, parts in enumerate(polygons)
+                if any(point_in_polygon(part, lng, lat) for part in parts)
+            ),
+            -1,
+        )
+        assert record_id == expected
+
+
+@pytest.mark.asyncio
+async def test_prefecture_indexes_load_once_and_are_evicted(fetch_rows):
+    """Test lazy loading, coalesced first loads and the prefecture bound"""
+    first, second = await asyncio.gather(
+        lookup_zoning(35.005, 135.775, "京都府"),
+        lookup_zoning(35.001, 135.771, "京都府"),
+    )
+    assert first.zoning_type == "商業地域"
+    assert second.zoning_type == "第一種住居地域"
+    assert fetch_rows.await_count == 1
+
+    assert await lookup_zoning(35.68, 139.76, "東京都") is None
+    assert list(get_zoning_stats()["prefectures"]) == ["東京都"]
+
+    await lookup_zoning(35.005, 135.775, "京都府")
+    assert fetch_rows.await_count == 3
+
+    invalidate_zoning_index("京都府")
+    await lookup_zoning(35.005, 135.775, "京都府")
+    assert fetch_rows.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_load_limit_only_gates_database_loads(fetch_rows):
+    """Test the load limit is held for a load but not for cached lookups"""
+    load_limit = asyncio.Semaphore(1)
+    await load_limit.acquire()
+
+    lookup = asyncio.create_task(
+        lookup_zoning(35.005, 135.775, "京都府", load_limit=load_limit)
+    )
+    await asyncio.sleep(0.01)
+    assert not lookup.done()
+    assert fetch_rows.await_count == 0
+
+    load_limit.release()
+    assert (await lookup).zoning_type == "商業地域"
+
+    # Cached: answers while the limit is exhausted
+    async with load_limit:
+        result = await asyncio.wait_for(
+            lookup_zoning(35.001, 135.771, "京都府", load_limit=load_limit), 1
+        )
+    assert result.zoning_type == "第一種住居地域"
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_groups_by_prefecture(fetch_rows):
+    """Test per-point prefectures and results in input order"""
+    results = await lookup_zoning_batch(
+        [35.005, 35.68, 35.001],
+        [135.775, 139.76, 135.771],
+        ["京都府", "東京都", "京都府"],
+    )
+
+    assert results[0].area_code == "26105-002"
+    assert results[1] is None
+    assert results[2].area_code == "26105-001"
+
+    results = await lookup_zoning_batch([35.002], [135.802], "京都府")
+    assert results[0].building_coverage_ratio is None
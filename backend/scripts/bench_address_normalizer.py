@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for normalize_address
+
+Reports throughput for unique addresses (regex pipeline on every call) and
+for a bulk job with repeats (memoized fast path):
+
+    python scripts/bench_address_normalizer.py --count 200000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.address_normalizer import (  # noqa: E402
+    clear_normalize_cache,
+    normalize_address,
+)
+
+TOWNS = [
+    "東京都渋谷区道玄坂",
+    "東京都港区六本木",
+    "大阪府大阪市中央区難波",
+    "京都府京都市東山区祇園町南側",
+    "沖縄県那覇市おもろまち",
+    "東京都千代田区霞ヶ関",
+]
+KANJI = ["一", "二", "三", "四", "五", "六", "七", "八", "九"]
+
+
+def make_address(rng: random.Random) -> str:
+    town = rng.choice(TOWNS)
+    chome = rng.randint(1, 9)
+    ban = rng.randint(1, 60)
+    go = rng.randint(1, 30)
+    style = rng.randrange(4)
+    if style == 0:
+        return f"{town}{KANJI[chome - 1]}丁目{ban}番{go}号"
+    if style == 1:
+        return f"{town}{chome}丁目{ban}-{go}"
+    if style == 2:
+        return f"{town}{chr(0xFF10 + chome)}－{ban}－{go}"
+    return f"{town} {chome}-{ban}-{go}"
+
+
+def bench(label: str, addresses: list) -> None:
+    start = time.perf_counter()
+    for address in addresses:
+        normalize_address(address)
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / len(addresses) * 1e6
+    per_minute = len(addresses) / elapsed * 60
+    print(f"{label:<28} {per_call:7.2f}µs/address  {per_minute:>14,.0f} addresses/min")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200000)
+    parser.add_argument("--unique", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pool = [make_address(rng) for _ in range(args.unique)]
+    unique = list(dict.fromkeys(pool))
+    bulk = [rng.choice(unique) for _ in range(args.count)]
+
+    clear_normalize_cache()
+    bench(f"unique ({len(unique)})", unique)
+    clear_normalize_cache()
+    bench(f"bulk with repeats ({len(bulk)})", bulk)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
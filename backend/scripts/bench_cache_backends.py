@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Latency and throughput of the Redis and Firestore cache backends
+
+Runs the same workload (single gets/sets at a fixed concurrency, then
+get_many/set_many in batches) against RedisCache and FirestoreCache and
+prints per-operation latency percentiles and throughput.
+
+Run against a local Redis and the Firestore emulator:
+
+    docker run --rm -p 6379:6379 redis:7
+    gcloud emulators firestore start --host-port=localhost:8681
+    export FIRESTORE_EMULATOR_HOST=localhost:8681
+    python scripts/bench_cache_backends.py --requests 2000 --concurrency 50
+
+Backends whose server is not reachable are skipped.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services import firestore as firestore_service  # noqa: E402
+from app.services.firestore import FirestoreCache  # noqa: E402
+from app.services.redis_cache import RedisCache, check_redis  # noqa: E402
+
+VALUE = {
+    "status": "OK",
+    "result": {
+        "lat": 35.003612,
+        "lng": 135.773611,
+        "formatted_address": "日本、〒605-0074 京都府京都市東山区祇園町南側",
+        "prefecture": "京都府",
+        "city": "京都市東山区",
+        "district": "祇園町南側",
+    },
+}
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+async def timed_ops(label: str, op, keys: list, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list = []
+
+    async def one(key: str) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await op(key)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(key) for key in keys))
+    elapsed = time.perf_counter() - start
+
+    ms = sorted(latency * 1000 for latency in latencies)
+    print(
+        f"  {label:<10} {len(keys) / elapsed:9.0f} ops/s  "
+        f"p50 {percentile(ms, 0.5):7.2f}ms  p99 {percentile(ms, 0.99):7.2f}ms"
+    )
+
+
+async def timed_batches(label: str, op, batches: list) -> None:
+    latencies: list = []
+    start = time.perf_counter()
+    for batch in batches:
+        batch_start = time.perf_counter()
+        await op(batch)
+        latencies.append(time.perf_counter() - batch_start)
+    elapsed = time.perf_counter() - start
+
+    keys = sum(len(batch) for batch in batches)
+    ms = sorted(latency * 1000 for latency in latencies)
+    print(
+        f"  {label:<10} {keys / elapsed:9.0f} keys/s  "
+        f"p50 {percentile(ms, 0.5):7.2f}ms/batch  "
+        f"p99 {percentile(ms, 0.99):7.2f}ms/batch"
+    )
+
+
+async def run(name: str, cache, args) -> None:
+    keys = [f"bench:{name}:{i}" for i in range(args.requests)]
+    batches = [
+        keys[start : start + args.batch_size]
+        for start in range(0, len(keys), args.batch_size)
+    ]
+    print(f"{name}:")
+
+    await timed_ops("set", lambda key: cache.set(key, VALUE), keys, args.concurrency)
+    await timed_ops("get", cache.get, keys, args.concurrency)
+    await timed_batches(
+        "set_many",
+        lambda batch: cache.set_many({key: VALUE for key in batch}),
+        batches,
+    )
+    await timed_batches("get_many", cache.get_many, batches)
+    await cache.delete_many(keys)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--redis-url", default="redis://localhost:6379")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    redis_cache = RedisCache(args.redis_url, prefix="bench:")
+    if await check_redis(redis_cache) == "ok":
+        await run("redis", redis_cache, args)
+    else:
+        print(f"redis: not reachable at {args.redis_url}, skipped")
+    await redis_cache.close()
+
+    if os.getenv("FIRESTORE_EMULATOR_HOST"):
+        from google.cloud import firestore
+
+        firestore_service.db = firestore.AsyncClient(project="area-yield-os-bench")
+        await run("firestore", FirestoreCache(collection_name="bench_cache"), args)
+    else:
+        print("firestore: FIRESTORE_EMULATOR_HOST is not set, skipped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Encode/decode time and stored size of cache value formats
+
+Compares the current formats (Firestore map, JSON string in Redis) with the
+msgpack codec under each available compression, on synthetic analysis
+payloads of increasing size. Firestore map size follows Firestore's
+documented storage-size rules (strings: UTF-8 bytes + 1, numbers: 8, ...).
+
+    python scripts/bench_cache_codec.py --iterations 2000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core import codec as codec_module  # noqa: E402
+from app.core.codec import Codec, decode  # noqa: E402
+
+THEMES = ["立地", "清潔さ", "ホストの対応", "騒音", "アメニティ", "コスパ", "眺望"]
+REGULATIONS = ["住宅宿泊事業法", "旅館業法", "特区民泊", "用途地域", "条例上乗せ規制"]
+
+
+def analysis_payload(reviews: int, seed: int = 0) -> dict:
+    """Synthetic profitability/licensing/regulation payload"""
+    rng = random.Random(seed)
+    return {
+        "area": {"prefecture": "京都府", "city": "京都市東山区", "district": "祇園町南側"},
+        "profitability": {
+            "adr": round(rng.uniform(8000, 40000), 1),
+            "occupancy": round(rng.uniform(0.3, 0.95), 3),
+            "monthly": [round(rng.uniform(100000, 900000), 1) for _ in range(12)],
+            "roi": round(rng.uniform(0.02, 0.15), 4),
+        },
+        "licensing": {
+            "eligible": rng.random() > 0.3,
+            "max_days": 180,
+            "requirements": [f"{r}の届出" for r in REGULATIONS],
+        },
+        "regulation": [
+            {"law": law, "summary": f"{law}に基づく制限の概要。" * 4, "score": rng.random()}
+            for law in REGULATIONS
+        ],
+        "market_stats": {
+            "listings": rng.randint(10, 2000),
+            "adr_percentiles": [round(rng.uniform(5000, 60000), 1) for _ in range(11)],
+        },
+        "review_themes": [
+            {
+                "theme": rng.choice(THEMES),
+                "sentiment": round(rng.uniform(-1, 1), 3),
+                "count": rng.randint(1, 500),
+                "quote": "ゲストのレビュー抜粋。" * rng.randint(2, 8),
+            }
+            for _ in range(reviews)
+        ],
+    }
+
+
+def firestore_size(value) -> int:
+    """Storage size of a value as a Firestore field"""
+    if value is None or isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 8
+    if isinstance(value, str):
+        return len(value.encode("utf-8")) + 1
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, list):
+        return sum(firestore_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(firestore_size(k) + firestore_size(v) for k, v in value.items())
+    raise TypeError(type(value))
+
+
+def time_per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--sizes", default="10,100,1000", help="review themes")
+    args = parser.parse_args()
+
+    compressions = ["none", "zlib"]
+    if codec_module.zstandard is not None:
+        compressions.append("zstd")
+    if codec_module.lz4_frame is not None:
+        compressions.append("lz4")
+
+    for reviews in (int(size) for size in args.sizes.split(",")):
+        payload = analysis_payload(reviews)
+        print(f"\n{reviews} review themes:")
+        print(f"  {'format':<16} {'bytes':>9} {'encode µs':>11} {'decode µs':>11}")
+        print(
+            f"  {'firestore map':<16} {firestore_size(payload):>9} {'-':>11} {'-':>11}"
+        )
+
+        raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+        encode_us = time_per_call(
+            lambda: json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+            args.iterations,
+        )
+        decode_us = time_per_call(lambda: json.loads(raw), args.iterations)
+        print(
+            f"  {'json':<16} {len(raw.encode()):>9} "
+            f"{encode_us:>11.1f} {decode_us:>11.1f}"
+        )
+
+        for compression in compressions:
+            codec = Codec(compression=compression, compress_min_bytes=1024)
+            data = codec.encode(payload)
+            assert decode(data) == payload
+            encode_us = time_per_call(lambda: codec.encode(payload), args.iterations)
+            decode_us = time_per_call(lambda: decode(data), args.iterations)
+            label = f"msgpack+{compression}"
+            print(f"  {label:<16} {len(data):>9} {encode_us:>11.1f} {decode_us:>11.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Event-loop lag under concurrent Firestore cache reads
+
+Compares the previous blocking pattern (sync Firestore client called from
+async methods) with FirestoreCache on the async client. A probe task sleeps
+in short ticks and records how late it wakes up; with a blocking client the
+loop stalls for every round trip, so lag grows with the number of requests.
+
+Run against the Firestore emulator:
+
+    gcloud emulators firestore start --host-port=localhost:8681
+    export FIRESTORE_EMULATOR_HOST=localhost:8681
+    python scripts/bench_firestore_event_loop.py --requests 500 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from google.cloud import firestore  # noqa: E402
+
+from app.services import firestore as firestore_service  # noqa: E402
+from app.services.firestore import FirestoreCache  # noqa: E402
+
+COLLECTION = "bench_cache"
+
+
+class BlockingFirestoreCache:
+    """The previous FirestoreCache.get: sync SDK call inside an async method"""
+
+    def __init__(self, client: firestore.Client):
+        self.client = client
+
+    async def get(self, key: str):
+        doc = self.client.collection(COLLECTION).document(key).get()
+        return doc.to_dict().get("value") if doc.exists else None
+
+
+async def probe(stop: asyncio.Event, lags: list, tick: float = 0.005) -> None:
+    """Record how late the loop wakes up a task sleeping for `tick`"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(tick)
+        lags.append(time.perf_counter() - start - tick)
+
+
+async def run(label: str, cache, keys: list, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+    lags: list = []
+
+    async def read(key: str) -> None:
+        async with semaphore:
+            await cache.get(key)
+
+    probe_task = asyncio.create_task(probe(stop, lags))
+    start = time.perf_counter()
+    await asyncio.gather(*(read(key) for key in keys))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe_task
+
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    p99 = lags_ms[min(len(lags_ms) - 1, int(len(lags_ms) * 0.99))]
+    print(
+        f"{label:<9} {len(keys) / elapsed:8.0f} reads/s  "
+        f"loop lag mean {statistics.mean(lags_ms):7.2f}ms  "
+        f"p99 {p99:7.2f}ms  max {lags_ms[-1]:7.2f}ms  "
+        f"({len(lags)} probe ticks)"
+    )
+
+
+async def seed(client: firestore.AsyncClient, count: int) -> list:
+    keys = [f"bench:{i}" for i in range(count)]
+    expires_at = datetime.utcnow() + timedelta(hours=1)
+    for start in range(0, count, 500):
+        batch = client.batch()
+        for key in keys[start : start + 500]:
+            batch.set(
+                client.collection(COLLECTION).document(key),
+                {"key": key, "value": {"n": key}, "expires_at": expires_at},
+            )
+        await batch.commit()
+    return keys
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--project", default="area-yield-os-bench")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+        print("FIRESTORE_EMULATOR_HOST is not set; start the emulator first")
+        return 1
+
+    async_client = firestore.AsyncClient(project=args.project)
+    keys = await seed(async_client, args.requests)
+
+    blocking = BlockingFirestoreCache(firestore.Client(project=args.project))
+    await run("blocking", blocking, keys, args.concurrency)
+
+    firestore_service.db = async_client
+    await run(
+        "async", FirestoreCache(collection_name=COLLECTION), keys, args.concurrency
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for offline reverse geocoding
+
+Builds a synthetic grid of irregular 町丁目-sized polygons and reports
+single-point and vectorized batch lookup times. Pass --boundaries to measure
+against a real 町丁目 boundary GeoJSON instead:
+
+    python scripts/bench_reverse_geocoding.py --points 10000
+    python scripts/bench_reverse_geocoding.py --boundaries data/tokyo.geojson.gz
+"""
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.reverse_geocoding import BoundaryIndex  # noqa: E402
+
+
+def make_features(rng: np.random.Generator, side: int, vertices: int) -> list:
+    """Grid of side x side polygons (~500 m) with jittered boundaries"""
+    size = 0.005
+    features = []
+    for col in range(side):
+        for row in range(side):
+            center_lng = 139.5 + (col + 0.5) * size
+            center_lat = 35.5 + (row + 0.5) * size
+            ring = []
+            for i in range(vertices):
+                angle = 2 * math.pi * i / vertices
+                radius = size / 2 * rng.uniform(0.85, 1.0)
+                ring.append(
+                    [
+                        center_lng + radius * math.cos(angle),
+                        center_lat + radius * math.sin(angle),
+                    ]
+                )
+            ring.append(ring[0])
+            features.append(
+                {
+                    "type": "Feature",
+                    "properties": {
+                        "prefecture": "東京都",
+                        "city": "テスト市",
+                        "district": f"{col}-{row}丁目",
+                    },
+                    "geometry": {"type": "Polygon", "coordinates": [ring]},
+                }
+            )
+    return features
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--boundaries", help="町丁目 boundary GeoJSON (.gz ok)")
+    parser.add_argument("--side", type=int, default=100, help="Synthetic grid side")
+    parser.add_argument("--vertices", type=int, default=64)
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    start = time.perf_counter()
+    if args.boundaries:
+        index = BoundaryIndex.load(args.boundaries)
+    else:
+        index = BoundaryIndex(make_features(rng, args.side, args.vertices))
+    print(f"build: {time.perf_counter() - start:.2f}s  {index.get_stats()}")
+
+    min_lng, min_lat = index.bboxes[:, 0].min(), index.bboxes[:, 1].min()
+    max_lng, max_lat = index.bboxes[:, 2].max(), index.bboxes[:, 3].max()
+    lats = rng.uniform(min_lat, max_lat, args.points)
+    lngs = rng.uniform(min_lng, max_lng, args.points)
+
+    start = time.perf_counter()
+    for lat, lng in zip(lats.tolist(), lngs.tolist()):
+        index.locate(lat, lng)
+    elapsed = time.perf_counter() - start
+    print(f"single: {elapsed / args.points * 1e6:8.1f}µs/point")
+
+    start = time.perf_counter()
+    record_ids = index.locate_many(lats, lngs)
+    elapsed = time.perf_counter() - start
+    print(
+        f"batch:  {elapsed / args.points * 1e6:8.1f}µs/point  "
+        f"({elapsed * 1000:.1f}ms for {args.points}, "
+        f"{np.count_nonzero(record_ids >= 0)} hits)"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Nearest-school lookups: SchoolIndex vs a SQL scan of the schools table
+
+Loads synthetic schools (clustered around city centres, as real ones are)
+into a schools table and answers "nearest school within --radius meters"
+for random points three ways:
+
+  sql     a bounding-box query on the lat/lng B-tree index
+          (idx_schools_location) per point, distances in Python
+  index   SchoolIndex.within per point
+  batch   SchoolIndex.nearest_many over all points at once
+
+The table lives in an in-memory SQLite database unless --database-url
+points at PostgreSQL (the table is created there and dropped afterwards).
+
+    python scripts/bench_school_index.py --schools 60000 --queries 2000
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np  # noqa: E402
+from sqlalchemy import create_engine, insert, text  # noqa: E402
+
+from app.db.models import School  # noqa: E402
+from app.services.school_index import EARTH_RADIUS, SchoolIndex  # noqa: E402
+
+CITIES = [
+    (35.6812, 139.7671),  # 東京
+    (34.7025, 135.4959),  # 大阪
+    (35.0116, 135.7681),  # 京都
+    (35.1709, 136.8815),  # 名古屋
+    (43.0687, 141.3508),  # 札幌
+    (33.5902, 130.4017),  # 福岡
+]
+
+
+def synthetic_schools(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        lat, lng = rng.choice(CITIES)
+        rows.append(
+            {
+                "school_code": f"S{i:06d}",
+                "name": f"学校{i}",
+                "school_type": rng.choice(["elementary", "junior_high", "nursery"]),
+                "prefecture": "",
+                "city": "",
+                "lat": rng.gauss(lat, 0.15),
+                "lng": rng.gauss(lng, 0.15),
+            }
+        )
+    return rows
+
+
+def haversine(lat1, lng1, lat2, lng2) -> float:
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
+
+
+def sql_nearest(conn, lat: float, lng: float, radius: float):
+    dlat = radius / 111_320
+    dlng = dlat / math.cos(math.radians(lat))
+    rows = conn.execute(
+        text(
+            "SELECT id, lat, lng FROM schools "
+            "WHERE lat BETWEEN :min_lat AND :max_lat "
+            "AND lng BETWEEN :min_lng AND :max_lng"
+        ),
+        {
+            "min_lat": lat - dlat,
+            "max_lat": lat + dlat,
+            "min_lng": lng - dlng,
+            "max_lng": lng + dlng,
+        },
+    ).all()
+    distances = [haversine(lat, lng, row.lat, row.lng) for row in rows]
+    distances = [d for d in distances if d <= radius]
+    return min(distances) if distances else None
+
+
+def report(label: str, elapsed: float, queries: int) -> None:
+    print(
+        f"{label:<6} {elapsed * 1000:10.1f} ms total "
+        f"{elapsed / queries * 1e6:10.1f} µs/query"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--schools", type=int, default=60000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--radius", type=float, default=100.0)
+    parser.add_argument("--database-url", default="sqlite://")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    School.__table__.drop(engine, checkfirst=True)
+    School.__table__.create(engine)
+    rows = synthetic_schools(args.schools)
+    with engine.begin() as conn:
+        conn.execute(insert(School), rows)
+
+    rng = random.Random(1)
+    points = [
+        (rng.gauss(lat, 0.15), rng.gauss(lng, 0.15))
+        for lat, lng in (rng.choice(CITIES) for _ in range(args.queries))
+    ]
+    lats = np.array([p[0] for p in points])
+    lngs = np.array([p[1] for p in points])
+
+    try:
+        with engine.connect() as conn:
+            start = time.perf_counter()
+            expected = [sql_nearest(conn, lat, lng, args.radius) for lat, lng in points]
+            report("sql", time.perf_counter() - start, args.queries)
+
+            start = time.perf_counter()
+            schools = conn.execute(
+                text(
+                    "SELECT school_code, name, school_type, lat, lng "
+                    "FROM schools ORDER BY id"
+                )
+            ).all()
+            index = SchoolIndex(schools)
+            print(f"build  {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+        start = time.perf_counter()
+        single = [index.within(lat, lng, args.radius) for lat, lng in points]
+        report("index", time.perf_counter() - start, args.queries)
+
+        start = time.perf_counter()
+        distances, _ = index.nearest_many(lats, lngs, max_distance=args.radius)
+        report("batch", time.perf_counter() - start, args.queries)
+
+        # Same answers from all three
+        for i, want in enumerate(expected):
+            got = single[i][0][1] if single[i] else None
+            batch = distances[i, 0] if np.isfinite(distances[i, 0]) else None
+            for value in (got, batch):
+                assert (value is None) == (want is None)
+                assert value is None or abs(value - want) < 0.01
+        hits = sum(value is not None for value in expected)
+        print(f"{hits} of {args.queries} points have a school within {args.radius} m")
+    finally:
+        School.__table__.drop(engine)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
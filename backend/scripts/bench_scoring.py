@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Scoring throughput: score_location per location vs score_locations
+
+Scores random locations with the scalar reference (one call per location)
+and the vectorized engine (one call for all), and checks both agree
+exactly.
+
+    python scripts/bench_scoring.py --sizes 10000 100000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np  # noqa: E402
+
+from app.core.scoring import (  # noqa: E402
+    ZONING_SCORES,
+    score_location,
+    score_locations,
+)
+
+
+def random_columns(count: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    zonings = list(ZONING_SCORES) + [None]
+    school_distance = rng.uniform(0, 300, count)
+    school_distance[rng.random(count) < 0.2] = np.nan
+    return {
+        "revpar": rng.uniform(0, 15000, count),
+        "occupancy": rng.uniform(0, 100, count),
+        "market_avg_revpar": rng.uniform(2000, 9000, count),
+        "confidence": rng.uniform(0.3, 1.0, count),
+        "zoning": [zonings[i] for i in rng.integers(0, len(zonings), count)],
+        "school_distance": school_distance,
+        "existing_permits": rng.integers(0, 120, count).astype(float),
+        "signal_sentiment": rng.uniform(-1, 1, count),
+        "recent_violations": rng.integers(0, 10, count).astype(float),
+        "media_sentiment": rng.uniform(-1, 1, count),
+    }
+
+
+def scalar_rows(columns: dict) -> list:
+    rows = []
+    for row in zip(*(list(values) for values in columns.values())):
+        row = dict(zip(columns, row))
+        if row["school_distance"] != row["school_distance"]:  # NaN
+            row["school_distance"] = None
+        rows.append(row)
+    return rows
+
+
+def report(label: str, elapsed: float, count: int) -> None:
+    print(
+        f"{label:<8} {elapsed * 1000:10.1f} ms total "
+        f"{elapsed / count * 1e6:8.2f} µs/location"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        columns = random_columns(count)
+        rows = scalar_rows(columns)
+        print(f"{count} locations")
+
+        start = time.perf_counter()
+        expected = [score_location(**row) for row in rows]
+        report("scalar", time.perf_counter() - start, count)
+
+        start = time.perf_counter()
+        scores = score_locations(**columns)
+        report("vector", time.perf_counter() - start, count)
+
+        for name in (
+            "profitability_score",
+            "licensing_score",
+            "regulation_risk_score",
+            "score",
+        ):
+            assert scores[name].tolist() == [e[name] for e in expected]
+        assert scores["judgment"].tolist() == [e["judgment"] for e in expected]
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
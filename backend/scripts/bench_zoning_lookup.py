@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""用途地域 lookups: ZoningIndex vs scanning every polygon
+
+Builds a synthetic prefecture of square zoning blocks (a --grid x --grid
+tiling, some blocks missing) and finds the block covering random points
+three ways:
+
+  scan    parse every block's GeoJSON and run point_in_polygon on each
+          until one contains the point
+  index   ZoningIndex.locate per point
+  batch   ZoningIndex.locate_many over all points at once
+
+    python scripts/bench_zoning_lookup.py --grid 150 --queries 2000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np  # noqa: E402
+
+from app.core.geometry import point_in_polygon, polygons_from_geojson  # noqa: E402
+from app.services.zoning import ZoningIndex  # noqa: E402
+
+ORIGIN = (35.0, 135.6)
+BLOCK = 0.002
+ZONING_TYPES = ["第一種住居地域", "商業地域", "準工業地域", "第一種低層住居専用地域"]
+
+
+def synthetic_zoning(grid: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    rows = []
+    for row in range(grid):
+        for col in range(grid):
+            if rng.random() < 0.1:
+                continue
+            lat = ORIGIN[0] + row * BLOCK
+            lng = ORIGIN[1] + col * BLOCK
+            ring = [
+                [lng, lat],
+                [lng + BLOCK, lat],
+                [lng + BLOCK, lat + BLOCK],
+                [lng, lat + BLOCK],
+                [lng, lat],
+            ]
+            rows.append(
+                (
+                    f"Z{row:03d}{col:03d}",
+                    rng.choice(ZONING_TYPES),
+                    60.0,
+                    200.0,
+                    {"type": "Polygon", "coordinates": [ring]},
+                )
+            )
+    return rows
+
+
+def scan(rows: list, lat: float, lng: float):
+    for i, row in enumerate(rows):
+        if any(point_in_polygon(p, lng, lat) for p in polygons_from_geojson(row[4])):
+            return i
+    return None
+
+
+def report(label: str, elapsed: float, queries: int) -> None:
+    print(
+        f"{label:<6} {elapsed * 1000:10.1f} ms total "
+        f"{elapsed / queries * 1e6:10.1f} µs/point"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grid", type=int, default=150)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--scan-queries", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = synthetic_zoning(args.grid)
+    extent = args.grid * BLOCK
+    rng = np.random.default_rng(1)
+    lats = ORIGIN[0] + rng.uniform(0, extent, args.queries)
+    lngs = ORIGIN[1] + rng.uniform(0, extent, args.queries)
+    print(f"{len(rows)} zoning areas, {args.queries} points")
+
+    # The scan is slow enough that a sample stands in for the rest
+    scan_count = min(args.scan_queries, args.queries)
+    start = time.perf_counter()
+    expected = [scan(rows, lats[i], lngs[i]) for i in range(scan_count)]
+    report("scan", time.perf_counter() - start, scan_count)
+
+    start = time.perf_counter()
+    index = ZoningIndex(rows)
+    print(f"build  {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+    start = time.perf_counter()
+    single = [index.locate(lat, lng) for lat, lng in zip(lats, lngs)]
+    report("index", time.perf_counter() - start, args.queries)
+
+    start = time.perf_counter()
+    batch = index.locate_many(lats, lngs)
+    report("batch", time.perf_counter() - start, args.queries)
+
+    # Same answers from all three
+    for i, record_id in enumerate(single):
+        assert batch[i] == (-1 if record_id is None else record_id)
+        if i < scan_count:
+            assert record_id == expected[i]
+    hits = sum(record_id is not None for record_id in single)
+    print(f"{hits} of {args.queries} points are in a zoning area")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Build the offline gazetteer index from MLIT 位置参照情報 CSV files
+
+Download 大字・町丁目レベル位置参照情報 for the target prefectures from
+https://nlftp.mlit.go.jp/isj/ and point this script at the extracted CSVs:
+
+    python scripts/build_gazetteer_index.py data/26000-17.0b.csv data/13000-17.0b.csv \\
+        --output data/gazetteer.json.gz
+
+Then set GAZETTEER_INDEX_PATH to the output file.
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.address_normalizer import normalize_address  # noqa: E402
+from app.services.gazetteer import GazetteerIndex, read_mlit_csv  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="MLIT 位置参照情報 CSV files")
+    parser.add_argument("--output", required=True, help="Index file to write")
+    parser.add_argument(
+        "--encoding", default="cp932", help="CSV encoding (default: cp932)"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = itertools.chain.from_iterable(
+        read_mlit_csv(path, encoding=args.encoding) for path in args.inputs
+    )
+    index = GazetteerIndex.build(rows)
+    index.save(args.output)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {len(index)} 町丁目 / {len(index.keys)} keys -> {args.output}")
+    print(f"   build: {elapsed:.2f}s, size: {Path(args.output).stat().st_size:,} bytes")
+
+    # Quick lookup latency check over the indexed addresses
+    queries = [
+        normalize_address(f"{p}{c}{d}1-1") for p, c, d, _, _ in index.records[:10000]
+    ]
+    if queries:
+        start = time.perf_counter()
+        for query in queries:
+            index.lookup(query)
+        per_lookup = (time.perf_counter() - start) / len(queries) * 1e6
+        print(f"   lookup: {per_lookup:.1f}µs/address ({len(queries)} samples)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
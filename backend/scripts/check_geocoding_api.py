@@ -14,30 +14,30 @@ import asyncio
 async def check_api_key():
     """Check if API key works with a simple request"""
     api_key = settings.GOOGLE_MAPS_API_KEY
-    
+
     if not api_key:
         print("❌ APIキーが設定されていません")
         return False
-    
+
     print(f"✅ APIキーが設定されています (長さ: {len(api_key)})")
     print(f"   キーの先頭: {api_key[:10]}...")
-    
+
     # シンプルなテストリクエスト
     url = "https://maps.googleapis.com/maps/api/geocode/json"
     params = {
         "address": "Tokyo",
         "key": api_key,
     }
-    
+
     try:
         async with httpx.AsyncClient(timeout=10.0) as client:
             response = await client.get(url, params=params)
             data = response.json()
-            
+
             status = data.get("status")
-            
+
             print(f"\n📡 API レスポンスステータス: {status}")
-            
+
             if status == "OK":
                 print("✅ APIキーは正常に動作しています！")
                 return True
@@ -56,7 +56,7 @@ async def check_api_key():
             else:
                 print(f"❌ 予期しないステータス: {status}")
                 return False
-                
+
     except Exception as e:
         print(f"❌ エラーが発生しました: {e}")
         return False
@@ -67,4 +67,3 @@ if __name__ == "__main__":
     print("=" * 60)
     asyncio.run(check_api_key())
     print("=" * 60)
-
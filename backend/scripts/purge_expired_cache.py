@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Purge expired entries from the Firestore cache collection
+
+Deletes in pages of batched deletes with bounded parallelism. Each run stops
+when its time budget is spent and prints a JSON progress line including the
+cursor to pass back with --cursor; --until-complete keeps going run after
+run until the purge catches up.
+
+    python scripts/purge_expired_cache.py --time-budget 60 --parallelism 8
+    python scripts/purge_expired_cache.py --cursor '{"expires_at": ..., "id": ...}'
+
+Not needed when the collection has the Firestore TTL policy on expires_at
+(terraform var firestore_cache_native_ttl), except to catch up faster.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.services.firestore import FirestoreCache  # noqa: E402
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--collection", default="cache")
+    parser.add_argument("--page-size", type=int, default=settings.CACHE_PURGE_PAGE_SIZE)
+    parser.add_argument(
+        "--parallelism", type=int, default=settings.CACHE_PURGE_PARALLELISM
+    )
+    parser.add_argument(
+        "--time-budget", type=float, default=settings.CACHE_PURGE_TIME_BUDGET
+    )
+    parser.add_argument("--cursor", type=json.loads, default=None)
+    parser.add_argument("--until-complete", action="store_true")
+    args = parser.parse_args()
+
+    cache = FirestoreCache(collection_name=args.collection)
+    cursor = args.cursor
+    while True:
+        result = await cache.purge_expired(
+            page_size=args.page_size,
+            parallelism=args.parallelism,
+            time_budget=args.time_budget,
+            cursor=cursor,
+        )
+        print(json.dumps(result.to_dict(), ensure_ascii=False), flush=True)
+        cursor = result.cursor
+        if result.complete or not args.until_complete:
+            break
+
+    return 0 if result.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -48,4 +48,3 @@ async def test_geocoding():
 
 if __name__ == "__main__":
     asyncio.run(test_geocoding())
-
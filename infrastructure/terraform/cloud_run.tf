@@ -35,6 +35,11 @@ resource "google_cloud_run_service" "api" {
           }
         }
 
+        env {
+          name  = "FIRESTORE_CACHE_NATIVE_TTL"
+          value = tostring(var.firestore_cache_native_ttl)
+        }
+
         env {
           name = "REDIS_URL"
           value_from {
@@ -34,6 +34,18 @@ resource "google_firestore_index" "cache_by_key" {
   }
 }
 
+# TTL policy: Firestore deletes cache documents once expires_at has passed
+# (typically within 24 hours), so the app-side purge becomes optional
+resource "google_firestore_field" "cache_ttl" {
+  count      = var.firestore_cache_native_ttl ? 1 : 0
+  project    = var.project_id
+  database   = google_firestore_database.main.name
+  collection = "cache"
+  field      = "expires_at"
+
+  ttl_config {}
+}
+
 resource "google_firestore_index" "user_profiles" {
   project    = var.project_id
   database   = google_firestore_database.main.name
@@ -31,3 +31,9 @@ variable "redis_memory_size_gb" {
   default     = 1
 }
 
+
+variable "firestore_cache_native_ttl" {
+  description = "Enable the Firestore TTL policy on cache.expires_at"
+  type        = bool
+  default     = true
+}